@@ -0,0 +1,108 @@
+"""
+Benchmark: per-call LLM client construction vs the pooled client registry
+
+Runs chat completion calls against a local mock OpenAI-compatible server
+and reports per-call latency for:
+  - fresh: a new OpenAI client per call (previous Observer/Reflector behaviour)
+  - pooled: one client from LLMClientRegistry with keep-alive connections
+
+The local server speaks plain HTTP, so this measures client construction
+and TCP connection setup only; against api.openai.com each fresh client
+also pays a TLS handshake, so the real-world gap is larger.
+
+Usage:
+    python benchmarks/bench_llm_clients.py [--calls 200]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.llm_clients import LLMClientRegistry  # noqa: E402
+
+RESPONSE = json.dumps({
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "bench",
+    "choices": [{
+        "index": 0,
+        "finish_reason": "stop",
+        "message": {"role": "assistant", "content": "[]"},
+    }],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def call(client) -> None:
+    client.chat.completions.create(
+        model="bench",
+        messages=[{"role": "user", "content": "hello"}],
+    )
+
+
+def run(label: str, calls: int, get_client) -> list:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call(get_client())
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{label:>7}: mean {statistics.mean(latencies):6.2f} ms  "
+        f"p50 {statistics.median(latencies):6.2f} ms  "
+        f"p95 {statistics.quantiles(latencies, n=20)[-1]:6.2f} ms"
+    )
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    from openai import OpenAI
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    registry = LLMClientRegistry()
+    try:
+        # Warm up imports and the server
+        call(registry.get_openai("bench", base_url))
+
+        fresh = run("fresh", args.calls, lambda: OpenAI(api_key="bench", base_url=base_url))
+        pooled = run("pooled", args.calls, lambda: registry.get_openai("bench", base_url))
+        print(f"speedup: {statistics.mean(fresh) / statistics.mean(pooled):.1f}x (mean)")
+    finally:
+        registry.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
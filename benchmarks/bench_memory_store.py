@@ -0,0 +1,135 @@
+"""
+Benchmark: hot-tier (MemoryStore) query latency by collection size
+
+Fills a ChromaDB collection with synthetic observations and reports
+per-query latency at each size for:
+  - count+query: a collection.count() round trip before every query
+    (previous MemoryStore.search behaviour)
+  - search: MemoryStore.search with the cached collection size
+
+Vectors come from a cheap deterministic hash embedding so the numbers
+reflect the index and the extra round trip rather than an embedding
+model. Building the 1M collection takes several minutes and a few GB
+of disk; pass --sizes to pick smaller ones. Requires chromadb.
+
+Usage:
+    python benchmarks/bench_memory_store.py [--sizes 10000,100000,1000000] [--queries 200]
+"""
+
+import argparse
+import hashlib
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lib.memory_store import MemoryStore  # noqa: E402
+
+DIMS = 64
+
+
+def make_embedding_function():
+    import numpy as np
+    from chromadb.api.types import EmbeddingFunction
+
+    class HashEmbedding(EmbeddingFunction):
+        """Deterministic pseudo-random unit vector per text"""
+
+        def __call__(self, input):
+            vectors = []
+            for text in input:
+                seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+                vector = np.random.default_rng(seed).standard_normal(DIMS)
+                vectors.append((vector / np.linalg.norm(vector)).astype(np.float32))
+            return vectors
+
+        @staticmethod
+        def name() -> str:
+            return "oc-memory-bench-hash"
+
+    return HashEmbedding()
+
+
+def fill(collection, start: int, end: int, batch_size: int) -> None:
+    """Insert observations [start, end) with random unit vectors"""
+    import numpy as np
+
+    rng = np.random.default_rng(start)
+    for offset in range(start, end, batch_size):
+        stop = min(offset + batch_size, end)
+        vectors = rng.standard_normal((stop - offset, DIMS)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        collection.add(
+            ids=[f"obs-{i}" for i in range(offset, stop)],
+            embeddings=vectors.tolist(),
+            documents=[f"observation {i} about topic {i % 997}" for i in range(offset, stop)],
+            metadatas=[{'priority': 'medium', 'category': 'fact'} for _ in range(offset, stop)],
+        )
+
+
+def measure(label: str, queries: list, run_query) -> float:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run_query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(
+        f"  {label:>11}: mean {statistics.mean(latencies):7.3f} ms  "
+        f"p50 {statistics.median(latencies):7.3f} ms  "
+        f"p95 {statistics.quantiles(latencies, n=20)[-1]:7.3f} ms"
+    )
+    return statistics.mean(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default="10000,100000,1000000")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n-results', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import chromadb
+    except ImportError:
+        sys.exit("chromadb not installed. Run: pip install chromadb")
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    queries = [f"topic {i % 997}" for i in range(args.queries)]
+
+    with tempfile.TemporaryDirectory(prefix="oc-bench-chroma-") as tmp:
+        client = chromadb.PersistentClient(path=tmp)
+        collection = client.get_or_create_collection(
+            name="observations",
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=make_embedding_function(),
+        )
+        batch_size = min(5000, getattr(client, 'get_max_batch_size', lambda: 5000)())
+
+        store = MemoryStore(persist_dir=tmp, buffer_size=0)
+        store._client = client
+        store._collection = collection
+
+        filled = 0
+        for size in sizes:
+            start = time.perf_counter()
+            fill(collection, filled, size, batch_size)
+            filled = size
+            print(f"{size:,} observations (filled in {time.perf_counter() - start:.1f}s)")
+
+            store._count_exact = False  # filled behind the store's back
+            store.search(queries[0], n_results=args.n_results)  # warm up
+
+            def count_then_query(query):
+                n_results = min(args.n_results, collection.count())
+                collection.query(query_texts=[query], n_results=n_results)
+
+            before = measure("count+query", queries, count_then_query)
+            after = measure("search", queries, lambda q: store.search(q, n_results=args.n_results))
+            print(f"  {'saved':>11}: {before - after:7.3f} ms per query ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
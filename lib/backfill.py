@@ -0,0 +1,299 @@
+"""
+Batch Backfill for OC-Memory
+Bulk observation extraction through the provider batch API
+
+When OC-Memory is first pointed at an existing notes tree, extracting
+every file with synchronous calls is slow and costly. The backfill
+writes all extraction requests as an OpenAI Batch JSONL file, submits
+it, polls until the job completes and parses the results with the
+Observer, so the observations can be bulk-loaded into memory.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.observer import Observation, Observer, chunk_messages, merge_observations
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+class BackfillError(Exception):
+    """Batch backfill related errors"""
+    pass
+
+
+@dataclass
+class BackfillResult:
+    """Outcome of a backfill run"""
+    observations: Dict[str, List[Observation]] = field(default_factory=dict)
+    requests: int = 0
+    cached: int = 0
+    failed: int = 0
+    failed_inputs: List[str] = field(default_factory=list)
+    batch_ids: List[str] = field(default_factory=list)
+
+    @property
+    def total_observations(self) -> int:
+        return sum(len(obs) for obs in self.observations.values())
+
+
+def collect_markdown_files(
+    watch_dirs: List[str],
+    recursive: bool = True,
+    max_file_size: Optional[int] = None,
+) -> List[Path]:
+    """
+    List markdown files under the watch directories.
+
+    Args:
+        watch_dirs: Directories to walk
+        recursive: Include subdirectories
+        max_file_size: Skip files larger than this many bytes
+
+    Returns:
+        Sorted list of markdown file paths
+    """
+    files = set()
+    for watch_dir in watch_dirs:
+        root = Path(watch_dir).expanduser().resolve()
+        if not root.exists():
+            logger.warning(f"Skipping non-existent directory: {root}")
+            continue
+        for pattern in ('*.md', '*.markdown'):
+            matches = root.rglob(pattern) if recursive else root.glob(pattern)
+            for path in matches:
+                if not path.is_file():
+                    continue
+                if max_file_size and path.stat().st_size > max_file_size:
+                    logger.warning(f"Skipping oversized file: {path}")
+                    continue
+                files.add(path)
+    return sorted(files)
+
+
+# =============================================================================
+# Batch Backfill
+# =============================================================================
+
+class BatchBackfill:
+    """
+    Runs Observer extraction for many inputs as provider batch jobs.
+    """
+
+    def __init__(
+        self,
+        observer: Observer,
+        client: Any = None,
+        poll_interval: float = 30.0,
+        timeout: float = 86400.0,
+        max_batch_requests: int = 50000,
+    ):
+        """
+        Args:
+            observer: Observer supplying prompts, parsing and the response cache
+            client: OpenAI client (default: pooled client for the observer's key)
+            poll_interval: Seconds between batch status checks
+            timeout: Seconds to wait for a batch before giving up
+            max_batch_requests: Requests per submitted batch file
+        """
+        if observer.provider != "openai":
+            raise BackfillError(
+                f"Batch backfill requires the openai provider, not {observer.provider}"
+            )
+        self.observer = observer
+        if client is None:
+            try:
+                client = observer.clients.get_openai(observer.api_key, observer.base_url)
+            except Exception as e:
+                raise BackfillError(f"Cannot create OpenAI client: {e}") from e
+        self.client = client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_batch_requests = max_batch_requests
+
+    def run(self, inputs: Dict[str, str]) -> BackfillResult:
+        """
+        Extract observations from many inputs.
+
+        Args:
+            inputs: Mapping of input id (e.g. file path) to text
+
+        Returns:
+            BackfillResult with observations per input id; inputs with a
+            request that returned no result are left out and listed in
+            failed_inputs
+
+        Raises:
+            BackfillError: A batch could not be submitted, polled or read
+        """
+        result = BackfillResult()
+
+        # custom_id -> (input id, cache key)
+        pending: Dict[str, Tuple[str, Optional[str]]] = {}
+        requests: List[Dict[str, Any]] = []
+        responses: Dict[str, List[str]] = {input_id: [] for input_id in inputs}
+
+        for index, (input_id, text) in enumerate(inputs.items()):
+            if not text.strip():
+                continue
+            windows = chunk_messages(
+                [{"role": "user", "content": text}],
+                self.observer.window_tokens,
+                self.observer.window_overlap,
+            )
+            for window_index, window in enumerate(windows):
+                conversation_text = self.observer._format_messages(window)
+                cache_key = self.observer._cache_key(conversation_text)
+                if cache_key is not None:
+                    cached = self.observer.cache.get(cache_key)
+                    if cached is not None:
+                        responses[input_id].append(cached)
+                        result.cached += 1
+                        continue
+
+                custom_id = f"{index}-{window_index}"
+                pending[custom_id] = (input_id, cache_key)
+                requests.append({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": self.observer._openai_request(conversation_text),
+                })
+
+        result.requests = len(requests)
+        batch_ids = [
+            self._submit(requests[i:i + self.max_batch_requests])
+            for i in range(0, len(requests), self.max_batch_requests)
+        ]
+        result.batch_ids = batch_ids
+
+        for batch_id in batch_ids:
+            for custom_id, content in self._collect(batch_id).items():
+                if custom_id not in pending:
+                    continue
+                input_id, cache_key = pending.pop(custom_id)
+                responses[input_id].append(content)
+                if cache_key is not None and self.observer._decode_response(content) is not None:
+                    self.observer.cache.put(cache_key, content)
+
+        result.failed = len(pending)
+        if pending:
+            logger.warning(f"{len(pending)} backfill requests returned no result")
+        # A missing window fails the whole input, as in Observer.observe()
+        failed_inputs = {input_id for input_id, _ in pending.values()}
+        result.failed_inputs = [input_id for input_id in inputs if input_id in failed_inputs]
+
+        for input_id, raw_responses in responses.items():
+            if input_id in failed_inputs:
+                continue
+            result.observations[input_id] = merge_observations(
+                [self.observer._parse_response(raw) for raw in raw_responses]
+            )
+
+        logger.info(
+            f"Backfill extracted {result.total_observations} observations from "
+            f"{len(inputs)} inputs ({result.requests} batched, {result.cached} cached, "
+            f"{result.failed} failed in {len(result.failed_inputs)} inputs)"
+        )
+        return result
+
+    def _submit(self, requests: List[Dict[str, Any]]) -> str:
+        """Upload a batch input file and create the batch job"""
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in requests)
+        uploaded = self._api(
+            "Batch input upload", self.client.files.create,
+            file=("oc_memory_backfill.jsonl", payload.encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self._api(
+            "Batch creation", self.client.batches.create,
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+            metadata={"source": "oc-memory-backfill"},
+        )
+        logger.info(f"Submitted backfill batch {batch.id} ({len(requests)} requests)")
+        return batch.id
+
+    @staticmethod
+    def _api(action: str, func, *args, **kwargs):
+        """Call the OpenAI SDK, reporting any failure as BackfillError"""
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            raise BackfillError(f"{action} failed: {e}") from e
+
+    def _wait(self, batch_id: str):
+        """Poll a batch until it reaches a terminal status"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            batch = self._api(f"Batch {batch_id} status check", self.client.batches.retrieve, batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if time.monotonic() >= deadline:
+                raise BackfillError(f"Batch {batch_id} not finished after {self.timeout}s")
+            logger.debug(f"Batch {batch_id} status: {batch.status}")
+            time.sleep(self.poll_interval)
+
+    def _collect(self, batch_id: str) -> Dict[str, str]:
+        """
+        Wait for a batch and read its output file.
+
+        Returns:
+            Mapping of custom_id to message content for successful requests
+        """
+        batch = self._wait(batch_id)
+        if batch.status != 'completed':
+            logger.error(f"Batch {batch_id} ended with status {batch.status}")
+        if not batch.output_file_id:
+            return {}
+
+        contents = {}
+        output = self._api(
+            f"Batch {batch_id} output download", self.client.files.content, batch.output_file_id
+        ).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    logger.warning(f"Backfill request {entry.get('custom_id')} failed")
+                    continue
+                message = response['body']['choices'][0]['message']
+                contents[entry['custom_id']] = message.get('content') or "[]"
+            except (json.JSONDecodeError, KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Unreadable batch output line: {e}")
+        return contents
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+def create_backfill(config: Dict[str, Any], observer: Observer) -> BatchBackfill:
+    """
+    Create a BatchBackfill from config dictionary.
+
+    Args:
+        config: Configuration dict with optional 'backfill' section
+        observer: Observer to extract with
+
+    Returns:
+        Configured BatchBackfill instance
+    """
+    backfill_config = config.get('backfill', {})
+    return BatchBackfill(
+        observer,
+        poll_interval=backfill_config.get('poll_interval', 30.0),
+        timeout=backfill_config.get('timeout', 86400.0),
+        max_batch_requests=backfill_config.get('max_batch_requests', 50000),
+    )
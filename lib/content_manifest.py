@@ -0,0 +1,223 @@
+"""
+Content Manifest for OC-Memory
+Persistent source path -> content hash registry
+
+Lets the daemon skip files whose bytes have not changed since they were
+last processed (touch events, editor autosaves) before any copy or LLM
+work is done. An mtime/size pre-check avoids hashing untouched files.
+A new version can be staged when it is copied and committed only once
+its observations are stored, so a failed extraction is retried.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class FileVersion(NamedTuple):
+    """Content digest of a file and the stat it was hashed under"""
+    digest: str
+    mtime_ns: int
+    size: int
+
+
+def hash_file(path: Path) -> str:
+    """Fast content hash of a file (BLAKE2b, 128-bit)"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# =============================================================================
+# Content Manifest
+# =============================================================================
+
+class ContentManifest:
+    """
+    Tracks the content hash of every processed source file.
+    """
+
+    MANIFEST_FILENAME = ".oc_manifest.sqlite"
+
+    def __init__(self, manifest_path: str):
+        """
+        Args:
+            manifest_path: SQLite file to persist the manifest in
+        """
+        self.manifest_path = Path(manifest_path).expanduser().resolve()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Versions copied but not yet fully processed
+        self._staged: Dict[str, FileVersion] = {}
+
+        # Statistics
+        self.unchanged = 0
+        self.changed = 0
+        self.hashed = 0
+
+    def _ensure_initialized(self) -> sqlite3.Connection:
+        """Lazy-open the SQLite manifest"""
+        if self._conn is None:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.manifest_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def digest_if_changed(self, path: Path) -> Optional[FileVersion]:
+        """
+        Check a file against the manifest.
+
+        Args:
+            path: Source file
+
+        Returns:
+            None if the content is unchanged since it was recorded,
+            otherwise the current digest with the stat taken before
+            hashing (pass it to record() or stage())
+        """
+        path = Path(path).expanduser().resolve()
+        stat = path.stat()
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            row = conn.execute(
+                "SELECT mtime_ns, size, digest FROM manifest WHERE path = ?",
+                (str(path),),
+            ).fetchone()
+
+        if row is not None and (row[0], row[1]) == (stat.st_mtime_ns, stat.st_size):
+            self.unchanged += 1
+            return None
+
+        digest = hash_file(path)
+        self.hashed += 1
+
+        if row is not None and row[1] == stat.st_size and row[2] == digest:
+            # Touched but identical: remember the new mtime to skip hashing next time
+            self._store(path, stat.st_mtime_ns, stat.st_size, digest)
+            self.unchanged += 1
+            return None
+
+        self.changed += 1
+        return FileVersion(digest, stat.st_mtime_ns, stat.st_size)
+
+    def is_unchanged(self, path: Path) -> bool:
+        """True if the file content matches the recorded hash"""
+        return self.digest_if_changed(path) is None
+
+    def record(self, path: Path, version: Optional[FileVersion] = None) -> FileVersion:
+        """
+        Record a file as processed.
+
+        Args:
+            path: Source file
+            version: Version from digest_if_changed() (current file if None)
+
+        Returns:
+            The recorded version
+        """
+        path = Path(path).expanduser().resolve()
+        if version is None:
+            # Stat before hashing: an edit in between leaves an mtime
+            # that no longer matches, so the file is hashed again
+            stat = path.stat()
+            version = FileVersion(hash_file(path), stat.st_mtime_ns, stat.st_size)
+            self.hashed += 1
+        self._store(path, version.mtime_ns, version.size, version.digest)
+        return version
+
+    def stage(self, path: Path, version: FileVersion) -> None:
+        """
+        Hold a version until commit() records it.
+
+        Staged versions live in memory only, so a file whose processing
+        never finished (failure, shutdown) is processed again.
+        """
+        path = Path(path).expanduser().resolve()
+        with self._lock:
+            self._staged[str(path)] = version
+
+    def commit(self, path: Path) -> bool:
+        """
+        Record the staged version of a file.
+
+        Returns:
+            True if a staged version was recorded
+        """
+        path = Path(path).expanduser().resolve()
+        with self._lock:
+            version = self._staged.pop(str(path), None)
+        if version is None:
+            return False
+        self._store(path, version.mtime_ns, version.size, version.digest)
+        return True
+
+    def discard(self, path: Path) -> None:
+        """Drop the staged version of a file (it will be seen as changed again)"""
+        path = Path(path).expanduser().resolve()
+        with self._lock:
+            self._staged.pop(str(path), None)
+
+    def forget(self, path: Path) -> None:
+        """Remove a file from the manifest"""
+        path = Path(path).expanduser().resolve()
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                conn.execute("DELETE FROM manifest WHERE path = ?", (str(path),))
+
+    def _store(self, path: Path, mtime_ns: int, size: int, digest: str) -> None:
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO manifest "
+                    "(path, mtime_ns, size, digest, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (str(path), mtime_ns, size, digest, time.time()),
+                )
+
+    def count(self) -> int:
+        """Number of recorded files"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            return conn.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get manifest statistics"""
+        with self._lock:
+            staged = len(self._staged)
+        return {
+            'files': self.count(),
+            'staged': staged,
+            'unchanged': self.unchanged,
+            'changed': self.changed,
+            'hashed': self.hashed,
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
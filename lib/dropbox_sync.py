@@ -12,6 +12,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.query_cache import ChangeNotifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,7 +46,7 @@ class SyncResult:
 # Dropbox Sync Client
 # =============================================================================
 
-class DropboxSync:
+class DropboxSync(ChangeNotifier):
     """
     Dropbox sync client for OC-Memory cold storage.
     Handles upload, download, and bidirectional sync.
@@ -141,6 +143,7 @@ class DropboxSync:
                     mode=dropbox.files.WriteMode.overwrite,
                 )
             logger.info(f"Uploaded: {local_path.name} -> {remote_path}")
+            self._notify_change()
             return remote_path
         except Exception as e:
             logger.error(f"Upload failed for {local_path.name}: {e}")
@@ -242,6 +245,8 @@ class DropboxSync:
                 else:
                     result.errors += 1
 
+        if result.downloaded:
+            self._notify_change()
         logger.info(f"Sync complete: {result}")
         return result
 
@@ -0,0 +1,484 @@
+"""
+Embeddings for OC-Memory
+Pluggable embedding backends with an in-memory LRU and SQLite cache
+
+MemoryStore used Chroma's implicit default embedding function, so every
+stored observation and every search query was embedded from scratch.
+CachedEmbeddingFunction wraps a configurable backend (Chroma's bundled
+ONNX model, a local CPU sentence-transformers model or the OpenAI API)
+and remembers text -> vector, first in memory and then on disk. Cache
+misses are embedded in batches on a thread pool, except with the local
+sentence-transformers backend, which encodes one batch at a time.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Backend signature: list of texts -> list of vectors
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+DEFAULT_LOCAL_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_OPENAI_MODEL = "text-embedding-3-small"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at);
+"""
+
+
+class EmbeddingError(Exception):
+    """Embedding backend related errors"""
+    pass
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key for a text embedded by a given model"""
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(model.encode('utf-8'))
+    hasher.update(b'\0')
+    hasher.update(text.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+# =============================================================================
+# Disk cache
+# =============================================================================
+
+class EmbeddingCache:
+    """
+    Persistent text -> vector cache in SQLite with LRU size eviction.
+
+    Vectors are stored as float32 blobs.
+    """
+
+    CACHE_FILENAME = ".oc_embeddings.sqlite"
+
+    def __init__(self, cache_path: str, max_entries: int = 200000):
+        """
+        Args:
+            cache_path: SQLite file to store vectors in
+            max_entries: Maximum cached vectors (LRU eviction beyond, 0 = unbounded)
+        """
+        self.cache_path = Path(cache_path).expanduser().resolve()
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._entries = 0
+
+    def _ensure_initialized(self) -> sqlite3.Connection:
+        """Lazy-open the SQLite cache"""
+        if self._conn is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Look up several keys; returns only the ones found"""
+        if not keys:
+            return {}
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._ensure_initialized()
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = list(keys[i:i + 500])
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    vector = array('f')
+                    vector.frombytes(blob)
+                    found[key] = vector.tolist()
+            if found:
+                with conn:
+                    conn.executemany(
+                        "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                        [(time.time(), key) for key in found],
+                    )
+        return found
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        """Store several vectors, evicting least recently used entries if full"""
+        if not items:
+            return
+        now = time.time()
+        rows = [(array('f', vector).tobytes(), now, key) for key, vector in items.items()]
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                # Update existing keys, then insert the rest; the insert's
+                # rowcount keeps the entry count exact without a COUNT(*)
+                conn.executemany(
+                    "UPDATE embeddings SET vector = ?, accessed_at = ? WHERE key = ?", rows
+                )
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (vector, accessed_at, key) VALUES (?, ?, ?)", rows
+                ).rowcount
+            self._entries += inserted
+            if self.max_entries > 0 and self._entries > self.max_entries:
+                excess = self._entries - int(self.max_entries * 0.9)
+                with conn:
+                    deleted = conn.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY accessed_at LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+                self._entries -= deleted
+
+    def count(self) -> int:
+        with self._lock:
+            self._ensure_initialized()
+            return self._entries
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# =============================================================================
+# Cached embedding function
+# =============================================================================
+
+class CachedEmbeddingFunction:
+    """
+    Chroma-compatible embedding function with LRU + disk caching.
+
+    Called with a list of texts, it answers from the in-memory LRU,
+    then the disk cache, and embeds the remaining (de-duplicated) texts
+    in batches of batch_size on a thread pool.
+    """
+
+    def __init__(
+        self,
+        backend: EmbedFn,
+        model_name: str,
+        disk_cache: Optional[EmbeddingCache] = None,
+        memory_entries: int = 4096,
+        batch_size: int = 64,
+        workers: int = 2,
+    ):
+        """
+        Args:
+            backend: Function embedding a list of texts
+            model_name: Backend/model identifier (part of every cache key)
+            disk_cache: Persistent cache shared across restarts (optional)
+            memory_entries: In-memory LRU capacity (0 = disabled)
+            batch_size: Texts per backend call
+            workers: Concurrent backend calls for large inputs (1 = serial,
+                     for backends that cannot run calls in parallel)
+        """
+        self.backend = backend
+        self.model_name = model_name
+        self.disk_cache = disk_cache
+        self.memory_entries = memory_entries
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.embed_time = 0.0
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        """Embed texts (Chroma EmbeddingFunction protocol)"""
+        return self.embed(list(input))
+
+    def embed_query(self, input: List[str]) -> List[List[float]]:
+        """Embed query texts (same model and cache as documents)"""
+        return self.embed(list(input))
+
+    @staticmethod
+    def is_legacy() -> bool:
+        # Plain callable: Chroma should not try to persist/rebuild it from config
+        return True
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, using cached vectors where available.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector per text, in input order
+        """
+        keys = [embedding_key(self.model_name, text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    vectors[key] = vector
+            self.memory_hits += sum(1 for key in keys if key in vectors)
+
+        missing = list(dict.fromkeys(key for key in keys if key not in vectors))
+        if missing and self.disk_cache is not None:
+            from_disk = self.disk_cache.get_many(missing)
+            with self._lock:
+                self.disk_hits += sum(1 for key in keys if key in from_disk)
+            vectors.update(from_disk)
+            self._remember(from_disk)
+            missing = [key for key in missing if key not in from_disk]
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            embedded = self._embed_missing([text_by_key[key] for key in missing])
+            computed = dict(zip(missing, embedded))
+            with self._lock:
+                self.misses += sum(1 for key in keys if key in computed)
+            vectors.update(computed)
+            self._remember(computed)
+            if self.disk_cache is not None:
+                self.disk_cache.put_many(computed)
+
+        return [vectors[key] for key in keys]
+
+    def _embed_missing(self, texts: List[str]) -> List[List[float]]:
+        """Embed uncached texts in batches, concurrently when there are several"""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        start = time.perf_counter()
+        if len(batches) == 1 or self.workers == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            results = list(self._get_pool().map(self._embed_batch, batches))
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.batches += len(batches)
+            self.embed_time += elapsed
+        return [vector for batch in results for vector in batch]
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.backend(texts)
+        if len(vectors) != len(texts):
+            raise EmbeddingError(
+                f"Embedding backend returned {len(vectors)} vectors for {len(texts)} texts"
+            )
+        return [[float(x) for x in vector] for vector in vectors]
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="embed"
+                )
+            return self._pool
+
+    def _remember(self, vectors: Dict[str, List[float]]) -> None:
+        """Add vectors to the in-memory LRU"""
+        if self.memory_entries <= 0 or not vectors:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._lru[key] = vector
+                self._lru.move_to_end(key)
+            while len(self._lru) > self.memory_entries:
+                self._lru.popitem(last=False)
+
+    def close(self) -> None:
+        """Shut down the thread pool and close the disk cache"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get embedding cache statistics"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'model': self.model_name,
+                'memory_entries': len(self._lru),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'batches': self.batches,
+                'embed_time': round(self.embed_time, 3),
+            }
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+def load_backend(
+    provider: str,
+    model: Optional[str] = None,
+    device: str = "cpu",
+    api_key_env: str = "OPENAI_API_KEY",
+    base_url: Optional[str] = None,
+) -> EmbedFn:
+    """
+    Build an embedding backend.
+
+    Args:
+        provider: 'default' (Chroma's bundled ONNX MiniLM, CPU),
+                  'local' (sentence-transformers model) or 'openai'
+        model: Model name (provider default if None)
+        device: Device for local models ('cpu', 'cuda', ...)
+        api_key_env: Environment variable holding the OpenAI API key
+        base_url: OpenAI-compatible endpoint (None = api.openai.com)
+
+    Returns:
+        Function embedding a list of texts
+
+    Raises:
+        EmbeddingError: Unknown provider or missing package
+    """
+    if provider == "default":
+        try:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+        except ImportError as e:
+            raise EmbeddingError("chromadb not installed. Run: pip install chromadb") from e
+        onnx = DefaultEmbeddingFunction()
+        return lambda texts: [list(vector) for vector in onnx(texts)]
+
+    if provider == "local":
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise EmbeddingError(
+                "sentence-transformers not installed. Run: pip install sentence-transformers"
+            ) from e
+        encoder = SentenceTransformer(model or DEFAULT_LOCAL_MODEL, device=device)
+        # encode() is not re-entrant for the same model across threads, so
+        # calls are serial (create_embedding_function gives it one worker)
+        lock = threading.Lock()
+
+        def encode(texts: List[str]) -> List[List[float]]:
+            with lock:
+                return encoder.encode(
+                    texts, convert_to_numpy=True, normalize_embeddings=True
+                ).tolist()
+        return encode
+
+    if provider == "openai":
+        from lib.llm_clients import get_client_registry
+
+        api_key = os.environ.get(api_key_env, "")
+        if not api_key:
+            raise EmbeddingError(f"No API key found in {api_key_env}")
+        client = get_client_registry().get_openai(api_key, base_url)
+        model_name = model or DEFAULT_OPENAI_MODEL
+
+        def embed(texts: List[str]) -> List[List[float]]:
+            response = client.embeddings.create(model=model_name, input=texts)
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        return embed
+
+    raise EmbeddingError(f"Unsupported embedding provider: {provider}")
+
+
+class LazyBackend:
+    """
+    Defers building a backend (loading a model) until the first embedding.
+    """
+
+    def __init__(self, loader: Callable[[], EmbedFn]):
+        self._loader = loader
+        self._backend: Optional[EmbedFn] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._loader()
+        return self._backend(texts)
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+def create_embedding_function(config: Dict[str, Any]) -> Optional[CachedEmbeddingFunction]:
+    """
+    Create the MemoryStore embedding function from config.
+
+    Args:
+        config: Configuration dict with optional 'memory.embeddings' section
+
+    Returns:
+        CachedEmbeddingFunction, or None to keep Chroma's implicit default
+    """
+    memory_config = config.get('memory', {})
+    embed_config = memory_config.get('embeddings', {})
+    if not embed_config.get('enabled', True):
+        return None
+
+    provider = embed_config.get('provider', 'default')
+    model = embed_config.get('model')
+    if provider not in ('default', 'local', 'openai'):
+        raise EmbeddingError(f"Unsupported embedding provider: {provider}")
+    # Resolve the provider default, so naming it explicitly or omitting it
+    # gives the same model identity (the bundled ONNX model has no setting)
+    if provider == 'local':
+        model = model or DEFAULT_LOCAL_MODEL
+    elif provider == 'openai':
+        model = model or DEFAULT_OPENAI_MODEL
+    else:
+        model = None
+    backend = LazyBackend(lambda: load_backend(
+        provider,
+        model=model,
+        device=embed_config.get('device', 'cpu'),
+        api_key_env=embed_config.get('api_key_env', 'OPENAI_API_KEY'),
+        base_url=embed_config.get('base_url'),
+    ))
+
+    workers = embed_config.get('workers', 2)
+    if provider == 'local' and workers > 1:
+        # Serial backend: a pool would only queue batches on its lock
+        logger.info("Local embedding model encodes serially; ignoring workers setting")
+        workers = 1
+
+    disk_cache = None
+    if embed_config.get('disk_cache', True):
+        path = embed_config.get('cache_path')
+        if not path and memory_config.get('dir'):
+            path = str(Path(memory_config['dir']).expanduser() / EmbeddingCache.CACHE_FILENAME)
+        if path:
+            disk_cache = EmbeddingCache(path, max_entries=embed_config.get('cache_max_entries', 200000))
+
+    return CachedEmbeddingFunction(
+        backend,
+        model_name=f"{provider}:{model or ''}",
+        disk_cache=disk_cache,
+        memory_entries=embed_config.get('memory_entries', 4096),
+        batch_size=embed_config.get('batch_size', 64),
+        workers=workers,
+    )
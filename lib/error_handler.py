@@ -3,13 +3,19 @@ Error Handler for OC-Memory
 LLM API retry policy with exponential backoff
 
 Provides automatic retry logic for LLM API calls
-with configurable backoff strategy.
+with configurable backoff strategy, a shared adaptive rate
+limiter that honours provider Retry-After hints, and a circuit
+breaker that fails fast during sustained outages.
 """
 
+import asyncio
 import logging
+import random
+import threading
 import time
+from email.utils import parsedate_to_datetime
 from functools import wraps
-from typing import Callable, Any, Optional, Type, Tuple
+from typing import Callable, Any, Dict, Optional, Type, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +32,24 @@ class RetryExhaustedError(Exception):
         super().__init__(f"All {attempts} retry attempts exhausted: {last_error}")
 
 
+class CircuitOpenError(Exception):
+    """Call rejected because the circuit breaker is open"""
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open: LLM calls suspended for {retry_in:.1f}s")
+
+
 class LLMRetryPolicy:
     """
     Retry policy with exponential backoff for LLM API calls.
 
     Default: 3 attempts with delays of 2s, 4s, 8s
+
+    Optionally every attempt passes through a shared RateLimiter and a
+    CircuitBreaker. Throttling errors (HTTP 429) slow the limiter down
+    for all callers and wait for the provider's Retry-After hint; other
+    failures count towards opening the circuit, after which calls fail
+    fast with CircuitOpenError until the recovery timeout.
     """
 
     def __init__(
@@ -40,6 +59,9 @@ class LLMRetryPolicy:
         max_delay: float = 30.0,
         multiplier: float = 2.0,
         retryable_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
+        rate_limiter: Optional["RateLimiter"] = None,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+        jitter: float = 0.0,
     ):
         """
         Args:
@@ -48,25 +70,34 @@ class LLMRetryPolicy:
             max_delay: Maximum delay in seconds
             multiplier: Delay multiplier for exponential backoff
             retryable_exceptions: Exception types to retry (default: all)
+            rate_limiter: Limiter every attempt acquires a slot from
+            circuit_breaker: Breaker guarding the LLM provider
+            jitter: Random fraction (0-1) added to or removed from each delay
         """
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
         self.multiplier = multiplier
         self.retryable_exceptions = retryable_exceptions or (Exception,)
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.jitter = max(0.0, min(1.0, jitter))
 
         # Statistics
         self.total_calls = 0
         self.total_retries = 0
         self.total_failures = 0
+        self.total_throttled = 0
+        self.total_rejected = 0
 
-    def call_with_retry(self, func: Callable, *args, **kwargs) -> Any:
+    def call_with_retry(self, func: Callable, *args, tokens: int = 0, **kwargs) -> Any:
         """
         Call a function with retry logic.
 
         Args:
             func: Function to call
             *args: Positional arguments
+            tokens: Estimated LLM tokens per attempt (tokens-per-minute budget)
             **kwargs: Keyword arguments
 
         Returns:
@@ -74,84 +105,528 @@ class LLMRetryPolicy:
 
         Raises:
             RetryExhaustedError: If all attempts fail
+            CircuitOpenError: If the circuit breaker rejects the call
         """
         self.total_calls += 1
         last_error = None
 
         for attempt in range(1, self.max_attempts + 1):
+            self._admit()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(tokens=tokens)
+
             try:
                 result = func(*args, **kwargs)
-                if attempt > 1:
-                    logger.info(f"Succeeded on attempt {attempt}")
-                return result
-
             except self.retryable_exceptions as e:
                 last_error = e
-                if attempt < self.max_attempts:
-                    delay = self._calculate_delay(attempt)
-                    self.total_retries += 1
-                    logger.warning(
-                        f"Attempt {attempt}/{self.max_attempts} failed: {e}. "
-                        f"Retrying in {delay:.1f}s..."
-                    )
-                    time.sleep(delay)
-                else:
-                    self.total_failures += 1
-                    logger.error(
-                        f"All {self.max_attempts} attempts failed. "
-                        f"Last error: {e}"
-                    )
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    break
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._release()
+                raise
+
+            self._on_success(attempt)
+            return result
 
         raise RetryExhaustedError(last_error, self.max_attempts)
 
-    async def call_with_retry_async(self, func: Callable, *args, **kwargs) -> Any:
+    async def call_with_retry_async(self, func: Callable, *args, tokens: int = 0, **kwargs) -> Any:
         """Async version of call_with_retry"""
-        import asyncio
-
         self.total_calls += 1
         last_error = None
 
         for attempt in range(1, self.max_attempts + 1):
+            self._admit()
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(tokens=tokens)
+
             try:
                 result = await func(*args, **kwargs)
-                if attempt > 1:
-                    logger.info(f"Succeeded on attempt {attempt}")
-                return result
-
             except self.retryable_exceptions as e:
                 last_error = e
-                if attempt < self.max_attempts:
-                    delay = self._calculate_delay(attempt)
-                    self.total_retries += 1
-                    logger.warning(
-                        f"Attempt {attempt}/{self.max_attempts} failed: {e}. "
-                        f"Retrying in {delay:.1f}s..."
-                    )
-                    await asyncio.sleep(delay)
-                else:
-                    self.total_failures += 1
-                    logger.error(
-                        f"All {self.max_attempts} attempts failed. "
-                        f"Last error: {e}"
-                    )
+                delay = self._on_failure(e, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release()
+                raise
+
+            self._on_success(attempt)
+            return result
 
         raise RetryExhaustedError(last_error, self.max_attempts)
 
+    def _admit(self) -> None:
+        """Fail fast while the circuit breaker is open"""
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow_request():
+            self.total_rejected += 1
+            raise CircuitOpenError(self.circuit_breaker.retry_in())
+
+    def _release(self) -> None:
+        """A call ended without telling us anything about provider health"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release()
+
+    def _on_success(self, attempt: int) -> None:
+        if attempt > 1:
+            logger.info(f"Succeeded on attempt {attempt}")
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_success()
+
+    def _on_failure(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt.
+
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            # Never wait longer than our own backoff ceiling
+            retry_after = min(retry_after, self.max_delay)
+        if is_rate_limit_error(error):
+            # Throttling is back-pressure, not an outage
+            self.total_throttled += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_throttle(retry_after)
+            self._release()
+        elif self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+
+        if attempt >= self.max_attempts:
+            self.total_failures += 1
+            logger.error(
+                f"All {self.max_attempts} attempts failed. "
+                f"Last error: {error}"
+            )
+            return None
+
+        self.total_retries += 1
+        if self.circuit_breaker is not None and self.circuit_breaker.state == CircuitBreaker.OPEN:
+            # Next attempt is rejected immediately; no point waiting for it
+            return 0.0
+
+        delay = retry_after if retry_after is not None else self._jittered_delay(attempt)
+        logger.warning(
+            f"Attempt {attempt}/{self.max_attempts} failed: {error}. "
+            f"Retrying in {delay:.1f}s..."
+        )
+        return delay
+
     def _calculate_delay(self, attempt: int) -> float:
         """Calculate delay for given attempt number"""
         delay = self.base_delay * (self.multiplier ** (attempt - 1))
         return min(delay, self.max_delay)
 
+    def _jittered_delay(self, attempt: int) -> float:
+        """Backoff delay spread by jitter so workers do not retry in lockstep"""
+        delay = self._calculate_delay(attempt)
+        if self.jitter:
+            delay *= 1.0 + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
     def get_stats(self) -> dict:
         """Get retry statistics"""
-        return {
+        stats = {
             'total_calls': self.total_calls,
             'total_retries': self.total_retries,
             'total_failures': self.total_failures,
+            'total_throttled': self.total_throttled,
+            'total_rejected': self.total_rejected,
             'success_rate': (
-                (self.total_calls - self.total_failures) / max(self.total_calls, 1)
+                (self.total_calls - self.total_failures - self.total_rejected)
+                / max(self.total_calls, 1)
             ),
         }
+        if self.rate_limiter is not None:
+            stats['rate_limiter'] = self.rate_limiter.get_stats()
+        if self.circuit_breaker is not None:
+            stats['circuit_breaker'] = self.circuit_breaker.get_stats()
+        return stats
+
+
+# =============================================================================
+# Rate Limiter
+# =============================================================================
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter for LLM API requests.
+    Thread-safe; callers block in acquire() until a request slot is free.
+
+    A second bucket optionally enforces a tokens-per-minute budget. The
+    request rate adapts: every throttle report halves it (down to
+    min_rate_fraction of the configured rate) and pauses all callers for
+    the provider's Retry-After, and each success restores it gradually.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60.0,
+        burst: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        min_rate_fraction: float = 0.1,
+        recovery_step: float = 0.05,
+        max_retry_after: float = 60.0,
+    ):
+        """
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Bucket capacity (default: one second worth, at least 1)
+            tokens_per_minute: LLM token budget (None = unlimited)
+            min_rate_fraction: Lowest adaptive rate, as a fraction of the configured one
+            recovery_step: Fraction of the configured rate regained per success
+            max_retry_after: Longest pause a provider's Retry-After may impose
+        """
+        self.requests_per_minute = requests_per_minute
+        self.max_rate = requests_per_minute / 60.0
+        self.rate = self.max_rate
+        self.min_rate = self.max_rate * max(0.0, min(1.0, min_rate_fraction))
+        self.recovery_step = recovery_step
+        self.max_retry_after = max_retry_after
+        self.capacity = burst if burst is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # LLM token budget (one minute worth of capacity)
+        self.tokens_per_minute = tokens_per_minute
+        self.token_rate = tokens_per_minute / 60.0 if tokens_per_minute else None
+        self.token_capacity = float(tokens_per_minute or 0)
+        self._token_budget = self.token_capacity
+
+        # Statistics
+        self.total_acquired = 0
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+        self.total_tokens = 0
+        self.total_throttles = 0
+
+    def acquire(self, timeout: Optional[float] = None, tokens: int = 0) -> bool:
+        """
+        Take one request slot, waiting for the bucket to refill if needed.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            tokens: LLM tokens the request is expected to use
+
+        Returns:
+            True if a slot was acquired, False on timeout
+        """
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            wait_time = self._reserve(tokens)
+            if wait_time <= 0:
+                if waited:
+                    self._record_wait(start)
+                return True
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            waited = True
+            time.sleep(wait_time)
+
+    async def acquire_async(self, timeout: Optional[float] = None, tokens: int = 0) -> bool:
+        """Async version of acquire() that sleeps without blocking the loop"""
+        start = time.monotonic()
+        waited = False
+
+        while True:
+            wait_time = self._reserve(tokens)
+            if wait_time <= 0:
+                if waited:
+                    self._record_wait(start)
+                return True
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            waited = True
+            await asyncio.sleep(wait_time)
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Take a slot (and token budget) if available.
+
+        Returns:
+            0 if acquired, otherwise seconds until it may be
+        """
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            cost = min(float(tokens), self.token_capacity) if self.token_rate else 0.0
+            wait_time = 0.0
+            if self._tokens < 1.0:
+                wait_time = (1.0 - self._tokens) / self.rate
+            if cost > self._token_budget:
+                wait_time = max(wait_time, (cost - self._token_budget) / self.token_rate)
+            if wait_time > 0:
+                return wait_time
+
+            self._tokens -= 1.0
+            self._token_budget -= cost
+            self.total_acquired += 1
+            self.total_tokens += tokens
+            return 0.0
+
+    def _record_wait(self, start: float) -> None:
+        with self._lock:
+            self.total_waits += 1
+            self.total_wait_time += time.monotonic() - start
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        if self.token_rate:
+            self._token_budget = min(
+                self.token_capacity, self._token_budget + elapsed * self.token_rate
+            )
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Report that the provider throttled a request.
+
+        Args:
+            retry_after: Seconds the provider asked callers to wait
+                         (capped at max_retry_after)
+        """
+        if retry_after:
+            # A bogus or hostile header must not stall every caller for hours
+            retry_after = min(retry_after, self.max_retry_after)
+        with self._lock:
+            self._refill()
+            self.total_throttles += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drop the saved-up burst so callers do not stampede afterwards
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            rate = self.rate
+        logger.warning(f"LLM provider throttled; request rate lowered to {rate * 60:.1f}/min")
+
+    def record_success(self) -> None:
+        """Report a successful request (recovers the adaptive rate)"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.recovery_step)
+
+    def get_stats(self) -> dict:
+        """Get rate limiter statistics"""
+        return {
+            'requests_per_minute': self.requests_per_minute,
+            'current_requests_per_minute': round(self.rate * 60.0, 2),
+            'tokens_per_minute': self.tokens_per_minute,
+            'total_acquired': self.total_acquired,
+            'total_tokens': self.total_tokens,
+            'total_waits': self.total_waits,
+            'total_wait_time': round(self.total_wait_time, 3),
+            'total_throttles': self.total_throttles,
+        }
+
+
+# =============================================================================
+# Circuit Breaker
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    Circuit breaker for an LLM provider.
+
+    closed: calls pass; consecutive failures are counted.
+    open: calls are rejected until recovery_timeout has passed.
+    half_open: a limited number of probe calls pass; a success closes
+    the circuit again, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before probing
+            half_open_max_calls: Concurrent probe calls while half-open
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.times_opened = 0
+        self.total_rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state (open turns half-open once the timeout passed)"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.recovery_timeout):
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("Circuit half-open: probing LLM provider")
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed (takes a probe slot when half-open)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.total_rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit starts probing again"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit closed: LLM provider recovered")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Circuit open after {self._failures} consecutive failures; "
+                        f"pausing LLM calls for {self.recovery_timeout:.0f}s"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+
+    def release(self) -> None:
+        """Return a probe slot for a call that ended without a verdict"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def get_stats(self) -> dict:
+        """Get circuit breaker statistics"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+                'total_rejected': self.total_rejected,
+            }
+
+
+# =============================================================================
+# Provider error inspection
+# =============================================================================
+
+# Exception class names SDKs use for HTTP 429 / quota exhaustion
+RATE_LIMIT_ERROR_NAMES = ('RateLimitError', 'ResourceExhausted', 'TooManyRequests')
+
+
+def _error_status(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception signals provider throttling (HTTP 429)"""
+    return _error_status(error) == 429 or type(error).__name__ in RATE_LIMIT_ERROR_NAMES
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.title())
+    return value
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds the provider asked callers to wait, if the error says so.
+
+    Looks at a retry_after attribute, then the retry-after-ms and
+    retry-after response headers (delta seconds or an HTTP date).
+
+    Args:
+        error: Exception raised by an LLM call
+
+    Returns:
+        Delay in seconds, or None without a hint
+    """
+    value = getattr(error, 'retry_after', None)
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers or not hasattr(headers, 'get'):
+        return None
+
+    try:
+        value = _header(headers, 'retry-after-ms')
+        if value is not None:
+            return max(0.0, float(value) / 1000.0)
+        value = _header(headers, 'retry-after')
+        if value is None:
+            return None
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
 
 # =============================================================================
@@ -187,3 +662,64 @@ def with_retry(
         return wrapper
 
     return decorator
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+def create_rate_limiter(config: Dict[str, Any]) -> Optional[RateLimiter]:
+    """
+    Create the shared LLM rate limiter from config.
+
+    Args:
+        config: Configuration dict with optional 'llm' section
+
+    Returns:
+        RateLimiter, or None if llm.requests_per_minute is 0
+    """
+    llm_config = config.get('llm', {})
+    requests_per_minute = llm_config.get('requests_per_minute', 60)
+    if not requests_per_minute:
+        return None
+    return RateLimiter(
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=llm_config.get('tokens_per_minute'),
+    )
+
+
+def create_retry_policy(
+    config: Dict[str, Any],
+    rate_limiter: Optional[RateLimiter] = None,
+) -> LLMRetryPolicy:
+    """
+    Create an LLMRetryPolicy from config dictionary.
+
+    Args:
+        config: Configuration dict with optional 'llm.retry' and
+            'llm.circuit_breaker' sections
+        rate_limiter: Limiter shared with other LLM callers
+
+    Returns:
+        Configured LLMRetryPolicy instance
+    """
+    llm_config = config.get('llm', {})
+    retry_config = llm_config.get('retry', {})
+    breaker_config = llm_config.get('circuit_breaker', {})
+
+    circuit_breaker = None
+    if breaker_config.get('enabled', True):
+        circuit_breaker = CircuitBreaker(
+            failure_threshold=breaker_config.get('failure_threshold', 5),
+            recovery_timeout=breaker_config.get('recovery_timeout', 60.0),
+            half_open_max_calls=breaker_config.get('half_open_max_calls', 1),
+        )
+
+    return LLMRetryPolicy(
+        max_attempts=retry_config.get('max_attempts', 3),
+        base_delay=retry_config.get('base_delay', 2.0),
+        max_delay=retry_config.get('max_delay', 30.0),
+        jitter=retry_config.get('jitter', 0.2),
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+    )
@@ -4,8 +4,11 @@ Monitors user directories for markdown file changes
 """
 
 import logging
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
 
@@ -61,6 +64,165 @@ class MarkdownFileHandler(FileSystemEventHandler):
                     self.logger.error(f"Error in callback for {file_path}: {e}")
 
 
+class EventCoalescer:
+    """
+    Coalesces bursts of file events into one event per settled file
+    Editors fire several modified events per save; a path is emitted
+    once it has been quiet for quiet_period seconds
+    """
+
+    def __init__(
+        self,
+        callback: Callable,
+        quiet_period: float = 1.0,
+        max_events_per_second: float = 0.0,
+        max_pending: int = 10000
+    ):
+        """
+        Args:
+            callback: Function called with (file_path, event_type=...)
+                      once per settled file
+            quiet_period: Seconds without events before a path is emitted
+            max_events_per_second: Emission cap (0 = unlimited); excess
+                                   events wait in the pending set
+            max_pending: Maximum distinct paths waiting; events for new
+                         paths beyond this are dropped
+        """
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_events_per_second = max_events_per_second
+        self.max_pending = max_pending
+        self.logger = logging.getLogger(__name__)
+
+        # path -> [event_type, due time]
+        self._pending: Dict[Path, list] = {}
+        self._emitted_times: deque = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Statistics
+        self.received = 0
+        self.emitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def submit(self, file_path: Path, event_type: str = 'modified') -> None:
+        """Record an event; it is emitted after the path settles"""
+        with self._cond:
+            self.received += 1
+            now = time.monotonic()
+
+            entry = self._pending.get(file_path)
+            if entry is not None:
+                # created + modified is still a new file
+                if entry[0] != 'created':
+                    entry[0] = event_type
+                entry[1] = now + self.quiet_period
+                self.coalesced += 1
+                return
+
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                self.logger.warning(f"Too many pending file events, dropped: {file_path}")
+                return
+
+            self._pending[file_path] = [event_type, now + self.quiet_period]
+            self._cond.notify()
+
+    def start(self) -> None:
+        """Start the emitter thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="file-event-coalescer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        """
+        Stop the emitter thread
+
+        Args:
+            flush: Emit pending events immediately instead of discarding them
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+        with self._cond:
+            pending = list(self._pending.items())
+            self._pending.clear()
+            if not flush:
+                self.dropped += len(pending)
+
+        if flush:
+            for file_path, (event_type, _) in pending:
+                self._emit(file_path, event_type)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+
+                now = time.monotonic()
+                ready = sorted(
+                    (entry[1], path) for path, entry in self._pending.items()
+                    if entry[1] <= now
+                )
+                if not ready:
+                    next_due = min((e[1] for e in self._pending.values()), default=None)
+                    self._cond.wait(None if next_due is None else next_due - now)
+                    continue
+
+                budget = self._emission_budget(now)
+                if budget == 0:
+                    self._cond.wait(self._emitted_times[0] + 1.0 - now)
+                    continue
+
+                batch = []
+                for _, path in ready[:budget]:
+                    event_type, _ = self._pending.pop(path)
+                    batch.append((path, event_type))
+                    self._emitted_times.append(now)
+
+            for path, event_type in batch:
+                self._emit(path, event_type)
+
+    def _emission_budget(self, now: float) -> int:
+        """How many events may be emitted now under the per-second cap"""
+        if self.max_events_per_second <= 0:
+            return len(self._pending)
+        while self._emitted_times and self._emitted_times[0] <= now - 1.0:
+            self._emitted_times.popleft()
+        limit = max(1, int(self.max_events_per_second))
+        return max(0, limit - len(self._emitted_times))
+
+    def _emit(self, file_path: Path, event_type: str) -> None:
+        self.emitted += 1
+        try:
+            self.callback(file_path, event_type=event_type)
+        except Exception as e:
+            self.logger.error(f"Error in callback for {file_path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event counters"""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'received': self.received,
+            'emitted': self.emitted,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'pending': pending,
+        }
+
+
 class FileWatcher:
     """
     Watches user directories for markdown file changes
@@ -71,13 +233,20 @@ class FileWatcher:
         self,
         watch_dirs: List[str],
         callback: Optional[Callable] = None,
-        recursive: bool = True
+        recursive: bool = True,
+        quiet_period: float = 0.0,
+        max_events_per_second: float = 0.0,
+        max_pending: int = 10000
     ):
         """
         Args:
             watch_dirs: List of directory paths to watch
             callback: Function to call when files change
             recursive: Watch subdirectories recursively
+            quiet_period: Coalesce events per file until it has been quiet
+                          this many seconds (0 = forward every event)
+            max_events_per_second: Cap on coalesced events emitted per second
+            max_pending: Maximum files waiting to settle
         """
         self.watch_dirs = [Path(d).expanduser().resolve() for d in watch_dirs]
         self.callback = callback
@@ -85,6 +254,15 @@ class FileWatcher:
         self.observer = Observer()
         self.logger = logging.getLogger(__name__)
 
+        self.coalescer: Optional[EventCoalescer] = None
+        if callback is not None and (quiet_period > 0 or max_events_per_second > 0):
+            self.coalescer = EventCoalescer(
+                callback=callback,
+                quiet_period=quiet_period,
+                max_events_per_second=max_events_per_second,
+                max_pending=max_pending
+            )
+
         # Validate watch directories
         for watch_dir in self.watch_dirs:
             if not watch_dir.exists():
@@ -92,7 +270,11 @@ class FileWatcher:
 
     def start(self) -> None:
         """Start watching directories"""
-        handler = MarkdownFileHandler(callback=self.callback)
+        if self.coalescer is not None:
+            self.coalescer.start()
+            handler = MarkdownFileHandler(callback=self.coalescer.submit)
+        else:
+            handler = MarkdownFileHandler(callback=self.callback)
 
         for watch_dir in self.watch_dirs:
             if not watch_dir.exists():
@@ -110,17 +292,25 @@ class FileWatcher:
         self.logger.info("Stopping FileWatcher...")
         self.observer.stop()
         self.observer.join()
+        if self.coalescer is not None:
+            self.coalescer.stop(flush=True)
         self.logger.info("FileWatcher stopped")
 
     def is_alive(self) -> bool:
         """Check if watcher is running"""
         return self.observer.is_alive()
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event statistics (coalesced/dropped counts when coalescing)"""
+        if self.coalescer is None:
+            return {'coalescing': False}
+        stats = self.coalescer.get_stats()
+        stats['coalescing'] = True
+        return stats
+
 
 # Example usage and testing
 if __name__ == "__main__":
-    import time
-
     # Setup logging
     logging.basicConfig(
         level=logging.INFO,
@@ -0,0 +1,250 @@
+"""
+LLM Response Cache for OC-Memory
+Content-addressed cache of LLM responses in SQLite
+
+Responses are keyed by (provider, model, prompt version, hash of the
+whitespace-normalized input), so reprocessed files, restarts and
+duplicate notes reuse an earlier answer instead of paying for a call.
+Entries expire after a TTL and the least recently used are evicted
+once the cache exceeds max_entries.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+"""
+
+
+def prompt_version(*parts: str) -> str:
+    """Short fingerprint of a prompt template (changes invalidate the cache)"""
+    hasher = hashlib.blake2b(digest_size=6)
+    for part in parts:
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def normalize_input(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry"""
+    return " ".join(text.split())
+
+
+# =============================================================================
+# LLM Response Cache
+# =============================================================================
+
+class LLMResponseCache:
+    """
+    Persistent LLM response cache with TTL and LRU size eviction.
+    """
+
+    CACHE_FILENAME = ".oc_llm_cache.sqlite"
+
+    def __init__(
+        self,
+        cache_path: str,
+        ttl_seconds: float = 30 * 86400,
+        max_entries: int = 10000,
+    ):
+        """
+        Args:
+            cache_path: SQLite file to store responses in
+            ttl_seconds: Entry lifetime (0 = never expire)
+            max_entries: Maximum cached responses (LRU eviction beyond)
+        """
+        self.cache_path = Path(cache_path).expanduser().resolve()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._entries = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _ensure_initialized(self) -> sqlite3.Connection:
+        """Lazy-open the SQLite cache"""
+        if self._conn is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(provider: str, model: str, version: str, text: str) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            provider: LLM provider name
+            model: Model name
+            version: Prompt version (see prompt_version())
+            text: Input sent to the model
+
+        Returns:
+            Hex digest identifying the request
+        """
+        hasher = hashlib.blake2b(digest_size=20)
+        for part in (provider, model, version, normalize_input(text)):
+            hasher.update(part.encode('utf-8'))
+            hasher.update(b'\0')
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response (None on miss or expiry)"""
+        now = time.time()
+        with self._lock:
+            conn = self._ensure_initialized()
+            row = conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                with conn:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._entries -= 1
+                self.evictions += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            with conn:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, evicting least recently used entries if full"""
+        now = time.time()
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                existed = conn.execute(
+                    "SELECT 1 FROM responses WHERE key = ?", (key,)
+                ).fetchone() is not None
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+            if not existed:
+                self._entries += 1
+            if self.max_entries > 0 and self._entries > self.max_entries:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop expired entries, then the least recently used down to 90% of max"""
+        with conn:
+            if self.ttl_seconds > 0:
+                removed = conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                ).rowcount
+                self._entries -= removed
+                self.evictions += removed
+
+            target = int(self.max_entries * 0.9)
+            excess = self._entries - target
+            if excess > 0:
+                removed = conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                ).rowcount
+                self._entries -= removed
+                self.evictions += removed
+        logger.debug(f"LLM cache evicted down to {self._entries} entries")
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                conn.execute("DELETE FROM responses")
+            self._entries = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            self._ensure_initialized()
+            lookups = self.hits + self.misses
+            return {
+                'entries': self._entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+_caches: Dict[Path, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def create_llm_cache(config: Dict[str, Any]) -> Optional[LLMResponseCache]:
+    """
+    Create (or reuse) the LLM response cache from config.
+
+    Observer and Reflector built from the same config share one cache.
+
+    Args:
+        config: Configuration dict with 'llm.cache' and 'memory' sections
+
+    Returns:
+        LLMResponseCache, or None if disabled
+    """
+    cache_config = config.get('llm', {}).get('cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+
+    path = cache_config.get('path')
+    if not path:
+        memory_dir = config.get('memory', {}).get('dir')
+        if not memory_dir:
+            return None
+        path = str(Path(memory_dir).expanduser() / LLMResponseCache.CACHE_FILENAME)
+    path = Path(path).expanduser().resolve()
+
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMResponseCache(
+                str(path),
+                ttl_seconds=cache_config.get('ttl_days', 30) * 86400,
+                max_entries=cache_config.get('max_entries', 10000),
+            )
+            _caches[path] = cache
+        return cache
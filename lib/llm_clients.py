@@ -0,0 +1,257 @@
+"""
+LLM Client Registry for OC-Memory
+Shared, lazily built LLM API clients with connection pooling
+
+Observer and Reflector used to construct a new SDK client for every
+call, paying connection setup (and a TLS handshake) each time. The
+registry builds one client per (api key, endpoint) on first use and
+keeps its HTTP connections alive between calls.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Maximum LLM calls in flight per event loop for the async APIs
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+# =============================================================================
+# Client Registry
+# =============================================================================
+
+class LLMClientRegistry:
+    """
+    Thread-safe cache of LLM API clients.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 60.0,
+    ):
+        """
+        Args:
+            max_connections: Connection pool size per OpenAI client
+            max_keepalive_connections: Idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Request timeout in seconds
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+
+        self._openai: Dict[Tuple[str, Optional[str]], Any] = {}
+        # Async clients are bound to the event loop they were created on
+        self._async_openai: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._google: Dict[Tuple[str, str], Any] = {}
+        self._google_key: Optional[str] = None
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.created = 0
+        self.reused = 0
+
+    def get_openai(self, api_key: str, base_url: Optional[str] = None):
+        """
+        Get a pooled OpenAI client.
+
+        Args:
+            api_key: OpenAI API key
+            base_url: Alternative OpenAI-compatible endpoint (None = default)
+
+        Returns:
+            openai.OpenAI instance shared by all callers with the same key
+        """
+        key = (api_key, base_url)
+        with self._lock:
+            client = self._openai.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+
+            import httpx
+            from openai import OpenAI
+
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            self._openai[key] = client
+            self.created += 1
+            logger.debug(f"Created OpenAI client (base_url={base_url or 'default'})")
+            return client
+
+    def get_async_openai(self, api_key: str, base_url: Optional[str] = None):
+        """
+        Get a pooled AsyncOpenAI client for the running event loop.
+
+        Args:
+            api_key: OpenAI API key
+            base_url: Alternative OpenAI-compatible endpoint (None = default)
+
+        Returns:
+            openai.AsyncOpenAI instance shared within the current loop
+        """
+        loop = asyncio.get_running_loop()
+        key = (api_key, base_url)
+        with self._lock:
+            clients = self._async_openai.setdefault(loop, {})
+            client = clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+
+            import httpx
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+            )
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            clients[key] = client
+            self.created += 1
+            logger.debug(f"Created AsyncOpenAI client (base_url={base_url or 'default'})")
+            return client
+
+    async def aclose(self) -> None:
+        """Close the async clients created on the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_openai.pop(loop, {})
+        for client in clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.debug(f"Error closing AsyncOpenAI client: {e}")
+
+    def get_google_model(self, api_key: str, model: str):
+        """
+        Get a cached Gemini GenerativeModel.
+
+        genai.configure() is process-global, so it is only re-run when a
+        different API key is requested.
+
+        Args:
+            api_key: Google API key
+            model: Gemini model name
+
+        Returns:
+            google.generativeai.GenerativeModel instance
+        """
+        key = (api_key, model)
+        with self._lock:
+            if self._google_key == api_key and key in self._google:
+                self.reused += 1
+                return self._google[key]
+
+            import google.generativeai as genai
+
+            if self._google_key != api_key:
+                genai.configure(api_key=api_key)
+                self._google_key = api_key
+                self._google.clear()
+
+            generative_model = genai.GenerativeModel(model)
+            self._google[key] = generative_model
+            self.created += 1
+            logger.debug(f"Created Gemini model client: {model}")
+            return generative_model
+
+    def close(self) -> None:
+        """Close pooled connections and drop all cached clients"""
+        with self._lock:
+            for client in self._openai.values():
+                try:
+                    client.close()
+                except Exception as e:
+                    logger.debug(f"Error closing OpenAI client: {e}")
+            self._openai.clear()
+            self._google.clear()
+            self._google_key = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics"""
+        with self._lock:
+            return {
+                'openai_clients': len(self._openai),
+                'async_openai_clients': sum(len(c) for c in self._async_openai.values()),
+                'google_models': len(self._google),
+                'created': self.created,
+                'reused': self.reused,
+            }
+
+
+# =============================================================================
+# Async concurrency limit
+# =============================================================================
+
+class LoopSemaphore:
+    """
+    Bounded semaphore usable from any event loop.
+
+    asyncio semaphores belong to one loop, so one is created per running
+    loop on first use; the limit applies to calls within that loop.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Args:
+            limit: Maximum concurrent holders per event loop
+        """
+        self.limit = max(1, limit)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.BoundedSemaphore(self.limit)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def __aenter__(self) -> None:
+        await self._get().acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._get().release()
+
+
+# =============================================================================
+# Shared registry
+# =============================================================================
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> LLMClientRegistry:
+    """Get the process-wide client registry (created on first use)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry()
+        return _registry
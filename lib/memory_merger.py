@@ -6,11 +6,17 @@ Merges observations into a structured memory file that OpenClaw
 automatically indexes and uses for context.
 """
 
+import bisect
 import logging
+import os
 import re
+import stat
+import tempfile
+import threading
 from datetime import datetime
+from itertools import accumulate
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,13 @@ TOKENS_PER_WORD = 1.3
 # Token Estimation
 # =============================================================================
 
+def count_words(text: str) -> int:
+    """Count whitespace-separated words (the unit token estimates are built on)"""
+    if not text:
+        return 0
+    return len(text.split())
+
+
 def estimate_tokens(text: str) -> int:
     """Estimate token count from text (approximate)"""
     if not text:
@@ -38,6 +51,12 @@ class MemoryMerger:
     """
     Manages the active_memory.md file.
     Organizes observations into sections and enforces token limits.
+
+    Sections are kept resident in memory with a cached word count per
+    line and a running total per section, so updates and trimming do not
+    re-read or re-tokenize the whole file.
+    Changes are flushed by a debounced writer using an atomic rename,
+    and the file is only re-parsed when its mtime/size change on disk.
     """
 
     # Section headers in order
@@ -49,21 +68,43 @@ class MemoryMerger:
         "Critical Decisions",
     ]
 
+    # Trim order when over the token limit (oldest = last line first)
+    EVICTION_ORDER = [
+        "Observations Log",
+        "Completed Tasks",
+        "Critical Decisions",
+        "User Constraints",
+        "Current Context",
+    ]
+
     def __init__(
         self,
         memory_dir: str,
         filename: str = "active_memory.md",
         max_tokens: int = 30000,
+        flush_delay: float = 0.0,
     ):
         """
         Args:
             memory_dir: OpenClaw memory directory
             filename: Memory file name
             max_tokens: Maximum token limit for the file
+            flush_delay: Seconds to coalesce updates before writing
+                         (0 writes through on every update)
         """
         self.memory_dir = Path(memory_dir).expanduser().resolve()
         self.memory_file = self.memory_dir / filename
         self.max_tokens = max_tokens
+        self.flush_delay = flush_delay
+
+        # Resident section model
+        self._lock = threading.RLock()
+        self._sections: Optional[Dict[str, List[str]]] = None
+        self._line_words: Dict[str, List[int]] = {s: [] for s in self.SECTIONS}
+        self._section_words: Dict[str, int] = {s: 0 for s in self.SECTIONS}
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
 
         # Ensure directory exists
         self.memory_dir.mkdir(parents=True, exist_ok=True)
@@ -74,42 +115,19 @@ class MemoryMerger:
 
     def load(self) -> Dict[str, List[str]]:
         """
-        Load and parse the current memory file into sections.
+        Get the current memory sections.
 
         Returns:
-            Dict mapping section names to lists of content lines
+            Dict mapping section names to lists of content lines (a copy
+            of the resident model; pass it to save() to write changes)
         """
-        sections: Dict[str, List[str]] = {s: [] for s in self.SECTIONS}
-
-        if not self.memory_file.exists():
-            return sections
-
-        try:
-            content = self.memory_file.read_text(encoding='utf-8')
-        except Exception as e:
-            logger.error(f"Failed to read memory file: {e}")
-            return sections
-
-        current_section = None
-
-        for line in content.split('\n'):
-            # Check if line is a section header
-            header_match = re.match(r'^## (.+)$', line.strip())
-            if header_match:
-                header_name = header_match.group(1).strip()
-                if header_name in sections:
-                    current_section = header_name
-                continue
-
-            # Add line to current section
-            if current_section and line.strip():
-                sections[current_section].append(line)
-
-        return sections
+        with self._lock:
+            self._ensure_current()
+            return {name: list(lines) for name, lines in self._sections.items()}
 
     def save(self, sections: Dict[str, List[str]]) -> Path:
         """
-        Save sections to the memory file.
+        Replace all sections and write the memory file immediately.
 
         Args:
             sections: Dict mapping section names to content lines
@@ -117,33 +135,23 @@ class MemoryMerger:
         Returns:
             Path to saved file
         """
-        lines = [
-            "# Active Memory",
-            f"<!-- Updated: {datetime.now().isoformat()} -->",
-            f"<!-- Token estimate: {self._estimate_section_tokens(sections)} -->",
-            "",
-        ]
-
-        for section_name in self.SECTIONS:
-            lines.append(f"## {section_name}")
-            lines.append("")
-
-            section_lines = sections.get(section_name, [])
-            if section_lines:
-                lines.extend(section_lines)
-            else:
-                lines.append("_No entries yet._")
-            lines.append("")
-
-        content = '\n'.join(lines)
-
-        try:
-            self.memory_file.write_text(content, encoding='utf-8')
-            logger.info(f"Memory file saved: {self.memory_file}")
-            return self.memory_file
-        except Exception as e:
-            logger.error(f"Failed to save memory file: {e}")
-            raise
+        with self._lock:
+            self._sections = {s: list(sections.get(s, [])) for s in self.SECTIONS}
+            self._recount_words()
+            self._dirty = True
+            self._cancel_flush_timer()
+            return self._write()
+
+    def flush(self) -> None:
+        """Write pending changes to disk now"""
+        with self._lock:
+            self._cancel_flush_timer()
+            if self._dirty:
+                self._write()
+
+    def close(self) -> None:
+        """Flush pending changes (call on shutdown)"""
+        self.flush()
 
     def add_observations(self, observations: list) -> int:
         """
@@ -158,31 +166,32 @@ class MemoryMerger:
         if not observations:
             return 0
 
-        sections = self.load()
-        added = 0
-
-        for obs in observations:
-            md_line = obs.to_markdown()
-            section = self._map_category_to_section(obs.category)
-
-            # Check token limit before adding
-            sections[section].insert(0, md_line)  # newest first
-            if self._estimate_section_tokens(sections) > self.max_tokens:
-                # Remove oldest entries from Observations Log first
-                sections[section].pop(0)  # undo
-                self._trim_to_fit(sections)
-                # Try again after trimming
-                if self._estimate_section_tokens(sections) < self.max_tokens:
-                    sections[section].insert(0, md_line)
-                    added += 1
+        with self._lock:
+            self._ensure_current()
+            added = 0
+
+            for obs in observations:
+                md_line = obs.to_markdown()
+                section = self._map_category_to_section(obs.category)
+                words = count_words(md_line)
+
+                # Check token limit before adding
+                if self._tokens_for(self._total_words() + words) > self.max_tokens:
+                    # Remove oldest entries from Observations Log first
+                    self._trim_to_fit()
+                    # Try again after trimming
+                    if self._tokens_for(self._total_words()) < self.max_tokens:
+                        self._insert_line(section, md_line, words)
+                        added += 1
+                    else:
+                        logger.warning("Token limit reached, skipping observation")
                 else:
-                    logger.warning("Token limit reached, skipping observation")
-            else:
-                added += 1
+                    self._insert_line(section, md_line, words)
+                    added += 1
 
-        if added > 0:
-            self.save(sections)
-            logger.info(f"Added {added} observations to memory")
+            if added > 0:
+                self._mark_dirty()
+                logger.info(f"Added {added} observations to memory")
 
         return added
 
@@ -193,9 +202,12 @@ class MemoryMerger:
         Args:
             context: New context text
         """
-        sections = self.load()
-        sections["Current Context"] = [context]
-        self.save(sections)
+        with self._lock:
+            self._ensure_current()
+            self._sections["Current Context"] = [context]
+            self._line_words["Current Context"] = [count_words(context)]
+            self._section_words["Current Context"] = count_words(context)
+            self._mark_dirty()
 
     def add_entry(self, section: str, entry: str) -> bool:
         """
@@ -212,17 +224,19 @@ class MemoryMerger:
             logger.error(f"Unknown section: {section}")
             return False
 
-        sections = self.load()
-        sections[section].insert(0, entry)
+        with self._lock:
+            self._ensure_current()
+            self._insert_line(section, entry, count_words(entry))
 
-        if self._estimate_section_tokens(sections) > self.max_tokens:
-            self._trim_to_fit(sections)
+            if self._tokens_for(self._total_words()) > self.max_tokens:
+                self._trim_to_fit()
 
-        self.save(sections)
+            self._mark_dirty()
         return True
 
     def get_token_count(self) -> int:
         """Get current token count of memory file"""
+        self.flush()
         if not self.memory_file.exists():
             return 0
         content = self.memory_file.read_text(encoding='utf-8')
@@ -234,9 +248,178 @@ class MemoryMerger:
             logger.error(f"Unknown section: {section}")
             return
 
-        sections = self.load()
-        sections[section] = []
-        self.save(sections)
+        with self._lock:
+            self._ensure_current()
+            self._sections[section] = []
+            self._line_words[section] = []
+            self._section_words[section] = 0
+            self._mark_dirty()
+
+    # =========================================================================
+    # Resident model
+    # =========================================================================
+
+    def _ensure_current(self) -> None:
+        """Parse the memory file if not loaded yet or changed on disk"""
+        signature = self._stat_signature()
+        if self._sections is not None and signature == self._file_signature:
+            return
+
+        if self._sections is not None and self._dirty:
+            logger.warning(
+                f"{self.memory_file.name} changed on disk while updates were "
+                f"pending; keeping in-memory version"
+            )
+            self._file_signature = signature
+            return
+
+        self._sections = self._parse_file()
+        self._file_signature = signature
+        self._recount_words()
+
+    def _parse_file(self) -> Dict[str, List[str]]:
+        """Read and parse the memory file into sections"""
+        sections: Dict[str, List[str]] = {s: [] for s in self.SECTIONS}
+
+        if not self.memory_file.exists():
+            return sections
+
+        try:
+            content = self.memory_file.read_text(encoding='utf-8')
+        except Exception as e:
+            logger.error(f"Failed to read memory file: {e}")
+            return sections
+
+        current_section = None
+
+        for line in content.split('\n'):
+            # Check if line is a section header
+            header_match = re.match(r'^## (.+)$', line.strip())
+            if header_match:
+                header_name = header_match.group(1).strip()
+                if header_name in sections:
+                    current_section = header_name
+                continue
+
+            # Add line to current section
+            if current_section and line.strip():
+                sections[current_section].append(line)
+
+        return sections
+
+    def _render(self) -> str:
+        """Render the resident sections as markdown"""
+        lines = [
+            "# Active Memory",
+            f"<!-- Updated: {datetime.now().isoformat()} -->",
+            f"<!-- Token estimate: {self._tokens_for(self._total_words())} -->",
+            "",
+        ]
+
+        for section_name in self.SECTIONS:
+            lines.append(f"## {section_name}")
+            lines.append("")
+
+            section_lines = self._sections.get(section_name, [])
+            if section_lines:
+                lines.extend(section_lines)
+            else:
+                lines.append("_No entries yet._")
+            lines.append("")
+
+        return '\n'.join(lines)
+
+    def _file_mode(self) -> int:
+        """Permission bits of the existing memory file (0644 for a new one)"""
+        try:
+            return stat.S_IMODE(os.stat(self.memory_file).st_mode)
+        except FileNotFoundError:
+            return 0o644
+
+    def _write(self) -> Path:
+        """Atomically write the resident sections to the memory file"""
+        content = self._render()
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.memory_dir),
+                prefix=f".{self.memory_file.name}.",
+                suffix=".tmp",
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                # mkstemp creates 0600; keep the file readable by OpenClaw and sync tools
+                os.chmod(tmp_path, self._file_mode())
+                os.replace(tmp_path, self.memory_file)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+            self._file_signature = self._stat_signature()
+            self._dirty = False
+            logger.info(f"Memory file saved: {self.memory_file}")
+            return self.memory_file
+        except Exception as e:
+            logger.error(f"Failed to save memory file: {e}")
+            raise
+
+    def _mark_dirty(self) -> None:
+        """Record a change and schedule a debounced flush"""
+        self._dirty = True
+        if self.flush_delay <= 0:
+            self._write()
+            return
+
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            if not self._dirty:
+                return
+            try:
+                self._write()
+            except Exception:
+                pass  # already logged; retried on the next update or flush()
+
+    def _cancel_flush_timer(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the memory file, None if missing"""
+        try:
+            stat = self.memory_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _insert_line(self, section: str, line: str, words: int) -> None:
+        """Insert a line at the top of a section (newest first)"""
+        self._sections[section].insert(0, line)
+        self._line_words[section].insert(0, words)
+        self._section_words[section] += words
+
+    def _recount_words(self) -> None:
+        self._line_words = {
+            name: [count_words(line) for line in self._sections.get(name, [])]
+            for name in self.SECTIONS
+        }
+        self._section_words = {
+            name: sum(counts) for name, counts in self._line_words.items()
+        }
+
+    def _total_words(self) -> int:
+        return sum(self._section_words.values())
+
+    @staticmethod
+    def _tokens_for(words: int) -> int:
+        return int(words * TOKENS_PER_WORD)
 
     @staticmethod
     def _map_category_to_section(category: str) -> str:
@@ -250,37 +433,54 @@ class MemoryMerger:
         }
         return mapping.get(category, 'Observations Log')
 
-    def _estimate_section_tokens(self, sections: Dict[str, List[str]]) -> int:
-        """Estimate total tokens across all sections"""
-        total_text = ""
-        for lines in sections.values():
-            total_text += '\n'.join(lines) + '\n'
-        return estimate_tokens(total_text)
-
-    def _trim_to_fit(self, sections: Dict[str, List[str]]) -> None:
+    def _trim_to_fit(self) -> int:
         """
         Trim sections to fit within token limit.
-        Removes oldest entries from Observations Log first.
+        Removes oldest entries from Observations Log first, then
+        Completed Tasks, then the remaining sections (EVICTION_ORDER).
+
+        The cut point in each section is found with prefix sums over the
+        cached per-line word counts, so trimming k lines costs O(k).
+
+        Returns:
+            Number of lines removed
         """
-        while self._estimate_section_tokens(sections) > self.max_tokens:
-            # Try removing from Observations Log first (oldest = last)
-            if sections["Observations Log"]:
-                removed = sections["Observations Log"].pop()
-                logger.debug(f"Trimmed observation: {removed[:50]}...")
-                continue
+        allowed_words = self._max_words()
+        excess = self._total_words() - allowed_words
+        removed_lines = 0
 
-            # Then from Completed Tasks
-            if sections["Completed Tasks"]:
-                sections["Completed Tasks"].pop()
+        for section_name in self.EVICTION_ORDER:
+            if excess <= 0:
+                break
+
+            counts = self._line_words[section_name]
+            if not counts:
                 continue
 
-            # Last resort: trim other sections
-            for section_name in reversed(self.SECTIONS):
-                if sections[section_name]:
-                    sections[section_name].pop()
-                    break
-            else:
-                break  # Nothing left to trim
+            # removed[i] = words freed by dropping the last i+1 lines
+            removed = list(accumulate(reversed(counts)))
+            n_drop = min(bisect.bisect_left(removed, excess) + 1, len(counts))
+            freed = removed[n_drop - 1]
+
+            keep = len(counts) - n_drop
+            logger.debug(f"Trimmed {n_drop} oldest entries from {section_name}")
+            del self._sections[section_name][keep:]
+            del counts[keep:]
+            self._section_words[section_name] -= freed
+
+            excess -= freed
+            removed_lines += n_drop
+
+        return removed_lines
+
+    def _max_words(self) -> int:
+        """Largest word count whose token estimate fits within max_tokens"""
+        words = max(0, int((self.max_tokens + 1) / TOKENS_PER_WORD))
+        while words > 0 and self._tokens_for(words) > self.max_tokens:
+            words -= 1
+        while self._tokens_for(words + 1) <= self.max_tokens:
+            words += 1
+        return words
 
 
 # =============================================================================
@@ -300,8 +500,10 @@ def create_merger(config: Dict) -> MemoryMerger:
     memory_config = config.get('memory', {})
     memory_dir = memory_config.get('dir', '~/.openclaw/workspace/memory')
     max_tokens = memory_config.get('max_tokens', 30000)
+    flush_delay = memory_config.get('flush_delay', 1.0)
 
     return MemoryMerger(
         memory_dir=memory_dir,
         max_tokens=max_tokens,
+        flush_delay=flush_delay,
     )
@@ -4,41 +4,94 @@ ChromaDB-based vector storage for semantic search
 
 Provides persistent vector storage with semantic search
 capabilities for the Hot memory tier.
+
+Writes go through a write-behind buffer: observations accumulate in
+memory and a background thread upserts them in large batches once the
+buffer fills or flush_interval passes, so embedding and index inserts
+are paid per batch rather than per processed file. Reads flush first.
+
+The collection records which embedding model filled it; opening it with
+a different model is refused, since its vectors would not be comparable.
 """
 
 import logging
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from lib.embeddings import EmbeddingError, create_embedding_function
+from lib.query_cache import ChangeNotifier
 
 logger = logging.getLogger(__name__)
 
+# Collection metadata key naming the embedding model of its vectors
+EMBEDDING_MODEL_KEY = "oc_embedding_model"
+# Chroma's implicit embedding function, also used by older collections
+DEFAULT_EMBEDDING_MODEL = "default:"
+
 
 # =============================================================================
 # Memory Store
 # =============================================================================
 
-class MemoryStore:
+class MemoryStore(ChangeNotifier):
     """
     ChromaDB-backed vector store for observations.
     Provides semantic search over stored observations.
+    Change listeners run on every write, delete and clear.
     """
 
     def __init__(
         self,
         persist_dir: str = ".chromadb",
         collection_name: str = "observations",
+        buffer_size: int = 256,
+        flush_interval: float = 2.0,
+        embedding_function: Optional[Callable[[List[str]], List[List[float]]]] = None,
     ):
         """
         Args:
             persist_dir: Directory for ChromaDB persistence
             collection_name: Name of the ChromaDB collection
+            buffer_size: Buffered observations that trigger a flush
+                         (0 or 1 = write through on every call)
+            flush_interval: Maximum seconds an observation stays buffered
+            embedding_function: Embedding function for documents and queries
+                                (None = Chroma's default model)
         """
         self.persist_dir = Path(persist_dir).expanduser().resolve()
         self.collection_name = collection_name
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.embedding_function = embedding_function
         self._client = None
         self._collection = None
 
+        # Write-behind buffer: id -> (document, metadata); newer upserts win
+        self._buffer: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._buffer_lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Cached collection size: a lower bound that upserts can only raise,
+        # exact until the next write; lets search() skip count() calls
+        self._count_floor = 0
+        self._count_exact = False
+
+        # Statistics
+        self.flushes = 0
+        self.flushed = 0
+        self.flush_errors = 0
+        self.max_batch_size = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.last_flush_time = 0.0
+        self.count_queries = 0
+        self.count_skipped = 0
+
     def _ensure_initialized(self):
         """Lazy-initialize ChromaDB client and collection"""
         if self._collection is not None:
@@ -49,10 +102,7 @@ class MemoryStore:
             self._client = chromadb.PersistentClient(
                 path=str(self.persist_dir)
             )
-            self._collection = self._client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"},
-            )
+            self._collection = self._open_collection()
             logger.info(
                 f"ChromaDB initialized: {self.persist_dir} "
                 f"(collection: {self.collection_name})"
@@ -64,6 +114,51 @@ class MemoryStore:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
 
+    def open(self) -> None:
+        """
+        Open the collection now rather than on first use.
+
+        Raises:
+            ImportError: chromadb is not installed
+            EmbeddingError: The collection was built with another embedding model
+        """
+        self._ensure_initialized()
+
+    def _open_collection(self):
+        """
+        Get or create the collection with the configured embedding function.
+
+        Raises:
+            EmbeddingError: The stored vectors come from another embedding model
+        """
+        model = getattr(self.embedding_function, 'model_name', DEFAULT_EMBEDDING_MODEL)
+        kwargs = {}
+        if self.embedding_function is not None:
+            kwargs['embedding_function'] = self.embedding_function
+        collection = self._client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine", EMBEDDING_MODEL_KEY: model},
+            **kwargs,
+        )
+
+        stored = (collection.metadata or {}).get(EMBEDDING_MODEL_KEY, DEFAULT_EMBEDDING_MODEL)
+        if stored == model:
+            return collection
+        if collection.count() > 0:
+            raise EmbeddingError(
+                f"Collection '{self.collection_name}' in {self.persist_dir} holds vectors from "
+                f"embedding model '{stored}', not '{model}'. Restore the previous "
+                f"memory.embeddings settings or point memory.chromadb_dir at a new directory."
+            )
+        # Empty: recreate it so the metadata names the new model
+        logger.info(f"Recreating empty collection for embedding model '{model}' (was '{stored}')")
+        self._client.delete_collection(self.collection_name)
+        return self._client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine", EMBEDDING_MODEL_KEY: model},
+            **kwargs,
+        )
+
     def add_observation(
         self,
         obs_id: str,
@@ -79,9 +174,12 @@ class MemoryStore:
             metadata: Optional metadata dict
         """
         self._ensure_initialized()
+        self._write({obs_id: (content, self._clean_metadata(metadata or {}))})
+        logger.debug(f"Added observation: {obs_id}")
 
-        meta = metadata or {}
-        # ChromaDB metadata must be str/int/float/bool
+    @staticmethod
+    def _clean_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
+        """ChromaDB metadata must be str/int/float/bool"""
         clean_meta = {}
         for k, v in meta.items():
             if isinstance(v, (str, int, float, bool)):
@@ -90,13 +188,7 @@ class MemoryStore:
                 clean_meta[k] = v.isoformat()
             else:
                 clean_meta[k] = str(v)
-
-        self._collection.upsert(
-            ids=[obs_id],
-            documents=[content],
-            metadatas=[clean_meta],
-        )
-        logger.debug(f"Added observation: {obs_id}")
+        return clean_meta
 
     def add_observations(self, observations: list) -> int:
         """
@@ -113,25 +205,147 @@ class MemoryStore:
         if not observations:
             return 0
 
-        ids = [obs.id for obs in observations]
-        documents = [obs.content for obs in observations]
-        metadatas = [
-            {
+        self._write({
+            obs.id: (obs.content, {
                 'priority': obs.priority,
                 'category': obs.category,
                 'timestamp': obs.timestamp.isoformat(),
-            }
+            })
             for obs in observations
-        ]
+        })
+
+        logger.info(f"Added {len(observations)} observations to store")
+        return len(observations)
 
+    # -------------------------------------------------------------------------
+    # Write-behind buffer
+    # -------------------------------------------------------------------------
+
+    def _write(self, entries: Dict[str, Tuple[str, Dict[str, Any]]]) -> None:
+        """Buffer entries for the background flusher (or upsert directly)"""
+        if self.buffer_size <= 1 or self._closed:
+            with self._flush_lock:
+                self._upsert(entries)
+            self._notify_change()
+            return
+
+        with self._buffer_lock:
+            self._buffer.update(entries)
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="memory-store-flush", daemon=True
+                )
+                self._flusher.start()
+            if len(self._buffer) >= self.buffer_size:
+                self._buffer_lock.notify()
+        # Buffered writes are visible to reads (they flush first)
+        self._notify_change()
+
+    def _flush_loop(self) -> None:
+        """Background thread: flush on size or after flush_interval"""
+        failed = False
+        while True:
+            with self._buffer_lock:
+                deadline = time.monotonic() + self.flush_interval
+                # After a failure wait the full interval even if the buffer is full
+                while (not self._closed and time.monotonic() < deadline
+                       and (failed or len(self._buffer) < self.buffer_size)):
+                    self._buffer_lock.wait(max(0.0, deadline - time.monotonic()))
+                if self._closed:
+                    return
+            try:
+                self.flush()
+                failed = False
+            except Exception:
+                failed = True  # already logged; entries were re-queued
+
+    def flush(self) -> int:
+        """
+        Write all buffered observations to the collection in one batch.
+
+        Returns:
+            Number of observations written
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                entries, self._buffer = self._buffer, {}
+            if not entries:
+                return 0
+            try:
+                self._upsert(entries)
+            except Exception as e:
+                with self._buffer_lock:
+                    # Keep anything newer that arrived while we were flushing
+                    for obs_id, entry in entries.items():
+                        self._buffer.setdefault(obs_id, entry)
+                self.flush_errors += 1
+                logger.error(f"MemoryStore flush of {len(entries)} observations failed: {e}")
+                raise
+            return len(entries)
+
+    def _upsert(self, entries: Dict[str, Tuple[str, Dict[str, Any]]]) -> None:
+        """Upsert a batch into ChromaDB and record flush statistics"""
+        self._ensure_initialized()
+        start = time.perf_counter()
         self._collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas,
+            ids=list(entries),
+            documents=[document for document, _ in entries.values()],
+            metadatas=[metadata for _, metadata in entries.values()],
         )
+        elapsed = time.perf_counter() - start
+
+        # Upserted ids are distinct, and upserts never shrink the collection
+        self._count_floor = max(self._count_floor, len(entries))
+        self._count_exact = False
+
+        self.flushes += 1
+        self.flushed += len(entries)
+        self.max_batch_size = max(self.max_batch_size, len(entries))
+        self.total_flush_time += elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+        self.last_flush_time = elapsed
+        logger.debug(f"Upserted {len(entries)} observations in {elapsed * 1000:.1f}ms")
+
+    def pending(self) -> int:
+        """Number of buffered observations not yet written"""
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def close(self) -> None:
+        """Stop the background flusher and write any buffered observations"""
+        with self._buffer_lock:
+            self._closed = True
+            self._buffer_lock.notify()
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            flusher.join(timeout=max(5.0, self.flush_interval * 2))
+        if self.pending():
+            self.flush()
+        if hasattr(self.embedding_function, 'close'):
+            self.embedding_function.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write buffer statistics"""
+        return {
+            'pending': self.pending(),
+            'buffer_size': self.buffer_size,
+            'flushes': self.flushes,
+            'flushed': self.flushed,
+            'flush_errors': self.flush_errors,
+            'avg_batch_size': round(self.flushed / self.flushes, 1) if self.flushes else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'avg_flush_ms': (
+                round(self.total_flush_time / self.flushes * 1000, 2) if self.flushes else 0.0
+            ),
+            'max_flush_ms': round(self.max_flush_time * 1000, 2),
+            'last_flush_ms': round(self.last_flush_time * 1000, 2),
+            'count_queries': self.count_queries,
+            'count_skipped': self.count_skipped,
+        }
 
-        logger.info(f"Added {len(observations)} observations to store")
-        return len(observations)
+    # -------------------------------------------------------------------------
+    # Reads (flush first so buffered writes are visible)
+    # -------------------------------------------------------------------------
 
     def search(
         self,
@@ -150,35 +364,65 @@ class MemoryStore:
         Returns:
             List of result dicts with 'id', 'content', 'metadata', 'distance'
         """
+        return self.search_many([query], n_results=n_results, where=where)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Semantic search for several queries in a single collection query.
+
+        All query texts are embedded and searched in one call, so the
+        per-call overhead is paid once for the whole batch.
+
+        Args:
+            queries: Search query texts
+            n_results: Number of results to return per query
+            where: Optional metadata filter applied to every query
+
+        Returns:
+            One result list per query (same order), each as in search()
+        """
+        if not queries:
+            return []
+
         self._ensure_initialized()
+        self.flush()
 
         kwargs = {
-            "query_texts": [query],
-            "n_results": min(n_results, self.count()),
+            "query_texts": list(queries),
+            "n_results": self._clamp_n_results(n_results),
         }
         if where:
             kwargs["where"] = where
 
         if kwargs["n_results"] == 0:
-            return []
+            return [[] for _ in queries]
 
         results = self._collection.query(**kwargs)
 
-        items = []
-        if results and results.get('ids'):
-            for i in range(len(results['ids'][0])):
-                items.append({
-                    'id': results['ids'][0][i],
-                    'content': results['documents'][0][i] if results.get('documents') else '',
-                    'metadata': results['metadatas'][0][i] if results.get('metadatas') else {},
-                    'distance': results['distances'][0][i] if results.get('distances') else 0.0,
-                })
-
-        return items
+        batches = []
+        for q in range(len(queries)):
+            items = []
+            if results and results.get('ids') and q < len(results['ids']):
+                for i in range(len(results['ids'][q])):
+                    items.append({
+                        'id': results['ids'][q][i],
+                        'content': results['documents'][q][i] if results.get('documents') else '',
+                        'metadata': results['metadatas'][q][i] if results.get('metadatas') else {},
+                        'distance': results['distances'][q][i] if results.get('distances') else 0.0,
+                    })
+            batches.append(items)
+
+        return batches
 
     def get(self, obs_id: str) -> Optional[Dict[str, Any]]:
         """Get a single observation by ID"""
         self._ensure_initialized()
+        self.flush()
 
         result = self._collection.get(ids=[obs_id])
         if result and result['ids']:
@@ -192,13 +436,34 @@ class MemoryStore:
     def delete(self, obs_id: str) -> None:
         """Delete an observation by ID"""
         self._ensure_initialized()
-        self._collection.delete(ids=[obs_id])
+        # Hold the flush lock so an in-flight batch cannot re-add the entry
+        with self._flush_lock:
+            with self._buffer_lock:
+                self._buffer.pop(obs_id, None)
+            self._collection.delete(ids=[obs_id])
+            self._count_floor = max(0, self._count_floor - 1)
+            self._count_exact = False
+        self._notify_change()
         logger.debug(f"Deleted observation: {obs_id}")
 
     def count(self) -> int:
         """Get total number of stored observations"""
         self._ensure_initialized()
-        return self._collection.count()
+        self.flush()
+        with self._flush_lock:
+            if not self._count_exact:
+                self.count_queries += 1
+                self._count_floor = self._collection.count()
+                self._count_exact = True
+            return self._count_floor
+
+    def _clamp_n_results(self, n_results: int) -> int:
+        """Limit n_results to the collection size, querying it only if needed"""
+        with self._flush_lock:
+            if self._count_exact or self._count_floor >= n_results:
+                self.count_skipped += 1
+                return min(n_results, self._count_floor)
+        return min(n_results, self.count())
 
     def list_all(
         self,
@@ -207,6 +472,7 @@ class MemoryStore:
     ) -> List[Dict[str, Any]]:
         """List all observations with pagination"""
         self._ensure_initialized()
+        self.flush()
 
         result = self._collection.get(
             limit=limit,
@@ -226,12 +492,15 @@ class MemoryStore:
     def clear(self) -> None:
         """Delete all observations"""
         self._ensure_initialized()
-        # Re-create collection
-        self._client.delete_collection(self.collection_name)
-        self._collection = self._client.get_or_create_collection(
-            name=self.collection_name,
-            metadata={"hnsw:space": "cosine"},
-        )
+        with self._flush_lock:
+            with self._buffer_lock:
+                self._buffer.clear()
+            # Re-create collection
+            self._client.delete_collection(self.collection_name)
+            self._collection = self._open_collection()
+            self._count_floor = 0
+            self._count_exact = True
+        self._notify_change()
         logger.info("Memory store cleared")
 
 
@@ -239,5 +508,11 @@ def create_memory_store(config: Dict[str, Any]) -> MemoryStore:
     """Create a MemoryStore from config dictionary"""
     memory_config = config.get('memory', {})
     persist_dir = memory_config.get('chromadb_dir', '.chromadb')
-
-    return MemoryStore(persist_dir=persist_dir)
+    buffer_config = memory_config.get('write_buffer', {})
+
+    return MemoryStore(
+        persist_dir=persist_dir,
+        buffer_size=buffer_config.get('size', 256),
+        flush_interval=buffer_config.get('flush_interval', 2.0),
+        embedding_function=create_embedding_function(config),
+    )
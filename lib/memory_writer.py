@@ -9,6 +9,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from lib.content_manifest import ContentManifest
+
 
 class MemoryWriterError(Exception):
     """Memory writer related errors"""
@@ -21,25 +23,43 @@ class MemoryWriter:
     Handles file copying, metadata, and conflict resolution
     """
 
-    def __init__(self, memory_dir: str):
+    def __init__(self, memory_dir: str, manifest: Optional[ContentManifest] = None):
         """
         Args:
             memory_dir: OpenClaw Memory directory path
                        (typically ~/.openclaw/workspace/memory)
+            manifest: Content manifest used to skip unchanged sources
         """
         self.memory_dir = Path(memory_dir).expanduser().resolve()
+        self.manifest = manifest
         self.logger = logging.getLogger(__name__)
 
         # Create memory directory if it doesn't exist
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Memory directory: {self.memory_dir}")
 
+    def is_unchanged(self, source_file: Path) -> bool:
+        """
+        Check whether a source file's content matches the last copy
+
+        Args:
+            source_file: Path to source file
+
+        Returns:
+            True if the manifest has the same content hash recorded
+        """
+        if self.manifest is None or not source_file.exists():
+            return False
+        return self.manifest.is_unchanged(source_file)
+
     def copy_to_memory(
         self,
         source_file: Path,
         category: Optional[str] = None,
-        preserve_metadata: bool = True
-    ) -> Path:
+        preserve_metadata: bool = True,
+        skip_unchanged: bool = False,
+        defer_record: bool = False
+    ) -> Optional[Path]:
         """
         Copy file to memory directory
 
@@ -47,9 +67,13 @@ class MemoryWriter:
             source_file: Path to source file
             category: Optional category subdirectory
             preserve_metadata: Preserve file timestamps
+            skip_unchanged: Skip the copy if the manifest shows the
+                            content was already copied
+            defer_record: Only stage the manifest entry; the caller
+                          commits it once the file is fully processed
 
         Returns:
-            Path to copied file
+            Path to copied file, or None if skipped as unchanged
 
         Raises:
             MemoryWriterError: If source file not found or copy fails
@@ -57,6 +81,14 @@ class MemoryWriter:
         if not source_file.exists():
             raise MemoryWriterError(f"Source file not found: {source_file}")
 
+        # Hash before copying so the recorded digest matches the copied bytes
+        version = None
+        if self.manifest is not None:
+            version = self.manifest.digest_if_changed(source_file)
+            if version is None and skip_unchanged:
+                self.logger.debug(f"Unchanged, skipped: {source_file}")
+                return None
+
         # Determine target directory
         if category:
             target_dir = self.memory_dir / category
@@ -82,6 +114,12 @@ class MemoryWriter:
             else:
                 shutil.copy(source_file, target_file)
 
+            if version is not None:
+                if defer_record:
+                    self.manifest.stage(source_file, version)
+                else:
+                    self.manifest.record(source_file, version)
+
             self.logger.info(f"Copied to memory: {target_file}")
             return target_file
 
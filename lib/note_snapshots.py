@@ -0,0 +1,192 @@
+"""
+Note Snapshots for OC-Memory
+Last-processed version of each watched file, for incremental extraction
+
+When a note is edited, only the lines added or changed since the last
+processed version are sent to the Observer, so token spend scales with
+the size of the edit rather than the size of the note. A version can be
+staged while it is extracted and committed only once that succeeded, so
+a failed extraction is retried against the previous snapshot.
+"""
+
+import difflib
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HUNK_SEPARATOR = "\n\n"
+
+
+def changed_hunks(old: str, new: str) -> List[str]:
+    """
+    Compute the text added or changed between two versions.
+
+    Args:
+        old: Previously processed content
+        new: Current content
+
+    Returns:
+        List of hunks (new-side text of inserted/replaced line ranges);
+        deletions produce no hunks
+    """
+    if old == new:
+        return []
+
+    # Fast path: pure append (the common case for logs and journals)
+    if new.startswith(old):
+        appended = new[len(old):]
+        return [appended] if appended.strip() else []
+
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    hunks = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag in ('insert', 'replace'):
+            hunk = "".join(new_lines[j1:j2])
+            if hunk.strip():
+                hunks.append(hunk)
+    return hunks
+
+
+# =============================================================================
+# Snapshot Store
+# =============================================================================
+
+class SnapshotStore:
+    """
+    Stores the last-processed content of each source file on disk.
+    """
+
+    SNAPSHOT_DIRNAME = ".oc_snapshots"
+
+    def __init__(self, snapshot_dir: str):
+        """
+        Args:
+            snapshot_dir: Directory holding one snapshot file per source
+        """
+        self.snapshot_dir = Path(snapshot_dir).expanduser().resolve()
+        self._lock = threading.Lock()
+        # Content being extracted, saved once extraction succeeded
+        self._staged: Dict[str, str] = {}
+
+        # Statistics
+        self.full_extractions = 0
+        self.incremental_extractions = 0
+        self.unchanged = 0
+        self.bytes_total = 0
+        self.bytes_sent = 0
+
+    def _snapshot_path(self, source_file: Path) -> Path:
+        key = str(Path(source_file).expanduser().resolve())
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return self.snapshot_dir / f"{digest}.snap"
+
+    def load(self, source_file: Path) -> Optional[str]:
+        """Get the last-processed content of a file (None if never processed)"""
+        try:
+            return self._snapshot_path(source_file).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return None
+
+    def save(self, source_file: Path, content: str) -> None:
+        """Record content as the last-processed version (atomic write)"""
+        target = self._snapshot_path(source_file)
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.snapshot_dir), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def stage(self, source_file: Path, content: str) -> None:
+        """
+        Hold content until commit() saves it as the last-processed version.
+
+        Staged content lives in memory only, so a file whose extraction
+        never finished (failure, shutdown) is diffed against the previous
+        snapshot again.
+        """
+        key = str(Path(source_file).expanduser().resolve())
+        with self._lock:
+            self._staged[key] = content
+
+    def commit(self, source_file: Path) -> bool:
+        """
+        Save the staged content of a file.
+
+        Returns:
+            True if staged content was saved
+        """
+        key = str(Path(source_file).expanduser().resolve())
+        with self._lock:
+            content = self._staged.pop(key, None)
+        if content is None:
+            return False
+        self.save(source_file, content)
+        return True
+
+    def discard(self, source_file: Path) -> None:
+        """Drop the staged content of a file (the snapshot is left as it was)"""
+        key = str(Path(source_file).expanduser().resolve())
+        with self._lock:
+            self._staged.pop(key, None)
+
+    def forget(self, source_file: Path) -> None:
+        """Drop the snapshot of a file"""
+        try:
+            self._snapshot_path(source_file).unlink()
+        except FileNotFoundError:
+            pass
+
+    def delta(self, source_file: Path, content: str) -> str:
+        """
+        Text to extract from, given the current content of a file.
+
+        Args:
+            source_file: Source file path
+            content: Current content
+
+        Returns:
+            Whole content on first sight, otherwise only the added or
+            changed hunks (empty string if nothing new)
+        """
+        previous = self.load(source_file)
+        if previous is None:
+            text = content
+        else:
+            text = HUNK_SEPARATOR.join(changed_hunks(previous, content))
+
+        with self._lock:
+            self.bytes_total += len(content)
+            self.bytes_sent += len(text)
+            if previous is None:
+                self.full_extractions += 1
+            elif text:
+                self.incremental_extractions += 1
+            else:
+                self.unchanged += 1
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics"""
+        with self._lock:
+            return {
+                'staged': len(self._staged),
+                'full_extractions': self.full_extractions,
+                'incremental_extractions': self.incremental_extractions,
+                'unchanged': self.unchanged,
+                'bytes_total': self.bytes_total,
+                'bytes_sent': self.bytes_sent,
+            }
@@ -6,17 +6,45 @@ Extracts structured observations from OpenClaw session transcripts
 using configurable LLM providers (OpenAI, Google).
 """
 
+import asyncio
 import json
 import logging
 import os
 import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from lib.error_handler import LLMRetryPolicy
+from lib.llm_clients import (
+    DEFAULT_MAX_CONCURRENCY, LLMClientRegistry, LoopSemaphore, get_client_registry
+)
+from lib.llm_cache import LLMResponseCache, create_llm_cache, prompt_version
+from lib.memory_merger import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Token budget of one message window sent to the LLM
+DEFAULT_WINDOW_TOKENS = 4000
+
+# Maximum windows extracted concurrently for one large input
+DEFAULT_WINDOW_WORKERS = 4
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+
+class ObservationError(Exception):
+    """
+    Observations could not be extracted (LLM error, exhausted retries,
+    open circuit breaker). Unlike an empty result, the input was not
+    processed and should be retried later.
+    """
+    pass
+
 
 # =============================================================================
 # Data Classes
@@ -55,6 +83,113 @@ class Observation:
         }
 
 
+# =============================================================================
+# Chunking
+# =============================================================================
+
+def _split_message(message: Dict[str, str], max_tokens: int) -> List[Dict[str, str]]:
+    """Split one oversized message into pieces at line (then word) boundaries"""
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            pieces.append("".join(current))
+        current, current_tokens = [], 0
+
+    for line in str(message.get('content', '')).splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if line_tokens > max_tokens:
+            # A single huge line: fall back to word boundaries
+            flush()
+            words = line.split()
+            step = max(1, int(len(words) * max_tokens / line_tokens))
+            for i in range(0, len(words), step):
+                pieces.append(" ".join(words[i:i + step]) + "\n")
+            continue
+        if current and current_tokens + line_tokens > max_tokens:
+            flush()
+        current.append(line)
+        current_tokens += line_tokens
+    flush()
+
+    return [{'role': message.get('role', 'user'), 'content': piece} for piece in pieces]
+
+
+def chunk_messages(
+    messages: List[Dict[str, str]],
+    max_tokens: int = DEFAULT_WINDOW_TOKENS,
+    overlap: int = 0,
+) -> List[List[Dict[str, str]]]:
+    """
+    Split a conversation into token-budgeted windows at message boundaries.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys
+        max_tokens: Estimated token budget per window; messages larger
+                    than this are split into pieces
+        overlap: Number of trailing messages of a window repeated at the
+                 start of the next one (for context across the cut)
+
+    Returns:
+        List of windows (each a list of message dicts)
+    """
+    units: List[Tuple[Dict[str, str], int]] = []
+    for message in messages:
+        tokens = estimate_tokens(str(message.get('content', '')))
+        if tokens > max_tokens:
+            units.extend(
+                (piece, estimate_tokens(piece['content']))
+                for piece in _split_message(message, max_tokens)
+            )
+        else:
+            units.append((message, tokens))
+
+    windows: List[List[Dict[str, str]]] = []
+    window: List[Tuple[Dict[str, str], int]] = []
+    window_tokens = 0
+    fresh = 0  # messages in the window that are not overlap
+
+    for unit in units:
+        if fresh and window_tokens + unit[1] > max_tokens:
+            windows.append([m for m, _ in window])
+            window = window[-overlap:] if overlap > 0 else []
+            window_tokens = sum(t for _, t in window)
+            # Drop overlap that would not leave room for the new message
+            while window and window_tokens + unit[1] > max_tokens:
+                window_tokens -= window.pop(0)[1]
+            fresh = 0
+        window.append(unit)
+        window_tokens += unit[1]
+        fresh += 1
+
+    if fresh:
+        windows.append([m for m, _ in window])
+    return windows
+
+
+def merge_observations(results: List[List['Observation']]) -> List['Observation']:
+    """
+    Merge per-window observations, dropping duplicates.
+
+    Observations are considered duplicates when their content matches
+    after case and whitespace normalization; the highest priority wins
+    and the first occurrence keeps its position.
+    """
+    merged: Dict[str, Observation] = {}
+    for observations in results:
+        for obs in observations:
+            key = " ".join(obs.content.lower().split())
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = obs
+            elif PRIORITY_RANK.get(obs.priority, 1) < PRIORITY_RANK.get(existing.priority, 1):
+                existing.priority = obs.priority
+    return list(merged.values())
+
+
 # =============================================================================
 # Observer System Prompt
 # =============================================================================
@@ -88,6 +223,18 @@ Return a JSON array of observations:
 If no meaningful observations can be extracted, return an empty array: []
 """
 
+# Cache key component: edits to the prompt invalidate cached responses
+OBSERVER_PROMPT_VERSION = prompt_version(OBSERVER_SYSTEM_PROMPT)
+
+# Header of a request that packs several small files into one prompt
+PACKED_FILES_INSTRUCTION = (
+    "The input contains {count} separate files. Each file starts with a line "
+    "'=== FILE <number>: <name> ===' and ends where the next one starts. "
+    "Extract observations from every file and add a \"file\" field with the "
+    "file's number to each observation."
+)
+PACKED_FILE_HEADER = "=== FILE {number}: {name} ==="
+
 
 # =============================================================================
 # Observer Agent
@@ -105,6 +252,15 @@ class Observer:
         model: Optional[str] = None,
         api_key: Optional[str] = None,
         api_key_env: str = "OPENAI_API_KEY",
+        window_tokens: int = DEFAULT_WINDOW_TOKENS,
+        window_overlap: int = 0,
+        window_workers: int = DEFAULT_WINDOW_WORKERS,
+        base_url: Optional[str] = None,
+        clients: Optional[LLMClientRegistry] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[LLMResponseCache] = None,
+        retry_policy: Optional[LLMRetryPolicy] = None,
+        transcript_offsets: Optional['TranscriptOffsets'] = None,
     ):
         """
         Args:
@@ -112,11 +268,33 @@ class Observer:
             model: Model name (auto-selected if None)
             api_key: API key (reads from env if None)
             api_key_env: Environment variable name for API key
+            window_tokens: Token budget per message window; larger inputs
+                           are chunked and extracted window by window
+            window_overlap: Messages repeated between consecutive windows
+            window_workers: Maximum windows extracted concurrently
+            base_url: OpenAI-compatible endpoint (None = api.openai.com)
+            clients: Client registry (default: the shared registry)
+            max_concurrency: Maximum LLM calls in flight in the async API
+            cache: Response cache consulted before calling the LLM
+            retry_policy: Retry/rate-limit/circuit-breaker policy applied to
+                          each LLM request (None = single attempt)
+            transcript_offsets: Where observe_from_file() resumes each
+                                transcript (None = read from the start)
         """
         self.provider = provider
         self.model = model or self._default_model(provider)
         self.api_key = api_key or os.environ.get(api_key_env, "")
+        self.window_tokens = window_tokens
+        self.window_overlap = window_overlap
+        self.window_workers = window_workers
+        self.base_url = base_url
+        self.clients = clients or get_client_registry()
+        self._semaphore = LoopSemaphore(max_concurrency)
+        self.cache = cache
+        self.retry_policy = retry_policy
+        self.transcript_offsets = transcript_offsets
         self._observation_counter = 0
+        self._counter_lock = threading.Lock()
 
         if not self.api_key:
             logger.warning(
@@ -142,6 +320,9 @@ class Observer:
 
         Returns:
             List of extracted Observation objects
+
+        Raises:
+            ObservationError: If any window could not be extracted
         """
         if not messages:
             return []
@@ -150,31 +331,249 @@ class Observer:
             logger.error("Cannot observe: no API key configured")
             return []
 
+        windows = chunk_messages(messages, self.window_tokens, self.window_overlap)
+        if len(windows) == 1:
+            return self._observe_window(windows[0])
+
+        # Map: extract windows concurrently; reduce: merge and de-duplicate
+        workers = max(1, min(self.window_workers, len(windows)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._observe_window, windows))
+
+        observations = merge_observations(results)
+        logger.info(
+            f"Extracted {len(observations)} observations from {len(windows)} windows"
+        )
+        return observations
+
+    def _observe_window(self, messages: List[Dict[str, str]]) -> List[Observation]:
+        """Extract observations from one window with a single LLM call"""
         # Format messages for the LLM
         conversation_text = self._format_messages(messages)
 
         # Call LLM
         try:
-            raw_response = self._call_llm(conversation_text)
-            observations = self._parse_response(raw_response)
-            logger.info(f"Extracted {len(observations)} observations")
-            return observations
+            raw_response = self._call_llm_cached(conversation_text)
         except Exception as e:
             logger.error(f"Observation extraction failed: {e}")
+            raise ObservationError(str(e)) from e
+
+        observations = self._parse_response(raw_response)
+        logger.info(f"Extracted {len(observations)} observations")
+        return observations
+
+    async def observe_async(self, messages: List[Dict[str, str]]) -> List[Observation]:
+        """
+        Async version of observe().
+
+        Windows are extracted concurrently on the running event loop;
+        LLM calls in flight are bounded by max_concurrency.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+
+        Returns:
+            List of extracted Observation objects
+
+        Raises:
+            ObservationError: If any window could not be extracted
+        """
+        if not messages:
+            return []
+
+        if not self.api_key:
+            logger.error("Cannot observe: no API key configured")
             return []
 
+        windows = chunk_messages(messages, self.window_tokens, self.window_overlap)
+        results = await asyncio.gather(
+            *(self._observe_window_async(window) for window in windows)
+        )
+        if len(results) == 1:
+            return results[0]
+        return merge_observations(results)
+
+    async def observe_many_async(
+        self,
+        batches: List[List[Dict[str, str]]],
+    ) -> List[List[Observation]]:
+        """
+        Extract observations from many conversations on one event loop.
+
+        Args:
+            batches: List of message lists
+
+        Returns:
+            One observation list per input, in input order
+
+        Raises:
+            ObservationError: If any input could not be extracted
+        """
+        return list(await asyncio.gather(*(self.observe_async(m) for m in batches)))
+
+    def observe_many(self, batches: List[List[Dict[str, str]]]) -> List[List[Observation]]:
+        """
+        Synchronous driver for observe_many_async().
+
+        Runs a private event loop, so it must not be called from a
+        thread that already runs one.
+        """
+        async def run():
+            try:
+                return await self.observe_many_async(batches)
+            finally:
+                await self.clients.aclose()
+
+        return asyncio.run(run())
+
+    def observe_files(self, inputs: Dict[str, str]) -> Dict[str, List[Observation]]:
+        """
+        Extract observations from many files, packing small ones together.
+
+        Files are packed in order into requests of up to window_tokens,
+        each file marked by a numbered delimiter; the model tags every
+        observation with its file number so results map back to their
+        source. Files too large to share a request are observed alone.
+
+        Args:
+            inputs: Mapping of file id (e.g. path) to text
+
+        Returns:
+            Mapping of file id to its observations. Files whose request
+            failed are left out, so callers can retry them.
+        """
+        results: Dict[str, List[Observation]] = {
+            key: [] for key, text in inputs.items() if not text.strip()
+        }
+        if not self.api_key:
+            logger.error("Cannot observe: no API key configured")
+            return {key: [] for key in inputs}
+
+        packs = self._pack_inputs(inputs)
+        if not packs:
+            return results
+
+        workers = max(1, min(self.window_workers, len(packs)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for mapped in pool.map(self._observe_pack, packs):
+                results.update(mapped)
+        return results
+
+    def _pack_inputs(self, inputs: Dict[str, str]) -> List[List[Tuple[str, str]]]:
+        """Greedily group inputs into packs within the window token budget"""
+        packs: List[List[Tuple[str, str]]] = []
+        pack: List[Tuple[str, str]] = []
+        pack_tokens = 0
+
+        for key, text in inputs.items():
+            if not text.strip():
+                continue
+            tokens = estimate_tokens(text) + estimate_tokens(
+                PACKED_FILE_HEADER.format(number=len(pack) + 1, name=Path(key).name)
+            )
+            if pack and pack_tokens + tokens > self.window_tokens:
+                packs.append(pack)
+                pack, pack_tokens = [], 0
+            pack.append((key, text))
+            pack_tokens += tokens
+        if pack:
+            packs.append(pack)
+        return packs
+
+    def _observe_pack(self, pack: List[Tuple[str, str]]) -> Dict[str, List[Observation]]:
+        """Extract one pack with a single LLM call and map results to files ({} on failure)"""
+        if len(pack) == 1:
+            key, text = pack[0]
+            try:
+                return {key: self.observe([{"role": "user", "content": text}])}
+            except ObservationError:
+                return {}
+
+        sections = [PACKED_FILES_INSTRUCTION.format(count=len(pack))]
+        for number, (key, text) in enumerate(pack, start=1):
+            sections.append(
+                f"{PACKED_FILE_HEADER.format(number=number, name=Path(key).name)}\n{text.strip()}"
+            )
+        packed_text = "\n\n".join(sections)
+
+        try:
+            observations = self._parse_response(self._call_llm_cached(packed_text))
+        except Exception as e:
+            logger.error(f"Observation extraction failed for {len(pack)} packed files: {e}")
+            return {}
+
+        mapped: Dict[str, List[Observation]] = {key: [] for key, _ in pack}
+
+        unattributed = 0
+        for obs in observations:
+            number = obs.metadata.pop('file', None)
+            try:
+                index = int(number) - 1
+            except (TypeError, ValueError):
+                index = -1
+            if not 0 <= index < len(pack):
+                # Source unknown: dropped rather than stored under the wrong file
+                unattributed += 1
+                continue
+            mapped[pack[index][0]].append(obs)
+
+        if unattributed:
+            logger.warning(f"Dropped {unattributed} packed observations with no valid file number")
+        logger.info(
+            f"Extracted {len(observations) - unattributed} observations from {len(pack)} packed files"
+        )
+        return mapped
+
     def observe_from_file(self, log_file: Path) -> List[Observation]:
         """
         Extract observations from a JSONL log file.
 
+        The transcript is streamed window by window; with transcript
+        offsets configured, only lines added since the last call are read.
+
         Args:
             log_file: Path to .jsonl session transcript
 
         Returns:
             List of extracted Observation objects
         """
-        messages = self._read_jsonl_log(log_file)
-        return self.observe(messages)
+        return self.observe_transcript(log_file, self.transcript_offsets)
+
+    def observe_transcript(
+        self,
+        log_file: Path,
+        offsets: Optional['TranscriptOffsets'] = None,
+    ) -> List[Observation]:
+        """
+        Extract observations from a JSONL transcript, window by window.
+
+        Only lines after the stored offset are read, and the offset is
+        advanced after each extracted window, so repeated runs tail new
+        messages. A failed window stops the run without advancing the
+        offset, so the next run retries it.
+
+        Args:
+            log_file: Path to .jsonl session transcript
+            offsets: Offset store to resume from (None = read from start)
+
+        Returns:
+            List of Observation objects extracted before any failure
+        """
+        start = offsets.get(log_file) if offsets else 0
+        observations = []
+        for messages, end_offset in self.stream_jsonl_windows(
+            log_file, self.window_tokens, start
+        ):
+            if messages:
+                try:
+                    observations.extend(self.observe(messages))
+                except ObservationError as e:
+                    logger.warning(f"Transcript extraction stopped at offset {start} of {log_file}: {e}")
+                    break
+            start = end_offset
+            if offsets:
+                offsets.set(log_file, end_offset)
+        return observations
 
     def _format_messages(self, messages: List[Dict[str, str]]) -> str:
         """Format messages into a conversation string"""
@@ -185,6 +584,66 @@ class Observer:
             lines.append(f"[{role}]: {content}")
         return "\n\n".join(lines)
 
+    async def _observe_window_async(self, messages: List[Dict[str, str]]) -> List[Observation]:
+        """Async version of _observe_window()"""
+        conversation_text = self._format_messages(messages)
+
+        try:
+            async with self._semaphore:
+                raw_response = await self._call_llm_cached_async(conversation_text)
+        except Exception as e:
+            logger.error(f"Observation extraction failed: {e}")
+            raise ObservationError(str(e)) from e
+
+        observations = self._parse_response(raw_response)
+        logger.info(f"Extracted {len(observations)} observations")
+        return observations
+
+    def _cache_key(self, conversation_text: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            self.provider, self.model, OBSERVER_PROMPT_VERSION, conversation_text
+        )
+
+    def _call_llm_cached(self, conversation_text: str) -> str:
+        """Call the LLM, answering from the response cache when possible"""
+        key = self._cache_key(conversation_text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.retry_policy is not None:
+            response = self.retry_policy.call_with_retry(
+                self._call_llm, conversation_text, tokens=estimate_tokens(conversation_text)
+            )
+        else:
+            response = self._call_llm(conversation_text)
+        # Never cache a malformed response: it would be replayed forever
+        if key is not None and self._decode_response(response) is not None:
+            self.cache.put(key, response)
+        return response
+
+    async def _call_llm_cached_async(self, conversation_text: str) -> str:
+        """Async version of _call_llm_cached()"""
+        key = self._cache_key(conversation_text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.retry_policy is not None:
+            response = await self.retry_policy.call_with_retry_async(
+                self._call_llm_async, conversation_text, tokens=estimate_tokens(conversation_text)
+            )
+        else:
+            response = await self._call_llm_async(conversation_text)
+        # Never cache a malformed response: it would be replayed forever
+        if key is not None and self._decode_response(response) is not None:
+            self.cache.put(key, response)
+        return response
+
     def _call_llm(self, conversation_text: str) -> str:
         """
         Call the LLM API to extract observations.
@@ -202,65 +661,85 @@ class Observer:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _call_openai(self, conversation_text: str) -> str:
-        """Call OpenAI API"""
-        from openai import OpenAI
+    async def _call_llm_async(self, conversation_text: str) -> str:
+        """Async version of _call_llm()"""
+        if self.provider == "openai":
+            client = self.clients.get_async_openai(self.api_key, self.base_url)
+            response = await client.chat.completions.create(
+                **self._openai_request(conversation_text)
+            )
+            return response.choices[0].message.content or "[]"
+        elif self.provider == "google":
+            model = self.clients.get_google_model(self.api_key, self.model)
+            response = await model.generate_content_async(
+                self._google_prompt(conversation_text)
+            )
+            return response.text
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
 
-        client = OpenAI(api_key=self.api_key)
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
+    def _openai_request(self, conversation_text: str) -> Dict[str, Any]:
+        """Chat completion parameters for an extraction call"""
+        return {
+            'model': self.model,
+            'messages': [
                 {"role": "system", "content": OBSERVER_SYSTEM_PROMPT},
                 {"role": "user", "content": f"Extract observations from this conversation:\n\n{conversation_text}"},
             ],
-            temperature=0.1,
-            max_tokens=2000,
-            response_format={"type": "json_object"},
-        )
-        return response.choices[0].message.content or "[]"
-
-    def _call_google(self, conversation_text: str) -> str:
-        """Call Google Gemini API"""
-        import google.generativeai as genai
-
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(self.model)
+            'temperature': 0.1,
+            'max_tokens': 2000,
+            'response_format': {"type": "json_object"},
+        }
 
-        prompt = (
+    @staticmethod
+    def _google_prompt(conversation_text: str) -> str:
+        """Gemini prompt for an extraction call"""
+        return (
             f"{OBSERVER_SYSTEM_PROMPT}\n\n"
             f"Extract observations from this conversation:\n\n"
             f"{conversation_text}\n\n"
             f"Return ONLY a JSON array."
         )
 
-        response = model.generate_content(prompt)
+    def _call_openai(self, conversation_text: str) -> str:
+        """Call OpenAI API"""
+        client = self.clients.get_openai(self.api_key, self.base_url)
+        response = client.chat.completions.create(**self._openai_request(conversation_text))
+        return response.choices[0].message.content or "[]"
+
+    def _call_google(self, conversation_text: str) -> str:
+        """Call Google Gemini API"""
+        model = self.clients.get_google_model(self.api_key, self.model)
+        response = model.generate_content(self._google_prompt(conversation_text))
         return response.text
 
-    def _parse_response(self, raw_response: str) -> List[Observation]:
+    @staticmethod
+    def _decode_response(raw_response: str) -> Optional[List[Any]]:
         """
-        Parse LLM response into Observation objects.
+        Decode the JSON observation list of an LLM response.
 
         Args:
             raw_response: Raw LLM response string
 
         Returns:
-            List of Observation objects
+            List of raw observation items, or None if the response holds
+            no usable JSON
         """
         # Try to extract JSON from response
         try:
             data = json.loads(raw_response)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, TypeError):
             # Try to find JSON array in the response
-            match = re.search(r'\[.*\]', raw_response, re.DOTALL)
+            match = re.search(r'\[.*\]', raw_response or '', re.DOTALL)
             if match:
                 try:
                     data = json.loads(match.group())
                 except json.JSONDecodeError:
                     logger.warning("Failed to parse LLM response as JSON")
-                    return []
+                    return None
             else:
                 logger.warning("No JSON array found in LLM response")
-                return []
+                return None
 
         # Handle wrapper object (e.g., {"observations": [...]})
         if isinstance(data, dict):
@@ -270,9 +749,24 @@ class Observer:
                     break
             else:
                 logger.warning("Unexpected JSON structure")
-                return []
+                return None
 
         if not isinstance(data, list):
+            return None
+        return data
+
+    def _parse_response(self, raw_response: str) -> List[Observation]:
+        """
+        Parse LLM response into Observation objects.
+
+        Args:
+            raw_response: Raw LLM response string
+
+        Returns:
+            List of Observation objects
+        """
+        data = self._decode_response(raw_response)
+        if data is None:
             return []
 
         # Convert to Observation objects
@@ -283,8 +777,10 @@ class Observer:
             if not isinstance(item, dict):
                 continue
 
-            self._observation_counter += 1
-            obs_id = f"obs_{now.strftime('%Y%m%d')}_{self._observation_counter:04d}"
+            with self._counter_lock:
+                self._observation_counter += 1
+                counter = self._observation_counter
+            obs_id = f"obs_{now.strftime('%Y%m%d')}_{counter:04d}"
 
             # Validate priority
             priority = item.get('priority', 'medium').lower()
@@ -301,66 +797,181 @@ class Observer:
             if not content:
                 continue
 
+            metadata = {
+                'time_context': item.get('time_context', ''),
+                'source': 'observer',
+            }
+            if 'file' in item:
+                # Source file number in packed multi-file requests
+                metadata['file'] = item['file']
+
             obs = Observation(
                 id=obs_id,
                 timestamp=now,
                 priority=priority,
                 category=category,
                 content=content,
-                metadata={
-                    'time_context': item.get('time_context', ''),
-                    'source': 'observer',
-                },
+                metadata=metadata,
             )
             observations.append(obs)
 
         return observations
 
     @staticmethod
-    def _read_jsonl_log(log_file: Path) -> List[Dict[str, str]]:
+    def _parse_jsonl_line(line: str) -> Optional[Dict[str, str]]:
+        """Parse one transcript line into a message dict (None if not a message)"""
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(entry, dict) and 'role' in entry and 'content' in entry:
+            return {'role': entry['role'], 'content': entry['content']}
+        return None
+
+    @staticmethod
+    def stream_jsonl_windows(
+        log_file: Path,
+        max_tokens: int = DEFAULT_WINDOW_TOKENS,
+        start_offset: int = 0,
+    ) -> Iterator[Tuple[List[Dict[str, str]], int]]:
         """
-        Read messages from a JSONL log file.
+        Stream messages from a JSONL log in token-budgeted windows.
+
+        The file is read line by line, so memory use does not depend on
+        transcript size. A trailing line without a newline (still being
+        written) is left for the next run.
 
         Args:
             log_file: Path to .jsonl file
+            max_tokens: Estimated token budget per window (a single
+                        larger message gets a window of its own)
+            start_offset: Byte offset to start reading from
 
-        Returns:
-            List of message dicts
+        Yields:
+            (messages, end_offset) where end_offset is the byte offset
+            just past the last line consumed for the window
         """
-        messages = []
+        window: List[Dict[str, str]] = []
+        window_tokens = 0
+        offset = start_offset
+        yielded_offset = start_offset
+
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                        if 'role' in entry and 'content' in entry:
-                            messages.append({
-                                'role': entry['role'],
-                                'content': entry['content'],
-                            })
-                    except json.JSONDecodeError:
-                        continue
+            with open(log_file, 'rb') as f:
+                f.seek(start_offset)
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break
+                    message = Observer._parse_jsonl_line(raw.decode('utf-8', errors='replace'))
+                    if message:
+                        tokens = estimate_tokens(str(message['content']))
+                        if window and window_tokens + tokens > max_tokens:
+                            yield window, offset
+                            yielded_offset = offset
+                            window, window_tokens = [], 0
+                        window.append(message)
+                        window_tokens += tokens
+                    offset += len(raw)
         except FileNotFoundError:
             logger.error(f"Log file not found: {log_file}")
-        except Exception as e:
-            logger.error(f"Error reading log file: {e}")
+            return
 
-        return messages
+        if window or offset > yielded_offset:
+            yield window, offset
+
+
+# =============================================================================
+# Transcript Offsets
+# =============================================================================
+
+class TranscriptOffsets:
+    """
+    Persists how far each transcript has been processed (byte offsets).
+    A transcript that shrank or was replaced is read again from the start.
+    """
+
+    STATE_FILENAME = ".oc_transcript_offsets.json"
+
+    def __init__(self, state_path: str):
+        """
+        Args:
+            state_path: JSON file holding {transcript path: {offset, inode}}
+        """
+        self.state_path = Path(state_path).expanduser().resolve()
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, int]] = {}
+
+        if self.state_path.exists():
+            try:
+                self._state = json.loads(self.state_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable offset state {self.state_path}: {e}")
+
+    def get(self, log_file: Path) -> int:
+        """Byte offset to resume a transcript from"""
+        log_file = Path(log_file).expanduser().resolve()
+        with self._lock:
+            entry = self._state.get(str(log_file))
+        if not entry:
+            return 0
+
+        try:
+            stat = log_file.stat()
+        except OSError:
+            return 0
+        if stat.st_ino != entry.get('inode') or stat.st_size < entry['offset']:
+            logger.info(f"Transcript rotated or truncated, restarting: {log_file}")
+            return 0
+        return entry['offset']
+
+    def set(self, log_file: Path, offset: int) -> None:
+        """Record the processed offset and persist the state"""
+        log_file = Path(log_file).expanduser().resolve()
+        try:
+            inode = log_file.stat().st_ino
+        except OSError:
+            inode = 0
+        with self._lock:
+            self._state[str(log_file)] = {'offset': offset, 'inode': inode}
+            self._save()
+
+    def reset(self, log_file: Path) -> None:
+        """Forget a transcript's offset"""
+        log_file = Path(log_file).expanduser().resolve()
+        with self._lock:
+            if self._state.pop(str(log_file), None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.state_path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
 
 
 # =============================================================================
 # Convenience functions
 # =============================================================================
 
-def create_observer(config: Dict[str, Any]) -> Observer:
+def create_observer(
+    config: Dict[str, Any],
+    retry_policy: Optional[LLMRetryPolicy] = None,
+) -> Observer:
     """
     Create an Observer from config dictionary.
 
     Args:
         config: Configuration dict with 'llm' section
+        retry_policy: Policy shared with other LLM callers (optional)
 
     Returns:
         Configured Observer instance
@@ -374,4 +985,28 @@ def create_observer(config: Dict[str, Any]) -> Observer:
         provider=provider,
         model=model,
         api_key_env=api_key_env,
+        window_tokens=llm_config.get('window_tokens', DEFAULT_WINDOW_TOKENS),
+        window_overlap=llm_config.get('window_overlap', 0),
+        window_workers=llm_config.get('window_workers', DEFAULT_WINDOW_WORKERS),
+        base_url=llm_config.get('base_url'),
+        max_concurrency=llm_config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+        cache=create_llm_cache(config),
+        retry_policy=retry_policy,
+        transcript_offsets=create_transcript_offsets(config),
     )
+
+
+def create_transcript_offsets(config: Dict[str, Any]) -> Optional[TranscriptOffsets]:
+    """
+    Create the transcript offset store from config.
+
+    Args:
+        config: Configuration dict with 'memory' section
+
+    Returns:
+        TranscriptOffsets kept in the memory directory, or None without one
+    """
+    memory_dir = config.get('memory', {}).get('dir')
+    if not memory_dir:
+        return None
+    return TranscriptOffsets(str(Path(memory_dir).expanduser() / TranscriptOffsets.STATE_FILENAME))
@@ -10,10 +10,16 @@ import logging
 import re
 import subprocess
 import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.parallel_scan import ScanEngine, scan_files
+from lib.query_cache import ChangeNotifier
+from lib.text_scan import compile_query, find_snippet, mapped_file
+from lib.vault_index import VaultIndex, VaultWatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,31 +79,54 @@ class ObsidianNote:
 # Obsidian Client
 # =============================================================================
 
-class ObsidianClient:
+class ObsidianClient(ChangeNotifier):
     """
     Client for interacting with Obsidian vault.
     Supports both obsidian-cli and direct file manipulation.
     """
 
+    # Characters of context on each side of a search match
+    SNIPPET_CONTEXT = 100
+
     def __init__(
         self,
         vault_path: str,
         cli_path: Optional[str] = None,
         default_folder: str = "OC-Memory",
+        scan_engine: Optional[ScanEngine] = None,
+        vault_index: Optional[VaultIndex] = None,
+        watch_vault: bool = True,
     ):
         """
         Args:
             vault_path: Path to Obsidian vault root
             cli_path: Path to obsidian-cli binary (auto-detected if None)
             default_folder: Default folder for OC-Memory notes
+            scan_engine: Multi-process scanner for search_notes (sequential if None)
+            vault_index: Full-text index answering search, listing and stats
+                (the vault is walked on every call if None)
+            watch_vault: Keep vault_index fresh with a filesystem watcher;
+                otherwise only notes written through this client (and
+                explicit sync_index() calls) update it
         """
         self.vault_path = Path(vault_path).expanduser().resolve()
         self.cli_path = cli_path or self._find_cli()
         self.default_folder = default_folder
+        self.scan_engine = scan_engine
+        self.vault_index = vault_index
+        self.watch_vault = watch_vault
+
+        self._watcher: Optional[VaultWatcher] = None
+        self._index_ready = False
+        self._index_lock = threading.Lock()
 
         # Ensure vault directory exists
         self.vault_path.mkdir(parents=True, exist_ok=True)
 
+        if vault_index is not None:
+            # Edits picked up by the watcher invalidate cached cold results
+            vault_index.add_change_listener(self._notify_change)
+
     def _find_cli(self) -> Optional[str]:
         """Try to find obsidian-cli in PATH"""
         return shutil.which("obsidian-cli") or shutil.which("obsidian")
@@ -152,6 +181,11 @@ class ObsidianClient:
 
         note_path.write_text(note.to_markdown(), encoding="utf-8")
         logger.info(f"Created Obsidian note: {note_path}")
+        if self._index() is not None:
+            # Searchable now rather than after the watcher's quiet period
+            self.vault_index.add_document(note_path)
+        else:
+            self._notify_change()
         return note_path
 
     def create_archive_note(
@@ -196,39 +230,51 @@ class ObsidianClient:
         query: str,
         folder: Optional[str] = None,
         max_results: int = 10,
+        regex: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Search notes in the Obsidian vault.
 
-        Uses simple text matching (grep-like).
+        With a vault index, notes are ranked by BM25 over title, folder,
+        frontmatter, tags and body (query words match as a phrase whose
+        last word may be a prefix). Otherwise, and for regex queries,
+        notes are matched as text (grep-like): with a scan engine (or for
+        regex queries) every note is scanned and the notes with the most
+        matches are returned; otherwise the first matches found are.
 
         Args:
             query: Search query string
             folder: Subfolder to search in (searches all if None)
             max_results: Maximum number of results
+            regex: Treat query as a case-insensitive regular expression
 
         Returns:
             List of result dicts with 'path', 'title', 'snippet'
         """
+        index = self._index() if not regex else None
+        if index is not None:
+            return index.search(query, folder, max_results)
+
         search_dir = self.vault_path / folder if folder else self.vault_path
         if not search_dir.exists():
             return []
 
+        if self.scan_engine is not None or regex:
+            return self._scan_notes(search_dir, query, max_results, regex)
+
         results = []
-        query_lower = query.lower()
+        pattern = compile_query(query)
 
         for md_file in search_dir.rglob("*.md"):
             try:
-                content = md_file.read_text(encoding="utf-8")
-                if query_lower in content.lower():
-                    # Extract snippet around the match
-                    snippet = self._extract_snippet(content, query)
-                    title = md_file.stem
-
+                # Scan the raw bytes; only the snippet around the match is decoded
+                with mapped_file(md_file) as data:
+                    match = find_snippet(data, pattern, self.SNIPPET_CONTEXT)
+                if match is not None:
                     results.append({
                         'path': str(md_file),
-                        'title': title,
-                        'snippet': snippet,
+                        'title': md_file.stem,
+                        'snippet': match.snippet,
                         'folder': str(md_file.parent.relative_to(self.vault_path)),
                     })
 
@@ -240,6 +286,81 @@ class ObsidianClient:
 
         return results
 
+    def _scan_notes(self, search_dir: Path, query: str, max_results: int, regex: bool) -> List[Dict[str, Any]]:
+        """Rank notes by match count, across processes if a scan engine is set"""
+        files = list(search_dir.rglob("*.md"))
+        if self.scan_engine is not None:
+            hits = self.scan_engine.scan(files, query, max_results, regex, self.SNIPPET_CONTEXT)
+        else:
+            hits = scan_files([str(f) for f in files], query, max_results, regex, self.SNIPPET_CONTEXT)
+
+        return [
+            {
+                'path': hit.path,
+                'title': Path(hit.path).stem,
+                'snippet': hit.snippet,
+                'folder': str(Path(hit.path).parent.relative_to(self.vault_path)),
+                'matches': hit.score,
+            }
+            for hit in hits
+        ]
+
+    def search_notes_many(
+        self,
+        queries: List[str],
+        folder: Optional[str] = None,
+        max_results: int = 10,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search notes for several queries in a single pass over the vault.
+
+        Each note is read once and matched against every query.
+
+        Args:
+            queries: Search query strings
+            folder: Subfolder to search in (searches all if None)
+            max_results: Maximum number of results per query
+
+        Returns:
+            One result list per query (same order), each as in search_notes()
+        """
+        index = self._index()
+        if index is not None:
+            return [index.search(query, folder, max_results) for query in queries]
+
+        batches: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        search_dir = self.vault_path / folder if folder else self.vault_path
+        if not queries or not search_dir.exists():
+            return batches
+
+        patterns = [compile_query(query) for query in queries]
+        open_queries = set(range(len(queries)))
+
+        for md_file in search_dir.rglob("*.md"):
+            try:
+                with mapped_file(md_file) as data:
+                    matches = {i: find_snippet(data, patterns[i], self.SNIPPET_CONTEXT) for i in open_queries}
+            except Exception as e:
+                logger.debug(f"Error reading {md_file}: {e}")
+                continue
+
+            for i, match in matches.items():
+                if match is None:
+                    continue
+                batches[i].append({
+                    'path': str(md_file),
+                    'title': md_file.stem,
+                    'snippet': match.snippet,
+                    'folder': str(md_file.parent.relative_to(self.vault_path)),
+                })
+                if len(batches[i]) >= max_results:
+                    open_queries.discard(i)
+
+            if not open_queries:
+                break
+
+        return batches
+
     def get_note(self, note_path: str) -> Optional[Dict[str, Any]]:
         """
         Read a note from the vault.
@@ -284,6 +405,10 @@ class ObsidianClient:
         Returns:
             List of dicts with 'title', 'path', 'modified'
         """
+        index = self._index()
+        if index is not None:
+            return index.list_notes(folder or self.default_folder)
+
         target = self.vault_path / (folder or self.default_folder)
         if not target.exists():
             return []
@@ -301,6 +426,20 @@ class ObsidianClient:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get vault statistics"""
+        index = self._index()
+        if index is not None:
+            folder_stats = index.folder_stats(self.default_folder)
+            stats = {
+                'total_notes': folder_stats['notes'],
+                'total_size_bytes': folder_stats['size_bytes'],
+                'vault_path': str(self.vault_path),
+                'has_cli': self.has_cli,
+                'index': index.get_stats(),
+            }
+            if self._watcher is not None:
+                stats['watcher'] = self._watcher.get_stats()
+            return stats
+
         target = self.vault_path / self.default_folder
         if not target.exists():
             return {'total_notes': 0, 'total_size_bytes': 0, 'has_cli': self.has_cli}
@@ -315,6 +454,46 @@ class ObsidianClient:
             'has_cli': self.has_cli,
         }
 
+    # =========================================================================
+    # Vault index
+    # =========================================================================
+
+    def _index(self) -> Optional[VaultIndex]:
+        """The vault index, started and synced on first use (None if not configured)"""
+        if self.vault_index is None:
+            return None
+        if not self._index_ready:
+            with self._index_lock:
+                if not self._index_ready:
+                    # Watch first so edits made during the sync are not missed
+                    if self.watch_vault:
+                        self._watcher = VaultWatcher(self.vault_index)
+                        self._watcher.start()
+                    self.vault_index.sync()
+                    self._index_ready = True
+        return self.vault_index
+
+    def sync_index(self) -> Dict[str, int]:
+        """
+        Reconcile the vault index with the vault.
+
+        Returns:
+            Dict with 'added', 'updated', 'removed' counts (all 0 without an index)
+        """
+        if self._index() is None:
+            return {'added': 0, 'updated': 0, 'removed': 0}
+        return self.vault_index.sync()
+
+    def close(self) -> None:
+        """Stop the vault watcher and close the index"""
+        with self._index_lock:
+            if self._watcher is not None:
+                self._watcher.stop()
+                self._watcher = None
+            if self.vault_index is not None:
+                self.vault_index.close()
+            self._index_ready = False
+
     # =========================================================================
     # Private helpers
     # =========================================================================
@@ -327,24 +506,6 @@ class ObsidianClient:
         safe = safe.strip('. ')
         return safe[:200]  # Limit length
 
-    @staticmethod
-    def _extract_snippet(content: str, query: str, context_chars: int = 100) -> str:
-        """Extract a snippet around the first match of query in content"""
-        idx = content.lower().find(query.lower())
-        if idx == -1:
-            return content[:200]
-
-        start = max(0, idx - context_chars)
-        end = min(len(content), idx + len(query) + context_chars)
-
-        snippet = content[start:end].strip()
-        if start > 0:
-            snippet = "..." + snippet
-        if end < len(content):
-            snippet = snippet + "..."
-
-        return snippet
-
     @staticmethod
     def _parse_frontmatter(raw: str) -> tuple:
         """Parse YAML frontmatter from markdown content"""
@@ -371,7 +532,10 @@ class ObsidianClient:
 # Factory
 # =============================================================================
 
-def create_obsidian_client(config: Dict[str, Any]) -> Optional[ObsidianClient]:
+def create_obsidian_client(
+    config: Dict[str, Any],
+    scan_engine: Optional[ScanEngine] = None,
+) -> Optional[ObsidianClient]:
     """Create an ObsidianClient from config dictionary"""
     obsidian_config = config.get('obsidian', {})
 
@@ -379,4 +543,23 @@ def create_obsidian_client(config: Dict[str, Any]) -> Optional[ObsidianClient]:
         return None
 
     vault_path = obsidian_config.get('vault_path', '~/Documents/ObsidianVault')
-    return ObsidianClient(vault_path=vault_path)
+    index_config = obsidian_config.get('index', {})
+
+    vault_index = None
+    if index_config.get('enabled', True):
+        # Kept beside the other OC-Memory caches, never inside the vault
+        index_path = index_config.get('path')
+        memory_dir = config.get('memory', {}).get('dir')
+        if not index_path and memory_dir:
+            index_path = str(Path(memory_dir).expanduser() / VaultIndex.INDEX_FILENAME)
+        if index_path:
+            vault_index = VaultIndex(vault_path=vault_path, index_path=index_path)
+        else:
+            logger.warning("Vault index disabled: set memory.dir or obsidian.index.path")
+
+    return ObsidianClient(
+        vault_path=vault_path,
+        scan_engine=scan_engine,
+        vault_index=vault_index,
+        watch_vault=index_config.get('watch', True),
+    )
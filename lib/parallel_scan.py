@@ -0,0 +1,260 @@
+"""
+Parallel Scan for OC-Memory
+Multi-process full-text scan over markdown files
+
+The warm index answers plain keyword queries, but regular expressions
+cannot be answered from it, and the Obsidian vault is not indexed at
+all. ScanEngine splits the file list into one size-balanced partition
+per worker and scans the partitions in a process pool. Each worker
+returns its top-k files by match count and the parent merges them.
+Short file lists are scanned in-process, where pool overhead would
+dominate.
+"""
+
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from lib.text_scan import compile_pattern, compile_query, find_snippet, mapped_file
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanHit:
+    """A file matching a scan query"""
+    path: str
+    score: int  # number of matches in the file
+    offset: int  # byte offset of the first match
+    snippet: str
+
+
+def scan_files(
+    paths: List[str],
+    query: str,
+    n_results: int = 10,
+    regex: bool = False,
+    context_chars: int = 150,
+) -> List[ScanHit]:
+    """
+    Scan files in the current process.
+
+    Matches are counted in every file, but snippets are only cut for
+    the n_results files with the most matches.
+
+    Args:
+        paths: Files to scan
+        query: Literal query, or a regular expression if regex is True
+        n_results: Number of files to return
+        regex: Treat query as a regular expression
+        context_chars: Snippet context on each side of the first match
+
+    Returns:
+        ScanHits ordered by match count (then path)
+    """
+    matcher = compile_pattern(query) if regex else compile_query(query)
+
+    counts = []
+    for path in paths:
+        try:
+            with mapped_file(Path(path)) as data:
+                count = matcher.count(data)
+        except OSError as e:
+            logger.debug(f"Error reading {path}: {e}")
+            continue
+        if count:
+            counts.append((count, path))
+
+    hits = []
+    for count, path in heapq.nsmallest(n_results, counts, key=lambda entry: (-entry[0], entry[1])):
+        try:
+            with mapped_file(Path(path)) as data:
+                match = find_snippet(data, matcher, context_chars)
+        except OSError as e:
+            logger.debug(f"Error reading {path}: {e}")
+            continue
+        if match is not None:
+            hits.append(ScanHit(path=path, score=count, offset=match.offset, snippet=match.snippet))
+    return hits
+
+
+# =============================================================================
+# Scan Engine
+# =============================================================================
+
+class ScanEngine:
+    """
+    Scans file lists across a pool of worker processes.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        min_parallel_files: int = 64,
+        start_method: Optional[str] = None,
+    ):
+        """
+        Args:
+            workers: Worker processes (default: CPU count)
+            min_parallel_files: Smaller file lists are scanned in-process
+            start_method: multiprocessing start method (default: forkserver
+                where available, else spawn; fork is unsafe with the
+                daemon's threads)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_files = min_parallel_files
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = 'forkserver' if 'forkserver' in methods else 'spawn'
+        self.start_method = start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.scans = 0
+        self.parallel_scans = 0
+        self.files_scanned = 0
+        self.total_scan_time = 0.0
+
+    def scan(
+        self,
+        paths: Iterable[Path],
+        query: str,
+        n_results: int = 10,
+        regex: bool = False,
+        context_chars: int = 150,
+    ) -> List[ScanHit]:
+        """
+        Find the files with the most matches.
+
+        Args:
+            paths: Files to scan
+            query: Literal query, or a regular expression if regex is True
+            n_results: Number of files to return
+            regex: Treat query as a regular expression
+            context_chars: Snippet context on each side of the first match
+
+        Returns:
+            ScanHits ordered by match count (then path)
+
+        Raises:
+            re.error: If regex is True and query is not a valid pattern
+        """
+        paths = [str(path) for path in paths]
+        if regex:
+            compile_pattern(query)  # fail here rather than in every worker
+
+        start = time.perf_counter()
+        parallel = self.workers > 1 and len(paths) >= max(2, self.min_parallel_files)
+        hits = None
+        if parallel:
+            hits = self._scan_parallel(paths, query, n_results, regex, context_chars)
+        if hits is None:
+            hits = scan_files(paths, query, n_results, regex, context_chars)
+
+        self.scans += 1
+        self.parallel_scans += int(parallel)
+        self.files_scanned += len(paths)
+        self.total_scan_time += time.perf_counter() - start
+        return hits
+
+    def _scan_parallel(
+        self,
+        paths: List[str],
+        query: str,
+        n_results: int,
+        regex: bool,
+        context_chars: int,
+    ) -> Optional[List[ScanHit]]:
+        """Scan partitions in the pool and merge their top-k (None if the pool died)"""
+        try:
+            pool = self._get_pool()
+            futures = [
+                pool.submit(scan_files, partition, query, n_results, regex, context_chars)
+                for partition in self._partition(paths)
+            ]
+            candidates = [hit for future in futures for hit in future.result()]
+        except BrokenProcessPool as e:
+            logger.warning(f"Scan worker pool failed, scanning in-process: {e}")
+            self.close()
+            return None
+
+        return heapq.nsmallest(n_results, candidates, key=lambda hit: (-hit.score, hit.path))
+
+    def _partition(self, paths: List[str]) -> List[List[str]]:
+        """Split paths into one partition per worker, balanced by total size"""
+        sized = []
+        for path in paths:
+            try:
+                sized.append((os.path.getsize(path), path))
+            except OSError:
+                sized.append((0, path))
+
+        # Largest files first, each onto the currently lightest partition
+        partitions: List[List[str]] = [[] for _ in range(min(self.workers, len(paths)))]
+        loads = [(0, i) for i in range(len(partitions))]
+        for size, path in sorted(sized, reverse=True):
+            load, i = heapq.heappop(loads)
+            partitions[i].append(path)
+            heapq.heappush(loads, (load + size, i))
+        return [partition for partition in partitions if partition]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scan statistics"""
+        return {
+            'workers': self.workers,
+            'scans': self.scans,
+            'parallel_scans': self.parallel_scans,
+            'files_scanned': self.files_scanned,
+            'avg_scan_ms': (
+                round(self.total_scan_time / self.scans * 1000, 2) if self.scans else 0.0
+            ),
+        }
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+def create_scan_engine(config: Dict[str, Any]) -> Optional[ScanEngine]:
+    """
+    Create a ScanEngine from config dictionary.
+
+    Args:
+        config: Configuration dict with optional 'search.scan' section
+
+    Returns:
+        Configured ScanEngine, or None if disabled
+    """
+    scan_config = config.get('search', {}).get('scan', {})
+    if not scan_config.get('enabled', True):
+        return None
+
+    return ScanEngine(
+        workers=scan_config.get('workers') or None,
+        min_parallel_files=scan_config.get('min_parallel_files', 64),
+    )
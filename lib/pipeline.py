@@ -0,0 +1,522 @@
+"""
+Observation Pipeline for OC-Memory
+Staged, bounded-concurrency processing of file change events
+
+Decouples the file watcher thread from copying and LLM extraction:
+
+    submit() -> dedupe/debounce -> copy workers -> LLM workers -> batched sink
+
+Every hand-off is a bounded queue, so a slow stage applies backpressure
+to the stages before it instead of growing memory without limit.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from lib.error_handler import RateLimiter, create_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel that tells a worker thread to exit
+_STOP = object()
+
+
+# =============================================================================
+# Data Classes
+# =============================================================================
+
+@dataclass
+class PipelineItem:
+    """A file change moving through the pipeline"""
+    path: Path
+    event_type: str
+    due: float  # monotonic time after which the event is considered settled
+    observations: Optional[list] = None
+
+
+# =============================================================================
+# Observation Pipeline
+# =============================================================================
+
+class ObservationPipeline:
+    """
+    Staged worker pipeline for file change events.
+
+    Stages:
+    1. Intake: events for the same path are coalesced until the path
+       has been quiet for debounce_seconds
+    2. Copy: copy_fn(path, event_type) on copy_workers threads; a falsy
+       return value skips extraction for that file
+    3. Extract: extract_fn(path) on llm_workers threads (the concurrency
+       cap), each call gated by the rate limiter; with extract_many_fn,
+       up to pack_size queued files are extracted in one call
+    4. Sink: sink_fn([(path, observations), ...]) called with batches of
+       up to batch_size results, or whatever arrived within batch_interval
+
+    A path stays in flight until its results reach the sink, so a newer
+    event for it is not processed before the older one is stored.
+    """
+
+    def __init__(
+        self,
+        copy_fn: Callable[[Path, str], Any],
+        extract_fn: Optional[Callable[[Path], list]] = None,
+        sink_fn: Optional[Callable[[List[Tuple[Path, list]]], None]] = None,
+        copy_workers: int = 2,
+        llm_workers: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_queue_size: int = 1000,
+        debounce_seconds: float = 0.5,
+        batch_size: int = 20,
+        batch_interval: float = 2.0,
+        extract_many_fn: Optional[Callable[[List[Path]], List[list]]] = None,
+        pack_size: int = 1,
+    ):
+        """
+        Args:
+            copy_fn: Copy/metadata stage, called as copy_fn(path, event_type)
+            extract_fn: LLM extraction stage returning observations (optional)
+            sink_fn: Receives batches of (path, observations) tuples
+            copy_workers: Number of copy/metadata threads
+            llm_workers: Maximum concurrent LLM extractions
+            rate_limiter: Optional RateLimiter shared by LLM workers
+            max_queue_size: Capacity of the intake and each stage queue
+            debounce_seconds: Quiet period before a path is dispatched
+            batch_size: Maximum results per sink call
+            batch_interval: Maximum seconds a result waits for its batch
+            extract_many_fn: Extracts several files in one call, returning
+                             one observation list per path (optional)
+            pack_size: Maximum files handed to extract_many_fn at once
+        """
+        self.copy_fn = copy_fn
+        self.extract_fn = extract_fn
+        self.sink_fn = sink_fn
+        self.copy_workers = copy_workers
+        self.llm_workers = llm_workers
+        self.rate_limiter = rate_limiter
+        self.max_queue_size = max_queue_size
+        self.debounce_seconds = debounce_seconds
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.extract_many_fn = extract_many_fn
+        self.pack_size = max(1, pack_size)
+
+        # Intake: path -> item waiting for its quiet period
+        self._pending: Dict[Path, PipelineItem] = {}
+        self._in_flight: set = set()
+        self._cond = threading.Condition()
+
+        self._copy_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._llm_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._sink_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+
+        self._threads: List[threading.Thread] = []
+        self._accepting = False
+        self._running = False
+
+        # Statistics
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            'received': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'copied': 0,
+            'skipped': 0,
+            'extracted': 0,
+            'packed': 0,
+            'observations': 0,
+            'batches': 0,
+            'errors': 0,
+        }
+        self.max_depths: Dict[str, int] = {
+            'pending': 0, 'copy': 0, 'llm': 0, 'sink': 0,
+        }
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self) -> None:
+        """Start dispatcher, worker and sink threads"""
+        if self._running:
+            return
+        self._running = True
+        self._accepting = True
+
+        self._spawn("pipeline-dispatch", self._dispatch_loop)
+        for i in range(self.copy_workers):
+            self._spawn(f"pipeline-copy-{i}", self._copy_loop)
+        if self.extract_fn is not None:
+            for i in range(self.llm_workers):
+                self._spawn(f"pipeline-llm-{i}", self._llm_loop)
+        self._spawn("pipeline-sink", self._sink_loop)
+
+        logger.info(
+            f"Observation pipeline started "
+            f"(copy_workers={self.copy_workers}, "
+            f"llm_workers={self.llm_workers if self.extract_fn else 0})"
+        )
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop the pipeline.
+
+        Args:
+            drain: Process pending events before stopping
+            timeout: Maximum seconds to wait for draining
+        """
+        if not self._running:
+            return
+
+        with self._cond:
+            self._accepting = False
+            if drain:
+                now = time.monotonic()
+                for item in self._pending.values():
+                    item.due = now
+            else:
+                self._count('dropped', len(self._pending))
+                self._pending.clear()
+            self._cond.notify_all()
+
+        if drain and not self.wait_idle(timeout):
+            logger.warning("Pipeline did not drain before timeout")
+
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        for _ in range(self.copy_workers):
+            self._copy_queue.put(_STOP)
+        if self.extract_fn is not None:
+            for _ in range(self.llm_workers):
+                self._llm_queue.put(_STOP)
+        self._sink_queue.put(_STOP)
+
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads = []
+        logger.info(f"Observation pipeline stopped: {self.get_stats()}")
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every submitted event has been fully processed.
+
+        Returns:
+            True if idle, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                idle = not self._pending and not self._in_flight
+            if idle and self._sink_queue.unfinished_tasks == 0:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    # =========================================================================
+    # Intake
+    # =========================================================================
+
+    def submit(
+        self,
+        path: Path,
+        event_type: str = "modified",
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Submit a file change event.
+        Blocks while the intake is full (backpressure on the caller).
+
+        Args:
+            path: Changed file
+            event_type: 'created' or 'modified'
+            timeout: Maximum seconds to wait for intake space
+
+        Returns:
+            True if accepted (or coalesced), False if dropped
+        """
+        path = Path(path)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            self._count('received')
+            if not self._accepting:
+                self._count('dropped')
+                return False
+
+            existing = self._pending.get(path)
+            if existing is not None:
+                # A 'created' event stays 'created' when later modified
+                if existing.event_type != 'created':
+                    existing.event_type = event_type
+                existing.due = time.monotonic() + self.debounce_seconds
+                self._count('coalesced')
+                return True
+
+            while len(self._pending) >= self.max_queue_size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._count('dropped')
+                    logger.warning(f"Pipeline intake full, dropped event for {path}")
+                    return False
+                self._cond.wait(remaining)
+                if not self._accepting:
+                    self._count('dropped')
+                    return False
+
+            self._pending[path] = PipelineItem(
+                path=path,
+                event_type=event_type,
+                due=time.monotonic() + self.debounce_seconds,
+            )
+            self._track_depth('pending', len(self._pending))
+            self._cond.notify_all()
+            return True
+
+    def _dispatch_loop(self) -> None:
+        """Move settled events from intake to the copy queue"""
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+
+                now = time.monotonic()
+                ready = [
+                    item for path, item in self._pending.items()
+                    if item.due <= now and path not in self._in_flight
+                ]
+                if not ready:
+                    waiting = [
+                        item.due for path, item in self._pending.items()
+                        if path not in self._in_flight
+                    ]
+                    timeout = max(0.0, min(waiting) - now) if waiting else None
+                    # Re-check periodically for in-flight paths finishing
+                    self._cond.wait(min(timeout, 0.5) if timeout is not None else 0.5)
+                    continue
+
+                for item in ready:
+                    del self._pending[item.path]
+                    self._in_flight.add(item.path)
+                self._cond.notify_all()
+
+            for item in ready:
+                # Blocks while copy workers are saturated
+                self._copy_queue.put(item)
+                self._track_depth('copy', self._copy_queue.qsize())
+
+    # =========================================================================
+    # Stages
+    # =========================================================================
+
+    def _copy_loop(self) -> None:
+        while True:
+            item = self._copy_queue.get()
+            if item is _STOP:
+                return
+
+            try:
+                proceed = self.copy_fn(item.path, item.event_type)
+            except Exception as e:
+                logger.error(f"Copy stage failed for {item.path}: {e}")
+                self._count('errors')
+                proceed = False
+
+            if proceed:
+                self._count('copied')
+            else:
+                self._count('skipped')
+
+            if proceed and self.extract_fn is not None:
+                self._llm_queue.put(item)
+                self._track_depth('llm', self._llm_queue.qsize())
+            else:
+                self._finish(item)
+
+    def _llm_loop(self) -> None:
+        while True:
+            item = self._llm_queue.get()
+            if item is _STOP:
+                return
+
+            # Pack whatever else is already queued, without waiting for it
+            items = [item]
+            stopping = False
+            if self.extract_many_fn is not None:
+                while len(items) < self.pack_size:
+                    try:
+                        extra = self._llm_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if extra is _STOP:
+                        stopping = True
+                        break
+                    items.append(extra)
+
+            self._extract(items)
+            if stopping:
+                return
+
+    def _extract(self, items: List[PipelineItem]) -> None:
+        """Run the extraction stage for one file or a pack of files"""
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            if len(items) == 1:
+                items[0].observations = self.extract_fn(items[0].path) or []
+            else:
+                results = self.extract_many_fn([item.path for item in items])
+                for item, observations in zip(items, results):
+                    item.observations = observations or []
+                self._count('packed', len(items))
+            self._count('extracted', len(items))
+        except Exception as e:
+            paths = ", ".join(str(item.path) for item in items)
+            logger.error(f"Extraction stage failed for {paths}: {e}")
+            self._count('errors')
+            for item in items:
+                item.observations = []
+
+        for item in items:
+            if item.observations:
+                # Released by _flush_batch once stored
+                self._sink_queue.put(item)
+                self._track_depth('sink', self._sink_queue.qsize())
+            else:
+                self._finish(item)
+
+    def _sink_loop(self) -> None:
+        """Collect extraction results and hand them to sink_fn in batches"""
+        stopping = False
+        while not stopping:
+            batch: List[PipelineItem] = []
+            try:
+                item = self._sink_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                self._sink_queue.task_done()
+                return
+            batch.append(item)
+
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._sink_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._sink_queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush_batch(batch)
+
+    def _flush_batch(self, batch: List[PipelineItem]) -> None:
+        try:
+            if self.sink_fn is not None:
+                self.sink_fn([(item.path, item.observations) for item in batch])
+            with self._stats_lock:
+                self.stats['batches'] += 1
+                self.stats['observations'] += sum(len(item.observations) for item in batch)
+        except Exception as e:
+            logger.error(f"Sink stage failed for batch of {len(batch)}: {e}")
+            self._count('errors')
+        finally:
+            for item in batch:
+                self._finish(item)
+                self._sink_queue.task_done()
+
+    # =========================================================================
+    # Helpers
+    # =========================================================================
+
+    def _spawn(self, name: str, target: Callable) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _finish(self, item: PipelineItem) -> None:
+        """Release a path so newer events for it can be dispatched"""
+        with self._cond:
+            self._in_flight.discard(item.path)
+            self._cond.notify_all()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _track_depth(self, stage: str, depth: int) -> None:
+        if depth > self.max_depths[stage]:
+            self.max_depths[stage] = depth
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters and current/peak queue depths"""
+        with self._cond:
+            pending = len(self._pending)
+            in_flight = len(self._in_flight)
+
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        stats['queue_depths'] = {
+            'pending': pending,
+            'copy': self._copy_queue.qsize(),
+            'llm': self._llm_queue.qsize(),
+            'sink': self._sink_queue.qsize(),
+        }
+        stats['max_queue_depths'] = dict(self.max_depths)
+        stats['in_flight'] = in_flight
+        if self.rate_limiter is not None:
+            stats['rate_limiter'] = self.rate_limiter.get_stats()
+        return stats
+
+
+# =============================================================================
+# Factory
+# =============================================================================
+
+def create_pipeline(
+    config: Dict[str, Any],
+    copy_fn: Callable[[Path, str], Any],
+    extract_fn: Optional[Callable[[Path], list]] = None,
+    sink_fn: Optional[Callable[[List[Tuple[Path, list]]], None]] = None,
+    extract_many_fn: Optional[Callable[[List[Path]], List[list]]] = None,
+    limit_rate: bool = True,
+) -> ObservationPipeline:
+    """
+    Create an ObservationPipeline from config dictionary.
+
+    Pass limit_rate=False when the extraction functions already go
+    through a rate-limited LLMRetryPolicy, so calls are not throttled twice.
+    """
+    pipeline_config = config.get('pipeline', {})
+
+    rate_limiter = None
+    if extract_fn is not None and limit_rate:
+        rate_limiter = create_rate_limiter(config)
+
+    return ObservationPipeline(
+        copy_fn=copy_fn,
+        extract_fn=extract_fn,
+        sink_fn=sink_fn,
+        copy_workers=pipeline_config.get('copy_workers', 2),
+        llm_workers=pipeline_config.get('llm_workers', 4),
+        rate_limiter=rate_limiter,
+        max_queue_size=pipeline_config.get('max_queue_size', 1000),
+        debounce_seconds=pipeline_config.get('debounce_seconds', 0.0),
+        batch_size=pipeline_config.get('batch_size', 20),
+        batch_interval=pipeline_config.get('batch_interval', 2.0),
+        extract_many_fn=extract_many_fn,
+        pack_size=pipeline_config.get('pack_files', 8),
+    )
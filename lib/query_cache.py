@@ -0,0 +1,177 @@
+"""
+Query Cache for OC-Memory
+LRU + TTL cache of search results with per-tier invalidation
+
+Agents tend to repeat the same memory queries within a session. The
+cache keeps recent results keyed by the full query. Each tier has a
+generation counter that the tier's data source bumps on every write;
+an entry remembers the generations of the tiers it covers and is
+discarded as soon as any of them moved on. The TTL bounds staleness
+for changes made outside OC-Memory (e.g. notes edited by hand).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Change notification
+# =============================================================================
+
+class ChangeNotifier:
+    """
+    Mixin for data sources whose writes should invalidate cached reads.
+
+    Listeners are zero-argument callables run synchronously after each
+    change; their errors are logged and never reach the writer.
+    """
+
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """Call callback after every change"""
+        self.__dict__.setdefault('_change_listeners', []).append(callback)
+
+    def _notify_change(self) -> None:
+        for callback in list(self.__dict__.get('_change_listeners', ())):
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Change listener failed: {e}")
+
+
+# =============================================================================
+# Query Cache
+# =============================================================================
+
+class QueryCache:
+    """
+    Thread-safe LRU cache with a TTL and per-tier generations.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        """
+        Args:
+            max_entries: Maximum cached queries (least recently used evicted)
+            ttl: Seconds an entry stays valid (0 = no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[int, ...], Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations: Dict[str, int] = {}
+
+    def snapshot(self, tiers: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Current generations of the given tiers.
+
+        Take the snapshot before running a search and pass it to put(),
+        so a write that lands mid-search leaves the entry stale.
+        """
+        with self._lock:
+            return tuple(self._generations.get(tier, 0) for tier in tiers)
+
+    def get(self, key: Hashable, tiers: Iterable[str]) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+            tiers: Tiers the cached value depends on (same order as in put)
+
+        Returns:
+            Cached value, or None on miss, expiry or invalidation
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, generations, value = entry
+            if expires and time.monotonic() >= expires:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            if generations != tuple(self._generations.get(tier, 0) for tier in tiers):
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, generations: Tuple[int, ...]) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            generations: snapshot() of the tiers taken before computing value
+        """
+        if self.max_entries <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._entries[key] = (expires, generations, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tier: Optional[str] = None) -> None:
+        """
+        Invalidate every entry depending on a tier.
+
+        Args:
+            tier: Tier that changed ('hot', 'warm', 'cold'); all if None
+        """
+        with self._lock:
+            if tier is None:
+                self._entries.clear()
+                tiers: List[str] = list(self._generations)
+            else:
+                tiers = [tier]
+            for name in tiers:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                self.invalidations[name] = self.invalidations.get(name, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'expired': self.expired,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'invalidations': dict(self.invalidations),
+            }
@@ -0,0 +1,116 @@
+"""
+Rank Fusion for OC-Memory
+Merges ranked lists whose scores are not comparable
+
+Each memory tier scores on its own scale (cosine distance, BM25,
+constant cold scores). Reciprocal rank fusion (RRF) ignores the raw
+scores and combines positions only: a result earns weight / (k + rank)
+from every list it appears in. A lightweight BM25 pass over the hot
+candidates supplies a lexical ranking to fuse with the vector one.
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+from lib.warm_index import tokenize
+
+T = TypeVar('T')
+
+# Standard RRF damping constant (Cormack et al.); larger values flatten
+# the advantage of top ranks
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, Sequence[T]],
+    key: Callable[[T], Hashable],
+    n_results: int = 10,
+    k: int = DEFAULT_RRF_K,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Tuple[T, float, Dict[str, int]]]:
+    """
+    Fuse several ranked lists with reciprocal rank fusion.
+
+    Scores are accumulated per key and only the top n_results are
+    selected with a heap, so the full fused ordering is never sorted.
+
+    Args:
+        ranked_lists: Mapping of list name to items, best first
+        key: Identity of an item across lists (same key = same result)
+        n_results: Number of fused results to return
+        k: RRF damping constant
+        weights: Optional per-list weight (default 1.0)
+
+    Returns:
+        List of (item, fused score, {list name: 1-based rank}),
+        best first. The item is the first occurrence seen.
+    """
+    if n_results <= 0:
+        return []
+
+    weights = weights or {}
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, T] = {}
+    ranks: Dict[Hashable, Dict[str, int]] = {}
+
+    for name, ranked in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        for rank, item in enumerate(ranked, start=1):
+            item_key = key(item)
+            scores[item_key] = scores.get(item_key, 0.0) + weight / (k + rank)
+            items.setdefault(item_key, item)
+            ranks.setdefault(item_key, {})[name] = rank
+
+    top = heapq.nlargest(n_results, scores.items(), key=lambda entry: entry[1])
+    return [(items[item_key], score, ranks[item_key]) for item_key, score in top]
+
+
+def bm25_rank(
+    query: str,
+    documents: Sequence[str],
+    n_results: int = 10,
+    k1: float = 1.5,
+    b: float = 0.75,
+) -> List[Tuple[int, float]]:
+    """
+    Rank a small candidate set with BM25.
+
+    Collection statistics (document frequency, average length) come from
+    the candidates themselves, which is enough to order them lexically.
+
+    Args:
+        query: Search query string
+        documents: Candidate texts
+        n_results: Maximum number of documents to return
+        k1: BM25 term frequency saturation
+        b: BM25 length normalization
+
+    Returns:
+        List of (document index, score) for documents matching at least
+        one query term, best first
+    """
+    terms = set(tokenize(query))
+    if not terms or not documents or n_results <= 0:
+        return []
+
+    term_counts = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+    total_docs = len(documents)
+
+    scores: Dict[int, float] = {}
+    for term in terms:
+        doc_freq = sum(1 for counts in term_counts if term in counts)
+        if not doc_freq:
+            continue
+        idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        for index, counts in enumerate(term_counts):
+            tf = counts.get(term)
+            if not tf:
+                continue
+            norm = k1 * (1 - b + b * lengths[index] / avg_length)
+            scores[index] = scores.get(index, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+    return heapq.nlargest(n_results, scores.items(), key=lambda entry: entry[1])
@@ -13,6 +13,12 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+from lib.error_handler import LLMRetryPolicy
+from lib.llm_cache import LLMResponseCache, create_llm_cache, prompt_version
+from lib.llm_clients import (
+    DEFAULT_MAX_CONCURRENCY, LLMClientRegistry, LoopSemaphore, get_client_registry
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +63,9 @@ Return compressed observations as a markdown list:
 - [priority_emoji] [category]: compressed observation
 """
 
+# Cache key component: edits to the prompt invalidate cached responses
+REFLECTOR_PROMPT_VERSION = prompt_version(REFLECTOR_SYSTEM_PROMPT)
+
 
 # =============================================================================
 # Reflector Agent
@@ -74,10 +83,20 @@ class Reflector:
         model: Optional[str] = None,
         api_key: Optional[str] = None,
         api_key_env: str = "OPENAI_API_KEY",
+        base_url: Optional[str] = None,
+        clients: Optional[LLMClientRegistry] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[LLMResponseCache] = None,
+        retry_policy: Optional[LLMRetryPolicy] = None,
     ):
         self.provider = provider
         self.model = model or self._default_model(provider)
         self.api_key = api_key or os.environ.get(api_key_env, "")
+        self.base_url = base_url
+        self.clients = clients or get_client_registry()
+        self._semaphore = LoopSemaphore(max_concurrency)
+        self.cache = cache
+        self.retry_policy = retry_policy
         self.history: List[ReflectionResult] = []
 
     @staticmethod
@@ -104,50 +123,80 @@ class Reflector:
             ReflectionResult with compressed content
         """
         level = max(1, min(3, level))
-        original_tokens = self._estimate_tokens(observations_text)
 
         if not self.api_key:
             logger.error("Cannot reflect: no API key configured")
-            return ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=original_tokens,
-                compression_ratio=1.0,
-                compressed_content=observations_text,
-                level=level,
-                timestamp=datetime.now(),
-            )
+            return self._unchanged_result(observations_text, level)
 
         try:
-            compressed = self._call_llm(observations_text, level)
-            compressed_tokens = self._estimate_tokens(compressed)
-            ratio = original_tokens / max(compressed_tokens, 1)
-
-            result = ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=compressed_tokens,
-                compression_ratio=round(ratio, 1),
-                compressed_content=compressed,
-                level=level,
-                timestamp=datetime.now(),
-            )
+            compressed = self._call_llm_cached(observations_text, level)
+            return self._record_result(observations_text, compressed, level)
+        except Exception as e:
+            logger.error(f"Reflection failed: {e}")
+            return self._unchanged_result(observations_text, level)
 
-            self.history.append(result)
-            logger.info(
-                f"Compression: {original_tokens} -> {compressed_tokens} tokens "
-                f"({ratio:.1f}x at level {level})"
-            )
-            return result
+    async def reflect_async(
+        self,
+        observations_text: str,
+        level: int = 1,
+    ) -> ReflectionResult:
+        """
+        Async version of reflect(), bounded by max_concurrency.
+
+        Args:
+            observations_text: Raw observations markdown text
+            level: Compression level (1=light, 2=medium, 3=heavy)
+
+        Returns:
+            ReflectionResult with compressed content
+        """
+        level = max(1, min(3, level))
 
+        if not self.api_key:
+            logger.error("Cannot reflect: no API key configured")
+            return self._unchanged_result(observations_text, level)
+
+        try:
+            async with self._semaphore:
+                compressed = await self._call_llm_cached_async(observations_text, level)
+            return self._record_result(observations_text, compressed, level)
         except Exception as e:
             logger.error(f"Reflection failed: {e}")
-            return ReflectionResult(
-                original_tokens=original_tokens,
-                compressed_tokens=original_tokens,
-                compression_ratio=1.0,
-                compressed_content=observations_text,
-                level=level,
-                timestamp=datetime.now(),
-            )
+            return self._unchanged_result(observations_text, level)
+
+    def _record_result(self, observations_text: str, compressed: str, level: int) -> ReflectionResult:
+        """Build a ReflectionResult for a successful compression and record it"""
+        original_tokens = self._estimate_tokens(observations_text)
+        compressed_tokens = self._estimate_tokens(compressed)
+        ratio = original_tokens / max(compressed_tokens, 1)
+
+        result = ReflectionResult(
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            compression_ratio=round(ratio, 1),
+            compressed_content=compressed,
+            level=level,
+            timestamp=datetime.now(),
+        )
+
+        self.history.append(result)
+        logger.info(
+            f"Compression: {original_tokens} -> {compressed_tokens} tokens "
+            f"({ratio:.1f}x at level {level})"
+        )
+        return result
+
+    def _unchanged_result(self, observations_text: str, level: int) -> ReflectionResult:
+        """ReflectionResult returning the input as-is (no compression)"""
+        original_tokens = self._estimate_tokens(observations_text)
+        return ReflectionResult(
+            original_tokens=original_tokens,
+            compressed_tokens=original_tokens,
+            compression_ratio=1.0,
+            compressed_content=observations_text,
+            level=level,
+            timestamp=datetime.now(),
+        )
 
     def should_reflect(self, token_count: int, threshold: int = 40000) -> bool:
         """Check if compression is needed based on token count"""
@@ -185,14 +234,63 @@ class Reflector:
             'average_ratio': round(avg_ratio, 1),
         }
 
-    def _call_llm(self, text: str, level: int) -> str:
-        """Call LLM for compression"""
-        prompt = (
+    @staticmethod
+    def _build_prompt(text: str, level: int) -> str:
+        return (
             f"{REFLECTOR_SYSTEM_PROMPT}\n\n"
             f"Compression Level: {level}\n\n"
             f"Compress these observations:\n\n{text}"
         )
 
+    def _cache_key(self, text: str, level: int) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            self.provider, self.model, REFLECTOR_PROMPT_VERSION, f"level={level}\n{text}"
+        )
+
+    def _call_llm_cached(self, text: str, level: int) -> str:
+        """Call the LLM, answering from the response cache when possible"""
+        key = self._cache_key(text, level)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.retry_policy is not None:
+            compressed = self.retry_policy.call_with_retry(
+                self._call_llm, text, level, tokens=self._estimate_tokens(text)
+            )
+        else:
+            compressed = self._call_llm(text, level)
+        # Never cache an empty compression: it would be replayed forever
+        if key is not None and compressed and compressed.strip():
+            self.cache.put(key, compressed)
+        return compressed
+
+    async def _call_llm_cached_async(self, text: str, level: int) -> str:
+        """Async version of _call_llm_cached()"""
+        key = self._cache_key(text, level)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.retry_policy is not None:
+            compressed = await self.retry_policy.call_with_retry_async(
+                self._call_llm_async, text, level, tokens=self._estimate_tokens(text)
+            )
+        else:
+            compressed = await self._call_llm_async(text, level)
+        # Never cache an empty compression: it would be replayed forever
+        if key is not None and compressed and compressed.strip():
+            self.cache.put(key, compressed)
+        return compressed
+
+    def _call_llm(self, text: str, level: int) -> str:
+        """Call LLM for compression"""
+        prompt = self._build_prompt(text, level)
+
         if self.provider == "openai":
             return self._call_openai(prompt)
         elif self.provider == "google":
@@ -200,24 +298,39 @@ class Reflector:
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _call_openai(self, prompt: str) -> str:
-        from openai import OpenAI
-        client = OpenAI(api_key=self.api_key)
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=[
+    async def _call_llm_async(self, text: str, level: int) -> str:
+        """Async version of _call_llm()"""
+        prompt = self._build_prompt(text, level)
+
+        if self.provider == "openai":
+            client = self.clients.get_async_openai(self.api_key, self.base_url)
+            response = await client.chat.completions.create(**self._openai_request(prompt))
+            return response.choices[0].message.content or ""
+        elif self.provider == "google":
+            model = self.clients.get_google_model(self.api_key, self.model)
+            response = await model.generate_content_async(prompt)
+            return response.text
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+    def _openai_request(self, prompt: str) -> Dict[str, Any]:
+        return {
+            'model': self.model,
+            'messages': [
                 {"role": "system", "content": "You are a memory compression agent."},
                 {"role": "user", "content": prompt},
             ],
-            temperature=0.1,
-            max_tokens=4000,
-        )
+            'temperature': 0.1,
+            'max_tokens': 4000,
+        }
+
+    def _call_openai(self, prompt: str) -> str:
+        client = self.clients.get_openai(self.api_key, self.base_url)
+        response = client.chat.completions.create(**self._openai_request(prompt))
         return response.choices[0].message.content or ""
 
     def _call_google(self, prompt: str) -> str:
-        import google.generativeai as genai
-        genai.configure(api_key=self.api_key)
-        model = genai.GenerativeModel(self.model)
+        model = self.clients.get_google_model(self.api_key, self.model)
         response = model.generate_content(prompt)
         return response.text
 
@@ -229,11 +342,18 @@ class Reflector:
         return int(len(text.split()) * 1.3)
 
 
-def create_reflector(config: Dict[str, Any]) -> Reflector:
+def create_reflector(
+    config: Dict[str, Any],
+    retry_policy: Optional[LLMRetryPolicy] = None,
+) -> Reflector:
     """Create a Reflector from config dictionary"""
     llm_config = config.get('llm', {})
     return Reflector(
         provider=llm_config.get('provider', 'openai'),
         model=llm_config.get('model'),
         api_key_env=llm_config.get('api_key_env', 'OPENAI_API_KEY'),
+        base_url=llm_config.get('base_url'),
+        max_concurrency=llm_config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+        cache=create_llm_cache(config),
+        retry_policy=retry_policy,
     )
@@ -0,0 +1,241 @@
+"""
+Text Scanning for OC-Memory
+Case-insensitive match and snippet extraction over raw file bytes
+
+Warm and cold search only need the first match of a query and some
+context around it. Lower-casing the decoded file to find it costs
+several full copies of every file per query. Here files are
+memory-mapped (small files are read as bytes) and scanned without
+decoding. Queries made of ASCII or caseless characters (e.g. Hangul)
+are found with bytes.lower() + find over fixed-size chunks, which is
+several times faster than an IGNORECASE regex; other queries use a
+compiled case-insensitive bytes regex. Only the bytes around the match
+are decoded.
+"""
+
+import mmap
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+# Files below this size are read into memory; mapping them costs more
+# than it saves
+MMAP_THRESHOLD = 64 * 1024
+
+# Bytes lower-cased at a time by the chunked scan
+CHUNK_SIZE = 1024 * 1024
+
+# A UTF-8 character is at most 4 bytes, so 4 bytes per character of
+# context always cover enough text to cut from
+_MAX_CHAR_BYTES = 4
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+@dataclass
+class SnippetMatch:
+    """First match of a query in a text buffer"""
+    offset: int  # byte offset of the match
+    snippet: str
+
+
+class QueryMatcher:
+    """Case-insensitive literal matcher over UTF-8 bytes"""
+
+    def __init__(self, query: str):
+        self.query = query
+        self._needle: Optional[bytes] = None
+        self._pattern = None
+
+        if all(char.isascii() or len({char, char.lower(), char.upper()}) == 1 for char in query):
+            # bytes.lower() folds exactly the ASCII letters, and UTF-8
+            # multi-byte sequences never contain ASCII bytes
+            self._needle = query.encode("utf-8").lower()
+            return
+
+        # re.IGNORECASE only folds ASCII on bytes patterns, so cased
+        # non-ASCII characters become an alternation of their encodings
+        parts = []
+        for char in query:
+            variants = {char, char.lower(), char.upper()}
+            if char.isascii() or len(variants) == 1:
+                parts.append(re.escape(char.encode("utf-8")))
+            else:
+                parts.append(
+                    b"(?:" + b"|".join(re.escape(v.encode("utf-8")) for v in sorted(variants)) + b")"
+                )
+        self._pattern = re.compile(b"".join(parts), re.IGNORECASE)
+
+    def search(self, data: Buffer, chunk_size: int = CHUNK_SIZE) -> Optional[Tuple[int, int]]:
+        """
+        Find the first match.
+
+        Returns:
+            (start, end) byte offsets, or None if there is no match
+        """
+        if self._pattern is not None:
+            match = self._pattern.search(data)
+            return match.span() if match is not None else None
+
+        length = len(self._needle)
+        for offset in range(0, max(1, len(data)), chunk_size):
+            # Overlap chunks so a match across a boundary is not missed
+            index = data[offset:offset + chunk_size + length - 1].lower().find(self._needle)
+            if index != -1:
+                return offset + index, offset + index + length
+        return None
+
+    def count(self, data: Buffer, chunk_size: int = CHUNK_SIZE) -> int:
+        """Number of non-overlapping matches"""
+        if self._pattern is not None:
+            return sum(1 for _ in self._pattern.finditer(data))
+
+        length = len(self._needle)
+        if not length:
+            return 0
+        # A match counted in a chunk always starts before the overlap,
+        # so none is counted twice
+        return sum(
+            data[offset:offset + chunk_size + length - 1].lower().count(self._needle)
+            for offset in range(0, len(data), chunk_size)
+        )
+
+
+class RegexMatcher:
+    """Case-insensitive regular expression matcher over UTF-8 bytes"""
+
+    def __init__(self, pattern: str):
+        """
+        Raises:
+            re.error: If pattern is not a valid regular expression
+        """
+        self.query = pattern
+        self._pattern = re.compile(pattern.encode("utf-8"), re.IGNORECASE)
+
+    def search(self, data: Buffer) -> Optional[Tuple[int, int]]:
+        match = self._pattern.search(data)
+        return match.span() if match is not None else None
+
+    def count(self, data: Buffer) -> int:
+        return sum(1 for match in self._pattern.finditer(data) if match.end() > match.start())
+
+
+Matcher = Union[QueryMatcher, RegexMatcher]
+
+
+@lru_cache(maxsize=512)
+def compile_query(query: str) -> QueryMatcher:
+    """Build (and cache) the matcher for a query"""
+    return QueryMatcher(query)
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(pattern: str) -> RegexMatcher:
+    """Build (and cache) the matcher for a regular expression"""
+    return RegexMatcher(pattern)
+
+
+@contextmanager
+def mapped_file(path: Path, mmap_threshold: int = MMAP_THRESHOLD) -> Iterator[Buffer]:
+    """
+    Open a file as a read-only bytes buffer.
+
+    Files of at least mmap_threshold bytes are memory-mapped; smaller
+    (and empty, which cannot be mapped) files are read.
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < max(1, mmap_threshold):
+            f.seek(0)
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def find_snippet(
+    data: Buffer,
+    query: Union[str, Matcher],
+    context_chars: int = 150,
+) -> Optional[SnippetMatch]:
+    """
+    Find the first case-insensitive match and cut a snippet around it.
+
+    Args:
+        data: UTF-8 encoded text (bytes or mmap)
+        query: Query string or a matcher from compile_query()/compile_pattern()
+        context_chars: Characters of context on each side of the match
+
+    Returns:
+        SnippetMatch, or None if the query does not occur
+    """
+    matcher = compile_query(query) if isinstance(query, str) else query
+    span = matcher.search(data)
+    if span is None:
+        return None
+
+    start, end = span
+    window = context_chars * _MAX_CHAR_BYTES
+    low = max(0, start - window)
+    high = min(len(data), end + window)
+
+    before = _decode(data[low:start])
+    after = _decode(data[end:high])
+    more_before = low > 0 or len(before) > context_chars
+    more_after = high < len(data) or len(after) > context_chars
+
+    before = before[-context_chars:] if context_chars else ""
+    snippet = (before + _decode(data[start:end]) + after[:context_chars]).strip()
+    if more_before:
+        snippet = "..." + snippet
+    if more_after:
+        snippet = snippet + "..."
+
+    return SnippetMatch(offset=start, snippet=snippet)
+
+
+def head_snippet(data: Buffer, max_chars: int) -> str:
+    """First max_chars characters of the buffer"""
+    return _decode(data[:max_chars * _MAX_CHAR_BYTES])[:max_chars]
+
+
+def scan_file(path: Path, query: str, context_chars: int = 150) -> Optional[SnippetMatch]:
+    """
+    Search one file for query without decoding it.
+
+    Raises:
+        OSError: If the file cannot be opened
+    """
+    with mapped_file(path) as data:
+        return find_snippet(data, query, context_chars)
+
+
+def extract_snippet(content: str, query: str, context_chars: int = 150, fallback_chars: int = 300) -> str:
+    """
+    Snippet around the first case-insensitive match in a decoded string.
+
+    Uses a case-insensitive regex, so no lower-cased copy of the content
+    is built. Falls back to the first fallback_chars characters.
+    """
+    match = re.search(re.escape(query), content, re.IGNORECASE)
+    if match is None:
+        return content[:fallback_chars]
+
+    start = max(0, match.start() - context_chars)
+    end = min(len(content), match.end() + context_chars)
+
+    snippet = content[start:end].strip()
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(content):
+        snippet = snippet + "..."
+
+    return snippet
+
+
+def _decode(raw: bytes) -> str:
+    # Window edges may split a multi-byte character
+    return raw.decode("utf-8", errors="ignore")
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from lib.warm_index import WarmIndex, create_warm_index, warm_archive_dir
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +55,7 @@ class TTLManager:
         archive_dir: Optional[str] = None,
         hot_ttl_days: int = 90,
         warm_ttl_days: int = 365,
+        warm_index: Optional[WarmIndex] = None,
     ):
         """
         Args:
@@ -60,6 +63,7 @@ class TTLManager:
             archive_dir: Warm archive directory
             hot_ttl_days: Days before Hot -> Warm transition
             warm_ttl_days: Days before Warm -> Cold transition
+            warm_index: Optional WarmIndex updated as files move in/out of Warm
         """
         self.memory_dir = Path(memory_dir).expanduser().resolve()
         self.archive_dir = Path(
@@ -67,6 +71,7 @@ class TTLManager:
         ).expanduser().resolve()
         self.hot_ttl_days = hot_ttl_days
         self.warm_ttl_days = warm_ttl_days
+        self.warm_index = warm_index
 
         # Ensure directories exist
         self.memory_dir.mkdir(parents=True, exist_ok=True)
@@ -156,6 +161,13 @@ class TTLManager:
 
         shutil.move(str(file_path), str(target_file))
         logger.info(f"Archived to Warm: {file_path.name} -> {target_file}")
+
+        if self.warm_index is not None:
+            try:
+                self.warm_index.add_document(target_file)
+            except Exception as e:
+                logger.warning(f"Failed to index {target_file}: {e}")
+
         return target_file
 
     def archive_to_cold(
@@ -191,6 +203,13 @@ class TTLManager:
 
         shutil.move(str(file_path), str(target_file))
         logger.info(f"Archived to Cold: {file_path.name} -> {target_file}")
+
+        if self.warm_index is not None:
+            try:
+                self.warm_index.remove_document(file_path)
+            except Exception as e:
+                logger.warning(f"Failed to unindex {file_path}: {e}")
+
         return target_file
 
     def get_cold_candidates(self) -> List[Path]:
@@ -242,5 +261,8 @@ def create_ttl_manager(config: Dict[str, Any]) -> TTLManager:
 
     return TTLManager(
         memory_dir=memory_config.get('dir', '~/.openclaw/workspace/memory'),
+        archive_dir=str(warm_archive_dir(config)),
         hot_ttl_days=hot_memory_config.get('ttl_days', 90),
+        # Shared with UnifiedSearch built from the same config
+        warm_index=create_warm_index(config),
     )
@@ -6,11 +6,23 @@ Aggregates results from ChromaDB (Hot), Markdown archives (Warm),
 and Obsidian/Dropbox (Cold) into a ranked result set.
 """
 
+import copy
 import logging
 import re
+import sqlite3
+import threading
+import time
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from lib.parallel_scan import ScanEngine, ScanHit, create_scan_engine, scan_files
+from lib.query_cache import QueryCache
+from lib.ranking import DEFAULT_RRF_K, bm25_rank, reciprocal_rank_fusion
+from lib.text_scan import Buffer, extract_snippet, find_snippet, head_snippet, mapped_file
+from lib.warm_index import WarmIndex, create_warm_index, warm_archive_dir
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +64,22 @@ class SearchResult:
         return f"SearchResult(title='{self.title}', tier='{self.tier}', score={self.score:.3f})"
 
 
+class SearchResults(list):
+    """
+    Ranked list of SearchResult objects.
+    Also records which tiers missed their deadline in parallel mode.
+    """
+
+    def __init__(self, results=(), timed_out_tiers: Optional[List[str]] = None):
+        super().__init__(results)
+        self.timed_out_tiers = timed_out_tiers or []
+
+    @property
+    def is_partial(self) -> bool:
+        """True if at least one tier timed out"""
+        return bool(self.timed_out_tiers)
+
+
 # =============================================================================
 # Unified Search Engine
 # =============================================================================
@@ -60,16 +88,57 @@ class UnifiedSearch:
     """
     Searches across all memory tiers:
     1. Hot: ChromaDB semantic search
-    2. Warm: Markdown file grep
+    2. Warm: BM25 over the archive inverted index
     3. Cold: Obsidian vault search
+
+    In parallel mode the tiers are queried concurrently on a thread pool,
+    each with its own deadline; tiers that miss it are left out of the
+    results and reported in SearchResults.timed_out_tiers.
+
+    Tier scores live on different scales, so by default results are
+    merged with reciprocal rank fusion ('rrf'): each tier contributes by
+    rank only, and hot candidates are additionally ranked with BM25 so
+    exact keyword matches can lift semantic hits. 'score' keeps the raw
+    per-tier scores and sorts on them.
+
+    Complete results are kept in a QueryCache. The cache subscribes to
+    the data sources' change notifications, so a write to a tier (store
+    upsert, archive move, new note, Dropbox upload) invalidates exactly
+    the cached queries that searched that tier.
+
+    Regular expression queries (regex=True) cannot use the warm index or
+    ChromaDB; they scan the archive and the vault, across processes when
+    a ScanEngine is configured. The same scan serves warm queries when
+    the warm index is unavailable.
     """
 
+    FUSION_METHODS = ('rrf', 'score')
+
+    # Seconds each tier may take in parallel mode ('cold:dropbox' etc.
+    # override the 'cold' entry for a single cold source)
+    DEFAULT_TIER_TIMEOUTS = {
+        'hot': 2.0,
+        'warm': 2.0,
+        'cold': 5.0,
+    }
+
     def __init__(
         self,
         memory_store=None,
         archive_dir: Optional[str] = None,
         obsidian_client=None,
         dropbox_sync=None,
+        warm_index: Optional[WarmIndex] = None,
+        parallel: bool = False,
+        tier_timeouts: Optional[Dict[str, float]] = None,
+        max_workers: int = 4,
+        fusion: str = 'rrf',
+        rrf_k: int = DEFAULT_RRF_K,
+        hot_lexical: bool = True,
+        hot_candidates: int = 3,
+        cache_size: int = 256,
+        cache_ttl: float = 300.0,
+        scan_engine: Optional[ScanEngine] = None,
     ):
         """
         Args:
@@ -77,11 +146,53 @@ class UnifiedSearch:
             archive_dir: Warm archive directory path
             obsidian_client: ObsidianClient instance (Cold tier)
             dropbox_sync: DropboxSync instance (Cold tier, optional)
+            warm_index: WarmIndex over archive_dir (created lazily if None)
+            parallel: Query tiers concurrently by default
+            tier_timeouts: Per-tier deadlines in seconds for parallel mode
+            max_workers: Thread pool size for parallel mode
+            fusion: How tier results are merged ('rrf' or 'score')
+            rrf_k: Reciprocal rank fusion damping constant
+            hot_lexical: Add a BM25 ranking of hot candidates (rrf only)
+            hot_candidates: Hot candidates fetched per requested result
+                for the lexical pass
+            cache_size: Cached queries (0 disables the query cache)
+            cache_ttl: Seconds a cached result stays valid
+            scan_engine: Multi-process scanner for archive scans (in-process if None)
         """
+        if fusion not in self.FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+
         self.memory_store = memory_store
         self.archive_dir = Path(archive_dir).expanduser().resolve() if archive_dir else None
         self.obsidian_client = obsidian_client
         self.dropbox_sync = dropbox_sync
+        self.warm_index = warm_index
+        self._warm_index_synced = False
+        self.scan_engine = scan_engine
+
+        self.parallel = parallel
+        self.tier_timeouts = dict(self.DEFAULT_TIER_TIMEOUTS)
+        self.tier_timeouts.update(tier_timeouts or {})
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Tasks still running after their deadline, by task name
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+        self.timeout_counts: Dict[str, int] = {}
+        self.busy_counts: Dict[str, int] = {}
+
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.hot_lexical = hot_lexical
+        self.hot_candidates = max(1, hot_candidates)
+
+        self.cache: Optional[QueryCache] = (
+            QueryCache(max_entries=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+        )
+        self._watch(memory_store, 'hot')
+        self._watch(warm_index, 'warm')
+        self._watch(obsidian_client, 'cold')
+        self._watch(dropbox_sync, 'cold')
 
     def search(
         self,
@@ -89,7 +200,9 @@ class UnifiedSearch:
         tiers: Optional[List[str]] = None,
         n_results: int = 10,
         priority: Optional[str] = None,
-    ) -> List[SearchResult]:
+        parallel: Optional[bool] = None,
+        regex: bool = False,
+    ) -> SearchResults:
         """
         Search across specified memory tiers.
 
@@ -98,36 +211,228 @@ class UnifiedSearch:
             tiers: List of tiers to search ('hot', 'warm', 'cold'); all if None
             n_results: Maximum results per tier
             priority: Filter by priority ('high', 'medium', 'low')
+            parallel: Query tiers concurrently (defaults to self.parallel)
+            regex: Treat query as a case-insensitive regular expression
+                (scans warm archives and the Obsidian vault only)
 
         Returns:
-            List of SearchResult objects, ranked by score
+            SearchResults (list of SearchResult objects), ranked by score
+            (the fused RRF score when fusion is 'rrf')
         """
         if tiers is None:
             tiers = ['hot', 'warm', 'cold']
+        if parallel is None:
+            parallel = self.parallel
 
-        all_results = []
+        key = self._cache_key(query, tiers, n_results, priority, regex)
+        if self.cache is not None:
+            cached = self.cache.get(key, tiers)
+            if cached is not None:
+                return self._copy_results(cached)
+            generations = self.cache.snapshot(tiers)
 
-        for tier in tiers:
-            try:
-                if tier == 'hot':
-                    results = self._search_hot(query, n_results, priority)
-                elif tier == 'warm':
-                    results = self._search_warm(query, n_results)
-                elif tier == 'cold':
-                    results = self._search_cold(query, n_results)
+        if regex:
+            tasks = self._scan_tasks(query, tiers, n_results)
+        else:
+            tasks = self._tier_tasks(query, tiers, n_results, priority)
+        if parallel and len(tasks) > 1:
+            task_results, timed_out = self._run_parallel(tasks)
+        else:
+            task_results, timed_out = self._run_sequential(tasks), []
+
+        results = self._merge_results(
+            query, [name for name, _ in tasks], task_results, n_results, timed_out
+        )
+        if self.cache is not None and not results.is_partial:
+            self.cache.put(key, self._copy_results(results), generations)
+        return results
+
+    def search_many(
+        self,
+        queries: List[str],
+        tiers: Optional[List[str]] = None,
+        n_results: int = 10,
+        priority: Optional[str] = None,
+        parallel: Optional[bool] = None,
+    ) -> List[SearchResults]:
+        """
+        Search several queries at once.
+
+        Each tier handles the whole batch in one go: a single ChromaDB
+        query for all query texts, one pass over the warm index and one
+        walk of the vault, so I/O and embedding cost are shared.
+
+        Args:
+            queries: Search query strings
+            tiers: List of tiers to search ('hot', 'warm', 'cold'); all if None
+            n_results: Maximum results per tier and query
+            priority: Filter by priority ('high', 'medium', 'low')
+            parallel: Query tiers concurrently (defaults to self.parallel)
+
+        Returns:
+            One SearchResults per query, in the same order as queries
+        """
+        if not queries:
+            return []
+        if tiers is None:
+            tiers = ['hot', 'warm', 'cold']
+        if parallel is None:
+            parallel = self.parallel
+
+        results: List[Optional[SearchResults]] = [None] * len(queries)
+        missing = list(range(len(queries)))
+        if self.cache is not None:
+            generations = self.cache.snapshot(tiers)
+            missing = []
+            for i, query in enumerate(queries):
+                cached = self.cache.get(self._cache_key(query, tiers, n_results, priority), tiers)
+                if cached is None:
+                    missing.append(i)
                 else:
-                    logger.warning(f"Unknown tier: {tier}")
-                    continue
+                    results[i] = self._copy_results(cached)
+            if not missing:
+                return results
 
-                all_results.extend(results)
-            except Exception as e:
-                logger.error(f"Error searching {tier} tier: {e}")
+        # Only queries that missed the cache go to the tiers
+        pending = [queries[i] for i in missing]
+        tasks = self._tier_tasks_many(pending, tiers, n_results, priority)
+        if parallel and len(tasks) > 1:
+            task_results, timed_out = self._run_parallel(tasks)
+        else:
+            task_results, timed_out = self._run_sequential(tasks), []
+
+        names = [name for name, _ in tasks]
+        for batch_index, i in enumerate(missing):
+            merged = self._merge_results(
+                queries[i],
+                names,
+                {name: batches[batch_index] for name, batches in task_results.items()},
+                n_results,
+                list(timed_out),
+            )
+            if self.cache is not None and not merged.is_partial:
+                key = self._cache_key(queries[i], tiers, n_results, priority)
+                self.cache.put(key, self._copy_results(merged), generations)
+            results[i] = merged
+
+        return results
+
+    # =========================================================================
+    # Query cache
+    # =========================================================================
+
+    @staticmethod
+    def _cache_key(
+        query: str,
+        tiers: List[str],
+        n_results: int,
+        priority: Optional[str],
+        regex: bool = False,
+    ) -> tuple:
+        return (query, tuple(tiers), n_results, priority, regex)
+
+    @staticmethod
+    def _copy_results(results: SearchResults) -> SearchResults:
+        """Copy results so callers cannot alter what the cache holds"""
+        return SearchResults(
+            [copy.copy(result) for result in results],
+            timed_out_tiers=list(results.timed_out_tiers),
+        )
+
+    def _watch(self, source, tier: str) -> None:
+        """Invalidate cached queries on a tier when its source changes"""
+        if self.cache is not None and source is not None and hasattr(source, 'add_change_listener'):
+            source.add_change_listener(partial(self.cache.invalidate, tier))
+
+    def invalidate_cache(self, tier: Optional[str] = None) -> None:
+        """
+        Drop cached results for a tier changed outside the known sources.
+
+        Args:
+            tier: 'hot', 'warm' or 'cold'; all tiers if None
+        """
+        if self.cache is not None:
+            self.cache.invalidate(tier)
+
+    # =========================================================================
+    # Result merging
+    # =========================================================================
+
+    def _merge_results(
+        self,
+        query: str,
+        names: List[str],
+        task_results: Dict[str, List[SearchResult]],
+        n_results: int,
+        timed_out: List[str],
+    ) -> SearchResults:
+        """Combine per-tier results into one ranked SearchResults"""
+        if self.fusion == 'rrf':
+            return self._fuse_results(query, names, task_results, n_results, timed_out)
+
+        all_results = []
+        cold_results = []
+        for name in names:
+            if name.startswith('cold'):
+                cold_results.extend(task_results.get(name, []))
+            else:
+                all_results.extend(task_results.get(name, []))
+        all_results.extend(cold_results[:n_results])
 
         # Sort by score (descending)
         all_results.sort(key=lambda r: r.score, reverse=True)
 
         # Limit total results
-        return all_results[:n_results]
+        return SearchResults(all_results[:n_results], timed_out_tiers=timed_out)
+
+    def _fuse_results(
+        self,
+        query: str,
+        names: List[str],
+        task_results: Dict[str, List[SearchResult]],
+        n_results: int,
+        timed_out: List[str],
+    ) -> SearchResults:
+        """
+        Merge tier rankings with reciprocal rank fusion.
+
+        Every task (and the BM25 pass over hot candidates) is one ranked
+        list. The fused score replaces SearchResult.score; the tier's own
+        score and the per-list ranks are kept in metadata.
+        """
+        ranked_lists: Dict[str, List[SearchResult]] = {}
+        for name in names:
+            results = task_results.get(name, [])
+            ranked_lists[name] = results[:n_results]
+            if name == 'hot' and self.hot_lexical and results:
+                lexical = bm25_rank(query, [r.content for r in results], n_results)
+                ranked_lists['hot:lexical'] = [results[index] for index, _ in lexical]
+
+        fused = reciprocal_rank_fusion(
+            ranked_lists,
+            key=self._fusion_key,
+            n_results=n_results,
+            k=self.rrf_k,
+        )
+
+        merged = []
+        for result, score, ranks in fused:
+            result.metadata = {**result.metadata, 'tier_score': result.score, 'ranks': ranks}
+            result.score = score
+            merged.append(result)
+
+        return SearchResults(merged, timed_out_tiers=timed_out)
+
+    @staticmethod
+    def _fusion_key(result: SearchResult) -> Tuple[str, str, str]:
+        """Identity of a hit across ranked lists: its path, or its title if it has none"""
+        return (result.tier, result.source, result.metadata.get('path') or result.title)
+
+    def _hot_fetch_size(self, n_results: int) -> int:
+        """Hot candidates to fetch (more when the lexical pass reranks them)"""
+        if self.fusion == 'rrf' and self.hot_lexical:
+            return n_results * self.hot_candidates
+        return n_results
 
     def search_hot(
         self,
@@ -138,14 +443,194 @@ class UnifiedSearch:
         """Search Hot tier only (ChromaDB)"""
         return self._search_hot(query, n_results, priority)
 
-    def search_warm(self, query: str, n_results: int = 5) -> List[SearchResult]:
+    def search_warm(self, query: str, n_results: int = 5, regex: bool = False) -> List[SearchResult]:
         """Search Warm tier only (archives)"""
+        if regex:
+            return self._scan_warm(query, n_results, regex=True)
         return self._search_warm(query, n_results)
 
     def search_cold(self, query: str, n_results: int = 5) -> List[SearchResult]:
         """Search Cold tier only (Obsidian/Dropbox)"""
         return self._search_cold(query, n_results)
 
+    # =========================================================================
+    # Tier fan-out
+    # =========================================================================
+
+    def _tier_tasks(
+        self,
+        query: str,
+        tiers: List[str],
+        n_results: int,
+        priority: Optional[str],
+    ) -> List[Tuple[str, Callable[[], List[SearchResult]]]]:
+        """Build one named search task per tier (cold split per source)"""
+        tasks = []
+        for tier in tiers:
+            if tier == 'hot':
+                tasks.append(('hot', partial(
+                    self._search_hot, query, self._hot_fetch_size(n_results), priority
+                )))
+            elif tier == 'warm':
+                tasks.append(('warm', partial(self._search_warm, query, n_results)))
+            elif tier == 'cold':
+                tasks.append(('cold:obsidian', partial(self._search_obsidian, query, n_results)))
+                tasks.append(('cold:dropbox', partial(self._search_dropbox, query, n_results)))
+            else:
+                logger.warning(f"Unknown tier: {tier}")
+        return tasks
+
+    def _scan_tasks(
+        self,
+        pattern: str,
+        tiers: List[str],
+        n_results: int,
+    ) -> List[Tuple[str, Callable[[], List[SearchResult]]]]:
+        """Build scan tasks for a regex query (tiers that can only be scanned)"""
+        tasks = []
+        for tier in tiers:
+            if tier == 'warm':
+                tasks.append(('warm', partial(self._scan_warm, pattern, n_results, True)))
+            elif tier == 'cold':
+                tasks.append(('cold:obsidian', partial(self._search_obsidian, pattern, n_results, True)))
+            elif tier == 'hot':
+                logger.debug("Skipping hot tier for regex query")
+            else:
+                logger.warning(f"Unknown tier: {tier}")
+        return tasks
+
+    def _tier_tasks_many(
+        self,
+        queries: List[str],
+        tiers: List[str],
+        n_results: int,
+        priority: Optional[str],
+    ) -> List[Tuple[str, Callable[[], List[List[SearchResult]]]]]:
+        """Build one batch search task per tier, each returning a list per query"""
+        tasks = []
+        for tier in tiers:
+            if tier == 'hot':
+                tasks.append(('hot', partial(
+                    self._search_hot_many, queries, self._hot_fetch_size(n_results), priority
+                )))
+            elif tier == 'warm':
+                tasks.append(('warm', partial(self._search_warm_many, queries, n_results)))
+            elif tier == 'cold':
+                tasks.append(('cold:obsidian', partial(self._search_obsidian_many, queries, n_results)))
+                tasks.append(('cold:dropbox', partial(self._search_dropbox_many, queries, n_results)))
+            else:
+                logger.warning(f"Unknown tier: {tier}")
+        return tasks
+
+    @staticmethod
+    def _run_sequential(tasks) -> Dict[str, List[SearchResult]]:
+        """Run tier tasks one after another"""
+        task_results = {}
+        for name, task in tasks:
+            try:
+                task_results[name] = task()
+            except Exception as e:
+                logger.error(f"Error searching {name} tier: {e}")
+        return task_results
+
+    def _run_parallel(self, tasks) -> Tuple[Dict[str, List[SearchResult]], List[str]]:
+        """
+        Run tier tasks concurrently, each against its own deadline.
+
+        A running task cannot be cancelled, so a tier whose task from an
+        earlier search is still running is not submitted again and counts
+        as timed out; a hung tier holds at most one pool worker.
+
+        Returns:
+            (results by task name, names of tasks that timed out)
+        """
+        executor = self._get_executor()
+        start = time.monotonic()
+
+        futures: Dict[Future, str] = {}
+        timed_out: List[str] = []
+        for name, task in tasks:
+            with self._in_flight_lock:
+                if name in self._in_flight:
+                    timed_out.append(name)
+                    self.busy_counts[name] = self.busy_counts.get(name, 0) + 1
+                    logger.warning(f"{name} tier is still busy with an earlier search, skipped")
+                    continue
+                future = executor.submit(task)
+                self._in_flight[name] = future
+            future.add_done_callback(partial(self._task_done, name))
+            futures[future] = name
+
+        deadlines = {
+            future: start + self._tier_timeout(name)
+            for future, name in futures.items()
+        }
+
+        task_results: Dict[str, List[SearchResult]] = {}
+        pending = set(futures)
+
+        while pending:
+            next_deadline = min(deadlines[f] for f in pending)
+            done, _ = wait(
+                pending,
+                timeout=max(0.0, next_deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+
+            for future in done:
+                pending.discard(future)
+                name = futures[future]
+                try:
+                    task_results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching {name} tier: {e}")
+
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[f] <= now]:
+                pending.discard(future)
+                future.cancel()
+                name = futures[future]
+                timed_out.append(name)
+                self.timeout_counts[name] = self.timeout_counts.get(name, 0) + 1
+                logger.warning(
+                    f"{name} tier missed its {self._tier_timeout(name):.1f}s deadline, "
+                    f"returning partial results"
+                )
+
+        return task_results, timed_out
+
+    def _task_done(self, name: str, future: Future) -> None:
+        with self._in_flight_lock:
+            if self._in_flight.get(name) is future:
+                del self._in_flight[name]
+
+    def _tier_timeout(self, name: str) -> float:
+        """Deadline for a task, falling back from 'cold:dropbox' to 'cold'"""
+        if name in self.tier_timeouts:
+            return self.tier_timeouts[name]
+        return self.tier_timeouts.get(name.split(':')[0], self.DEFAULT_TIER_TIMEOUTS['cold'])
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="unified-search",
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the parallel search thread pool, scan workers and vault index"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._in_flight_lock:
+            self._in_flight.clear()
+        if self.scan_engine is not None:
+            self.scan_engine.close()
+        if self.obsidian_client is not None and hasattr(self.obsidian_client, 'close'):
+            # Stops the vault watcher thread and closes the index
+            self.obsidian_client.close()
+
     # =========================================================================
     # Tier-specific search implementations
     # =========================================================================
@@ -174,6 +659,34 @@ class UnifiedSearch:
             logger.error(f"ChromaDB search failed: {e}")
             return []
 
+        return self._hot_results(results)
+
+    def _search_hot_many(
+        self,
+        queries: List[str],
+        n_results: int,
+        priority: Optional[str] = None,
+    ) -> List[List[SearchResult]]:
+        """Search Hot tier for several queries in one ChromaDB query"""
+        if self.memory_store is None:
+            return [[] for _ in queries]
+
+        where = {"priority": priority} if priority else None
+        try:
+            batches = self.memory_store.search_many(
+                queries=queries,
+                n_results=n_results,
+                where=where,
+            )
+        except Exception as e:
+            logger.error(f"ChromaDB search failed: {e}")
+            return [[] for _ in queries]
+
+        return [self._hot_results(results) for results in batches]
+
+    @staticmethod
+    def _hot_results(results: List[Dict[str, Any]]) -> List[SearchResult]:
+        """Convert MemoryStore hits to SearchResults"""
         search_results = []
         for item in results:
             # ChromaDB distance: 0 = identical, 2 = opposite
@@ -193,106 +706,237 @@ class UnifiedSearch:
         return search_results
 
     def _search_warm(self, query: str, n_results: int) -> List[SearchResult]:
-        """Search Warm tier via markdown file grep"""
+        """Search Warm tier via the BM25 archive index"""
         if self.archive_dir is None or not self.archive_dir.exists():
             return []
 
+        try:
+            index = self._get_warm_index()
+            hits = index.search(query, n_results)
+        except sqlite3.Error as e:
+            logger.warning(f"Warm index unavailable, scanning archive: {e}")
+            return self._scan_warm(query, n_results)
+
         results = []
-        query_lower = query.lower()
-        query_words = query_lower.split()
+        for hit in hits:
+            snippets = self._archived_snippets(index, Path(hit['path']), [query])
+            if snippets is not None:
+                results.append(self._warm_result(hit, snippets[0]))
 
-        for md_file in self.archive_dir.rglob("*.md"):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                content_lower = content.lower()
-
-                # Calculate relevance score based on word matches
-                if query_lower not in content_lower:
-                    # Check individual words
-                    word_matches = sum(1 for w in query_words if w in content_lower)
-                    if word_matches == 0:
-                        continue
-                    score = word_matches / len(query_words) * 0.5  # partial match
-                else:
-                    # Exact query match
-                    count = content_lower.count(query_lower)
-                    score = min(0.9, 0.5 + count * 0.1)  # cap at 0.9
+        return results
 
-                # Extract snippet
-                snippet = self._extract_snippet(content, query)
+    def _scan_warm(self, query: str, n_results: int, regex: bool = False) -> List[SearchResult]:
+        """Scan the archive files directly (regex queries, or no usable index)"""
+        if self.archive_dir is None or not self.archive_dir.exists():
+            return []
 
-                results.append(SearchResult(
-                    title=md_file.stem,
-                    content=snippet,
-                    tier='warm',
-                    score=score,
-                    source=str(md_file),
-                    metadata={
-                        'path': str(md_file),
-                        'modified': datetime.fromtimestamp(
-                            md_file.stat().st_mtime
-                        ).isoformat(),
-                    },
-                ))
+        files = list(self.archive_dir.rglob("*.md"))
+        if self.scan_engine is not None:
+            hits = self.scan_engine.scan(files, query, n_results, regex=regex)
+        else:
+            hits = scan_files([str(f) for f in files], query, n_results, regex)
 
-                if len(results) >= n_results:
-                    break
-            except Exception as e:
-                logger.debug(f"Error reading {md_file}: {e}")
+        return [self._scan_result(hit) for hit in hits]
 
-        # Sort warm results by score
-        results.sort(key=lambda r: r.score, reverse=True)
-        return results[:n_results]
+    @staticmethod
+    def _scan_result(hit: ScanHit) -> SearchResult:
+        """Convert a warm ScanHit to a SearchResult"""
+        path = Path(hit.path)
+        try:
+            modified = datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+        except OSError:
+            modified = ''
+
+        return SearchResult(
+            title=path.stem,
+            content=hit.snippet,
+            tier='warm',
+            # Same (0, 0.9) mapping as BM25, on the match count
+            score=0.9 * hit.score / (hit.score + 1.0),
+            source=hit.path,
+            metadata={
+                'path': hit.path,
+                'modified': modified,
+                'matches': hit.score,
+            },
+        )
+
+    def _search_warm_many(self, queries: List[str], n_results: int) -> List[List[SearchResult]]:
+        """Search Warm tier for several queries in one index pass"""
+        if self.archive_dir is None or not self.archive_dir.exists():
+            return [[] for _ in queries]
+
+        try:
+            index = self._get_warm_index()
+            all_hits = index.search_many(queries, n_results)
+        except sqlite3.Error as e:
+            logger.warning(f"Warm index unavailable, scanning archive: {e}")
+            return [self._scan_warm(query, n_results) for query in queries]
+
+        # Files hit by several queries are opened once
+        wanted: Dict[str, List[str]] = {}
+        for query, hits in zip(queries, all_hits):
+            for hit in hits:
+                wanted.setdefault(hit['path'], []).append(query)
+        snippets: Dict[str, Optional[Dict[str, str]]] = {}
+        for path, path_queries in wanted.items():
+            found = self._archived_snippets(index, Path(path), path_queries)
+            snippets[path] = None if found is None else dict(zip(path_queries, found))
+
+        return [
+            [
+                self._warm_result(hit, snippets[hit['path']][query])
+                for hit in hits
+                if snippets[hit['path']] is not None
+            ]
+            for query, hits in zip(queries, all_hits)
+        ]
+
+    def _archived_snippets(self, index: WarmIndex, md_file: Path, queries: List[str]) -> Optional[List[str]]:
+        """
+        Snippets for several queries from one indexed archive file.
+
+        The file is memory-mapped and scanned as bytes rather than decoded
+        and lower-cased whole.
+
+        Returns:
+            One snippet per query, or None if the file is unreadable or gone
+        """
+        try:
+            with mapped_file(md_file) as data:
+                return [self._buffer_snippet(data, query) for query in queries]
+        except FileNotFoundError:
+            # Moved out of the archive behind our back
+            index.remove_document(md_file)
+        except Exception as e:
+            logger.debug(f"Error reading {md_file}: {e}")
+        return None
+
+    @staticmethod
+    def _buffer_snippet(data: Buffer, query: str, context_chars: int = 150) -> str:
+        """Snippet around the first match in raw file bytes (file head if none)"""
+        match = find_snippet(data, query, context_chars)
+        return match.snippet if match is not None else head_snippet(data, 300)
+
+    @staticmethod
+    def _warm_result(hit: Dict[str, Any], snippet: str) -> SearchResult:
+        """Convert a WarmIndex hit to a SearchResult"""
+        # Map unbounded BM25 onto (0, 0.9) to stay below exact hot hits
+        bm25 = hit['score']
+        score = 0.9 * bm25 / (bm25 + 1.0)
+
+        return SearchResult(
+            title=hit['title'],
+            content=snippet,
+            tier='warm',
+            score=score,
+            source=hit['path'],
+            metadata={
+                'path': hit['path'],
+                'modified': hit['modified'],
+                'bm25': bm25,
+            },
+        )
+
+    def _get_warm_index(self) -> WarmIndex:
+        """Get the warm index, building it from the archive on first use"""
+        if self.warm_index is None:
+            self.warm_index = WarmIndex(str(self.archive_dir))
+            self._watch(self.warm_index, 'warm')
+        if not self._warm_index_synced:
+            self.warm_index.sync()
+            self._warm_index_synced = True
+        return self.warm_index
 
     def _search_cold(self, query: str, n_results: int) -> List[SearchResult]:
         """Search Cold tier via Obsidian and/or Dropbox"""
-        results = []
+        results = self._search_obsidian(query, n_results)
+        results.extend(self._search_dropbox(query, n_results))
+        return results[:n_results]
 
-        # Search Obsidian vault
-        if self.obsidian_client is not None:
-            try:
-                obsidian_results = self.obsidian_client.search_notes(
-                    query=query,
-                    max_results=n_results,
-                )
-                for item in obsidian_results:
-                    results.append(SearchResult(
-                        title=item.get('title', ''),
-                        content=item.get('snippet', ''),
-                        tier='cold',
-                        score=0.4,  # Cold tier gets lower base score
-                        source='obsidian',
-                        metadata={
-                            'path': item.get('path', ''),
-                            'folder': item.get('folder', ''),
-                        },
-                    ))
-            except Exception as e:
-                logger.error(f"Obsidian search failed: {e}")
+    def _search_obsidian(self, query: str, n_results: int, regex: bool = False) -> List[SearchResult]:
+        """Search the Obsidian vault (Cold tier)"""
+        if self.obsidian_client is None:
+            return []
 
-        # Search Dropbox
-        if self.dropbox_sync is not None and self.dropbox_sync.is_configured:
-            try:
-                dropbox_results = self.dropbox_sync.search(
-                    query=query,
-                    max_results=n_results,
-                )
-                for item in dropbox_results:
-                    results.append(SearchResult(
-                        title=item.get('name', ''),
-                        content='',  # Content not available from search
-                        tier='cold',
-                        score=0.3,  # Dropbox results get lower score
-                        source='dropbox',
-                        metadata={
-                            'path': item.get('path', ''),
-                            'modified': str(item.get('modified', '')),
-                        },
-                    ))
-            except Exception as e:
-                logger.error(f"Dropbox search failed: {e}")
+        kwargs = {'regex': True} if regex else {}
+        try:
+            obsidian_results = self.obsidian_client.search_notes(
+                query=query,
+                max_results=n_results,
+                **kwargs,
+            )
+        except Exception as e:
+            logger.error(f"Obsidian search failed: {e}")
+            return []
 
-        return results[:n_results]
+        return self._obsidian_results(obsidian_results)
+
+    def _search_obsidian_many(self, queries: List[str], n_results: int) -> List[List[SearchResult]]:
+        """Search the Obsidian vault for several queries in one walk"""
+        if self.obsidian_client is None:
+            return [[] for _ in queries]
+
+        try:
+            batches = self.obsidian_client.search_notes_many(
+                queries=queries,
+                max_results=n_results,
+            )
+        except Exception as e:
+            logger.error(f"Obsidian search failed: {e}")
+            return [[] for _ in queries]
+
+        return [self._obsidian_results(items) for items in batches]
+
+    @staticmethod
+    def _obsidian_results(items: List[Dict[str, Any]]) -> List[SearchResult]:
+        """Convert ObsidianClient hits to SearchResults"""
+        return [
+            SearchResult(
+                title=item.get('title', ''),
+                content=item.get('snippet', ''),
+                tier='cold',
+                score=0.4,  # Cold tier gets lower base score
+                source='obsidian',
+                metadata={
+                    'path': item.get('path', ''),
+                    'folder': item.get('folder', ''),
+                },
+            )
+            for item in items
+        ]
+
+    def _search_dropbox(self, query: str, n_results: int) -> List[SearchResult]:
+        """Search Dropbox (Cold tier)"""
+        if self.dropbox_sync is None or not self.dropbox_sync.is_configured:
+            return []
+
+        results = []
+        try:
+            dropbox_results = self.dropbox_sync.search(
+                query=query,
+                max_results=n_results,
+            )
+            for item in dropbox_results:
+                results.append(SearchResult(
+                    title=item.get('name', ''),
+                    content='',  # Content not available from search
+                    tier='cold',
+                    score=0.3,  # Dropbox results get lower score
+                    source='dropbox',
+                    metadata={
+                        'path': item.get('path', ''),
+                        'modified': str(item.get('modified', '')),
+                    },
+                ))
+        except Exception as e:
+            logger.error(f"Dropbox search failed: {e}")
+
+        return results
+
+    def _search_dropbox_many(self, queries: List[str], n_results: int) -> List[List[SearchResult]]:
+        """Search Dropbox for several queries (the API has no batch search)"""
+        return [self._search_dropbox(query, n_results) for query in queries]
 
     # =========================================================================
     # Helpers
@@ -301,20 +945,7 @@ class UnifiedSearch:
     @staticmethod
     def _extract_snippet(content: str, query: str, context_chars: int = 150) -> str:
         """Extract a snippet around the first match"""
-        idx = content.lower().find(query.lower())
-        if idx == -1:
-            return content[:300]
-
-        start = max(0, idx - context_chars)
-        end = min(len(content), idx + len(query) + context_chars)
-
-        snippet = content[start:end].strip()
-        if start > 0:
-            snippet = "..." + snippet
-        if end < len(content):
-            snippet = snippet + "..."
-
-        return snippet
+        return extract_snippet(content, query, context_chars, fallback_chars=300)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get search engine statistics"""
@@ -328,6 +959,17 @@ class UnifiedSearch:
             ),
         }
 
+        if self.warm_index is not None:
+            stats['warm_index'] = self.warm_index.get_stats()
+
+        stats['parallel'] = self.parallel
+        stats['fusion'] = self.fusion
+        stats['cache'] = self.cache.get_stats() if self.cache is not None else None
+        if self.scan_engine is not None:
+            stats['scan'] = self.scan_engine.get_stats()
+        stats['tier_timeout_counts'] = dict(self.timeout_counts)
+        stats['tier_busy_counts'] = dict(self.busy_counts)
+
         if stats['hot_configured']:
             stats['tiers_available'].append('hot')
         if stats['warm_configured']:
@@ -347,6 +989,8 @@ def create_unified_search(
     memory_store=None,
     obsidian_client=None,
     dropbox_sync=None,
+    warm_index: Optional[WarmIndex] = None,
+    scan_engine: Optional[ScanEngine] = None,
 ) -> UnifiedSearch:
     """
     Create a UnifiedSearch from config dictionary.
@@ -356,17 +1000,27 @@ def create_unified_search(
         memory_store: Optional MemoryStore instance
         obsidian_client: Optional ObsidianClient instance
         dropbox_sync: Optional DropboxSync instance
+        warm_index: WarmIndex shared with the TTLManager (default: the one
+            create_warm_index() returns for this config)
+        scan_engine: Optional ScanEngine (shared with the ObsidianClient);
+            created from 'search.scan' if None
     """
-    memory_config = config.get('memory', {})
-    archive_dir = memory_config.get('archive_dir')
-
-    if archive_dir is None:
-        mem_dir = memory_config.get('dir', '~/.openclaw/workspace/memory')
-        archive_dir = str(Path(mem_dir).expanduser() / 'archive')
+    search_config = config.get('search', {})
 
     return UnifiedSearch(
         memory_store=memory_store,
-        archive_dir=archive_dir,
+        archive_dir=str(warm_archive_dir(config)),
         obsidian_client=obsidian_client,
         dropbox_sync=dropbox_sync,
+        warm_index=warm_index if warm_index is not None else create_warm_index(config),
+        parallel=search_config.get('parallel', False),
+        tier_timeouts=search_config.get('tier_timeouts'),
+        max_workers=search_config.get('max_workers', 4),
+        fusion=search_config.get('fusion', 'rrf'),
+        rrf_k=search_config.get('rrf_k', DEFAULT_RRF_K),
+        hot_lexical=search_config.get('hot_lexical', True),
+        hot_candidates=search_config.get('hot_candidates', 3),
+        cache_size=search_config.get('cache', {}).get('max_entries', 256),
+        cache_ttl=search_config.get('cache', {}).get('ttl', 300.0),
+        scan_engine=scan_engine if scan_engine is not None else create_scan_engine(config),
     )
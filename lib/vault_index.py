@@ -0,0 +1,568 @@
+"""
+Vault Index for OC-Memory
+Persistent full-text index over the Obsidian vault
+
+Keeps one row per note (path, folder, title, mtime, size) plus an FTS5
+table over title, folder, frontmatter, tags and body in SQLite, so
+searching, listing and counting notes no longer walk and read the whole
+vault. VaultWatcher applies filesystem events to the index as notes
+are created, edited, moved or deleted, including by Obsidian itself.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from lib.file_watcher import EventCoalescer
+from lib.query_cache import ChangeNotifier
+from lib.warm_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    note_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    folder TEXT NOT NULL,
+    title TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes(folder);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, folder, frontmatter, tags, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# bm25() weights for title, folder, frontmatter, tags, body
+COLUMN_WEIGHTS = (5.0, 1.0, 1.0, 3.0, 1.0)
+
+# Inline #tags in the note body
+TAG_PATTERN = re.compile(r"(?<![\w#])#([\w/-]+)")
+
+# Rows written per transaction during sync
+SYNC_BATCH = 500
+
+
+def parse_note(raw: str) -> Tuple[Dict[str, str], List[str], str]:
+    """
+    Split a note into frontmatter, tags and body.
+
+    Understands the simple YAML written by ObsidianNote: 'key: value'
+    lines, and tags given as a '- item' list or inline '[a, b]'. Inline
+    #tags in the body are collected too.
+
+    Returns:
+        (frontmatter dict, tags, body)
+    """
+    frontmatter: Dict[str, str] = {}
+    tags: List[str] = []
+    body = raw
+
+    if raw.startswith("---"):
+        parts = raw.split("---", 2)
+        if len(parts) >= 3:
+            body = parts[2].strip()
+            list_key = None
+            for line in parts[1].strip().split("\n"):
+                stripped = line.strip()
+                if stripped.startswith("- ") and list_key is not None:
+                    item = stripped[2:].strip().strip('"')
+                    if list_key == 'tags':
+                        tags.append(item)
+                    else:
+                        frontmatter[list_key] = f"{frontmatter.get(list_key, '')} {item}".strip()
+                    continue
+                key, sep, value = stripped.partition(":")
+                if not sep:
+                    continue
+                key, value = key.strip(), value.strip().strip('"')
+                list_key = key if not value else None
+                if key == 'tags' and value:
+                    tags.extend(t.strip().strip('"') for t in value.strip("[]").split(",") if t.strip())
+                elif value:
+                    frontmatter[key] = value
+
+    tags.extend(TAG_PATTERN.findall(body))
+    return frontmatter, list(dict.fromkeys(tag.lstrip('#') for tag in tags)), body
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a plain-text query.
+
+    The query's words are searched as a phrase whose last word may be a
+    prefix ("chroma" finds "ChromaDB", "메모리" finds "메모리를").
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    return '"' + " ".join(terms) + '"*'
+
+
+# =============================================================================
+# Vault Index
+# =============================================================================
+
+class VaultIndex(ChangeNotifier):
+    """
+    SQLite FTS5 index of an Obsidian vault.
+    Change listeners run whenever indexed notes change.
+    """
+
+    INDEX_FILENAME = ".oc_vault_index.sqlite"
+
+    def __init__(
+        self,
+        vault_path: str,
+        index_path: str,
+    ):
+        """
+        Args:
+            vault_path: Obsidian vault root
+            index_path: SQLite index file, outside the vault (Obsidian and sync
+                tools would otherwise see it and its -wal/-shm files)
+        """
+        self.vault_path = Path(vault_path).expanduser().resolve()
+        self.index_path = Path(index_path).expanduser().resolve()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _ensure_initialized(self) -> sqlite3.Connection:
+        """Lazy-open the SQLite index and create the schema"""
+        if self._conn is not None:
+            return self._conn
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+        return conn
+
+    def _relative(self, file_path: Path) -> str:
+        """Vault-relative posix path of a note"""
+        return Path(file_path).expanduser().resolve().relative_to(self.vault_path).as_posix()
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def add_document(self, file_path: Path) -> bool:
+        """
+        Index (or re-index) a single note.
+
+        Args:
+            file_path: Markdown file inside the vault
+
+        Returns:
+            True if the note was indexed
+        """
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                indexed = self._index_note(conn, Path(file_path))
+        if indexed:
+            self._notify_change()
+        return indexed
+
+    def _index_note(self, conn: sqlite3.Connection, file_path: Path) -> bool:
+        """Write one note's rows (caller commits)"""
+        file_path = Path(file_path).expanduser().resolve()
+        try:
+            rel_path = self._relative(file_path)
+            raw = file_path.read_bytes().decode("utf-8", errors="replace")
+            stat = file_path.stat()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot index {file_path}: {e}")
+            return False
+
+        frontmatter, tags, body = parse_note(raw)
+        folder = Path(rel_path).parent.as_posix()
+
+        self._delete_note(conn, rel_path)
+        cursor = conn.execute(
+            "INSERT INTO notes (path, folder, title, mtime, size) VALUES (?, ?, ?, ?, ?)",
+            (rel_path, folder, file_path.stem, stat.st_mtime, stat.st_size),
+        )
+        conn.execute(
+            "INSERT INTO notes_fts (rowid, title, folder, frontmatter, tags, body) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                cursor.lastrowid,
+                file_path.stem,
+                folder,
+                "\n".join(f"{key}: {value}" for key, value in frontmatter.items()),
+                " ".join(tags),
+                body,
+            ),
+        )
+        return True
+
+    def remove_document(self, file_path: Path) -> bool:
+        """
+        Remove a note from the index.
+
+        Returns:
+            True if the note was indexed before
+        """
+        try:
+            rel_path = self._relative(file_path)
+        except ValueError:
+            return False
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                removed = self._delete_note(conn, rel_path)
+
+        if removed:
+            logger.debug(f"Removed from vault index: {rel_path}")
+            self._notify_change()
+        return removed
+
+    def remove_folder(self, dir_path: Path) -> int:
+        """
+        Remove every note under a (deleted or moved) folder.
+
+        Returns:
+            Number of notes removed
+        """
+        try:
+            rel_dir = self._relative(dir_path)
+        except ValueError:
+            return 0
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                paths = [
+                    path for (path,) in conn.execute(
+                        "SELECT path FROM notes WHERE folder = ? OR (folder >= ? AND folder < ?)",
+                        (rel_dir, rel_dir + "/", rel_dir + "0"),
+                    )
+                ]
+                for path in paths:
+                    self._delete_note(conn, path)
+
+        if paths:
+            self._notify_change()
+        return len(paths)
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the vault.
+        Only notes whose mtime or size changed are re-read.
+
+        Returns:
+            Dict with 'added', 'updated', 'removed' counts
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            indexed = {
+                path: (mtime, size)
+                for path, mtime, size in conn.execute("SELECT path, mtime, size FROM notes")
+            }
+
+            seen = set()
+            pending = 0
+            conn.execute("BEGIN")
+            try:
+                for md_file in self.vault_path.rglob("*.md"):
+                    try:
+                        rel_path = md_file.relative_to(self.vault_path).as_posix()
+                        stat = md_file.stat()
+                    except (OSError, ValueError):
+                        continue
+                    seen.add(rel_path)
+
+                    previous = indexed.get(rel_path)
+                    if previous == (stat.st_mtime, stat.st_size):
+                        continue
+                    if self._index_note(conn, md_file):
+                        counts['updated' if previous else 'added'] += 1
+                        pending += 1
+                        if pending >= SYNC_BATCH:
+                            conn.execute("COMMIT")
+                            conn.execute("BEGIN")
+                            pending = 0
+
+                for path in indexed.keys() - seen:
+                    self._delete_note(conn, path)
+                    counts['removed'] += 1
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if any(counts.values()):
+            self._notify_change()
+            logger.info(
+                f"Vault index synced: {counts['added']} added, "
+                f"{counts['updated']} updated, {counts['removed']} removed"
+            )
+        return counts
+
+    def rebuild(self) -> int:
+        """Drop the index and re-index the vault from scratch"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                conn.execute("DELETE FROM notes_fts")
+                conn.execute("DELETE FROM notes")
+            self.sync()
+        return self.count()
+
+    @staticmethod
+    def _delete_note(conn: sqlite3.Connection, rel_path: str) -> bool:
+        row = conn.execute("SELECT note_id FROM notes WHERE path = ?", (rel_path,)).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (row[0],))
+        conn.execute("DELETE FROM notes WHERE note_id = ?", (row[0],))
+        return True
+
+    # =========================================================================
+    # Query
+    # =========================================================================
+
+    def search(
+        self,
+        query: str,
+        folder: Optional[str] = None,
+        max_results: int = 10,
+        context_tokens: int = 24,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search.
+
+        Args:
+            query: Search query string
+            folder: Restrict to a folder and its subfolders
+            max_results: Maximum number of notes
+            context_tokens: Snippet length in tokens
+
+        Returns:
+            List of dicts with 'path' (absolute), 'title', 'snippet',
+            'folder' and 'score' (higher is better), best match first
+        """
+        expression = match_expression(query)
+        if expression is None or max_results <= 0:
+            return []
+
+        sql = (
+            "SELECT n.path, n.title, n.folder, "
+            "snippet(notes_fts, 4, '', '', '...', ?), bm25(notes_fts, ?, ?, ?, ?, ?) AS score "
+            "FROM notes_fts JOIN notes n ON n.note_id = notes_fts.rowid "
+            "WHERE notes_fts MATCH ?"
+        )
+        params: List[Any] = [context_tokens, *COLUMN_WEIGHTS, expression]
+        if folder:
+            folder_sql, folder_params = self._folder_filter(folder, column="n.folder")
+            sql += " AND " + folder_sql
+            params.extend(folder_params)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(max_results)
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'path': str(self.vault_path / path),
+                'title': title,
+                'snippet': snippet,
+                'folder': note_folder,
+                'score': -score,
+            }
+            for path, title, note_folder, snippet, score in rows
+        ]
+
+    def list_notes(self, folder: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        List notes in a folder and its subfolders (all notes if None).
+
+        Returns:
+            List of dicts with 'title', 'path' (vault-relative), 'modified',
+            ordered by path
+        """
+        sql = "SELECT title, path, mtime FROM notes"
+        params: List[Any] = []
+        if folder:
+            folder_sql, params = self._folder_filter(folder)
+            sql += " WHERE " + folder_sql
+        sql += " ORDER BY path"
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                'title': title,
+                'path': str(Path(path)),
+                'modified': datetime.fromtimestamp(mtime).isoformat(),
+            }
+            for title, path, mtime in rows
+        ]
+
+    def folder_stats(self, folder: Optional[str] = None) -> Dict[str, int]:
+        """Note count and total size of a folder and its subfolders"""
+        sql = "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM notes"
+        params: List[Any] = []
+        if folder:
+            folder_sql, params = self._folder_filter(folder)
+            sql += " WHERE " + folder_sql
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            notes, size = conn.execute(sql, params).fetchone()
+        return {'notes': notes, 'size_bytes': size}
+
+    @staticmethod
+    def _folder_filter(folder: str, column: str = "folder") -> Tuple[str, List[str]]:
+        """SQL condition for a folder and its subfolders (index range scan)"""
+        folder = Path(folder).as_posix().strip("/")
+        # '0' sorts right after '/', so the range covers 'folder/...'
+        return (
+            f"({column} = ? OR ({column} >= ? AND {column} < ?))",
+            [folder, folder + "/", folder + "0"],
+        )
+
+    # =========================================================================
+    # Info
+    # =========================================================================
+
+    def count(self) -> int:
+        """Number of indexed notes"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        stats = self.folder_stats()
+        return {
+            'notes': stats['notes'],
+            'size_bytes': stats['size_bytes'],
+            'index_path': str(self.index_path),
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# =============================================================================
+# Vault Watcher
+# =============================================================================
+
+class VaultEventHandler(FileSystemEventHandler):
+    """
+    Routes vault filesystem events to the index.
+    Note events go through the coalescer; folder deletes and moves are
+    applied directly.
+    """
+
+    def __init__(self, index: VaultIndex, coalescer: EventCoalescer):
+        super().__init__()
+        self.index = index
+        self.coalescer = coalescer
+
+    @staticmethod
+    def _is_note(path: str) -> bool:
+        return Path(path).suffix.lower() == '.md'
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and self._is_note(event.src_path):
+            self.coalescer.submit(Path(event.src_path), 'created')
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if not event.is_directory and self._is_note(event.src_path):
+            self.coalescer.submit(Path(event.src_path), 'modified')
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        if event.is_directory:
+            self.index.remove_folder(Path(event.src_path))
+        elif self._is_note(event.src_path):
+            self.coalescer.submit(Path(event.src_path), 'deleted')
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if event.is_directory:
+            self.index.remove_folder(Path(event.src_path))
+            for md_file in Path(event.dest_path).rglob("*.md"):
+                self.coalescer.submit(md_file, 'created')
+            return
+        if self._is_note(event.src_path):
+            self.coalescer.submit(Path(event.src_path), 'deleted')
+        if self._is_note(event.dest_path):
+            self.coalescer.submit(Path(event.dest_path), 'created')
+
+
+class VaultWatcher:
+    """
+    Keeps a VaultIndex in step with the vault via watchdog events.
+    """
+
+    def __init__(self, index: VaultIndex, quiet_period: float = 0.5):
+        """
+        Args:
+            index: Index to maintain
+            quiet_period: Seconds a note must be quiet before it is re-indexed
+                (editors save in bursts)
+        """
+        self.index = index
+        self.coalescer = EventCoalescer(callback=self._apply, quiet_period=quiet_period)
+        self.observer: Optional[Observer] = None
+
+    def _apply(self, file_path: Path, event_type: str = 'modified') -> None:
+        """Index the note if it exists, otherwise drop it"""
+        if file_path.exists():
+            self.index.add_document(file_path)
+        else:
+            self.index.remove_document(file_path)
+
+    def start(self) -> None:
+        """Start watching the vault"""
+        if self.observer is not None:
+            return
+        self.coalescer.start()
+        self.observer = Observer()
+        self.observer.schedule(
+            VaultEventHandler(self.index, self.coalescer),
+            str(self.index.vault_path),
+            recursive=True,
+        )
+        self.observer.start()
+        logger.info(f"Watching vault for index updates: {self.index.vault_path}")
+
+    def stop(self) -> None:
+        """Stop watching and apply pending events"""
+        if self.observer is None:
+            return
+        self.observer.stop()
+        self.observer.join()
+        self.observer = None
+        self.coalescer.stop(flush=True)
+
+    def is_alive(self) -> bool:
+        return self.observer is not None and self.observer.is_alive()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get event statistics"""
+        return self.coalescer.get_stats()
@@ -0,0 +1,416 @@
+"""
+Warm Index for OC-Memory
+Persistent inverted index over the Warm archive
+
+Stores term -> postings (document, term frequency) in SQLite so that
+Warm tier queries read only the postings of the query terms and rank
+documents with BM25 instead of scanning every archived markdown file.
+"""
+
+import heapq
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from lib.query_cache import ChangeNotifier
+
+logger = logging.getLogger(__name__)
+
+# Word characters (unicode-aware, so Korean notes are indexed too)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# =============================================================================
+# Warm Index
+# =============================================================================
+
+class WarmIndex(ChangeNotifier):
+    """
+    On-disk inverted index for the Warm archive directory.
+    Ranks archived markdown files with Okapi BM25.
+    """
+
+    INDEX_FILENAME = ".warm_index.sqlite"
+
+    def __init__(
+        self,
+        archive_dir: str,
+        index_path: Optional[str] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Args:
+            archive_dir: Warm archive directory to index
+            index_path: SQLite index file (default: <archive_dir>/.warm_index.sqlite)
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.archive_dir = Path(archive_dir).expanduser().resolve()
+        self.index_path = (
+            Path(index_path).expanduser().resolve() if index_path
+            else self.archive_dir / self.INDEX_FILENAME
+        )
+        self.k1 = k1
+        self.b = b
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _ensure_initialized(self) -> sqlite3.Connection:
+        """Lazy-open the SQLite index and create the schema"""
+        if self._conn is not None:
+            return self._conn
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+        logger.debug(f"Warm index opened: {self.index_path}")
+        return conn
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def add_document(self, file_path: Path) -> bool:
+        """
+        Index (or re-index) a single archive file.
+
+        Args:
+            file_path: Markdown file inside the archive
+
+        Returns:
+            True if the file was indexed
+        """
+        file_path = Path(file_path).expanduser().resolve()
+        try:
+            content = file_path.read_text(encoding="utf-8")
+            stat = file_path.stat()
+        except Exception as e:
+            logger.warning(f"Cannot index {file_path}: {e}")
+            return False
+
+        term_freqs = Counter(tokenize(content))
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                self._delete_document(conn, str(file_path))
+                cursor = conn.execute(
+                    "INSERT INTO documents (path, title, length, mtime, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        str(file_path),
+                        file_path.stem,
+                        sum(term_freqs.values()),
+                        stat.st_mtime,
+                        stat.st_size,
+                    ),
+                )
+                doc_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    ((term, doc_id, tf) for term, tf in term_freqs.items()),
+                )
+
+        logger.debug(f"Indexed warm file: {file_path} ({len(term_freqs)} terms)")
+        self._notify_change()
+        return True
+
+    def remove_document(self, file_path: Path) -> bool:
+        """
+        Remove a file from the index.
+
+        Returns:
+            True if the file was indexed before
+        """
+        file_path = Path(file_path).expanduser().resolve()
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                removed = self._delete_document(conn, str(file_path))
+
+        if removed:
+            logger.debug(f"Removed from warm index: {file_path}")
+            self._notify_change()
+        return removed
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the archive directory.
+        Only files whose mtime or size changed are re-read.
+
+        Returns:
+            Dict with 'added', 'updated', 'removed' counts
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            indexed = {
+                path: (mtime, size)
+                for path, mtime, size in conn.execute(
+                    "SELECT path, mtime, size FROM documents"
+                )
+            }
+
+            seen = set()
+            if self.archive_dir.exists():
+                for md_file in self.archive_dir.rglob("*.md"):
+                    path = str(md_file.resolve())
+                    seen.add(path)
+                    try:
+                        stat = md_file.stat()
+                    except OSError:
+                        continue
+
+                    previous = indexed.get(path)
+                    if previous == (stat.st_mtime, stat.st_size):
+                        continue
+                    if self.add_document(md_file):
+                        counts['updated' if previous else 'added'] += 1
+
+            for path in indexed.keys() - seen:
+                with conn:
+                    self._delete_document(conn, path)
+                counts['removed'] += 1
+
+        if counts['removed']:
+            self._notify_change()
+        if any(counts.values()):
+            logger.info(
+                f"Warm index synced: {counts['added']} added, "
+                f"{counts['updated']} updated, {counts['removed']} removed"
+            )
+        return counts
+
+    def rebuild(self) -> int:
+        """Drop all postings and re-index the archive from scratch"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            with conn:
+                conn.execute("DELETE FROM postings")
+                conn.execute("DELETE FROM documents")
+            self.sync()
+        return self.count()
+
+    @staticmethod
+    def _delete_document(conn: sqlite3.Connection, path: str) -> bool:
+        row = conn.execute(
+            "SELECT doc_id FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+        conn.execute("DELETE FROM documents WHERE doc_id = ?", (row[0],))
+        return True
+
+    # =========================================================================
+    # Query
+    # =========================================================================
+
+    def search(self, query: str, n_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank archive files against a query with BM25.
+
+        Args:
+            query: Search query string
+            n_results: Maximum number of documents to return
+
+        Returns:
+            List of dicts with 'path', 'title', 'score', 'modified',
+            best match first
+        """
+        return self.search_many([query], n_results)[0]
+
+    def search_many(self, queries: List[str], n_results: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Rank archive files against several queries in one pass.
+
+        Postings of a term shared by several queries are read once, and
+        collection statistics and document rows are fetched once for the
+        whole batch.
+
+        Args:
+            queries: Search query strings
+            n_results: Maximum number of documents per query
+
+        Returns:
+            One result list per query (same order), each as in search()
+        """
+        query_terms = [set(tokenize(query)) for query in queries]
+        all_terms = set().union(*query_terms) if query_terms else set()
+        if not all_terms or n_results <= 0:
+            return [[] for _ in queries]
+
+        with self._lock:
+            conn = self._ensure_initialized()
+            total_docs, avg_length = conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM documents"
+            ).fetchone()
+            if not total_docs:
+                return [[] for _ in queries]
+            avg_length = avg_length or 1.0
+
+            # term -> {doc_id: BM25 contribution}
+            term_scores: Dict[str, Dict[int, float]] = {}
+            for term in all_terms:
+                rows = conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN documents d ON d.doc_id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not rows:
+                    continue
+
+                idf = self._idf(total_docs, len(rows))
+                contributions = {}
+                for doc_id, tf, length in rows:
+                    norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                    contributions[doc_id] = idf * tf * (self.k1 + 1) / (tf + norm)
+                term_scores[term] = contributions
+
+            tops = []
+            for terms in query_terms:
+                scores: Dict[int, float] = {}
+                for term in terms:
+                    for doc_id, score in term_scores.get(term, {}).items():
+                        scores[doc_id] = scores.get(doc_id, 0.0) + score
+                tops.append(heapq.nlargest(n_results, scores.items(), key=lambda item: item[1]))
+
+            documents: Dict[int, tuple] = {}
+            for top in tops:
+                for doc_id, _ in top:
+                    if doc_id not in documents:
+                        documents[doc_id] = conn.execute(
+                            "SELECT path, title, mtime FROM documents WHERE doc_id = ?",
+                            (doc_id,),
+                        ).fetchone()
+
+        batches = []
+        for top in tops:
+            results = []
+            for doc_id, score in top:
+                path, title, mtime = documents[doc_id]
+                results.append({
+                    'path': path,
+                    'title': title,
+                    'score': score,
+                    'modified': datetime.fromtimestamp(mtime).isoformat(),
+                })
+            batches.append(results)
+
+        return batches
+
+    @staticmethod
+    def _idf(total_docs: int, doc_freq: int) -> float:
+        """BM25 inverse document frequency (always positive)"""
+        return math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    # =========================================================================
+    # Info
+    # =========================================================================
+
+    def count(self) -> int:
+        """Number of indexed documents"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        with self._lock:
+            conn = self._ensure_initialized()
+            documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            terms = conn.execute(
+                "SELECT COUNT(DISTINCT term) FROM postings"
+            ).fetchone()[0]
+
+        return {
+            'documents': documents,
+            'terms': terms,
+            'index_path': str(self.index_path),
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# =============================================================================
+# Convenience functions
+# =============================================================================
+
+_indexes: Dict[Path, WarmIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def warm_archive_dir(config: Dict[str, Any]) -> Path:
+    """Warm archive directory from config (memory.archive_dir or <memory.dir>/archive)"""
+    memory_config = config.get('memory', {})
+    archive_dir = memory_config.get('archive_dir')
+    if archive_dir is None:
+        mem_dir = memory_config.get('dir', '~/.openclaw/workspace/memory')
+        archive_dir = str(Path(mem_dir).expanduser() / 'archive')
+    return Path(archive_dir).expanduser().resolve()
+
+
+def create_warm_index(config: Dict[str, Any]) -> Optional[WarmIndex]:
+    """
+    Create (or reuse) the Warm archive index from config.
+
+    TTLManager and UnifiedSearch built from the same config share one
+    index, so archive moves reach search results and its query cache.
+
+    Args:
+        config: Configuration dict with 'memory' section
+
+    Returns:
+        WarmIndex, or None if memory.warm_index is disabled
+    """
+    if not config.get('memory', {}).get('warm_index', True):
+        return None
+
+    archive_dir = warm_archive_dir(config)
+    with _indexes_lock:
+        index = _indexes.get(archive_dir)
+        if index is None:
+            index = WarmIndex(str(archive_dir))
+            _indexes[archive_dir] = index
+        return index
@@ -22,11 +22,16 @@ from lib import __version__
 from lib.config import get_config, ConfigError
 from lib.file_watcher import FileWatcher
 from lib.memory_writer import MemoryWriter, MemoryWriterError
+from lib.content_manifest import ContentManifest
+from lib.note_snapshots import SnapshotStore
 from lib.observer import Observer, create_observer
 from lib.memory_merger import MemoryMerger, create_merger
 from lib.reflector import Reflector, create_reflector
 from lib.ttl_manager import TTLManager, create_ttl_manager
-from lib.error_handler import LLMRetryPolicy
+from lib.error_handler import LLMRetryPolicy, create_rate_limiter, create_retry_policy
+from lib.pipeline import ObservationPipeline, create_pipeline
+from lib.backfill import BackfillError, collect_markdown_files, create_backfill
+from lib.embeddings import EmbeddingError
 
 
 class MemoryObserver:
@@ -34,6 +39,7 @@ class MemoryObserver:
     Main daemon process for OC-Memory.
     Orchestrates all core engines:
     - FileWatcher: directory monitoring
+    - ObservationPipeline: staged copy/extraction workers off the watcher thread
     - MemoryWriter: file copying to OpenClaw memory
     - Observer: LLM-based observation extraction
     - MemoryMerger: active_memory.md management
@@ -58,20 +64,41 @@ class MemoryObserver:
             raise
 
         # --- Core components (always initialized) ---
+        memory_dir = Path(self.config['memory']['dir']).expanduser()
+        self.manifest: Optional[ContentManifest] = None
+        if self.config['memory'].get('skip_unchanged', True):
+            self.manifest = ContentManifest(
+                str(memory_dir / ContentManifest.MANIFEST_FILENAME)
+            )
         self.memory_writer = MemoryWriter(
-            memory_dir=self.config['memory']['dir']
+            memory_dir=str(memory_dir),
+            manifest=self.manifest
         )
 
+        # Last-processed note versions: only edited hunks go to the LLM
+        self.snapshots: Optional[SnapshotStore] = None
+        if self.config['memory'].get('incremental_extraction', True):
+            self.snapshots = SnapshotStore(
+                str(memory_dir / SnapshotStore.SNAPSHOT_DIRNAME)
+            )
+
         self.file_watcher = FileWatcher(
             watch_dirs=self.config['watch']['dirs'],
             callback=self.on_file_change,
-            recursive=self.config['watch'].get('recursive', True)
+            recursive=self.config['watch'].get('recursive', True),
+            quiet_period=self.config['watch'].get('quiet_period', 1.0),
+            max_events_per_second=self.config['watch'].get('max_events_per_second', 50),
         )
 
         self.merger = create_merger(self.config)
 
         self.ttl_manager = create_ttl_manager(self.config)
 
+        # --- Retry policy for LLM calls (shared rate limiter + circuit breaker) ---
+        self.retry_policy: LLMRetryPolicy = create_retry_policy(
+            self.config, rate_limiter=create_rate_limiter(self.config)
+        )
+
         # --- Optional LLM components (need API key) ---
         self.observer: Optional[Observer] = None
         self.reflector: Optional[Reflector] = None
@@ -81,14 +108,20 @@ class MemoryObserver:
         self.memory_store = None
         self._init_memory_store()
 
-        # --- Retry policy for LLM calls ---
-        self.retry_policy = LLMRetryPolicy(
-            max_attempts=3, base_delay=2.0, max_delay=30.0
+        # --- Processing pipeline (watcher thread only enqueues) ---
+        self.pipeline: ObservationPipeline = create_pipeline(
+            self.config,
+            copy_fn=self._copy_stage,
+            extract_fn=self._extract_stage if self.observer else None,
+            sink_fn=self._sink_observations,
+            extract_many_fn=self._extract_many_stage if self.observer else None,
+            limit_rate=False,  # LLM requests go through retry_policy's limiter
         )
 
         # --- State ---
         self.running = False
         self.files_processed = 0
+        self.files_unchanged = 0
         self.observations_extracted = 0
         self.compressions_run = 0
         self.errors = 0
@@ -103,8 +136,8 @@ class MemoryObserver:
             return
 
         try:
-            self.observer = create_observer(self.config)
-            self.reflector = create_reflector(self.config)
+            self.observer = create_observer(self.config, retry_policy=self.retry_policy)
+            self.reflector = create_reflector(self.config, retry_policy=self.retry_policy)
             if self.observer.api_key:
                 self.logger.info(
                     f"Observer initialized: {self.observer.provider}/{self.observer.model}"
@@ -120,27 +153,45 @@ class MemoryObserver:
         """Initialize ChromaDB MemoryStore if available."""
         try:
             from lib.memory_store import create_memory_store
-            self.memory_store = create_memory_store(self.config)
+            memory_store = create_memory_store(self.config)
+            # Open now: a store built with another embedding model must
+            # stop startup rather than fail on every write
+            memory_store.open()
+            self.memory_store = memory_store
             self.logger.info("MemoryStore (ChromaDB) initialized")
         except ImportError:
             self.logger.info(
                 "chromadb not installed, MemoryStore disabled. "
                 "Run: pip install chromadb"
             )
+        except EmbeddingError:
+            raise
         except Exception as e:
             self.logger.warning(f"MemoryStore unavailable: {e}")
 
     def on_file_change(self, file_path: Path, event_type: str) -> None:
-        """Handle file change events from FileWatcher."""
-        try:
-            self.logger.info(f"Processing file: {file_path} ({event_type})")
+        """Handle file change events from FileWatcher (enqueue only)."""
+        self.pipeline.submit(file_path, event_type)
 
-            # 1. Copy to memory directory
+    def _copy_stage(self, file_path: Path, event_type: str) -> bool:
+        """Pipeline stage: copy a changed file into the memory directory."""
+        try:
             category = self._detect_category(file_path)
+            # With an Observer the manifest entry is committed only once
+            # the file's observations are stored (see _commit_file)
             target_file = self.memory_writer.copy_to_memory(
                 source_file=file_path,
-                category=category
+                category=category,
+                skip_unchanged=True,
+                defer_record=self.observer is not None
             )
+            if target_file is None:
+                # Same bytes as last time: no copy, no LLM call
+                self.files_unchanged += 1
+                self.logger.debug(f"Skipping unchanged file: {file_path}")
+                return False
+
+            self.logger.info(f"Processing file: {file_path} ({event_type})")
 
             metadata = {
                 "source": str(file_path),
@@ -152,15 +203,12 @@ class MemoryObserver:
             self.memory_writer.add_metadata(target_file, metadata)
             self.files_processed += 1
 
-            # 2. Extract observations via LLM (if available)
-            if self.observer:
-                self._extract_observations_from_file(file_path)
-
             self.logger.info(
                 f"Synced to memory: {target_file} "
                 f"(files: {self.files_processed}, "
                 f"observations: {self.observations_extracted})"
             )
+            return True
 
         except MemoryWriterError as e:
             self.errors += 1
@@ -168,39 +216,105 @@ class MemoryObserver:
         except Exception as e:
             self.errors += 1
             self.logger.exception(f"Unexpected error processing {file_path}: {e}")
+        return False
 
-    def _extract_observations_from_file(self, file_path: Path):
-        """Read a markdown file and extract observations via LLM."""
+    def _extract_stage(self, file_path: Path) -> list:
+        """Pipeline stage: extract observations from a file via LLM."""
         try:
             content = file_path.read_text(encoding='utf-8')
-            if not content.strip():
-                return
-
-            messages = [{"role": "user", "content": content}]
-            observations = self.retry_policy.call_with_retry(
-                self.observer.observe, messages
-            )
+            text = content
+            if self.snapshots:
+                text = self.snapshots.delta(file_path, content)
+                # Becomes the diff base only once extraction succeeded
+                self.snapshots.stage(file_path, content)
+            if not text.strip():
+                self._commit_file(file_path)
+                return []
+
+            messages = [{"role": "user", "content": text}]
+            observations = self.observer.observe(messages) or []
 
             if not observations:
-                return
+                # Nothing goes to the sink, so the file is done here
+                self._commit_file(file_path)
+            return observations
 
-            # Add to MemoryMerger (active_memory.md)
-            added = self.merger.add_observations(observations)
-
-            # Add to ChromaDB (if available)
-            if self.memory_store:
-                try:
-                    self.memory_store.add_observations(observations)
-                except Exception as e:
-                    self.logger.warning(f"Failed to add to MemoryStore: {e}")
+        except Exception as e:
+            self.logger.warning(f"Observation extraction failed for {file_path}: {e}")
+            self._discard_file(file_path)
+            return []
 
-            self.observations_extracted += added
-            self.logger.info(
-                f"Extracted {added} observations from {file_path.name}"
-            )
+    def _extract_many_stage(self, file_paths: list) -> list:
+        """Pipeline stage: extract several small files in packed LLM requests."""
+        inputs = {}
+        for file_path in file_paths:
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except Exception as e:
+                self.logger.warning(f"Cannot read {file_path}: {e}")
+                continue
+            if self.snapshots:
+                inputs[str(file_path)] = self.snapshots.delta(file_path, content)
+                self.snapshots.stage(file_path, content)
+            else:
+                inputs[str(file_path)] = content
 
+        try:
+            results = self.observer.observe_files(inputs) or {}
         except Exception as e:
-            self.logger.warning(f"Observation extraction failed for {file_path}: {e}")
+            self.logger.warning(f"Packed extraction failed for {len(inputs)} files: {e}")
+            results = {}
+
+        for file_path in file_paths:
+            observations = results.get(str(file_path))
+            if observations is None:
+                # Failed (or unreadable): seen as changed on the next event
+                self._discard_file(file_path)
+            elif not observations:
+                self._commit_file(file_path)
+        return [results.get(str(file_path), []) for file_path in file_paths]
+
+    def _commit_file(self, file_path: Path) -> None:
+        """Mark a file as fully processed: skip it until its content changes."""
+        if self.manifest:
+            self.manifest.commit(file_path)
+        if self.snapshots:
+            self.snapshots.commit(file_path)
+
+    def _discard_file(self, file_path: Path) -> None:
+        """Forget a failed file's staged state so the next event retries it."""
+        if self.manifest:
+            self.manifest.discard(file_path)
+        if self.snapshots:
+            self.snapshots.discard(file_path)
+
+    def _sink_observations(self, batch) -> None:
+        """Pipeline sink: store a batch of (file, observations) results."""
+        observations = [obs for _, file_obs in batch for obs in file_obs]
+        if not observations:
+            return
+
+        # Add to MemoryMerger (active_memory.md)
+        try:
+            added = self.merger.add_observations(observations)
+        except Exception:
+            for file_path, _ in batch:
+                self._discard_file(file_path)
+            raise
+        for file_path, _ in batch:
+            self._commit_file(file_path)
+
+        # Add to ChromaDB (if available)
+        if self.memory_store:
+            try:
+                self.memory_store.add_observations(observations)
+            except Exception as e:
+                self.logger.warning(f"Failed to add to MemoryStore: {e}")
+
+        self.observations_extracted += added
+        self.logger.info(
+            f"Extracted {added} observations from {len(batch)} files"
+        )
 
     def _run_periodic_tasks(self):
         """Run periodic maintenance tasks (compression, TTL)."""
@@ -243,9 +357,7 @@ class MemoryObserver:
             if not obs_text.strip():
                 return
 
-            result = self.retry_policy.call_with_retry(
-                self.reflector.reflect, obs_text, level
-            )
+            result = self.reflector.reflect(obs_text, level)
 
             if result.compression_ratio > 1.0:
                 # Replace observations with compressed content
@@ -281,6 +393,8 @@ class MemoryObserver:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
+        self.pipeline.start()
+
         try:
             self.file_watcher.start()
         except Exception as e:
@@ -303,6 +417,87 @@ class MemoryObserver:
 
         self.stop()
 
+    def backfill(self) -> int:
+        """
+        One-off bulk sync of the watch directories.
+
+        Files are copied as usual (unchanged files are skipped), then all
+        extractions are submitted as a single provider batch job and the
+        observations are bulk-loaded once the job completes. Files whose
+        requests failed are not recorded, so the next backfill retries them.
+
+        Returns:
+            Number of observations added
+        """
+        files = collect_markdown_files(
+            self.config['watch']['dirs'],
+            recursive=self.config['watch'].get('recursive', True),
+            max_file_size=self.config['memory'].get('max_file_size'),
+        )
+        try:
+            changed = [f for f in files if self._copy_stage(f, 'backfill')]
+            self.logger.info(f"Backfill: {len(changed)} of {len(files)} files changed")
+            if not self.observer or not changed:
+                return 0
+            return self._backfill_changed(changed)
+        finally:
+            self.merger.close()
+            self._close_memory_store()
+            if self.manifest:
+                self.manifest.close()
+
+    def _backfill_changed(self, changed: list) -> int:
+        """Extract changed files in one batch job; commit only the files that succeeded."""
+        inputs = {}
+        for file_path in changed:
+            try:
+                content = file_path.read_text(encoding='utf-8')
+            except Exception as e:
+                self.logger.warning(f"Cannot read {file_path}: {e}")
+                continue
+            if self.snapshots:
+                inputs[str(file_path)] = self.snapshots.delta(file_path, content)
+                self.snapshots.stage(file_path, content)
+            else:
+                inputs[str(file_path)] = content
+
+        try:
+            result = create_backfill(self.config, self.observer).run(inputs)
+        except BackfillError as e:
+            self.errors += 1
+            self.logger.error(f"Backfill failed: {e}")
+            for file_path in changed:
+                self._discard_file(file_path)
+            return 0
+
+        if result.failed_inputs:
+            self.errors += 1
+            self.logger.warning(
+                f"Backfill: {len(result.failed_inputs)} files failed and will be retried"
+            )
+
+        before = self.observations_extracted
+        self._sink_observations([
+            (Path(path), observations)
+            for path, observations in result.observations.items()
+        ])
+        for file_path in changed:
+            if str(file_path) in result.observations:
+                self._commit_file(file_path)
+            else:
+                # Unreadable or failed: seen as changed on the next run
+                self._discard_file(file_path)
+        return self.observations_extracted - before
+
+    def _close_memory_store(self) -> None:
+        """Flush buffered MemoryStore writes and stop its flusher thread."""
+        if not self.memory_store:
+            return
+        try:
+            self.memory_store.close()
+        except Exception as e:
+            self.logger.error(f"Failed to flush MemoryStore: {e}")
+
     def stop(self) -> None:
         """Stop the observer daemon."""
         self.logger.info("Stopping OC-Memory Observer...")
@@ -311,16 +506,37 @@ class MemoryObserver:
         if self.file_watcher.is_alive():
             self.file_watcher.stop()
 
+        self.pipeline.stop(drain=True)
+
+        try:
+            self.merger.close()
+        except Exception as e:
+            self.logger.error(f"Failed to flush active memory: {e}")
+        self._close_memory_store()
+
         self.logger.info("=" * 60)
         self.logger.info("OC-Memory Observer Statistics")
         self.logger.info("=" * 60)
         self.logger.info(f"Files processed: {self.files_processed}")
+        self.logger.info(f"Files unchanged (skipped): {self.files_unchanged}")
         self.logger.info(f"Observations extracted: {self.observations_extracted}")
         self.logger.info(f"Compressions run: {self.compressions_run}")
         self.logger.info(f"Errors: {self.errors}")
+        self.logger.info(f"Watcher stats: {self.file_watcher.get_stats()}")
+        self.logger.info(f"Pipeline stats: {self.pipeline.get_stats()}")
+        self.logger.info(f"LLM retry stats: {self.retry_policy.get_stats()}")
+        if self.memory_store:
+            self.logger.info(f"MemoryStore write stats: {self.memory_store.get_stats()}")
+        if self.manifest:
+            self.logger.info(f"Manifest stats: {self.manifest.get_stats()}")
+            self.manifest.close()
+        if self.snapshots:
+            self.logger.info(f"Snapshot stats: {self.snapshots.get_stats()}")
         if self.reflector:
             stats = self.reflector.get_stats()
             self.logger.info(f"Compression stats: {stats}")
+        if self.observer and self.observer.cache:
+            self.logger.info(f"LLM cache stats: {self.observer.cache.get_stats()}")
         self.logger.info("=" * 60)
         self.logger.info("OC-Memory Observer stopped")
 
@@ -362,6 +578,10 @@ def main() -> None:
         '--config', default='config.yaml',
         help='Path to configuration file (default: config.yaml)'
     )
+    parser.add_argument(
+        '--backfill', action='store_true',
+        help='Sync all watched files once via the provider batch API, then exit'
+    )
     parser.add_argument(
         '--version', action='version',
         version=f'OC-Memory {__version__}'
@@ -384,10 +604,17 @@ def main() -> None:
 
     try:
         observer = MemoryObserver(config_path=args.config)
+        if args.backfill:
+            added = observer.backfill()
+            logging.info(f"Backfill complete: {added} observations added")
+            return
         observer.start()
     except ConfigError as e:
         logging.error(f"Configuration error: {e}")
         sys.exit(1)
+    except EmbeddingError as e:
+        logging.error(f"MemoryStore error: {e}")
+        sys.exit(1)
     except KeyboardInterrupt:
         logging.info("Interrupted by user")
         sys.exit(0)
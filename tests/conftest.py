@@ -101,3 +101,62 @@ def sample_messages():
         {"role": "assistant", "content": "I'll set up ChromaDB. March 15 noted as deadline."},
         {"role": "user", "content": "Always use type hints in the code."},
     ]
+
+
+@pytest.fixture
+def mock_openai_server():
+    """
+    Local OpenAI-compatible HTTP server for client tests.
+
+    Answers POST /v1/chat/completions with server.response_content and
+    records requests and distinct client connections.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            with server.lock:
+                server.requests.append((self.path, body))
+                server.connections.add(self.client_address)
+
+            payload = json.dumps({
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model", "test"),
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": server.response_content},
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = set()
+    server.response_content = "[]"
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,294 @@
+"""Tests for lib/backfill.py"""
+
+import json
+import threading
+import pytest
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.backfill import BatchBackfill, BackfillError, collect_markdown_files, create_backfill
+from lib.llm_cache import LLMResponseCache
+from lib.llm_clients import LLMClientRegistry
+from lib.observer import Observer
+
+pytest.importorskip("openai")
+
+
+@pytest.fixture
+def batch_server():
+    """
+    Local stand-in for the OpenAI Files + Batches API.
+
+    Each chat request in an uploaded batch is answered with
+    server.respond(body) -> message content (None = failed request). Batches report
+    'in_progress' on the first status check and complete on the next.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _send(self, payload, content_type='application/json'):
+            data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if server.unauthorized:
+                data = json.dumps({"error": {"message": "Invalid API key", "type": "invalid_request_error",
+                                             "code": "invalid_api_key"}}).encode()
+                self.send_response(401)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            elif self.path == '/v1/files':
+                message = BytesParser().parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+                )
+                content = next(
+                    part.get_payload(decode=True) for part in message.get_payload()
+                    if part.get_param('name', header='content-disposition') == 'file'
+                )
+                file_id = f"file-{len(server.files)}"
+                server.files[file_id] = content
+                self._send({
+                    "id": file_id, "object": "file", "bytes": len(content),
+                    "created_at": 0, "filename": "input.jsonl",
+                    "purpose": "batch", "status": "processed",
+                })
+            elif self.path == '/v1/batches':
+                request = json.loads(body)
+                batch_id = f"batch-{len(server.batches)}"
+                server.batches[batch_id] = {
+                    "request": request, "checks": 0, "output_file_id": None,
+                }
+                self._send(self._batch(batch_id, "validating"))
+            else:
+                self.send_error(404)
+
+        def do_GET(self):
+            if server.drop_polls:
+                # Hang up without answering
+                self.close_connection = True
+                return
+            if self.path.startswith('/v1/batches/'):
+                batch_id = self.path.rsplit('/', 1)[1]
+                state = server.batches[batch_id]
+                state['checks'] += 1
+                if state['checks'] < 2:
+                    self._send(self._batch(batch_id, "in_progress"))
+                    return
+                if state['output_file_id'] is None:
+                    state['output_file_id'] = self._run(state['request']['input_file_id'])
+                self._send(self._batch(batch_id, "completed", state['output_file_id']))
+            elif self.path.startswith('/v1/files/') and self.path.endswith('/content'):
+                file_id = self.path.split('/')[3]
+                self._send(server.files[file_id], 'application/octet-stream')
+            else:
+                self.send_error(404)
+
+        def _run(self, input_file_id):
+            lines = []
+            for line in server.files[input_file_id].decode().splitlines():
+                request = json.loads(line)
+                server.chat_requests.append(request)
+                content = server.respond(request['body'])
+                if content is None:
+                    lines.append(json.dumps({
+                        "id": f"req-{len(lines)}",
+                        "custom_id": request['custom_id'],
+                        "response": {"status_code": 500, "body": {}},
+                        "error": None,
+                    }))
+                    continue
+                lines.append(json.dumps({
+                    "id": f"req-{len(lines)}",
+                    "custom_id": request['custom_id'],
+                    "response": {"status_code": 200, "body": {
+                        "choices": [{"message": {
+                            "role": "assistant", "content": content,
+                        }}],
+                    }},
+                    "error": None,
+                }))
+            output_id = f"file-{len(server.files)}"
+            server.files[output_id] = "\n".join(lines).encode()
+            return output_id
+
+        def _batch(self, batch_id, status, output_file_id=None):
+            return {
+                "id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions",
+                "input_file_id": server.batches[batch_id]['request']['input_file_id'],
+                "completion_window": "24h", "created_at": 0, "status": status,
+                "output_file_id": output_file_id,
+            }
+
+        def log_message(self, format, *args):
+            pass
+
+    def echo_notes(body):
+        text = body['messages'][-1]['content']
+        lines = [line.split("]: ", 1)[-1] for line in text.splitlines()]
+        return json.dumps([
+            {"priority": "medium", "category": "fact", "content": line[2:].strip()}
+            for line in lines if line.startswith("- ")
+        ])
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.files = {}
+    server.batches = {}
+    server.chat_requests = []
+    server.respond = echo_notes
+    server.unauthorized = False
+    server.drop_polls = False
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _observer(server, **kwargs):
+    return Observer(api_key="test", base_url=server.base_url,
+                    clients=LLMClientRegistry(), **kwargs)
+
+
+class TestCollectMarkdownFiles:
+    def test_collects_recursively(self, temp_dir):
+        (temp_dir / "a.md").write_text("a")
+        (temp_dir / "sub").mkdir()
+        (temp_dir / "sub" / "b.markdown").write_text("b")
+        (temp_dir / "c.txt").write_text("c")
+
+        files = collect_markdown_files([str(temp_dir)])
+        assert [f.name for f in files] == ["a.md", "b.markdown"]
+
+        flat = collect_markdown_files([str(temp_dir)], recursive=False)
+        assert [f.name for f in flat] == ["a.md"]
+
+    def test_skips_oversized_and_missing(self, temp_dir):
+        (temp_dir / "big.md").write_text("x" * 100)
+        assert collect_markdown_files([str(temp_dir), str(temp_dir / "nope")],
+                                      max_file_size=10) == []
+
+
+class TestBatchBackfill:
+    def test_run_extracts_all_inputs_in_one_batch(self, batch_server):
+        backfill = BatchBackfill(_observer(batch_server), poll_interval=0.01)
+
+        result = backfill.run({
+            "a.md": "# A\n- Uses PostgreSQL\n",
+            "b.md": "# B\n- Deadline is Friday\n- Prefers dark mode\n",
+            "empty.md": "   ",
+        })
+
+        assert len(result.batch_ids) == 1
+        assert result.requests == 2
+        assert result.failed == 0
+        assert [o.content for o in result.observations["a.md"]] == ["Uses PostgreSQL"]
+        assert [o.content for o in result.observations["b.md"]] == [
+            "Deadline is Friday", "Prefers dark mode",
+        ]
+        assert result.observations["empty.md"] == []
+        assert result.total_observations == 3
+
+    def test_large_input_split_into_windows(self, batch_server):
+        observer = _observer(batch_server, window_tokens=50)
+        text = "".join(f"- fact number {i} about the project\n" for i in range(30))
+
+        result = BatchBackfill(observer, poll_interval=0.01).run({"big.md": text})
+
+        assert result.requests > 1
+        assert len(result.observations["big.md"]) == 30
+
+    def test_max_batch_requests_splits_batches(self, batch_server):
+        backfill = BatchBackfill(_observer(batch_server), poll_interval=0.01,
+                                 max_batch_requests=2)
+        result = backfill.run({f"{i}.md": f"- note {i}\n" for i in range(5)})
+
+        assert len(result.batch_ids) == 3
+        assert result.total_observations == 5
+
+    def test_cached_responses_skip_the_batch(self, batch_server, temp_dir):
+        cache = LLMResponseCache(str(temp_dir / "cache.sqlite"))
+        observer = _observer(batch_server, cache=cache)
+        inputs = {"a.md": "- cached fact\n"}
+
+        BatchBackfill(observer, poll_interval=0.01).run(inputs)
+        second = BatchBackfill(observer, poll_interval=0.01).run(inputs)
+
+        assert second.requests == 0
+        assert second.cached == 1
+        assert second.batch_ids == []
+        assert [o.content for o in second.observations["a.md"]] == ["cached fact"]
+        assert len(batch_server.chat_requests) == 1
+        cache.close()
+
+    def test_failed_request_fails_its_input(self, batch_server):
+        echo = batch_server.respond
+        batch_server.respond = lambda body: None if "broken" in json.dumps(body) else echo(body)
+        observer = _observer(batch_server, window_tokens=50)
+        text = "".join(f"- fact number {i} about the project\n" for i in range(30))
+
+        result = BatchBackfill(observer, poll_interval=0.01).run({
+            "a.md": "- Uses PostgreSQL\n",
+            "big.md": text + "- broken window\n",
+        })
+
+        assert result.failed == 1
+        assert result.failed_inputs == ["big.md"]
+        assert "big.md" not in result.observations
+        assert [o.content for o in result.observations["a.md"]] == ["Uses PostgreSQL"]
+
+    def test_malformed_response_not_cached(self, batch_server, temp_dir):
+        cache = LLMResponseCache(str(temp_dir / "cache.sqlite"))
+        batch_server.respond = lambda body: "not json"
+
+        result = BatchBackfill(_observer(batch_server, cache=cache), poll_interval=0.01).run(
+            {"a.md": "- fact\n"}
+        )
+
+        assert result.observations["a.md"] == []
+        assert cache.get_stats()['entries'] == 0
+        cache.close()
+
+    def test_timeout(self, batch_server):
+        backfill = BatchBackfill(_observer(batch_server), poll_interval=0.01, timeout=0)
+        with pytest.raises(BackfillError):
+            backfill.run({"a.md": "- fact\n"})
+
+    def test_auth_error_raised_as_backfill_error(self, batch_server):
+        batch_server.unauthorized = True
+        backfill = BatchBackfill(_observer(batch_server), poll_interval=0.01)
+        with pytest.raises(BackfillError, match="upload"):
+            backfill.run({"a.md": "- fact\n"})
+
+    def test_dropped_connection_raised_as_backfill_error(self, batch_server):
+        from openai import OpenAI
+
+        batch_server.drop_polls = True
+        client = OpenAI(api_key="test", base_url=batch_server.base_url, max_retries=0)
+        backfill = BatchBackfill(_observer(batch_server), client=client, poll_interval=0.01)
+        with pytest.raises(BackfillError, match="status check"):
+            backfill.run({"a.md": "- fact\n"})
+
+    def test_requires_openai_provider(self):
+        observer = Observer(provider="google", api_key="test")
+        with pytest.raises(BackfillError):
+            BatchBackfill(observer, client=object())
+
+
+class TestCreateBackfill:
+    def test_create_from_config(self, batch_server):
+        config = {'backfill': {'poll_interval': 1.5, 'max_batch_requests': 100}}
+        backfill = create_backfill(config, _observer(batch_server))
+        assert backfill.poll_interval == 1.5
+        assert backfill.max_batch_requests == 100
@@ -0,0 +1,137 @@
+"""Tests for lib/content_manifest.py"""
+
+import os
+import time
+import pytest
+
+from lib.content_manifest import ContentManifest, FileVersion, hash_file
+
+
+@pytest.fixture
+def manifest(temp_dir):
+    m = ContentManifest(str(temp_dir / "manifest.sqlite"))
+    yield m
+    m.close()
+
+
+class TestHashFile:
+    def test_same_content_same_hash(self, temp_dir):
+        a = temp_dir / "a.md"
+        b = temp_dir / "b.md"
+        a.write_text("hello")
+        b.write_text("hello")
+        assert hash_file(a) == hash_file(b)
+
+    def test_different_content_different_hash(self, temp_dir):
+        a = temp_dir / "a.md"
+        b = temp_dir / "b.md"
+        a.write_text("hello")
+        b.write_text("world")
+        assert hash_file(a) != hash_file(b)
+
+
+class TestContentManifest:
+    def test_unknown_file_is_changed(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        stat = f.stat()
+        version = manifest.digest_if_changed(f)
+        assert version == FileVersion(hash_file(f), stat.st_mtime_ns, stat.st_size)
+        assert not manifest.is_unchanged(f)
+
+    def test_record_keeps_stat_taken_before_hashing(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        version = manifest.digest_if_changed(f)
+
+        # Edited between the check and record(): must not look processed
+        f.write_text("edited!")
+        later = time.time() + 10
+        os.utime(f, (later, later))
+        manifest.record(f, version)
+
+        assert not manifest.is_unchanged(f)
+
+    def test_staged_version_recorded_on_commit(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.stage(f, manifest.digest_if_changed(f))
+
+        assert not manifest.is_unchanged(f)
+        assert manifest.get_stats()['staged'] == 1
+        assert manifest.commit(f)
+        assert not manifest.commit(f)
+        assert manifest.is_unchanged(f)
+
+    def test_discarded_version_not_recorded(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.stage(f, manifest.digest_if_changed(f))
+        manifest.discard(f)
+
+        assert not manifest.commit(f)
+        assert manifest.count() == 0
+        assert not manifest.is_unchanged(f)
+
+    def test_recorded_file_is_unchanged(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.record(f)
+
+        assert manifest.is_unchanged(f)
+        assert manifest.hashed == 1  # mtime/size pre-check, no re-hash
+
+    def test_touch_rehashes_once(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.record(f)
+
+        later = time.time() + 10
+        os.utime(f, (later, later))
+
+        assert manifest.is_unchanged(f)
+        assert manifest.is_unchanged(f)
+        assert manifest.hashed == 2
+
+    def test_edit_detected(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.record(f)
+
+        f.write_text("content, edited")
+        assert not manifest.is_unchanged(f)
+
+    def test_forget(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        manifest.record(f)
+        manifest.forget(f)
+
+        assert manifest.count() == 0
+        assert not manifest.is_unchanged(f)
+
+    def test_persists_across_instances(self, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        path = temp_dir / "manifest.sqlite"
+
+        first = ContentManifest(str(path))
+        first.record(f)
+        first.close()
+
+        second = ContentManifest(str(path))
+        assert second.is_unchanged(f)
+        second.close()
+
+    def test_get_stats(self, manifest, temp_dir):
+        f = temp_dir / "note.md"
+        f.write_text("content")
+        version = manifest.digest_if_changed(f)
+        manifest.record(f, version)
+        manifest.is_unchanged(f)
+
+        stats = manifest.get_stats()
+        assert stats['files'] == 1
+        assert stats['changed'] == 1
+        assert stats['unchanged'] == 1
+        assert stats['hashed'] == 1
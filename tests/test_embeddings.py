@@ -0,0 +1,228 @@
+"""Tests for lib/embeddings.py"""
+
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from lib.embeddings import (
+    DEFAULT_LOCAL_MODEL, DEFAULT_OPENAI_MODEL, CachedEmbeddingFunction, EmbeddingCache,
+    EmbeddingError, LazyBackend,
+    create_embedding_function, load_backend,
+)
+from lib.memory_store import EMBEDDING_MODEL_KEY, MemoryStore
+
+
+class FakeBackend:
+    """Deterministic 3-d vectors; records every batch it embeds"""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0] for t in texts]
+
+    @property
+    def embedded(self):
+        return [t for batch in self.batches for t in batch]
+
+
+class TestEmbeddingCache:
+    def test_roundtrip_and_persistence(self, temp_dir):
+        path = str(temp_dir / "emb.sqlite")
+        cache = EmbeddingCache(path)
+        cache.put_many({"k1": [0.5, -1.25, 3.0], "k2": [1.0, 2.0, 3.0]})
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        found = reopened.get_many(["k1", "k2", "missing"])
+        assert found == {"k1": [0.5, -1.25, 3.0], "k2": [1.0, 2.0, 3.0]}
+        assert reopened.count() == 2
+        reopened.close()
+
+    def test_lru_eviction(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb.sqlite"), max_entries=10)
+        cache.put_many({f"k{i}": [float(i)] for i in range(11)})
+        assert cache.count() == 9
+        cache.close()
+
+    def test_count_tracks_new_and_replaced_keys(self, temp_dir):
+        path = str(temp_dir / "emb.sqlite")
+        cache = EmbeddingCache(path)
+        cache.put_many({"k1": [1.0], "k2": [2.0]})
+        cache.put_many({"k2": [2.5], "k3": [3.0]})
+        assert cache.count() == 3
+        assert cache.get_many(["k2"]) == {"k2": [2.5]}
+        cache.close()
+
+        reopened = EmbeddingCache(path)
+        assert reopened.count() == 3
+        reopened.close()
+
+
+class TestCachedEmbeddingFunction:
+    def test_memory_cache_skips_backend(self):
+        backend = FakeBackend()
+        embed = CachedEmbeddingFunction(backend, "fake")
+
+        first = embed(["alpha", "beta"])
+        second = embed(["beta", "alpha"])
+
+        assert second == [first[1], first[0]]
+        assert backend.embedded == ["alpha", "beta"]
+        stats = embed.get_stats()
+        assert stats['memory_hits'] == 2
+        assert stats['misses'] == 2
+        assert stats['hit_rate'] == 0.5
+
+    def test_duplicates_embedded_once(self):
+        backend = FakeBackend()
+        embed = CachedEmbeddingFunction(backend, "fake")
+        vectors = embed(["same", "same", "other"])
+        assert vectors[0] == vectors[1]
+        assert backend.embedded == ["same", "other"]
+
+    def test_disk_cache_survives_restart(self, temp_dir):
+        path = str(temp_dir / "emb.sqlite")
+        backend = FakeBackend()
+        embed = CachedEmbeddingFunction(backend, "fake", disk_cache=EmbeddingCache(path))
+        vectors = embed(["persisted query"])
+        embed.close()
+
+        restarted = CachedEmbeddingFunction(backend, "fake", disk_cache=EmbeddingCache(path))
+        assert restarted(["persisted query"]) == vectors
+        assert len(backend.batches) == 1
+        assert restarted.get_stats()['disk_hits'] == 1
+        restarted.close()
+
+    def test_model_is_part_of_key(self, temp_dir):
+        cache = EmbeddingCache(str(temp_dir / "emb.sqlite"))
+        backend = FakeBackend()
+        CachedEmbeddingFunction(backend, "model-a", disk_cache=cache)(["text"])
+        CachedEmbeddingFunction(backend, "model-b", disk_cache=cache)(["text"])
+        assert len(backend.batches) == 2
+        cache.close()
+
+    def test_batches_on_thread_pool(self):
+        backend = FakeBackend()
+        embed = CachedEmbeddingFunction(backend, "fake", batch_size=4, workers=3)
+        texts = [f"text {i}" for i in range(10)]
+
+        vectors = embed(texts)
+
+        assert sorted(len(batch) for batch in backend.batches) == [2, 4, 4]
+        assert vectors == backend(texts)
+        assert embed.get_stats()['batches'] == 3
+        embed.close()
+
+    def test_lru_capacity(self):
+        backend = FakeBackend()
+        embed = CachedEmbeddingFunction(backend, "fake", memory_entries=2)
+        embed(["a", "b", "c"])
+        embed(["a"])
+        assert backend.embedded == ["a", "b", "c", "a"]
+
+    def test_backend_vector_count_mismatch(self):
+        embed = CachedEmbeddingFunction(lambda texts: [[1.0]], "broken")
+        with pytest.raises(EmbeddingError):
+            embed(["one", "two"])
+
+
+class TestBackends:
+    def test_unknown_provider(self):
+        with pytest.raises(EmbeddingError):
+            load_backend("nope")
+
+    def test_lazy_backend_loads_once(self):
+        loader = MagicMock(return_value=lambda texts: [[0.0] for _ in texts])
+        backend = LazyBackend(loader)
+        loader.assert_not_called()
+        backend(["a"])
+        backend(["b"])
+        loader.assert_called_once()
+
+
+class TestCreateEmbeddingFunction:
+    def test_defaults(self, temp_dir):
+        embed = create_embedding_function({'memory': {'dir': str(temp_dir)}})
+        assert embed.model_name == "default:"
+        assert embed.disk_cache.cache_path == (temp_dir / EmbeddingCache.CACHE_FILENAME).resolve()
+
+    def test_from_config(self):
+        config = {'memory': {'embeddings': {
+            'provider': 'local', 'model': 'all-MiniLM-L6-v2',
+            'disk_cache': False, 'batch_size': 16, 'workers': 4,
+        }}}
+        embed = create_embedding_function(config)
+        assert embed.model_name == "local:all-MiniLM-L6-v2"
+        assert embed.disk_cache is None
+        assert embed.batch_size == 16
+        # sentence-transformers encodes serially: no pool
+        assert embed.workers == 1
+
+    def test_default_model_resolved(self):
+        for provider, model in (('local', DEFAULT_LOCAL_MODEL), ('openai', DEFAULT_OPENAI_MODEL)):
+            implicit = create_embedding_function({'memory': {'embeddings': {'provider': provider}}})
+            explicit = create_embedding_function(
+                {'memory': {'embeddings': {'provider': provider, 'model': model}}}
+            )
+            assert implicit.model_name == explicit.model_name == f"{provider}:{model}"
+
+    def test_default_provider_ignores_model(self):
+        config = {'memory': {'embeddings': {'model': 'all-MiniLM-L6-v2'}}}
+        assert create_embedding_function(config).model_name == "default:"
+
+    def test_workers_for_parallel_backend(self):
+        config = {'memory': {'embeddings': {'provider': 'openai', 'workers': 4}}}
+        assert create_embedding_function(config).workers == 4
+
+    def test_disabled(self):
+        assert create_embedding_function({'memory': {'embeddings': {'enabled': False}}}) is None
+
+    def test_unknown_provider(self):
+        with pytest.raises(EmbeddingError):
+            create_embedding_function({'memory': {'embeddings': {'provider': 'nope'}}})
+
+
+class TestMemoryStoreIntegration:
+    def test_collection_uses_embedding_function(self, temp_dir):
+        embed = CachedEmbeddingFunction(FakeBackend(), "fake")
+        store = MemoryStore(persist_dir=str(temp_dir / "chroma"), embedding_function=embed)
+        store._client = MagicMock()
+        store._client.get_or_create_collection.return_value.metadata = {EMBEDDING_MODEL_KEY: "fake"}
+
+        store._collection = store._open_collection()
+
+        kwargs = store._client.get_or_create_collection.call_args.kwargs
+        assert kwargs['embedding_function'] is embed
+        assert kwargs['metadata'][EMBEDDING_MODEL_KEY] == "fake"
+
+    def _store_with_collection(self, temp_dir, stored_model, count):
+        embed = CachedEmbeddingFunction(FakeBackend(), "openai:")
+        store = MemoryStore(persist_dir=str(temp_dir / "chroma"), embedding_function=embed)
+        store._client = MagicMock()
+        collection = store._client.get_or_create_collection.return_value
+        collection.metadata = {"hnsw:space": "cosine"}
+        if stored_model is not None:
+            collection.metadata[EMBEDDING_MODEL_KEY] = stored_model
+        collection.count.return_value = count
+        return store
+
+    def test_other_embedding_model_refused(self, temp_dir):
+        store = self._store_with_collection(temp_dir, "local:", count=5)
+        with pytest.raises(EmbeddingError, match="local:"):
+            store._open_collection()
+        store._client.delete_collection.assert_not_called()
+
+    def test_legacy_collection_counts_as_default_model(self, temp_dir):
+        store = self._store_with_collection(temp_dir, None, count=5)
+        with pytest.raises(EmbeddingError, match="'default:'"):
+            store._open_collection()
+
+    def test_empty_collection_recreated_for_new_model(self, temp_dir):
+        store = self._store_with_collection(temp_dir, "local:", count=0)
+        store._open_collection()
+        store._client.delete_collection.assert_called_once_with("observations")
+        assert store._client.get_or_create_collection.call_count == 2
@@ -1,9 +1,23 @@
 """Tests for lib/error_handler.py"""
 
+import asyncio
 import time
 import pytest
+from email.utils import formatdate
+from types import SimpleNamespace
 
-from lib.error_handler import LLMRetryPolicy, RetryExhaustedError, with_retry
+from lib.error_handler import (
+    CircuitBreaker, CircuitOpenError, LLMRetryPolicy, RetryExhaustedError, RateLimiter,
+    create_rate_limiter, create_retry_policy, get_retry_after, is_rate_limit_error, with_retry,
+)
+
+
+class RateLimitError(Exception):
+    """Stand-in for an SDK 429 error carrying the HTTP response"""
+    def __init__(self, headers=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(status_code=429, headers=headers or {})
 
 
 class TestLLMRetryPolicy:
@@ -95,6 +109,273 @@ class TestLLMRetryPolicy:
         assert stats['success_rate'] > 0
 
 
+class TestRateLimiter:
+    def test_burst_available_immediately(self):
+        limiter = RateLimiter(requests_per_minute=600, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            assert limiter.acquire() is True
+        assert time.monotonic() - start < 0.05
+        assert limiter.total_waits == 0
+
+    def test_waits_for_refill(self):
+        limiter = RateLimiter(requests_per_minute=1200, burst=1)  # 20/s
+        limiter.acquire()
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start >= 0.04
+        assert limiter.total_waits == 1
+
+    def test_acquire_timeout(self):
+        limiter = RateLimiter(requests_per_minute=1, burst=1)
+        assert limiter.acquire() is True
+        assert limiter.acquire(timeout=0.01) is False
+
+    def test_get_stats(self):
+        limiter = RateLimiter(requests_per_minute=60)
+        limiter.acquire()
+        stats = limiter.get_stats()
+        assert stats['requests_per_minute'] == 60
+        assert stats['total_acquired'] == 1
+
+
+class TestAdaptiveRateLimiter:
+    def test_token_budget_limits_requests(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10, tokens_per_minute=600)  # 10 tok/s
+        assert limiter.acquire(tokens=600) is True
+        assert limiter.acquire(timeout=0.05, tokens=100) is False
+        assert limiter.get_stats()['total_tokens'] == 600
+
+    def test_oversized_request_clamped_to_capacity(self):
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=60)
+        assert limiter.acquire(timeout=0.01, tokens=10_000) is True
+
+    def test_throttle_halves_rate_and_success_recovers(self):
+        limiter = RateLimiter(requests_per_minute=120, min_rate_fraction=0.3, recovery_step=0.5)
+        limiter.record_throttle()
+        assert limiter.get_stats()['current_requests_per_minute'] == 60
+        limiter.record_throttle()
+        assert limiter.get_stats()['current_requests_per_minute'] == 36  # floor at 30%
+        limiter.record_success()
+        limiter.record_success()
+        assert limiter.get_stats()['current_requests_per_minute'] == 120
+        assert limiter.total_throttles == 2
+
+    def test_retry_after_pauses_all_callers(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10)
+        limiter.record_throttle(retry_after=0.1)
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    def test_retry_after_capped(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10, max_retry_after=0.1)
+        limiter.record_throttle(retry_after=86400)
+        start = time.monotonic()
+        limiter.acquire()
+        assert time.monotonic() - start < 1.0
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(requests_per_minute=1200, burst=1)
+
+        async def run():
+            await limiter.acquire_async()
+            return await limiter.acquire_async(timeout=0.2)
+
+        start = time.monotonic()
+        assert asyncio.run(run()) is True
+        assert time.monotonic() - start >= 0.04
+        assert limiter.total_waits == 1
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request() is False
+        assert breaker.retry_in() > 59
+        assert breaker.get_stats()['times_opened'] == 1
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # one probe at a time
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.times_opened == 2
+
+
+class TestProviderErrors:
+    def test_rate_limit_detection(self):
+        assert is_rate_limit_error(RateLimitError())
+        assert is_rate_limit_error(SimpleNamespace(status_code=429))
+        assert not is_rate_limit_error(ConnectionError("down"))
+
+    def test_retry_after_header_seconds(self):
+        assert get_retry_after(RateLimitError({'retry-after': '7'})) == 7.0
+        assert get_retry_after(RateLimitError({'Retry-After': '3'})) == 3.0
+
+    def test_retry_after_ms_header(self):
+        assert get_retry_after(RateLimitError({'retry-after-ms': '250'})) == 0.25
+
+    def test_retry_after_http_date(self):
+        delay = get_retry_after(RateLimitError({'retry-after': formatdate(time.time() + 30)}))
+        assert 25 < delay <= 30
+
+    def test_retry_after_missing_or_invalid(self):
+        assert get_retry_after(RateLimitError()) is None
+        assert get_retry_after(RateLimitError({'retry-after': 'soon'})) is None
+        assert get_retry_after(ValueError("x")) is None
+
+
+class TestPolicyWithLimiterAndBreaker:
+    def test_throttle_honours_retry_after(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10)
+        policy = LLMRetryPolicy(max_attempts=2, base_delay=5.0, rate_limiter=limiter)
+        calls = []
+
+        def func():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise RateLimitError({'retry-after': '0.1'})
+            return "ok"
+
+        assert policy.call_with_retry(func) == "ok"
+        assert 0.09 <= calls[1] - calls[0] < 1.0  # Retry-After, not the 5s backoff
+        stats = policy.get_stats()
+        assert stats['total_throttled'] == 1
+        assert stats['rate_limiter']['total_throttles'] == 1
+        assert stats['rate_limiter']['total_acquired'] == 2
+
+    def test_retry_after_capped_at_max_delay(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10)
+        policy = LLMRetryPolicy(max_attempts=2, base_delay=0.05, max_delay=0.1,
+                                jitter=0, rate_limiter=limiter)
+        calls = []
+
+        def func():
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise RateLimitError({'retry-after': '86400'})
+            return "ok"
+
+        assert policy.call_with_retry(func) == "ok"
+        assert calls[1] - calls[0] < 1.0
+
+    def test_tokens_charged_per_attempt(self):
+        limiter = RateLimiter(requests_per_minute=6000, burst=10, tokens_per_minute=10_000)
+        policy = LLMRetryPolicy(rate_limiter=limiter)
+        policy.call_with_retry(lambda text: text, "hello", tokens=120)
+        assert limiter.total_tokens == 120
+
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        policy = LLMRetryPolicy(max_attempts=5, base_delay=0.2, circuit_breaker=breaker)
+        calls = [0]
+
+        def down():
+            calls[0] += 1
+            raise ConnectionError("outage")
+
+        start = time.monotonic()
+        with pytest.raises(CircuitOpenError):
+            policy.call_with_retry(down)
+        with pytest.raises(CircuitOpenError):
+            policy.call_with_retry(down)
+        assert time.monotonic() - start < 0.5  # one backoff, then no waiting
+        assert calls[0] == 2
+        assert policy.get_stats()['total_rejected'] == 2
+        assert policy.get_stats()['circuit_breaker']['state'] == CircuitBreaker.OPEN
+
+    def test_throttling_does_not_open_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        policy = LLMRetryPolicy(max_attempts=2, base_delay=0.01, circuit_breaker=breaker)
+
+        with pytest.raises(RetryExhaustedError):
+            policy.call_with_retry(self._raise, RateLimitError({'retry-after': '0'}))
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_non_retryable_error_releases_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        policy = LLMRetryPolicy(circuit_breaker=breaker, retryable_exceptions=(ConnectionError,))
+
+        with pytest.raises(ValueError):
+            policy.call_with_retry(self._raise, ValueError("bad input"))
+        assert breaker.allow_request() is True
+
+    def test_async_path(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        limiter = RateLimiter(requests_per_minute=6000, burst=10)
+        policy = LLMRetryPolicy(base_delay=0.01, rate_limiter=limiter, circuit_breaker=breaker)
+        attempts = [0]
+
+        async def flaky():
+            attempts[0] += 1
+            if attempts[0] < 2:
+                raise ConnectionError("blip")
+            return "ok"
+
+        assert asyncio.run(policy.call_with_retry_async(flaky, tokens=5)) == "ok"
+        assert breaker.get_stats()['consecutive_failures'] == 0
+        assert limiter.total_acquired == 2
+
+    def test_jitter_bounds(self):
+        policy = LLMRetryPolicy(base_delay=1.0, jitter=0.5)
+        delays = [policy._jittered_delay(1) for _ in range(50)]
+        assert all(0.5 <= d <= 1.5 for d in delays)
+        assert len(set(delays)) > 1
+
+    @staticmethod
+    def _raise(error):
+        raise error
+
+
+class TestCreateRetryPolicy:
+    def test_defaults(self):
+        policy = create_retry_policy({}, rate_limiter=create_rate_limiter({}))
+        assert policy.max_attempts == 3
+        assert policy.circuit_breaker is not None
+        assert policy.rate_limiter.requests_per_minute == 60
+
+    def test_from_config(self):
+        config = {'llm': {
+            'requests_per_minute': 0,
+            'tokens_per_minute': 1000,
+            'retry': {'max_attempts': 5, 'jitter': 0},
+            'circuit_breaker': {'enabled': False},
+        }}
+        policy = create_retry_policy(config, rate_limiter=create_rate_limiter(config))
+        assert policy.max_attempts == 5
+        assert policy.jitter == 0
+        assert policy.circuit_breaker is None
+        assert policy.rate_limiter is None
+        limiter = create_rate_limiter({'llm': {'tokens_per_minute': 1000}})
+        assert limiter.tokens_per_minute == 1000
+
+
 class TestWithRetryDecorator:
     def test_decorator_success(self):
         @with_retry(max_attempts=2, base_delay=0.01)
@@ -10,6 +10,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 from lib.file_watcher import (
     MarkdownFileHandler,
+    EventCoalescer,
     FileWatcher
 )
 
@@ -299,3 +300,118 @@ class TestFileWatcherIntegration:
 
         # Callback should have been called
         assert callback.called
+
+
+class TestEventCoalescer:
+    """Tests for EventCoalescer class"""
+
+    def test_burst_emits_single_event(self, mock_callback):
+        """Several events for one path produce one callback"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=0.1)
+        coalescer.start()
+        path = Path('/notes/a.md')
+        for _ in range(5):
+            coalescer.submit(path, event_type='modified')
+        time.sleep(0.4)
+        coalescer.stop()
+
+        mock_callback.assert_called_once_with(path, event_type='modified')
+        stats = coalescer.get_stats()
+        assert stats['received'] == 5
+        assert stats['coalesced'] == 4
+        assert stats['emitted'] == 1
+
+    def test_created_then_modified_stays_created(self, mock_callback):
+        """A new file that is then modified is reported as created"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=0.05)
+        coalescer.start()
+        path = Path('/notes/new.md')
+        coalescer.submit(path, event_type='created')
+        coalescer.submit(path, event_type='modified')
+        time.sleep(0.3)
+        coalescer.stop()
+
+        mock_callback.assert_called_once_with(path, event_type='created')
+
+    def test_waits_for_quiet_period(self, mock_callback):
+        """Nothing is emitted while the file keeps changing"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=0.2)
+        coalescer.start()
+        path = Path('/notes/a.md')
+        for _ in range(4):
+            coalescer.submit(path)
+            time.sleep(0.05)
+        assert not mock_callback.called
+        time.sleep(0.4)
+        coalescer.stop()
+        assert mock_callback.call_count == 1
+
+    def test_rate_cap_defers_events(self, mock_callback):
+        """At most max_events_per_second events are emitted per second"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=0.0, max_events_per_second=3)
+        coalescer.start()
+        for i in range(6):
+            coalescer.submit(Path(f'/notes/{i}.md'))
+        time.sleep(0.3)
+        assert mock_callback.call_count == 3
+        time.sleep(1.0)
+        coalescer.stop()
+        assert mock_callback.call_count == 6
+
+    def test_max_pending_drops_new_paths(self, mock_callback):
+        """Events for new paths are dropped when the pending set is full"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=60, max_pending=2)
+        for i in range(3):
+            coalescer.submit(Path(f'/notes/{i}.md'))
+        assert coalescer.get_stats()['dropped'] == 1
+        assert coalescer.get_stats()['pending'] == 2
+
+    def test_stop_flushes_pending(self, mock_callback):
+        """Pending events are emitted on stop"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=60)
+        coalescer.start()
+        coalescer.submit(Path('/notes/a.md'))
+        coalescer.stop(flush=True)
+        assert mock_callback.call_count == 1
+
+    def test_stop_without_flush_drops_pending(self, mock_callback):
+        """Pending events are counted as dropped when not flushed"""
+        coalescer = EventCoalescer(mock_callback, quiet_period=60)
+        coalescer.start()
+        coalescer.submit(Path('/notes/a.md'))
+        coalescer.stop(flush=False)
+        assert not mock_callback.called
+        assert coalescer.get_stats()['dropped'] == 1
+
+
+class TestFileWatcherCoalescing:
+    """Integration tests for FileWatcher with coalescing enabled"""
+
+    def test_no_coalescer_by_default(self, temp_watch_dir, mock_callback):
+        """Coalescing is opt-in"""
+        watcher = FileWatcher(watch_dirs=[str(temp_watch_dir)], callback=mock_callback)
+        assert watcher.coalescer is None
+        assert watcher.get_stats() == {'coalescing': False}
+
+    def test_repeated_saves_emit_once(self, temp_watch_dir):
+        """Several writes to one file produce a single callback"""
+        callback = Mock()
+        watcher = FileWatcher(
+            watch_dirs=[str(temp_watch_dir)],
+            callback=callback,
+            quiet_period=0.3
+        )
+        watcher.start()
+
+        test_file = temp_watch_dir / 'test.md'
+        for i in range(3):
+            test_file.write_text(f'# Revision {i}')
+            time.sleep(0.05)
+
+        time.sleep(1.0)
+        watcher.stop()
+
+        assert callback.call_count == 1
+        stats = watcher.get_stats()
+        assert stats['coalescing'] is True
+        assert stats['coalesced'] >= 1
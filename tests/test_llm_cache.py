@@ -0,0 +1,170 @@
+"""Tests for lib/llm_cache.py"""
+
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch
+
+from lib.llm_cache import LLMResponseCache, create_llm_cache, normalize_input, prompt_version
+from lib.observer import ObservationError, Observer
+from lib.reflector import Reflector
+
+
+@pytest.fixture
+def cache(temp_dir):
+    c = LLMResponseCache(str(temp_dir / "cache.sqlite"))
+    yield c
+    c.close()
+
+
+class TestKeys:
+    def test_normalize_input(self):
+        assert normalize_input("  a\n\n b\tc  ") == "a b c"
+
+    def test_key_ignores_whitespace(self):
+        a = LLMResponseCache.make_key("openai", "m", "v1", "hello  world")
+        b = LLMResponseCache.make_key("openai", "m", "v1", "hello\nworld\n")
+        assert a == b
+
+    def test_key_depends_on_every_part(self):
+        base = LLMResponseCache.make_key("openai", "m", "v1", "text")
+        assert base != LLMResponseCache.make_key("google", "m", "v1", "text")
+        assert base != LLMResponseCache.make_key("openai", "m2", "v1", "text")
+        assert base != LLMResponseCache.make_key("openai", "m", "v2", "text")
+        assert base != LLMResponseCache.make_key("openai", "m", "v1", "text2")
+
+    def test_prompt_version_changes_with_prompt(self):
+        assert prompt_version("prompt a") != prompt_version("prompt b")
+        assert prompt_version("prompt a") == prompt_version("prompt a")
+
+
+class TestLLMResponseCache:
+    def test_miss_then_hit(self, cache):
+        assert cache.get("k") is None
+        cache.put("k", "response")
+        assert cache.get("k") == "response"
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_ttl_expiry(self, temp_dir):
+        cache = LLMResponseCache(str(temp_dir / "cache.sqlite"), ttl_seconds=10)
+        cache.put("k", "response")
+        with patch('lib.llm_cache.time.time', return_value=time.time() + 60):
+            assert cache.get("k") is None
+        assert cache.get_stats()['entries'] == 0
+        cache.close()
+
+    def test_lru_eviction(self, temp_dir):
+        cache = LLMResponseCache(str(temp_dir / "cache.sqlite"), max_entries=10)
+        base = time.time() - 100
+        for i in range(10):
+            with patch('lib.llm_cache.time.time', return_value=base + i):
+                cache.put(f"k{i}", "r")
+        with patch('lib.llm_cache.time.time', return_value=base + 50):
+            cache.get("k0")  # recently used, survives
+            cache.put("k10", "r")
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 9
+        assert stats['evictions'] == 2
+        assert cache.get("k0") == "r"
+        assert cache.get("k1") is None
+        cache.close()
+
+    def test_persists_across_instances(self, temp_dir):
+        path = str(temp_dir / "cache.sqlite")
+        first = LLMResponseCache(path)
+        first.put("k", "response")
+        first.close()
+
+        second = LLMResponseCache(path)
+        assert second.get("k") == "response"
+        assert second.get_stats()['entries'] == 1
+        second.close()
+
+    def test_clear(self, cache):
+        cache.put("k", "response")
+        cache.clear()
+        assert cache.get("k") is None
+        assert cache.get_stats()['entries'] == 0
+
+
+class TestAgentCaching:
+    def test_observer_second_call_served_from_cache(self, cache):
+        obs = Observer(api_key="test", cache=cache)
+        response = json.dumps([{"priority": "high", "category": "fact", "content": "Cached"}])
+
+        with patch.object(obs, '_call_llm', return_value=response) as mock_llm:
+            first = obs.observe([{"role": "user", "content": "same input"}])
+            second = obs.observe([{"role": "user", "content": "same   input"}])
+
+        assert mock_llm.call_count == 1
+        assert [o.content for o in first] == [o.content for o in second] == ["Cached"]
+
+    def test_observer_failure_not_cached(self, cache):
+        obs = Observer(api_key="test", cache=cache)
+        with patch.object(obs, '_call_llm', side_effect=RuntimeError("down")):
+            with pytest.raises(ObservationError):
+                obs.observe([{"role": "user", "content": "input"}])
+        assert cache.get_stats()['entries'] == 0
+
+    def test_observer_malformed_response_not_cached(self, cache):
+        obs = Observer(api_key="test", cache=cache)
+        with patch.object(obs, '_call_llm', return_value="Sorry, I cannot help") as mock_llm:
+            assert obs.observe([{"role": "user", "content": "input"}]) == []
+            assert obs.observe([{"role": "user", "content": "input"}]) == []
+
+        assert mock_llm.call_count == 2
+        assert cache.get_stats()['entries'] == 0
+
+    def test_observer_empty_list_cached(self, cache):
+        obs = Observer(api_key="test", cache=cache)
+        with patch.object(obs, '_call_llm', return_value="[]"):
+            obs.observe([{"role": "user", "content": "input"}])
+        assert cache.get_stats()['entries'] == 1
+
+    def test_observer_async_malformed_response_not_cached(self, cache):
+        obs = Observer(api_key="test", cache=cache)
+        with patch.object(obs, '_call_llm_async', return_value="not json"):
+            assert asyncio.run(obs.observe_async([{"role": "user", "content": "input"}])) == []
+        assert cache.get_stats()['entries'] == 0
+
+    def test_reflector_empty_response_not_cached(self, cache):
+        r = Reflector(api_key="test", cache=cache)
+        with patch.object(r, '_call_llm', return_value="  \n") as mock_llm:
+            r._call_llm_cached("- a\n- b", level=1)
+            r._call_llm_cached("- a\n- b", level=1)
+
+        assert mock_llm.call_count == 2
+        assert cache.get_stats()['entries'] == 0
+
+    def test_reflector_async_empty_response_not_cached(self, cache):
+        r = Reflector(api_key="test", cache=cache)
+        with patch.object(r, '_call_llm_async', return_value=""):
+            asyncio.run(r._call_llm_cached_async("- a\n- b", level=1))
+        assert cache.get_stats()['entries'] == 0
+
+    def test_reflector_cache_keyed_by_level(self, cache):
+        r = Reflector(api_key="test", cache=cache)
+        with patch.object(r, '_call_llm', return_value="- short") as mock_llm:
+            r.reflect("- a\n- b", level=1)
+            r.reflect("- a\n- b", level=1)
+            r.reflect("- a\n- b", level=2)
+
+        assert mock_llm.call_count == 2
+
+
+class TestCreateLLMCache:
+    def test_default_path_in_memory_dir(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir / "cfg_a")}}
+        cache = create_llm_cache(config)
+        assert cache.cache_path == (temp_dir / "cfg_a" / LLMResponseCache.CACHE_FILENAME).resolve()
+        assert create_llm_cache(config) is cache
+
+    def test_disabled(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir)}, 'llm': {'cache': {'enabled': False}}}
+        assert create_llm_cache(config) is None
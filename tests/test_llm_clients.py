@@ -0,0 +1,127 @@
+"""Tests for lib/llm_clients.py"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from lib.llm_clients import LLMClientRegistry, LoopSemaphore, get_client_registry
+from lib.observer import Observer
+from lib.reflector import Reflector
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+
+class TestLLMClientRegistry:
+    def test_openai_client_reused(self):
+        registry = LLMClientRegistry()
+        first = registry.get_openai("key")
+        second = registry.get_openai("key")
+
+        assert first is second
+        assert registry.get_stats()['created'] == 1
+        assert registry.get_stats()['reused'] == 1
+        registry.close()
+
+    def test_openai_client_per_key_and_endpoint(self):
+        registry = LLMClientRegistry()
+        a = registry.get_openai("key-a")
+        b = registry.get_openai("key-b")
+        c = registry.get_openai("key-a", base_url="http://localhost:9/v1")
+
+        assert len({id(a), id(b), id(c)}) == 3
+        assert registry.get_stats()['openai_clients'] == 3
+        registry.close()
+
+    def test_close_drops_clients(self):
+        registry = LLMClientRegistry()
+        first = registry.get_openai("key")
+        registry.close()
+
+        assert registry.get_stats()['openai_clients'] == 0
+        assert registry.get_openai("key") is not first
+        registry.close()
+
+    def test_google_configured_once_per_key(self):
+        registry = LLMClientRegistry()
+        genai = MagicMock()
+        with patch.dict('sys.modules', {'google': MagicMock(generativeai=genai),
+                                        'google.generativeai': genai}):
+            first = registry.get_google_model("key", "gemini")
+            second = registry.get_google_model("key", "gemini")
+
+        assert first is second
+        genai.configure.assert_called_once_with(api_key="key")
+        assert genai.GenerativeModel.call_count == 1
+
+    def test_async_client_per_event_loop(self):
+        registry = LLMClientRegistry()
+
+        async def get_twice():
+            first = registry.get_async_openai("key")
+            second = registry.get_async_openai("key")
+            await registry.aclose()
+            return first, second
+
+        a1, a2 = asyncio.run(get_twice())
+        b1, _ = asyncio.run(get_twice())
+
+        assert a1 is a2
+        assert b1 is not a1
+
+    def test_shared_registry_is_singleton(self):
+        assert get_client_registry() is get_client_registry()
+
+
+class TestLoopSemaphore:
+    def test_limits_concurrency(self):
+        semaphore = LoopSemaphore(2)
+        active = 0
+        peak = 0
+
+        async def task():
+            nonlocal active, peak
+            async with semaphore:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        async def run():
+            await asyncio.gather(*(task() for _ in range(10)))
+
+        asyncio.run(run())
+        asyncio.run(run())  # usable from a second event loop
+        assert peak == 2
+
+
+class TestPooledCalls:
+    def test_observer_reuses_connection(self, mock_openai_server):
+        mock_openai_server.response_content = json.dumps(
+            [{"priority": "high", "category": "fact", "content": "Pooled"}]
+        )
+        registry = LLMClientRegistry()
+        obs = Observer(api_key="test", base_url=mock_openai_server.base_url, clients=registry)
+
+        for _ in range(5):
+            results = obs.observe([{"role": "user", "content": "hello"}])
+            assert [o.content for o in results] == ["Pooled"]
+
+        assert len(mock_openai_server.requests) == 5
+        assert len(mock_openai_server.connections) == 1
+        assert registry.get_stats()['created'] == 1
+        registry.close()
+
+    def test_observer_and_reflector_share_client(self, mock_openai_server):
+        mock_openai_server.response_content = "compressed"
+        registry = LLMClientRegistry()
+        obs = Observer(api_key="test", base_url=mock_openai_server.base_url, clients=registry)
+        ref = Reflector(api_key="test", base_url=mock_openai_server.base_url, clients=registry)
+
+        obs.observe([{"role": "user", "content": "hello"}])
+        ref.reflect("- observation one\n- observation two")
+
+        assert registry.get_stats()['created'] == 1
+        assert len(mock_openai_server.connections) == 1
+        registry.close()
@@ -1,10 +1,14 @@
 """Tests for lib/memory_merger.py"""
 
+import os
+import random
+import time
 import pytest
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
-from lib.memory_merger import MemoryMerger, estimate_tokens, create_merger
+from lib.memory_merger import MemoryMerger, estimate_tokens, count_words, create_merger
 from lib.observer import Observation
 
 
@@ -159,6 +163,154 @@ class TestMemoryMerger:
         assert token_count < 200  # reasonable bound given small max_tokens
 
 
+class TestResidentSectionModel:
+    @staticmethod
+    def _obs(i, category="fact"):
+        return Observation(
+            id=f"obs_{i:03d}",
+            timestamp=datetime.now(),
+            priority="medium",
+            category=category,
+            content=f"Observation {i}",
+        )
+
+    def test_file_parsed_once_for_many_updates(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        with patch.object(merger, '_parse_file', wraps=merger._parse_file) as parse:
+            merger.add_observations([self._obs(i) for i in range(5)])
+            merger.add_entry("Completed Tasks", "- Done")
+            merger.add_context("Context")
+            merger.clear_section("Completed Tasks")
+        assert parse.call_count == 1
+
+    def test_external_change_is_reparsed(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_entry("Observations Log", "- Ours")
+
+        other = MemoryMerger(str(memory_dir))
+        other.add_entry("Observations Log", "- Theirs")
+        stat = merger.memory_file.stat()
+        os.utime(merger.memory_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        sections = merger.load()
+        assert sections["Observations Log"] == ["- Theirs", "- Ours"]
+
+    def test_running_word_counts_match_content(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_observations([self._obs(i) for i in range(3)])
+        merger.add_entry("Critical Decisions", "- Use SQLite for the index")
+        merger.clear_section("Observations Log")
+
+        sections = merger.load()
+        for name, lines in sections.items():
+            assert merger._section_words[name] == sum(count_words(l) for l in lines)
+
+    def test_debounced_flush(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_delay=0.2)
+        merger.add_entry("Observations Log", "- Pending entry")
+        assert not merger.memory_file.exists()
+
+        time.sleep(0.5)
+        assert "Pending entry" in merger.memory_file.read_text()
+
+    def test_flush_writes_pending_changes(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_delay=60)
+        merger.add_entry("Observations Log", "- Pending entry")
+        merger.flush()
+        assert "Pending entry" in merger.memory_file.read_text()
+        assert merger._flush_timer is None
+
+    def test_token_count_includes_pending_changes(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), flush_delay=60)
+        merger.add_entry("Observations Log", "- " + "word " * 100)
+        assert merger.get_token_count() > 100
+
+    def test_atomic_write_leaves_no_temp_files(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_entry("Observations Log", "- Entry")
+        assert [p.name for p in memory_dir.iterdir()] == ["active_memory.md"]
+
+    def test_atomic_write_keeps_file_mode(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir))
+        merger.add_entry("Observations Log", "- Entry")
+        assert merger.memory_file.stat().st_mode & 0o777 == 0o644
+
+        os.chmod(merger.memory_file, 0o640)
+        merger.add_entry("Observations Log", "- Another entry")
+        assert merger.memory_file.stat().st_mode & 0o777 == 0o640
+
+
+def _reference_trim(sections, max_tokens):
+    """Trimming loop as originally implemented (one line per iteration)"""
+    def total(secs):
+        text = ""
+        for lines in secs.values():
+            text += '\n'.join(lines) + '\n'
+        return estimate_tokens(text)
+
+    while total(sections) > max_tokens:
+        if sections["Observations Log"]:
+            sections["Observations Log"].pop()
+            continue
+        if sections["Completed Tasks"]:
+            sections["Completed Tasks"].pop()
+            continue
+        for name in reversed(MemoryMerger.SECTIONS):
+            if sections[name]:
+                sections[name].pop()
+                break
+        else:
+            break
+
+
+class TestTrimToFit:
+    @staticmethod
+    def _merger_with(memory_dir, sections, max_tokens):
+        # Save without a limit, then tighten it so only _trim_to_fit trims
+        merger = MemoryMerger(str(memory_dir), max_tokens=10 ** 6)
+        merger.save(sections)
+        merger.max_tokens = max_tokens
+        return merger
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_reference_order(self, memory_dir, seed):
+        rng = random.Random(seed)
+        sections = {
+            name: [
+                "- " + " ".join("w" for _ in range(rng.randint(1, 12)))
+                for _ in range(rng.randint(0, 15))
+            ]
+            for name in MemoryMerger.SECTIONS
+        }
+        max_tokens = rng.randint(0, 300)
+
+        expected = {k: list(v) for k, v in sections.items()}
+        _reference_trim(expected, max_tokens)
+
+        merger = self._merger_with(memory_dir, sections, max_tokens)
+        merger._trim_to_fit()
+
+        assert merger._sections == expected
+        for name in MemoryMerger.SECTIONS:
+            assert merger._section_words[name] == sum(merger._line_words[name])
+
+    def test_observations_log_trimmed_first(self, memory_dir):
+        sections = {s: [] for s in MemoryMerger.SECTIONS}
+        sections["Observations Log"] = ["- new fact one", "- old fact two"]
+        sections["Critical Decisions"] = ["- keep this decision"]
+        merger = self._merger_with(memory_dir, sections, max_tokens=10)
+
+        removed = merger._trim_to_fit()
+        assert removed == 1
+        assert merger._sections["Observations Log"] == ["- new fact one"]
+        assert merger._sections["Critical Decisions"] == ["- keep this decision"]
+
+    def test_max_words(self, memory_dir):
+        merger = MemoryMerger(str(memory_dir), max_tokens=50)
+        words = merger._max_words()
+        assert int(words * 1.3) <= 50 < int((words + 1) * 1.3)
+
+
 class TestCreateMerger:
     def test_create_from_config(self, temp_dir):
         config = {
@@ -169,6 +321,7 @@ class TestCreateMerger:
         }
         merger = create_merger(config)
         assert merger.max_tokens == 20000
+        assert merger.flush_delay == 1.0
 
     def test_create_with_defaults(self, temp_dir):
         merger = create_merger({})
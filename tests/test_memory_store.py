@@ -0,0 +1,280 @@
+"""Tests for lib/memory_store.py"""
+
+import threading
+import time
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from lib.memory_store import MemoryStore, create_memory_store
+from lib.observer import Observation
+
+
+def _store(temp_dir, **kwargs):
+    """MemoryStore with a mocked ChromaDB collection"""
+    store = MemoryStore(persist_dir=str(temp_dir / "chroma"), **kwargs)
+    store._collection = MagicMock()
+    store._collection.count.return_value = 0
+    store._collection.metadata = {}
+    return store
+
+
+def _obs(i, content=None):
+    return Observation(
+        id=f"obs-{i}", priority="medium", category="fact",
+        content=content or f"fact {i}", timestamp=datetime(2026, 1, 1),
+    )
+
+
+def _upserted_ids(store):
+    return [call.kwargs['ids'] for call in store._collection.upsert.call_args_list]
+
+
+class TestWriteThrough:
+    def test_buffer_disabled_upserts_immediately(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store.add_observation("a", "content", {"when": datetime(2026, 1, 1), "tags": ["x"]})
+
+        call = store._collection.upsert.call_args
+        assert call.kwargs['ids'] == ["a"]
+        assert call.kwargs['metadatas'] == [{"when": "2026-01-01T00:00:00", "tags": "['x']"}]
+        assert store.pending() == 0
+
+
+class TestWriteBehindBuffer:
+    def test_writes_are_buffered(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        assert store.add_observations([_obs(1), _obs(2)]) == 2
+
+        assert store.pending() == 2
+        store._collection.upsert.assert_not_called()
+        store.close()
+
+    def test_flush_on_size(self, temp_dir):
+        store = _store(temp_dir, buffer_size=5, flush_interval=60)
+        for i in range(3):
+            store.add_observations([_obs(2 * i), _obs(2 * i + 1)])
+
+        deadline = time.monotonic() + 2
+        while store.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert store.pending() == 0
+        assert _upserted_ids(store) == [[f"obs-{i}" for i in range(6)]]
+        store.close()
+
+    def test_flush_on_interval(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=0.05)
+        store.add_observations([_obs(1)])
+        time.sleep(0.3)
+
+        assert store.pending() == 0
+        assert _upserted_ids(store) == [["obs-1"]]
+        store.close()
+
+    def test_latest_write_per_id_wins(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store.add_observations([_obs(1, "old")])
+        store.add_observations([_obs(1, "new")])
+
+        assert store.flush() == 1
+        assert store._collection.upsert.call_args.kwargs['documents'] == ["new"]
+        store.close()
+
+    def test_close_flushes_and_stops_thread(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store.add_observations([_obs(1), _obs(2)])
+        flusher = store._flusher
+
+        store.close()
+
+        assert store.pending() == 0
+        assert _upserted_ids(store) == [["obs-1", "obs-2"]]
+        assert not flusher.is_alive()
+
+        # Writes after close go straight through
+        store.add_observations([_obs(3)])
+        assert _upserted_ids(store)[-1] == ["obs-3"]
+
+    def test_reads_flush_first(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store.add_observations([_obs(1)])
+        store._collection.get.return_value = {'ids': ['obs-1'], 'documents': ['fact 1'], 'metadatas': [{}]}
+
+        assert store.get("obs-1")['content'] == "fact 1"
+        assert _upserted_ids(store) == [["obs-1"]]
+        store.close()
+
+    def test_delete_drops_pending_entry(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store.add_observations([_obs(1), _obs(2)])
+        store.delete("obs-1")
+        store.close()
+
+        assert _upserted_ids(store) == [["obs-2"]]
+        store._collection.delete.assert_called_once_with(ids=["obs-1"])
+
+    def test_failed_flush_requeues(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store._collection.upsert.side_effect = [RuntimeError("disk full"), None]
+        store.add_observations([_obs(1)])
+
+        with pytest.raises(RuntimeError):
+            store.flush()
+        assert store.pending() == 1
+        assert store.flush() == 1
+        assert store.get_stats()['flush_errors'] == 1
+        store.close()
+
+    def test_concurrent_writers(self, temp_dir):
+        store = _store(temp_dir, buffer_size=50, flush_interval=0.02)
+
+        def writer(start):
+            for i in range(start, start + 100):
+                store.add_observations([_obs(i)])
+
+        threads = [threading.Thread(target=writer, args=(n * 100,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        store.close()
+
+        written = [obs_id for ids in _upserted_ids(store) for obs_id in ids]
+        assert sorted(written) == sorted(f"obs-{i}" for i in range(400))
+
+    def test_get_stats(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store.add_observations([_obs(1), _obs(2), _obs(3)])
+        store.flush()
+        store.add_observations([_obs(4)])
+        store.flush()
+
+        stats = store.get_stats()
+        assert stats['flushes'] == 2
+        assert stats['flushed'] == 4
+        assert stats['avg_batch_size'] == 2.0
+        assert stats['max_batch_size'] == 3
+        assert stats['avg_flush_ms'] >= 0
+        assert stats['pending'] == 0
+        store.close()
+
+
+class TestCachedCount:
+    def _query_result(self):
+        return {'ids': [['obs-1']], 'documents': [['fact 1']], 'metadatas': [[{}]], 'distances': [[0.1]]}
+
+    def test_count_cached_until_next_write(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._collection.count.return_value = 7
+
+        assert store.count() == 7
+        assert store.count() == 7
+        assert store._collection.count.call_count == 1
+
+        store.add_observations([_obs(1)])
+        store._collection.count.return_value = 8
+        assert store.count() == 8
+        assert store._collection.count.call_count == 2
+
+    def test_search_skips_count_when_known(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._collection.count.return_value = 10
+        store._collection.query.return_value = self._query_result()
+
+        for _ in range(5):
+            store.search("fact", n_results=3)
+
+        assert store._collection.count.call_count == 1
+        assert store._collection.query.call_args.kwargs['n_results'] == 3
+        assert store.get_stats()['count_skipped'] == 4
+
+    def test_search_after_batch_write_uses_floor(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._collection.query.return_value = self._query_result()
+        store.add_observations([_obs(i) for i in range(10)])
+
+        store.search("fact", n_results=5)
+        store._collection.count.assert_not_called()
+
+    def test_small_collection_clamps_n_results(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._collection.count.return_value = 2
+        store._collection.query.return_value = self._query_result()
+
+        store.search("fact", n_results=5)
+        assert store._collection.query.call_args.kwargs['n_results'] == 2
+
+    def test_empty_store_skips_query(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        assert store.search("anything") == []
+        store._collection.query.assert_not_called()
+
+    def test_search_many_single_query_call(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._collection.count.return_value = 10
+        store._collection.query.return_value = {
+            'ids': [['obs-1'], ['obs-2', 'obs-3']],
+            'documents': [['fact 1'], ['fact 2', 'fact 3']],
+            'metadatas': [[{}], [{}, {}]],
+            'distances': [[0.1], [0.2, 0.3]],
+        }
+
+        results = store.search_many(["one", "two"], n_results=2)
+
+        store._collection.query.assert_called_once()
+        assert store._collection.query.call_args.kwargs['query_texts'] == ["one", "two"]
+        assert [[r['id'] for r in hits] for hits in results] == [["obs-1"], ["obs-2", "obs-3"]]
+
+    def test_search_many_empty(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        assert store.search_many([]) == []
+        assert store.search_many(["a", "b"]) == [[], []]
+        store._collection.query.assert_not_called()
+
+    def test_delete_and_clear_update_count(self, temp_dir):
+        store = _store(temp_dir, buffer_size=0)
+        store._client = MagicMock()
+        store._client.get_or_create_collection.return_value = store._collection
+        store._collection.count.return_value = 3
+        store.count()
+
+        store.delete("obs-1")
+        store._collection.count.return_value = 2
+        assert store.count() == 2
+
+        store.clear()
+        store._collection.count.return_value = 99  # must not be consulted
+        assert store.count() == 0
+
+
+class TestChangeListeners:
+    def test_writes_notify_listeners(self, temp_dir):
+        store = _store(temp_dir, buffer_size=100, flush_interval=60)
+        store._client = MagicMock()
+        store._client.get_or_create_collection.return_value = store._collection
+        changes = []
+        store.add_change_listener(lambda: changes.append(1))
+
+        store.add_observations([_obs(1)])  # buffered writes count too
+        store.delete("obs-1")
+        store.clear()
+        store.close()
+
+        assert len(changes) == 3
+
+
+class TestCreateMemoryStore:
+    def test_create_from_config(self, temp_dir):
+        config = {'memory': {
+            'chromadb_dir': str(temp_dir / "chroma"),
+            'write_buffer': {'size': 32, 'flush_interval': 0.5},
+        }}
+        store = create_memory_store(config)
+        assert store.buffer_size == 32
+        assert store.flush_interval == 0.5
+
+    def test_create_with_defaults(self):
+        store = create_memory_store({})
+        assert store.buffer_size == 256
+        assert store.flush_interval == 2.0
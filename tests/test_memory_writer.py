@@ -1,9 +1,12 @@
 """Tests for lib/memory_writer.py"""
 
+import os
+import time
 import pytest
 from pathlib import Path
 from datetime import datetime
 
+from lib.content_manifest import ContentManifest
 from lib.memory_writer import MemoryWriter, MemoryWriterError
 
 
@@ -106,3 +109,63 @@ class TestMemoryWriter:
         assert writer.get_category_from_path(Path("/user/notes/bar.md")) == "notes"
         assert writer.get_category_from_path(Path("/user/docs/baz.md")) == "documents"
         assert writer.get_category_from_path(Path("/user/random/qux.md")) == "general"
+
+
+class TestSkipUnchanged:
+    def _writer(self, memory_dir, temp_dir):
+        manifest = ContentManifest(str(temp_dir / "manifest.sqlite"))
+        return MemoryWriter(str(memory_dir), manifest=manifest)
+
+    def test_unchanged_source_skipped(self, memory_dir, temp_dir):
+        writer = self._writer(memory_dir, temp_dir)
+        source = temp_dir / "source.md"
+        source.write_text("# Source")
+
+        first = writer.copy_to_memory(source, skip_unchanged=True)
+        second = writer.copy_to_memory(source, skip_unchanged=True)
+
+        assert first is not None and first.exists()
+        assert second is None
+        assert writer.is_unchanged(source)
+
+    def test_touched_source_skipped(self, memory_dir, temp_dir):
+        writer = self._writer(memory_dir, temp_dir)
+        source = temp_dir / "source.md"
+        source.write_text("# Source")
+        writer.copy_to_memory(source, skip_unchanged=True)
+
+        later = time.time() + 10
+        os.utime(source, (later, later))
+
+        assert writer.copy_to_memory(source, skip_unchanged=True) is None
+
+    def test_modified_source_copied(self, memory_dir, temp_dir):
+        writer = self._writer(memory_dir, temp_dir)
+        source = temp_dir / "source.md"
+        source.write_text("# Source")
+        writer.copy_to_memory(source, skip_unchanged=True)
+
+        source.write_text("# Source, edited")
+
+        assert not writer.is_unchanged(source)
+        assert writer.copy_to_memory(source, skip_unchanged=True) is not None
+
+    def test_deferred_record_waits_for_commit(self, memory_dir, temp_dir):
+        writer = self._writer(memory_dir, temp_dir)
+        source = temp_dir / "source.md"
+        source.write_text("# Source")
+
+        assert writer.copy_to_memory(source, skip_unchanged=True, defer_record=True) is not None
+        assert not writer.is_unchanged(source)
+
+        assert writer.manifest.commit(source)
+        assert writer.copy_to_memory(source, skip_unchanged=True) is None
+
+    def test_without_manifest_never_skips(self, memory_dir, temp_dir):
+        writer = MemoryWriter(str(memory_dir))
+        source = temp_dir / "source.md"
+        source.write_text("# Source")
+
+        assert writer.copy_to_memory(source, skip_unchanged=True) is not None
+        assert not writer.is_unchanged(source)
+        assert writer.copy_to_memory(source, skip_unchanged=True) is not None
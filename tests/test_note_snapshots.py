@@ -0,0 +1,96 @@
+"""Tests for lib/note_snapshots.py"""
+
+import pytest
+
+from lib.note_snapshots import SnapshotStore, changed_hunks
+
+
+class TestChangedHunks:
+    def test_identical(self):
+        assert changed_hunks("a\nb\n", "a\nb\n") == []
+
+    def test_append(self):
+        assert changed_hunks("a\nb\n", "a\nb\nc\n") == ["c\n"]
+
+    def test_whitespace_only_append(self):
+        assert changed_hunks("a\n", "a\n\n\n") == []
+
+    def test_insert_in_middle(self):
+        old = "# Title\nline 1\nline 3\n"
+        new = "# Title\nline 1\nline 2\nline 3\n"
+        assert changed_hunks(old, new) == ["line 2\n"]
+
+    def test_replace(self):
+        old = "a\nold line\nc\n"
+        new = "a\nnew line\nc\n"
+        assert changed_hunks(old, new) == ["new line\n"]
+
+    def test_deletion_only(self):
+        assert changed_hunks("a\nb\nc\n", "a\nc\n") == []
+
+    def test_multiple_hunks(self):
+        old = "a\nb\nc\nd\n"
+        new = "a\nx\nb\nc\nd\ny\n"
+        assert changed_hunks(old, new) == ["x\n", "y\n"]
+
+
+class TestSnapshotStore:
+    @pytest.fixture
+    def store(self, temp_dir):
+        return SnapshotStore(str(temp_dir / "snapshots"))
+
+    def test_first_sight_returns_full_content(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        assert store.delta(source, "# Note\nbody\n") == "# Note\nbody\n"
+        assert store.get_stats()['full_extractions'] == 1
+
+    def test_delta_after_save(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        big = "".join(f"line {i}\n" for i in range(1000))
+        store.save(source, big)
+
+        delta = store.delta(source, big + "new decision\n")
+
+        assert delta == "new decision\n"
+        stats = store.get_stats()
+        assert stats['incremental_extractions'] == 1
+        assert stats['bytes_sent'] == len("new decision\n")
+
+    def test_unchanged_returns_empty(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        store.save(source, "same\n")
+        assert store.delta(source, "same\n") == ""
+        assert store.get_stats()['unchanged'] == 1
+
+    def test_load_and_forget(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        assert store.load(source) is None
+        store.save(source, "content")
+        assert store.load(source) == "content"
+        store.forget(source)
+        assert store.load(source) is None
+
+    def test_snapshots_not_markdown(self, store, temp_dir):
+        store.save(temp_dir / "note.md", "content")
+        assert list(store.snapshot_dir.glob("**/*.md")) == []
+
+    def test_staged_content_saved_on_commit(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        store.save(source, "old\n")
+        store.stage(source, "old\nnew\n")
+        assert store.load(source) == "old\n"
+        assert store.get_stats()['staged'] == 1
+
+        assert store.commit(source)
+        assert store.load(source) == "old\nnew\n"
+        assert not store.commit(source)
+        assert store.get_stats()['staged'] == 0
+
+    def test_discarded_content_keeps_previous_snapshot(self, store, temp_dir):
+        source = temp_dir / "note.md"
+        store.save(source, "old\n")
+        store.stage(source, "old\nnew\n")
+        store.discard(source)
+
+        assert not store.commit(source)
+        assert store.delta(source, "old\nnew\n") == "new\n"
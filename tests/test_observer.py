@@ -1,12 +1,17 @@
 """Tests for lib/observer.py"""
 
+import asyncio
 import json
 import pytest
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
-from lib.observer import Observer, Observation, OBSERVER_SYSTEM_PROMPT, create_observer
+from lib.error_handler import CircuitBreaker, LLMRetryPolicy, RateLimiter
+from lib.observer import (
+    Observer, Observation, ObservationError, OBSERVER_SYSTEM_PROMPT, TranscriptOffsets,
+    create_observer, chunk_messages, merge_observations,
+)
 
 
 class TestObservation:
@@ -134,7 +139,7 @@ class TestObserver:
         results = obs._parse_response(response)
         assert results[0].category == "fact"  # normalized to default
 
-    def test_read_jsonl_log(self, temp_dir):
+    def test_observe_from_file(self, temp_dir):
         log_file = temp_dir / "test.jsonl"
         lines = [
             json.dumps({"role": "user", "content": "Hello"}),
@@ -142,15 +147,346 @@ class TestObserver:
             "invalid json line",
             json.dumps({"no_role": True}),  # missing role
         ]
-        log_file.write_text('\n'.join(lines))
+        log_file.write_text('\n'.join(lines) + '\n')
 
-        messages = Observer._read_jsonl_log(log_file)
-        assert len(messages) == 2
-        assert messages[0]['role'] == "user"
+        obs = Observer(api_key="test")
+        with patch.object(obs, 'observe', return_value=[]) as mock_observe:
+            obs.observe_from_file(log_file)
+
+        messages = mock_observe.call_args.args[0]
+        assert [m['role'] for m in messages] == ["user", "assistant"]
+
+    def test_observe_from_file_missing_file(self, temp_dir):
+        obs = Observer(api_key="test")
+        assert obs.observe_from_file(temp_dir / "missing.jsonl") == []
+
+    def test_observe_from_file_resumes_from_offsets(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        offsets = TranscriptOffsets(str(temp_dir / "offsets.json"))
+        obs = Observer(api_key="test", transcript_offsets=offsets)
+
+        _write_transcript(log_file, ["one"])
+        with patch.object(obs, 'observe', return_value=[]) as mock_observe:
+            obs.observe_from_file(log_file)
+            _write_transcript(log_file, ["two"], mode='a')
+            obs.observe_from_file(log_file)
+
+        sent = [[m['content'] for m in call.args[0]] for call in mock_observe.call_args_list]
+        assert sent == [["one"], ["two"]]
+
+
+def _write_transcript(path, contents, mode='w'):
+    with open(path, mode) as f:
+        for content in contents:
+            f.write(json.dumps({"role": "user", "content": content}) + "\n")
+
+
+class TestTranscriptStreaming:
+    def test_windows_respect_token_budget(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        _write_transcript(log_file, ["word " * 10] * 10)  # ~13 tokens each
+
+        windows = list(Observer.stream_jsonl_windows(log_file, max_tokens=30))
+
+        assert [len(messages) for messages, _ in windows] == [2, 2, 2, 2, 2]
+        assert windows[-1][1] == log_file.stat().st_size
+
+    def test_oversized_message_gets_own_window(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        _write_transcript(log_file, ["short", "word " * 100, "short"])
+
+        windows = list(Observer.stream_jsonl_windows(log_file, max_tokens=20))
+
+        assert [len(messages) for messages, _ in windows] == [1, 1, 1]
+
+    def test_partial_trailing_line_left_for_next_run(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        _write_transcript(log_file, ["complete"])
+        complete_size = log_file.stat().st_size
+        with open(log_file, 'a') as f:
+            f.write('{"role": "user", "content": "half')
+
+        windows = list(Observer.stream_jsonl_windows(log_file))
+
+        assert len(windows) == 1
+        assert windows[0][1] == complete_size
+
+    def test_start_offset(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        _write_transcript(log_file, ["first"])
+        offset = log_file.stat().st_size
+        _write_transcript(log_file, ["second"], mode='a')
+
+        windows = list(Observer.stream_jsonl_windows(log_file, start_offset=offset))
+
+        assert [m['content'] for m in windows[0][0]] == ["second"]
+
+    def test_missing_file(self, temp_dir):
+        assert list(Observer.stream_jsonl_windows(temp_dir / "missing.jsonl")) == []
+
+    def test_observe_transcript_tails_new_lines(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        offsets = TranscriptOffsets(str(temp_dir / "offsets.json"))
+        obs = Observer(api_key="test")
+
+        _write_transcript(log_file, ["one", "two"])
+        with patch.object(obs, 'observe', return_value=[]) as mock_observe:
+            obs.observe_transcript(log_file, offsets)
+            _write_transcript(log_file, ["three"], mode='a')
+            restarted = TranscriptOffsets(str(temp_dir / "offsets.json"))
+            obs.observe_transcript(log_file, restarted)
+            obs.observe_transcript(log_file, restarted)
+
+        sent = [[m['content'] for m in call.args[0]] for call in mock_observe.call_args_list]
+        assert sent == [["one", "two"], ["three"]]
+
+    def test_observe_transcript_keeps_offset_on_failure(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        offsets = TranscriptOffsets(str(temp_dir / "offsets.json"))
+        obs = Observer(api_key="test")
+
+        _write_transcript(log_file, ["one"])
+        with patch.object(obs, 'observe', side_effect=ObservationError("down")):
+            assert obs.observe_transcript(log_file, offsets) == []
+        assert offsets.get(log_file) == 0
+
+        with patch.object(obs, 'observe', return_value=[]) as mock_observe:
+            obs.observe_transcript(log_file, offsets)
+        assert [m['content'] for m in mock_observe.call_args.args[0]] == ["one"]
+        assert offsets.get(log_file) == log_file.stat().st_size
+
+    def test_offsets_reset_on_truncation(self, temp_dir):
+        log_file = temp_dir / "session.jsonl"
+        _write_transcript(log_file, ["a long first message", "another one"])
+        offsets = TranscriptOffsets(str(temp_dir / "offsets.json"))
+        offsets.set(log_file, log_file.stat().st_size)
+
+        _write_transcript(log_file, ["new"])  # rewritten, now shorter
+
+        assert offsets.get(log_file) == 0
+
+
+def _msg(content, role="user"):
+    return {"role": role, "content": content}
+
+
+def _obs(content, priority="medium"):
+    return Observation(
+        id="obs", timestamp=datetime.now(), priority=priority,
+        category="fact", content=content,
+    )
+
+
+class TestChunking:
+    def test_small_input_single_window(self):
+        messages = [_msg("hello"), _msg("world")]
+        assert chunk_messages(messages, max_tokens=100) == [messages]
+
+    def test_splits_at_message_boundaries(self):
+        messages = [_msg("word " * 10) for _ in range(6)]  # ~13 tokens each
+        windows = chunk_messages(messages, max_tokens=30)
+        assert [len(w) for w in windows] == [2, 2, 2]
+        assert [m for w in windows for m in w] == messages
+
+    def test_overlap_repeats_trailing_messages(self):
+        messages = [_msg(f"m{i} " + "word " * 9) for i in range(4)]
+        windows = chunk_messages(messages, max_tokens=30, overlap=1)
+        assert windows[1][0] is windows[0][-1]
+        assert {id(m) for w in windows for m in w} == {id(m) for m in messages}
+
+    def test_oversized_message_split_by_lines(self):
+        content = "".join(f"line {i} with some words\n" for i in range(100))
+        windows = chunk_messages([_msg(content)], max_tokens=50)
+        assert len(windows) > 1
+        assert "".join(m['content'] for w in windows for m in w) == content
+
+    def test_oversized_single_line_split_by_words(self):
+        windows = chunk_messages([_msg("word " * 500)], max_tokens=100)
+        assert len(windows) > 1
+        assert sum(len(m['content'].split()) for w in windows for m in w) == 500
+
+
+class TestMergeObservations:
+    def test_dedupes_normalized_content(self):
+        merged = merge_observations([
+            [_obs("User prefers Python")],
+            [_obs("user prefers  python"), _obs("Deadline is Friday")],
+        ])
+        assert [o.content for o in merged] == ["User prefers Python", "Deadline is Friday"]
+
+    def test_keeps_highest_priority(self):
+        merged = merge_observations([[_obs("Same", "low")], [_obs("same", "high")]])
+        assert len(merged) == 1
+        assert merged[0].priority == "high"
 
-    def test_read_jsonl_log_missing_file(self, temp_dir):
-        messages = Observer._read_jsonl_log(temp_dir / "missing.jsonl")
-        assert messages == []
+
+class TestMapReduceObserve:
+    def test_large_input_extracted_per_window(self):
+        obs = Observer(api_key="test", window_tokens=30, window_workers=3)
+        messages = [_msg(f"topic{i} " + "word " * 9) for i in range(6)]
+
+        def fake_llm(text):
+            topics = sorted(w for w in text.split() if w.startswith("topic"))
+            return json.dumps([
+                {"priority": "medium", "category": "fact", "content": t} for t in topics
+            ] + [{"priority": "low", "category": "fact", "content": "shared"}])
+
+        with patch.object(obs, '_call_llm', side_effect=fake_llm) as mock_llm:
+            results = obs.observe(messages)
+
+        assert mock_llm.call_count == 3
+        contents = [o.content for o in results]
+        assert contents == ["topic0", "topic1", "shared", "topic2", "topic3", "topic4", "topic5"]
+        assert len({o.id for o in results}) == len(results)
+
+    def test_failed_window_fails_whole_input(self):
+        """Partial results would mark the input done and lose the failed window"""
+        obs = Observer(api_key="test", window_tokens=30)
+        messages = [_msg("boom " + "word " * 9), _msg("word " * 10),
+                    _msg("fine " + "word " * 9)]
+
+        def fake_llm(text):
+            if "boom" in text:
+                raise RuntimeError("API error")
+            return json.dumps([{"priority": "medium", "category": "fact", "content": "ok"}])
+
+        with patch.object(obs, '_call_llm', side_effect=fake_llm):
+            with pytest.raises(ObservationError, match="API error"):
+                obs.observe(messages)
+
+
+class TestObserveAsync:
+    def test_observe_async_single_window(self):
+        obs = Observer(api_key="test")
+        response = json.dumps([{"priority": "high", "category": "fact", "content": "Async"}])
+        with patch.object(obs, '_call_llm_async', AsyncMock(return_value=response)) as mock_llm:
+            results = asyncio.run(obs.observe_async([_msg("hello")]))
+
+        assert [o.content for o in results] == ["Async"]
+        assert mock_llm.await_count == 1
+
+    def test_observe_async_no_api_key(self):
+        obs = Observer(api_key="")
+        obs.api_key = ""
+        assert asyncio.run(obs.observe_async([_msg("hello")])) == []
+
+    def test_observe_async_failure_raises(self):
+        obs = Observer(api_key="test")
+        with patch.object(obs, '_call_llm_async', AsyncMock(side_effect=RuntimeError("down"))):
+            with pytest.raises(ObservationError, match="down"):
+                asyncio.run(obs.observe_async([_msg("hello")]))
+
+    def test_concurrency_bounded_by_semaphore(self):
+        obs = Observer(api_key="test", max_concurrency=3)
+        in_flight = 0
+        peak = 0
+
+        async def fake_llm(text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "[]"
+
+        with patch.object(obs, '_call_llm_async', side_effect=fake_llm):
+            results = asyncio.run(obs.observe_many_async([[_msg(str(i))] for i in range(20)]))
+
+        assert len(results) == 20
+        assert peak == 3
+
+    def test_observe_many_against_mock_server(self, mock_openai_server):
+        pytest.importorskip("openai")
+        from lib.llm_clients import LLMClientRegistry
+
+        mock_openai_server.response_content = json.dumps(
+            [{"priority": "medium", "category": "fact", "content": "From server"}]
+        )
+        obs = Observer(api_key="test", base_url=mock_openai_server.base_url,
+                       clients=LLMClientRegistry(), max_concurrency=4)
+
+        results = obs.observe_many([[_msg(f"conversation {i}")] for i in range(10)])
+
+        assert [[o.content for o in r] for r in results] == [["From server"]] * 10
+        assert len(mock_openai_server.requests) == 10
+        assert len(mock_openai_server.connections) <= 4
+
+
+class TestObserveFiles:
+    def test_small_files_packed_into_one_call(self):
+        obs = Observer(api_key="test")
+        response = json.dumps({"observations": [
+            {"priority": "high", "category": "decision", "content": "Use Rust", "file": 2},
+            {"priority": "medium", "category": "fact", "content": "Meeting Monday", "file": 1},
+            {"priority": "low", "category": "fact", "content": "Unknown source", "file": 9},
+        ]})
+
+        with patch.object(obs, '_call_llm', return_value=response) as mock_llm:
+            results = obs.observe_files({
+                "/notes/meeting.md": "Meeting on Monday",
+                "/notes/project.md": "We will use Rust",
+                "/notes/empty.md": "  ",
+            })
+
+        assert mock_llm.call_count == 1
+        prompt = mock_llm.call_args.args[0]
+        assert "=== FILE 1: meeting.md ===" in prompt
+        assert "=== FILE 2: project.md ===" in prompt
+        assert [o.content for o in results["/notes/project.md"]] == ["Use Rust"]
+        # File 9 does not exist: the observation is dropped, not misattributed
+        assert [o.content for o in results["/notes/meeting.md"]] == ["Meeting Monday"]
+        assert results["/notes/empty.md"] == []
+        assert all('file' not in o.metadata for r in results.values() for o in r)
+
+    def test_observation_without_file_number_dropped(self):
+        obs = Observer(api_key="test")
+        response = json.dumps([
+            {"priority": "high", "category": "fact", "content": "No source"},
+            {"priority": "high", "category": "fact", "content": "Bad source", "file": "two"},
+            {"priority": "high", "category": "fact", "content": "From b", "file": 2},
+        ])
+
+        with patch.object(obs, '_call_llm', return_value=response):
+            results = obs.observe_files({"/a.md": "first note", "/b.md": "second note"})
+
+        assert results["/a.md"] == []
+        assert [o.content for o in results["/b.md"]] == ["From b"]
+
+    def test_packs_respect_token_budget(self):
+        obs = Observer(api_key="test", window_tokens=100)
+        inputs = {f"/notes/{i}.md": "word " * 30 for i in range(6)}  # ~40 tokens each
+
+        packs = obs._pack_inputs(inputs)
+
+        assert [len(p) for p in packs] == [2, 2, 2]
+
+    def test_single_file_pack_uses_plain_prompt(self):
+        obs = Observer(api_key="test")
+        response = json.dumps([{"priority": "high", "category": "fact", "content": "Solo"}])
+        with patch.object(obs, '_call_llm', return_value=response) as mock_llm:
+            results = obs.observe_files({"/notes/a.md": "Solo note"})
+
+        assert "=== FILE" not in mock_llm.call_args.args[0]
+        assert [o.content for o in results["/notes/a.md"]] == ["Solo"]
+
+    def test_failed_pack_is_left_out(self):
+        obs = Observer(api_key="test")
+        with patch.object(obs, '_call_llm', side_effect=RuntimeError("down")):
+            results = obs.observe_files({"/a.md": "one", "/b.md": "two", "/c.md": " "})
+        assert results == {"/c.md": []}
+
+    def test_failed_single_file_is_left_out(self):
+        obs = Observer(api_key="test", window_tokens=10)
+        response = json.dumps([{"priority": "high", "category": "fact", "content": "Kept"}])
+
+        def fake_llm(text):
+            if "second" in text:
+                raise RuntimeError("down")
+            return response
+
+        with patch.object(obs, '_call_llm', side_effect=fake_llm):
+            results = obs.observe_files({"/a.md": "first " * 20, "/b.md": "second " * 20})
+        assert list(results) == ["/a.md"]
 
 
 class TestObserverLLMIntegration:
@@ -200,12 +536,11 @@ class TestObserverLLMIntegration:
         assert result == []
 
     def test_observe_llm_raises_exception(self):
-        """LLM call fails, observe() returns empty list gracefully"""
+        """LLM call fails, observe() reports it instead of returning no observations"""
         obs = Observer(api_key="fake-key")
         with patch.object(obs, '_call_llm', side_effect=Exception("API timeout")):
-            result = obs.observe([{"role": "user", "content": "test"}])
-
-        assert result == []
+            with pytest.raises(ObservationError, match="API timeout"):
+                obs.observe([{"role": "user", "content": "test"}])
 
     def test_observe_llm_returns_malformed_json(self):
         """LLM returns non-JSON response, handled gracefully"""
@@ -215,6 +550,32 @@ class TestObserverLLMIntegration:
 
         assert result == []
 
+    def test_retry_policy_wraps_each_llm_request(self):
+        """Transient failures are retried per request through the shared policy"""
+        limiter = RateLimiter(requests_per_minute=6000, burst=10, tokens_per_minute=100_000)
+        policy = LLMRetryPolicy(max_attempts=3, base_delay=0.01, rate_limiter=limiter)
+        obs = Observer(api_key="fake-key", retry_policy=policy)
+        response = json.dumps([{"priority": "low", "category": "fact", "content": "Retried"}])
+
+        with patch.object(obs, '_call_llm', side_effect=[ConnectionError("blip"), response]):
+            result = obs.observe([{"role": "user", "content": "Something worth noting"}])
+
+        assert [o.content for o in result] == ["Retried"]
+        assert policy.total_retries == 1
+        assert limiter.total_acquired == 2
+        assert limiter.total_tokens > 0
+
+    def test_open_circuit_skips_llm(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure()
+        obs = Observer(api_key="fake-key",
+                       retry_policy=LLMRetryPolicy(circuit_breaker=breaker))
+
+        with patch.object(obs, '_call_llm') as call:
+            with pytest.raises(ObservationError):
+                obs.observe([{"role": "user", "content": "test"}])
+        call.assert_not_called()
+
 
 class TestCreateObserver:
     def test_create_from_config(self):
@@ -233,3 +594,14 @@ class TestCreateObserver:
         obs = create_observer({})
         assert obs.provider == "openai"
         assert obs.model == "gpt-4o-mini"
+
+    def test_transcript_offsets_in_memory_dir(self, temp_dir):
+        obs = create_observer({'memory': {'dir': str(temp_dir)}})
+        assert obs.transcript_offsets.state_path == (
+            temp_dir / TranscriptOffsets.STATE_FILENAME
+        ).resolve()
+        assert create_observer({}).transcript_offsets is None
+
+    def test_create_with_retry_policy(self):
+        policy = LLMRetryPolicy()
+        assert create_observer({}, retry_policy=policy).retry_policy is policy
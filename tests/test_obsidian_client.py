@@ -4,6 +4,7 @@ import pytest
 from pathlib import Path
 
 from lib.obsidian_client import ObsidianClient, ObsidianNote, create_obsidian_client
+from lib.vault_index import VaultIndex
 
 
 class TestObsidianNote:
@@ -75,6 +76,35 @@ class TestObsidianClient:
         assert results[0]['title'] == "Alpha"
         assert "ChromaDB" in results[0]['snippet']
 
+    def test_search_notes_many(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir))
+        client.create_note(title="Alpha", content="ChromaDB is great")
+        client.create_note(title="Beta", content="Python and ChromaDB")
+
+        results = client.search_notes_many(["chromadb", "python", "missing"])
+        assert [len(r) for r in results] == [2, 1, 0]
+        assert results[1][0]['title'] == "Beta"
+        assert client.search_notes_many(["chromadb"], max_results=1)[0][0]['title'] in ("Alpha", "Beta")
+
+    def test_search_notes_regex(self, temp_dir):
+        client = ObsidianClient(vault_path=str(temp_dir))
+        client.create_note(title="Alpha", content="error code E1234 then E5678")
+        client.create_note(title="Beta", content="error code E99")
+
+        results = client.search_notes(r"e\d{4}", regex=True)
+        assert [r['title'] for r in results] == ["Alpha"]
+        assert results[0]['matches'] == 2
+
+    def test_search_notes_with_scan_engine(self, temp_dir):
+        from lib.parallel_scan import ScanEngine
+
+        client = ObsidianClient(vault_path=str(temp_dir), scan_engine=ScanEngine(workers=1))
+        client.create_note(title="Once", content="ChromaDB")
+        client.create_note(title="Twice", content="ChromaDB and chromadb")
+
+        results = client.search_notes("chromadb")
+        assert [r['title'] for r in results] == ["Twice", "Once"]
+
     def test_search_notes_empty(self, temp_dir):
         client = ObsidianClient(vault_path=str(temp_dir))
         results = client.search_notes("nonexistent")
@@ -147,6 +177,7 @@ class TestCreateObsidianClient:
 
     def test_enabled(self, temp_dir):
         config = {
+            'memory': {'dir': str(temp_dir / 'memory')},
             'obsidian': {
                 'enabled': True,
                 'vault_path': str(temp_dir / 'vault'),
@@ -154,6 +185,92 @@ class TestCreateObsidianClient:
         }
         client = create_obsidian_client(config)
         assert client is not None
+        assert isinstance(client.vault_index, VaultIndex)
+        assert client.vault_index.index_path == (
+            temp_dir / 'memory' / VaultIndex.INDEX_FILENAME
+        ).resolve()
+        assert client.watch_vault
+
+    def test_index_needs_location_outside_vault(self, temp_dir):
+        config = {'obsidian': {'enabled': True, 'vault_path': str(temp_dir / 'vault')}}
+        assert create_obsidian_client(config).vault_index is None
+
+    def test_index_disabled(self, temp_dir):
+        config = {
+            'obsidian': {
+                'enabled': True,
+                'vault_path': str(temp_dir / 'vault'),
+                'index': {'enabled': False},
+            }
+        }
+        client = create_obsidian_client(config)
+        assert client.vault_index is None
 
     def test_not_configured(self):
         assert create_obsidian_client({}) is None
+
+
+class TestObsidianClientIndex:
+    @pytest.fixture
+    def client(self, temp_dir):
+        vault = temp_dir / "vault"
+        (vault / "Journal").mkdir(parents=True)
+        (vault / "Journal" / "today.md").write_text("Vector roadmap meeting", encoding="utf-8")
+        client = ObsidianClient(
+            vault_path=str(vault),
+            vault_index=VaultIndex(str(vault), str(temp_dir / "vault_index.sqlite")),
+            watch_vault=False,
+        )
+        yield client
+        client.close()
+
+    def test_search_uses_index(self, client):
+        client.create_note(title="Vectors", content="ChromaDB stores vectors")
+        results = client.search_notes("vectors")
+        assert [r['title'] for r in results] == ["Vectors"]
+        assert 'score' in results[0]
+        assert client.vault_index.count() == 2
+
+    def test_search_many_uses_index(self, client):
+        client.create_note(title="Python", content="Type hints")
+        batches = client.search_notes_many(["roadmap", "hints", "missing"])
+        assert [[r['title'] for r in batch] for batch in batches] == [["today"], ["Python"], []]
+
+    def test_regex_bypasses_index(self, client):
+        results = client.search_notes(r"road\w+", regex=True)
+        assert [r['title'] for r in results] == ["today"]
+
+    def test_list_notes_and_stats(self, client):
+        client.create_note(title="A", content="alpha")
+        client.create_note(title="B", content="beta", folder="OC-Memory/archive")
+        assert [n['title'] for n in client.list_notes()] == ["A", "B"]
+        assert [n['title'] for n in client.list_notes("Journal")] == ["today"]
+
+        stats = client.get_stats()
+        assert stats['total_notes'] == 2
+        assert stats['total_size_bytes'] > 0
+        assert stats['index']['notes'] == 3
+
+    def test_sync_index_and_change_notification(self, client):
+        client.sync_index()  # first use indexes the existing note
+        calls = []
+        client.add_change_listener(lambda: calls.append(1))
+        client.create_note(title="C", content="gamma")
+        assert len(calls) == 1
+
+        (client.vault_path / "Journal" / "extra.md").write_text("delta", encoding="utf-8")
+        assert client.sync_index()['added'] == 1
+        assert len(calls) == 2
+        assert client.search_notes("delta")[0]['title'] == "extra"
+
+    def test_watcher_started_on_first_use(self, temp_dir):
+        vault = temp_dir / "watched"
+        index = VaultIndex(str(vault), str(temp_dir / "vault_index.sqlite"))
+        client = ObsidianClient(vault_path=str(vault), vault_index=index)
+        try:
+            assert client.search_notes("anything") == []
+            assert client._watcher is not None and client._watcher.is_alive()
+            assert 'watcher' in client.get_stats()
+        finally:
+            client.close()
+        assert client._watcher is None
@@ -0,0 +1,77 @@
+"""Tests for lib/parallel_scan.py"""
+
+import re
+import pytest
+
+from lib.parallel_scan import ScanEngine, create_scan_engine, scan_files
+
+
+@pytest.fixture
+def notes(temp_dir):
+    files = []
+    for i in range(12):
+        path = temp_dir / f"note_{i:02d}.md"
+        path.write_text("filler text\n" * 20 + "Kafka lag\n" * (i % 4), encoding="utf-8")
+        files.append(path)
+    return files
+
+
+class TestScanFiles:
+    def test_ranks_by_match_count(self, notes):
+        hits = scan_files([str(p) for p in notes], "KAFKA", n_results=4)
+        assert [h.score for h in hits] == [3, 3, 3, 2]
+        assert [h.path for h in hits[:3]] == sorted(h.path for h in hits[:3])
+        assert "Kafka" in hits[0].snippet
+
+    def test_regex(self, notes):
+        hits = scan_files([str(p) for p in notes], r"kafka\s+la[gq]", n_results=20, regex=True)
+        assert len(hits) == 9
+
+    def test_missing_file_skipped(self, notes, temp_dir):
+        paths = [str(temp_dir / "gone.md"), str(notes[3])]
+        assert [h.score for h in scan_files(paths, "kafka")] == [3]
+
+
+class TestScanEngine:
+    def test_parallel_matches_sequential(self, notes):
+        engine = ScanEngine(workers=2, min_parallel_files=0)
+        try:
+            parallel = engine.scan(notes, "kafka lag", n_results=5)
+        finally:
+            engine.close()
+        sequential = scan_files([str(p) for p in notes], "kafka lag", n_results=5)
+
+        assert parallel == sequential
+        assert engine.get_stats()['parallel_scans'] == 1
+
+    def test_small_lists_scan_in_process(self, notes):
+        engine = ScanEngine(workers=4, min_parallel_files=100)
+        engine.scan(notes, "kafka")
+        assert engine._pool is None
+        assert engine.get_stats()['parallel_scans'] == 0
+
+    def test_partitions_balanced_by_size(self, temp_dir):
+        sizes = [900, 500, 400, 300, 200, 100]
+        paths = []
+        for i, size in enumerate(sizes):
+            path = temp_dir / f"{i}.md"
+            path.write_bytes(b"x" * size)
+            paths.append(str(path))
+
+        partitions = ScanEngine(workers=2)._partition(paths)
+        totals = sorted(sum(sizes[paths.index(p)] for p in part) for part in partitions)
+        assert totals == [1200, 1200]
+
+    def test_invalid_regex(self, notes):
+        with pytest.raises(re.error):
+            ScanEngine(workers=1).scan(notes, "kafka(", regex=True)
+
+
+class TestCreateScanEngine:
+    def test_from_config(self):
+        engine = create_scan_engine({'search': {'scan': {'workers': 3, 'min_parallel_files': 10}}})
+        assert engine.workers == 3
+        assert engine.min_parallel_files == 10
+
+    def test_disabled(self):
+        assert create_scan_engine({'search': {'scan': {'enabled': False}}}) is None
@@ -0,0 +1,227 @@
+"""Tests for lib/pipeline.py"""
+
+import threading
+import time
+from pathlib import Path
+
+from lib.pipeline import ObservationPipeline, create_pipeline
+
+
+class Recorder:
+    """Collects calls made by the pipeline stages"""
+
+    def __init__(self, extract_delay=0.0):
+        self.copied = []
+        self.extracted = []
+        self.batches = []
+        self.packs = []
+        self.extract_delay = extract_delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def copy(self, path, event_type):
+        self.copied.append((path, event_type))
+        return path.name != "skip.md"
+
+    def extract(self, path):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.extract_delay)
+        with self._lock:
+            self.active -= 1
+        self.extracted.append(path)
+        return [f"obs:{path.name}"]
+
+    def extract_many(self, paths):
+        time.sleep(self.extract_delay)
+        self.packs.append(list(paths))
+        return [[f"obs:{path.name}"] for path in paths]
+
+    def sink(self, batch):
+        self.batches.append(batch)
+
+
+def make_pipeline(recorder, **kwargs):
+    kwargs.setdefault('debounce_seconds', 0.0)
+    kwargs.setdefault('batch_interval', 0.05)
+    return ObservationPipeline(
+        copy_fn=recorder.copy,
+        extract_fn=recorder.extract,
+        sink_fn=recorder.sink,
+        **kwargs,
+    )
+
+
+class TestObservationPipeline:
+    def test_processes_event_through_all_stages(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec)
+        pipeline.start()
+        pipeline.submit(Path("/notes/a.md"), "created")
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        assert rec.copied == [(Path("/notes/a.md"), "created")]
+        assert rec.extracted == [Path("/notes/a.md")]
+        assert rec.batches == [[(Path("/notes/a.md"), ["obs:a.md"])]]
+
+        stats = pipeline.get_stats()
+        assert stats['copied'] == 1
+        assert stats['extracted'] == 1
+        assert stats['observations'] == 1
+
+    def test_repeated_events_are_coalesced(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec, debounce_seconds=0.2)
+        pipeline.start()
+        path = Path("/notes/a.md")
+        pipeline.submit(path, "created")
+        pipeline.submit(path, "modified")
+        pipeline.submit(path, "modified")
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        assert rec.copied == [(path, "created")]
+        assert pipeline.get_stats()['coalesced'] == 2
+
+    def test_copy_skip_bypasses_extraction(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec)
+        pipeline.start()
+        pipeline.submit(Path("/notes/skip.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        assert rec.extracted == []
+        assert pipeline.get_stats()['skipped'] == 1
+
+    def test_llm_concurrency_is_capped(self):
+        rec = Recorder(extract_delay=0.05)
+        pipeline = make_pipeline(rec, llm_workers=2)
+        pipeline.start()
+        for i in range(8):
+            pipeline.submit(Path(f"/notes/{i}.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        assert len(rec.extracted) == 8
+        assert rec.max_active == 2
+
+    def test_results_are_batched(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec, batch_size=10, batch_interval=0.5)
+        pipeline.start()
+        for i in range(5):
+            pipeline.submit(Path(f"/notes/{i}.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        assert sum(len(b) for b in rec.batches) == 5
+        assert len(rec.batches) < 5
+
+    def test_stage_errors_are_counted(self):
+        def failing_copy(path, event_type):
+            raise OSError("disk full")
+
+        pipeline = ObservationPipeline(copy_fn=failing_copy, debounce_seconds=0.0)
+        pipeline.start()
+        pipeline.submit(Path("/notes/a.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+        assert pipeline.get_stats()['errors'] == 1
+
+    def test_full_intake_drops_after_timeout(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec, max_queue_size=1, debounce_seconds=60)
+        # Not started: nothing leaves the intake
+        pipeline._accepting = True
+        assert pipeline.submit(Path("/notes/a.md")) is True
+        assert pipeline.submit(Path("/notes/b.md"), timeout=0.05) is False
+        assert pipeline.get_stats()['dropped'] == 1
+
+    def test_stop_drains_pending_events(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec, debounce_seconds=60)
+        pipeline.start()
+        pipeline.submit(Path("/notes/a.md"))
+        pipeline.stop(drain=True, timeout=5)
+        assert rec.extracted == [Path("/notes/a.md")]
+
+    def test_submit_after_stop_is_dropped(self):
+        rec = Recorder()
+        pipeline = make_pipeline(rec)
+        pipeline.start()
+        pipeline.stop()
+        assert pipeline.submit(Path("/notes/a.md")) is False
+
+    def test_queue_depth_metrics(self):
+        rec = Recorder(extract_delay=0.02)
+        pipeline = make_pipeline(rec, llm_workers=1)
+        pipeline.start()
+        for i in range(5):
+            pipeline.submit(Path(f"/notes/{i}.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        stats = pipeline.get_stats()
+        assert set(stats['queue_depths']) == {'pending', 'copy', 'llm', 'sink'}
+        assert stats['max_queue_depths']['pending'] >= 1
+        assert stats['in_flight'] == 0
+
+
+class TestPackedExtraction:
+    def test_queued_files_are_packed(self):
+        rec = Recorder(extract_delay=0.1)
+        pipeline = make_pipeline(rec, llm_workers=1, extract_many_fn=rec.extract_many,
+                                 pack_size=4)
+        # Hold the single LLM worker on the first file so the rest queue up
+        pipeline.start()
+        for i in range(9):
+            pipeline.submit(Path(f"/notes/{i}.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        extracted = rec.extracted + [p for pack in rec.packs for p in pack]
+        assert sorted(extracted) == sorted(Path(f"/notes/{i}.md") for i in range(9))
+        assert rec.packs and max(len(pack) for pack in rec.packs) <= 4
+        assert sum(len(b) for b in rec.batches) == 9
+
+        stats = pipeline.get_stats()
+        assert stats['extracted'] == 9
+        assert stats['packed'] == sum(len(pack) for pack in rec.packs)
+
+    def test_pack_failure_counts_error(self):
+        rec = Recorder(extract_delay=0.1)
+
+        def failing_many(paths):
+            raise RuntimeError("API down")
+
+        pipeline = make_pipeline(rec, llm_workers=1, extract_many_fn=failing_many, pack_size=4)
+        pipeline.start()
+        for i in range(4):
+            pipeline.submit(Path(f"/notes/{i}.md"))
+        assert pipeline.wait_idle(timeout=5)
+        pipeline.stop()
+
+        stats = pipeline.get_stats()
+        assert stats['errors'] >= 1
+        assert stats['in_flight'] == 0
+
+
+class TestCreatePipeline:
+    def test_create_from_config(self):
+        config = {
+            'pipeline': {'copy_workers': 3, 'llm_workers': 6, 'batch_size': 5},
+            'llm': {'requests_per_minute': 120},
+        }
+        pipeline = create_pipeline(config, copy_fn=lambda p, e: True, extract_fn=lambda p: [])
+        assert pipeline.copy_workers == 3
+        assert pipeline.llm_workers == 6
+        assert pipeline.batch_size == 5
+        assert pipeline.rate_limiter.requests_per_minute == 120
+
+    def test_no_rate_limiter_without_extraction(self):
+        pipeline = create_pipeline({}, copy_fn=lambda p, e: True)
+        assert pipeline.rate_limiter is None
@@ -0,0 +1,73 @@
+"""Tests for lib/query_cache.py"""
+
+import time
+
+from lib.query_cache import ChangeNotifier, QueryCache
+
+
+class TestQueryCache:
+    def test_hit_and_miss(self):
+        cache = QueryCache()
+        assert cache.get("q", ['hot']) is None
+        cache.put("q", "result", cache.snapshot(['hot']))
+        assert cache.get("q", ['hot']) == "result"
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_lru_eviction(self):
+        cache = QueryCache(max_entries=2)
+        for key in ("a", "b"):
+            cache.put(key, key, cache.snapshot([]))
+        cache.get("a", [])
+        cache.put("c", "c", cache.snapshot([]))
+
+        assert cache.get("b", []) is None
+        assert cache.get("a", []) == "a"
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        cache = QueryCache(ttl=0.05)
+        cache.put("q", "result", cache.snapshot([]))
+        time.sleep(0.1)
+        assert cache.get("q", []) is None
+        assert cache.get_stats()['expired'] == 1
+
+    def test_invalidation_is_per_tier(self):
+        cache = QueryCache()
+        cache.put("hot-only", 1, cache.snapshot(['hot']))
+        cache.put("warm-cold", 2, cache.snapshot(['warm', 'cold']))
+
+        cache.invalidate('cold')
+
+        assert cache.get("hot-only", ['hot']) == 1
+        assert cache.get("warm-cold", ['warm', 'cold']) is None
+        assert cache.get_stats()['invalidations'] == {'cold': 1}
+
+    def test_write_during_computation_leaves_entry_stale(self):
+        cache = QueryCache()
+        generations = cache.snapshot(['hot'])
+        cache.invalidate('hot')  # lands while the search runs
+        cache.put("q", "old", generations)
+        assert cache.get("q", ['hot']) is None
+
+    def test_disabled(self):
+        cache = QueryCache(max_entries=0)
+        cache.put("q", "result", cache.snapshot([]))
+        assert len(cache) == 0
+
+
+class TestChangeNotifier:
+    def test_listeners_called_and_errors_contained(self):
+        calls = []
+
+        def broken():
+            raise RuntimeError("boom")
+
+        source = ChangeNotifier()
+        source.add_change_listener(broken)
+        source.add_change_listener(lambda: calls.append(1))
+        source._notify_change()
+        assert calls == [1]
@@ -0,0 +1,49 @@
+"""Tests for lib/ranking.py"""
+
+import pytest
+
+from lib.ranking import bm25_rank, reciprocal_rank_fusion
+
+
+class TestReciprocalRankFusion:
+    def test_items_in_several_lists_win(self):
+        fused = reciprocal_rank_fusion(
+            {'a': ["x", "y", "z"], 'b': ["y", "w"]},
+            key=lambda item: item,
+        )
+        assert [item for item, _, _ in fused] == ["y", "x", "w", "z"]
+        assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused[0][2] == {'a': 2, 'b': 1}
+
+    def test_top_k_only(self):
+        fused = reciprocal_rank_fusion({'a': list(range(100))}, key=lambda item: item, n_results=3)
+        assert [item for item, _, _ in fused] == [0, 1, 2]
+
+    def test_weights_and_k(self):
+        fused = reciprocal_rank_fusion(
+            {'a': ["x"], 'b': ["y"]},
+            key=lambda item: item,
+            k=1,
+            weights={'b': 2.0},
+        )
+        assert [(item, score) for item, score, _ in fused] == [("y", 1.0), ("x", 0.5)]
+
+    def test_empty(self):
+        assert reciprocal_rank_fusion({}, key=lambda item: item) == []
+        assert reciprocal_rank_fusion({'a': ["x"]}, key=lambda item: item, n_results=0) == []
+
+
+class TestBM25Rank:
+    def test_ranks_matching_documents(self):
+        documents = ["vector database", "python hints", "vector vector search"]
+        ranked = bm25_rank("vector", documents)
+        assert [index for index, _ in ranked] == [2, 0]
+        assert ranked[0][1] > ranked[1][1]
+
+    def test_no_match(self):
+        assert bm25_rank("quantum", ["vector database"]) == []
+        assert bm25_rank("", ["vector database"]) == []
+        assert bm25_rank("vector", []) == []
+
+    def test_respects_n_results(self):
+        assert len(bm25_rank("a", ["a", "a b", "a c"], n_results=2)) == 2
@@ -1,7 +1,9 @@
 """Tests for lib/reflector.py"""
 
+import asyncio
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
+from lib.error_handler import LLMRetryPolicy
 from lib.reflector import Reflector, ReflectionResult, create_reflector
 
 
@@ -132,6 +134,54 @@ class TestReflectorLLMIntegration:
         assert stats['average_ratio'] > 1.0
 
 
+class TestReflectAsync:
+    def test_reflect_async_success(self):
+        r = Reflector(provider="openai", api_key="fake-key")
+        original = "- one fact\n- two fact\n- three fact\n- four fact\n"
+        with patch.object(r, '_call_llm_async', AsyncMock(return_value="- facts 1-4")):
+            result = asyncio.run(r.reflect_async(original, level=2))
+
+        assert result.compressed_content == "- facts 1-4"
+        assert result.level == 2
+        assert len(r.history) == 1
+
+    def test_reflect_async_failure_returns_original(self):
+        r = Reflector(provider="openai", api_key="fake-key")
+        with patch.object(r, '_call_llm_async', AsyncMock(side_effect=RuntimeError("API down"))):
+            result = asyncio.run(r.reflect_async("- keep me", level=1))
+
+        assert result.compressed_content == "- keep me"
+        assert result.compression_ratio == 1.0
+        assert r.history == []
+
+    def test_reflect_async_retries_through_policy(self):
+        policy = LLMRetryPolicy(max_attempts=2, base_delay=0.01)
+        r = Reflector(api_key="fake-key", retry_policy=policy)
+        llm = AsyncMock(side_effect=[ConnectionError("blip"), "- short"])
+        with patch.object(r, '_call_llm_async', llm):
+            result = asyncio.run(r.reflect_async("- one\n- two\n- three", level=1))
+
+        assert result.compressed_content == "- short"
+        assert policy.total_retries == 1
+
+    def test_reflect_async_against_mock_server(self, mock_openai_server):
+        pytest.importorskip("openai")
+        from lib.llm_clients import LLMClientRegistry
+
+        mock_openai_server.response_content = "- compressed"
+        r = Reflector(api_key="test", base_url=mock_openai_server.base_url,
+                      clients=LLMClientRegistry())
+
+        async def run():
+            try:
+                return await r.reflect_async("- a\n- b\n- c", level=1)
+            finally:
+                await r.clients.aclose()
+
+        result = asyncio.run(run())
+        assert result.compressed_content == "- compressed"
+
+
 class TestCreateReflector:
     def test_create_from_config(self):
         config = {
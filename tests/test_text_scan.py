@@ -0,0 +1,77 @@
+"""Tests for lib/text_scan.py"""
+
+import mmap
+
+from lib.text_scan import compile_query, extract_snippet, find_snippet, head_snippet, mapped_file, scan_file
+
+
+class TestFindSnippet:
+    def test_case_insensitive_match(self):
+        data = b"The quick brown FOX jumps over the lazy dog"
+        match = find_snippet(data, "fox", context_chars=6)
+        assert match.offset == 16
+        assert match.snippet == "...brown FOX jumps..."
+
+    def test_no_match(self):
+        assert find_snippet(b"nothing here", "fox") is None
+
+    def test_match_at_edges_has_no_ellipsis(self):
+        assert find_snippet(b"fox", "FOX").snippet == "fox"
+
+    def test_non_ascii_case_folding(self):
+        data = "Überblick über die Übergabe".encode("utf-8")
+        match = find_snippet(data, "übergabe", context_chars=4)
+        assert match.snippet == "...die Übergabe"
+
+    def test_multibyte_context_is_cut_by_characters(self):
+        data = ("가나다라마바사 메모리 아자차카타파하").encode("utf-8")
+        match = find_snippet(data, "메모리", context_chars=3)
+        assert match.snippet == "...바사 메모리 아자..."
+        assert match.offset == len("가나다라마바사 ".encode("utf-8"))
+
+    def test_regex_metacharacters_are_literal(self):
+        assert find_snippet(b"cost is $5 (approx.)", "$5 (approx") is not None
+        assert find_snippet(b"cost is 5", "c.st") is None
+
+    def test_compiled_matcher(self):
+        assert find_snippet(b"Vector DB", compile_query("vector")).offset == 0
+
+    def test_match_across_chunk_boundary(self):
+        data = b"x" * 10 + b"MeMoRy" + b"y" * 10
+        assert compile_query("memory").search(data, chunk_size=12) == (10, 16)
+        assert compile_query("memory").search(b"", chunk_size=12) is None
+
+
+class TestMappedFile:
+    def test_small_file_read(self, temp_dir):
+        path = temp_dir / "small.md"
+        path.write_text("Small note", encoding="utf-8")
+        with mapped_file(path) as data:
+            assert isinstance(data, bytes)
+
+    def test_empty_file(self, temp_dir):
+        path = temp_dir / "empty.md"
+        path.write_bytes(b"")
+        with mapped_file(path, mmap_threshold=0) as data:
+            assert data == b""
+
+    def test_large_file_mapped(self, temp_dir):
+        path = temp_dir / "large.md"
+        path.write_bytes(b"filler line\n" * 100000 + b"Kafka consumer LAG alert\n" + b"tail\n" * 10)
+
+        with mapped_file(path) as data:
+            assert isinstance(data, mmap.mmap)
+
+        match = scan_file(path, "consumer lag", context_chars=6)
+        assert match.offset == len(b"filler line\n") * 100000 + len(b"Kafka ")
+        assert match.snippet == "...Kafka consumer LAG alert..."
+
+
+class TestHelpers:
+    def test_head_snippet(self):
+        assert head_snippet("héllo world".encode("utf-8"), 5) == "héllo"
+
+    def test_extract_snippet(self):
+        content = "A" * 50 + " Memory Store " + "B" * 50
+        assert extract_snippet(content, "memory store", context_chars=3) == "...AA Memory Store BB..."
+        assert extract_snippet("no match", "zzz", fallback_chars=2) == "no"
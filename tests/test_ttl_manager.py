@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from lib.ttl_manager import TTLManager, ArchiveResult, create_ttl_manager
+from lib.warm_index import WarmIndex
 
 
 class TestTTLManager:
@@ -107,6 +108,36 @@ class TestTTLManager:
         assert result.exists()
         assert not test_file.exists()
 
+    def test_archive_to_warm_updates_index(self, temp_dir):
+        mem_dir = temp_dir / "mem"
+        mem_dir.mkdir(parents=True)
+        old_file = mem_dir / "old_note.md"
+        old_file.write_text("Kubernetes migration notes")
+        old_time = time.time() - (100 * 86400)
+        os.utime(old_file, (old_time, old_time))
+
+        archive_dir = temp_dir / "archive"
+        index = WarmIndex(str(archive_dir))
+        mgr = TTLManager(str(mem_dir), str(archive_dir), warm_index=index)
+        mgr.check_and_archive()
+
+        hits = index.search("kubernetes")
+        assert len(hits) == 1
+        assert hits[0]['title'] == "old_note"
+
+    def test_archive_to_cold_updates_index(self, temp_dir):
+        archive_dir = temp_dir / "archive"
+        archive_dir.mkdir(parents=True)
+        test_file = archive_dir / "to_cold.md"
+        test_file.write_text("cold content")
+
+        index = WarmIndex(str(archive_dir))
+        index.sync()
+        mgr = TTLManager(str(temp_dir / "mem"), str(archive_dir), warm_index=index)
+        mgr.archive_to_cold(test_file, temp_dir / "cold")
+
+        assert index.count() == 0
+
     def test_archive_to_cold_no_dir(self, temp_dir):
         mgr = TTLManager(str(temp_dir / "mem"))
         result = mgr.archive_to_cold(temp_dir / "nonexistent.md")
@@ -121,3 +152,9 @@ class TestCreateTTLManager:
         }
         mgr = create_ttl_manager(config)
         assert mgr.hot_ttl_days == 60
+        assert mgr.warm_index is not None
+
+    def test_create_without_warm_index(self, temp_dir):
+        config = {'memory': {'dir': str(temp_dir), 'warm_index': False}}
+        mgr = create_ttl_manager(config)
+        assert mgr.warm_index is None
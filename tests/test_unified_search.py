@@ -1,10 +1,13 @@
 """Tests for lib/unified_search.py"""
 
+import os
+import time
 import pytest
 from pathlib import Path
 from datetime import datetime
+from unittest.mock import MagicMock
 
-from lib.unified_search import UnifiedSearch, SearchResult, create_unified_search
+from lib.unified_search import UnifiedSearch, SearchResult, SearchResults, create_unified_search
 from lib.obsidian_client import ObsidianClient
 
 
@@ -59,6 +62,35 @@ class TestUnifiedSearchWarm:
         results = search.search_warm("quantum physics")
         assert len(results) == 0
 
+    def test_search_warm_ranks_best_match_first(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        # Written first so a scan-and-stop search would return it first
+        (archive / "a_passing.md").write_text(
+            "A long note that mentions ChromaDB once among many other unrelated "
+            "words about gardening, cooking and travel plans for the summer",
+            encoding="utf-8",
+        )
+        (archive / "b_focused.md").write_text(
+            "ChromaDB setup. ChromaDB collections. ChromaDB tuning.",
+            encoding="utf-8",
+        )
+
+        search = UnifiedSearch(archive_dir=str(archive))
+        results = search.search_warm("ChromaDB", n_results=1)
+        assert len(results) == 1
+        assert results[0].title == "b_focused"
+
+    def test_search_warm_picks_up_new_files_after_sync(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        search = UnifiedSearch(archive_dir=str(archive))
+        assert search.search_warm("retention") == []
+
+        (archive / "policy.md").write_text("Retention policy is 90 days", encoding="utf-8")
+        search.warm_index.sync()
+        assert len(search.search_warm("retention")) == 1
+
     def test_search_warm_no_archive(self):
         search = UnifiedSearch(archive_dir=None)
         results = search.search_warm("test")
@@ -91,6 +123,22 @@ class TestUnifiedSearchCold:
         results = search.search_cold("test")
         assert results == []
 
+    def test_close_stops_vault_watcher(self, temp_dir):
+        from lib.vault_index import VaultIndex
+
+        vault = temp_dir / "vault"
+        index = VaultIndex(str(vault), str(temp_dir / "vault_index.sqlite"))
+        client = ObsidianClient(vault_path=str(vault), vault_index=index)
+        search = UnifiedSearch(obsidian_client=client)
+        search.search_cold("anything")
+        watcher = client._watcher
+        assert watcher is not None and watcher.is_alive()
+
+        search.close()
+
+        assert not watcher.is_alive()
+        assert client._watcher is None
+
 
 class TestUnifiedSearchMultiTier:
     def test_search_all_tiers(self, temp_dir):
@@ -143,6 +191,362 @@ class TestUnifiedSearchMultiTier:
         assert len(results) <= 3
 
 
+class TestUnifiedSearchParallel:
+    @staticmethod
+    def _slow_dropbox(delay):
+        dropbox = MagicMock()
+        dropbox.is_configured = True
+
+        def slow_search(query, max_results):
+            time.sleep(delay)
+            return [{'name': 'remote.md', 'path': '/remote.md', 'modified': ''}]
+
+        dropbox.search.side_effect = slow_search
+        return dropbox
+
+    def _make_search(self, temp_dir, dropbox, **kwargs):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "warm_note.md").write_text("Warm memory about testing", encoding="utf-8")
+        vault = temp_dir / "vault"
+        client = ObsidianClient(vault_path=str(vault))
+        client.create_note(title="ColdNote", content="Cold testing content")
+        return UnifiedSearch(
+            archive_dir=str(archive),
+            obsidian_client=client,
+            dropbox_sync=dropbox,
+            **kwargs,
+        )
+
+    def test_parallel_matches_sequential(self, temp_dir):
+        search = self._make_search(temp_dir, self._slow_dropbox(0))
+        sequential = search.search("testing", tiers=['warm', 'cold'])
+        parallel = search.search("testing", tiers=['warm', 'cold'], parallel=True)
+        search.close()
+
+        assert isinstance(parallel, SearchResults)
+        assert [r.title for r in parallel] == [r.title for r in sequential]
+        assert parallel.timed_out_tiers == []
+
+    def test_slow_tier_returns_partial_results(self, temp_dir):
+        search = self._make_search(
+            temp_dir,
+            self._slow_dropbox(1.0),
+            parallel=True,
+            tier_timeouts={'cold:dropbox': 0.1},
+        )
+        start = time.monotonic()
+        results = search.search("testing", tiers=['warm', 'cold'])
+        elapsed = time.monotonic() - start
+        search.close()
+
+        assert elapsed < 0.9
+        assert results.is_partial
+        assert results.timed_out_tiers == ['cold:dropbox']
+        sources = {r.source for r in results}
+        assert 'obsidian' in sources
+        assert 'dropbox' not in sources
+        assert search.get_stats()['tier_timeout_counts'] == {'cold:dropbox': 1}
+
+    def test_hung_tier_is_not_resubmitted(self, temp_dir):
+        dropbox = self._slow_dropbox(0.5)
+        search = self._make_search(
+            temp_dir,
+            dropbox,
+            parallel=True,
+            tier_timeouts={'cold:dropbox': 0.05},
+        )
+        first = search.search("testing", tiers=['cold'])
+        second = search.search("memory", tiers=['cold'])
+
+        assert first.timed_out_tiers == ['cold:dropbox']
+        assert second.timed_out_tiers == ['cold:dropbox']
+        assert dropbox.search.call_count == 1
+        assert search.get_stats()['tier_busy_counts'] == {'cold:dropbox': 1}
+
+        # Once the hung call returns, the tier is queried again
+        time.sleep(0.6)
+        third = search.search("cold", tiers=['cold'])
+        search.close()
+        assert dropbox.search.call_count == 2
+        assert third.timed_out_tiers == ['cold:dropbox']
+
+    def test_tier_error_does_not_fail_search(self, temp_dir):
+        store = MagicMock()
+        store.search.side_effect = RuntimeError("boom")
+        search = self._make_search(temp_dir, None, memory_store=store, parallel=True)
+        results = search.search("testing")
+        search.close()
+        assert len(results) >= 1
+        assert results.timed_out_tiers == []
+
+    def test_tier_timeout_fallback(self):
+        search = UnifiedSearch(tier_timeouts={'cold': 7.0, 'cold:dropbox': 1.5})
+        assert search._tier_timeout('cold:obsidian') == 7.0
+        assert search._tier_timeout('cold:dropbox') == 1.5
+        assert search._tier_timeout('hot') == UnifiedSearch.DEFAULT_TIER_TIMEOUTS['hot']
+
+
+class TestUnifiedSearchMany:
+    def test_matches_single_searches(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "warm_note.md").write_text("Warm memory about testing", encoding="utf-8")
+        (archive / "other.md").write_text("Deployment checklist", encoding="utf-8")
+        client = ObsidianClient(vault_path=str(temp_dir / "vault"))
+        client.create_note(title="ColdNote", content="Cold testing content")
+        search = UnifiedSearch(archive_dir=str(archive), obsidian_client=client)
+
+        queries = ["testing", "deployment", "nothing"]
+        batched = search.search_many(queries, tiers=['warm', 'cold'])
+
+        assert len(batched) == 3
+        for query, results in zip(queries, batched):
+            single = search.search(query, tiers=['warm', 'cold'])
+            assert [(r.title, r.tier, r.score) for r in results] == \
+                [(r.title, r.tier, r.score) for r in single]
+
+    def test_hot_tier_uses_one_store_call(self):
+        store = MagicMock()
+        store.search_many.return_value = [
+            [{'id': 'a', 'content': 'A', 'distance': 0.2, 'metadata': {}}],
+            [],
+        ]
+        search = UnifiedSearch(memory_store=store, fusion='score')
+
+        results = search.search_many(["x", "y"], tiers=['hot'], priority="high")
+
+        store.search_many.assert_called_once_with(queries=["x", "y"], n_results=10, where={"priority": "high"})
+        assert [r.title for r in results[0]] == ["a"]
+        assert results[0][0].score == pytest.approx(0.9)
+        assert len(results[1]) == 0
+
+    def test_parallel_and_errors(self, temp_dir):
+        store = MagicMock()
+        store.search_many.side_effect = RuntimeError("boom")
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "note.md").write_text("Parallel testing", encoding="utf-8")
+        search = UnifiedSearch(memory_store=store, archive_dir=str(archive), parallel=True)
+
+        results = search.search_many(["testing", "parallel"])
+        search.close()
+
+        assert [len(r) for r in results] == [1, 1]
+        assert all(r.timed_out_tiers == [] for r in results)
+
+    def test_empty_queries(self):
+        assert UnifiedSearch().search_many([]) == []
+
+
+class TestUnifiedSearchFusion:
+    @staticmethod
+    def _hot_store(*items):
+        store = MagicMock()
+        store.search.return_value = [
+            {'id': obs_id, 'content': content, 'distance': distance, 'metadata': {}}
+            for obs_id, content, distance in items
+        ]
+        return store
+
+    def test_rrf_interleaves_tiers_by_rank(self, temp_dir):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "a.md").write_text("kafka kafka kafka lag", encoding="utf-8")
+        (archive / "b.md").write_text("kafka notes", encoding="utf-8")
+        store = self._hot_store(("h1", "consumer offsets", 1.5), ("h2", "broker config", 1.6))
+        search = UnifiedSearch(memory_store=store, archive_dir=str(archive), hot_lexical=False)
+
+        results = search.search("kafka", tiers=['hot', 'warm'])
+
+        # Hot scores (~0.25) sit far below warm BM25, but rank 1 of each tier ties
+        assert [r.title for r in results] == ["h1", "a", "h2", "b"]
+        assert results[0].score == pytest.approx(1 / 61)
+        assert results[0].metadata['ranks'] == {'hot': 1}
+        assert results[0].metadata['tier_score'] == pytest.approx(0.25)
+
+    def test_hot_lexical_pass_promotes_keyword_match(self):
+        store = self._hot_store(
+            ("vague", "general infrastructure notes", 0.4),
+            ("other", "meeting summary", 0.5),
+            ("exact", "postgres replication lag alert", 0.6),
+        )
+        search = UnifiedSearch(memory_store=store)
+
+        results = search.search("postgres replication", tiers=['hot'], n_results=3)
+
+        store.search.assert_called_once_with(query="postgres replication", n_results=9, where=None)
+        assert [r.title for r in results] == ["exact", "vague", "other"]
+        assert results[0].metadata['ranks'] == {'hot': 3, 'hot:lexical': 1}
+
+    def test_same_title_notes_stay_separate(self):
+        client = MagicMock()
+        client.search_notes.return_value = [
+            {'title': "index", 'snippet': "kafka setup", 'path': "Work/index.md", 'folder': "Work"},
+            {'title': "index", 'snippet': "kafka reading", 'path': "Home/index.md", 'folder': "Home"},
+        ]
+        search = UnifiedSearch(obsidian_client=client)
+
+        results = search.search("kafka", tiers=['cold'])
+
+        assert [r.metadata['path'] for r in results] == ["Work/index.md", "Home/index.md"]
+
+    def test_score_fusion_sorts_raw_scores(self, temp_dir):
+        store = self._hot_store(("h1", "x", 0.0))
+        search = UnifiedSearch(memory_store=store, fusion='score')
+        results = search.search("x", tiers=['hot'])
+        assert results[0].score == 1.0
+        store.search.assert_called_once_with(query="x", n_results=10, where=None)
+
+    def test_unknown_fusion(self):
+        with pytest.raises(ValueError):
+            UnifiedSearch(fusion='magic')
+
+
+class TestUnifiedSearchCache:
+    def _make_search(self, temp_dir, **kwargs):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "warm_note.md").write_text("Warm memory about testing", encoding="utf-8")
+        client = ObsidianClient(vault_path=str(temp_dir / "vault"))
+        client.create_note(title="ColdNote", content="Cold testing content")
+        return UnifiedSearch(archive_dir=str(archive), obsidian_client=client, **kwargs)
+
+    def test_repeated_query_hits_cache(self, temp_dir):
+        search = self._make_search(temp_dir)
+        search.search("testing", tiers=['cold'])
+        search.obsidian_client.search_notes = MagicMock(side_effect=AssertionError("not cached"))
+
+        results = search.search("testing", tiers=['cold'])
+
+        assert [r.title for r in results] == ["ColdNote"]
+        assert search.get_stats()['cache']['hits'] == 1
+
+    def test_new_note_invalidates_cold_only(self, temp_dir):
+        search = self._make_search(temp_dir)
+        search.search("testing", tiers=['warm'])
+        search.search("testing", tiers=['warm'])  # first search synced the index
+        search.search("testing", tiers=['cold'])
+
+        search.obsidian_client.create_note(title="Second", content="More testing")
+
+        assert len(search.search("testing", tiers=['cold'])) == 2
+        search.search("testing", tiers=['warm'])
+        stats = search.get_stats()['cache']
+        assert stats['stale'] == 2  # first warm entry, then the cold entry
+        assert stats['hits'] == 1  # the warm entry survived the new note
+
+    def test_archive_move_invalidates_warm(self, temp_dir):
+        from lib.ttl_manager import TTLManager
+        from lib.warm_index import WarmIndex
+
+        mem = temp_dir / "mem"
+        archive = mem / "archive"
+        index = WarmIndex(str(archive))
+        ttl = TTLManager(memory_dir=str(mem), archive_dir=str(archive), warm_index=index)
+        search = UnifiedSearch(archive_dir=str(archive), warm_index=index)
+        assert search.search("kafka", tiers=['warm']) == []
+
+        old = mem / "kafka.md"
+        old.write_text("Kafka lag runbook", encoding="utf-8")
+        stale_time = time.time() - 200 * 86400
+        os.utime(old, (stale_time, stale_time))
+        ttl.check_and_archive()
+
+        assert [r.title for r in search.search("kafka", tiers=['warm'])] == ["kafka"]
+
+    def test_memory_store_write_invalidates_hot(self):
+        from lib.query_cache import ChangeNotifier
+
+        class Store(ChangeNotifier):
+            def __init__(self):
+                self.items = []
+
+            def search(self, query, n_results, where=None):
+                return list(self.items)
+
+        store = Store()
+        search = UnifiedSearch(memory_store=store)
+        assert search.search("x", tiers=['hot']) == []
+
+        store.items.append({'id': 'obs-1', 'content': 'x', 'distance': 0.1, 'metadata': {}})
+        store._notify_change()
+
+        assert [r.title for r in search.search("x", tiers=['hot'])] == ["obs-1"]
+
+    def test_partial_results_not_cached(self, temp_dir):
+        dropbox = TestUnifiedSearchParallel._slow_dropbox(0.5)
+        search = self._make_search(temp_dir, parallel=True, tier_timeouts={'cold:dropbox': 0.05})
+        search.dropbox_sync = dropbox
+        assert search.search("testing", tiers=['cold']).is_partial
+        search.close()
+        assert len(search.cache) == 0
+
+    def test_search_many_uses_cache(self, temp_dir):
+        search = self._make_search(temp_dir)
+        search.search("testing", tiers=['cold'])
+        search.obsidian_client.search_notes_many = MagicMock(return_value=[[]])
+
+        results = search.search_many(["testing", "other"], tiers=['cold'])
+
+        search.obsidian_client.search_notes_many.assert_called_once_with(queries=["other"], max_results=10)
+        assert [r.title for r in results[0]] == ["ColdNote"]
+        assert len(results[1]) == 0
+
+    def test_cache_disabled(self, temp_dir):
+        search = self._make_search(temp_dir, cache_size=0)
+        search.search("testing")
+        assert search.cache is None
+        assert search.get_stats()['cache'] is None
+
+
+class TestUnifiedSearchScan:
+    def _make_search(self, temp_dir, **kwargs):
+        archive = temp_dir / "archive"
+        archive.mkdir()
+        (archive / "incident.md").write_text("Ticket OPS-1234 and OPS-5678", encoding="utf-8")
+        (archive / "other.md").write_text("Ticket OPS-99", encoding="utf-8")
+        client = ObsidianClient(vault_path=str(temp_dir / "vault"))
+        client.create_note(title="ColdTicket", content="Escalated OPS-4242")
+        return UnifiedSearch(archive_dir=str(archive), obsidian_client=client, **kwargs)
+
+    def test_regex_search_scans_warm_and_cold(self, temp_dir):
+        store = MagicMock()
+        search = self._make_search(temp_dir, memory_store=store)
+
+        results = search.search(r"ops-\d{4}", regex=True)
+
+        assert {r.title for r in results} == {"incident", "ColdTicket"}
+        store.search.assert_not_called()
+        warm = next(r for r in results if r.tier == 'warm')
+        assert warm.metadata['matches'] == 2
+
+    def test_search_warm_regex(self, temp_dir):
+        search = self._make_search(temp_dir)
+        assert [r.title for r in search.search_warm(r"ops-\d+", regex=True)] == ["incident", "other"]
+
+    def test_warm_falls_back_to_scan_without_index(self, temp_dir):
+        import sqlite3
+
+        index = MagicMock()
+        index.sync.side_effect = sqlite3.OperationalError("unable to open database file")
+        search = self._make_search(temp_dir, warm_index=index)
+
+        results = search.search_warm("OPS-1234")
+        assert [r.title for r in results] == ["incident"]
+
+    def test_warm_many_falls_back_to_scan_without_index(self, temp_dir):
+        import sqlite3
+
+        index = MagicMock()
+        index.sync.side_effect = sqlite3.OperationalError("unable to open database file")
+        search = self._make_search(temp_dir, warm_index=index)
+
+        results = search.search_many(["OPS-1234", "nothing here"], tiers=['warm'])
+        assert [r.title for r in results[0]] == ["incident"]
+        assert results[1] == []
+
+
 class TestUnifiedSearchStats:
     def test_stats_empty(self):
         search = UnifiedSearch()
@@ -178,9 +582,35 @@ class TestCreateUnifiedSearch:
         search = create_unified_search(config)
         assert search.archive_dir is not None
 
+    def test_shares_warm_index_with_ttl_manager(self, temp_dir):
+        from lib.ttl_manager import create_ttl_manager
+
+        config = {'memory': {'dir': str(temp_dir / 'mem')}}
+        ttl = create_ttl_manager(config)
+        search = create_unified_search(config)
+        assert search.warm_index is ttl.warm_index
+        assert search.search("kafka", tiers=['warm']) == []
+
+        note = ttl.archive_dir / "kafka.md"
+        note.write_text("kafka consumer lag", encoding="utf-8")
+        ttl.warm_index.add_document(note)
+
+        assert [r.title for r in search.search("kafka", tiers=['warm'])] == ["kafka"]
+
     def test_create_with_defaults(self):
         search = create_unified_search({})
         assert search is not None
+        assert search.parallel is False
+
+    def test_create_parallel_from_config(self, temp_dir):
+        config = {
+            'memory': {'dir': str(temp_dir / 'mem')},
+            'search': {'parallel': True, 'tier_timeouts': {'cold': 3.0}},
+        }
+        search = create_unified_search(config)
+        assert search.parallel is True
+        assert search.tier_timeouts['cold'] == 3.0
+        assert search.tier_timeouts['hot'] == UnifiedSearch.DEFAULT_TIER_TIMEOUTS['hot']
 
     def test_extract_snippet(self):
         content = "The quick brown fox jumps over the lazy dog"
@@ -0,0 +1,239 @@
+"""Tests for lib/vault_index.py"""
+
+import os
+import time
+import pytest
+from pathlib import Path
+
+from lib.vault_index import VaultIndex, VaultWatcher, match_expression, parse_note
+
+
+NOTE = """---
+title: "Vector Notes"
+source: oc-memory
+tags:
+  - databases
+  - cold-archive
+---
+
+# Vector Notes
+
+ChromaDB is a vector database. See #search/vector for more.
+"""
+
+
+@pytest.fixture
+def vault(temp_dir):
+    d = temp_dir / "vault"
+    (d / "OC-Memory" / "archive").mkdir(parents=True)
+    (d / "OC-Memory" / "vector.md").write_text(NOTE, encoding="utf-8")
+    (d / "OC-Memory" / "archive" / "python.md").write_text(
+        "User prefers Python with type hints", encoding="utf-8"
+    )
+    (d / "Journal").mkdir()
+    (d / "Journal" / "today.md").write_text("Talked about the vector roadmap", encoding="utf-8")
+    (d / "OC-Memory-old").mkdir()
+    (d / "OC-Memory-old" / "stale.md").write_text("vector leftovers", encoding="utf-8")
+    return d
+
+
+@pytest.fixture
+def index_path(temp_dir):
+    return str(temp_dir / "data" / VaultIndex.INDEX_FILENAME)
+
+
+@pytest.fixture
+def index(vault, index_path):
+    idx = VaultIndex(str(vault), index_path)
+    idx.sync()
+    yield idx
+    idx.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+class TestParseNote:
+    def test_frontmatter_and_tags(self):
+        frontmatter, tags, body = parse_note(NOTE)
+        assert frontmatter['title'] == "Vector Notes"
+        assert frontmatter['source'] == "oc-memory"
+        assert tags == ["databases", "cold-archive", "search/vector"]
+        assert body.startswith("# Vector Notes")
+
+    def test_inline_tag_list(self):
+        _, tags, _ = parse_note("---\ntags: [a, b]\n---\nbody")
+        assert tags == ["a", "b"]
+
+    def test_no_frontmatter(self):
+        frontmatter, tags, body = parse_note("Just text")
+        assert frontmatter == {}
+        assert tags == []
+        assert body == "Just text"
+
+
+class TestMatchExpression:
+    def test_phrase_with_prefix(self):
+        assert match_expression("Vector DB") == '"vector db"*'
+
+    def test_quotes_are_dropped(self):
+        assert match_expression('say "hi" OR') == '"say hi or"*'
+
+    def test_empty(self):
+        assert match_expression("  ?! ") is None
+
+
+class TestVaultIndex:
+    def test_sync_indexes_all_notes(self, index):
+        assert index.count() == 4
+
+    def test_sync_is_incremental(self, index):
+        assert index.sync() == {'added': 0, 'updated': 0, 'removed': 0}
+
+    def test_sync_detects_changes_and_removals(self, vault, index):
+        note = vault / "Journal" / "today.md"
+        note.write_text("Now about gardening instead", encoding="utf-8")
+        os.utime(note, (time.time() + 10, time.time() + 10))
+        (vault / "OC-Memory" / "archive" / "python.md").unlink()
+
+        assert index.sync() == {'added': 0, 'updated': 1, 'removed': 1}
+        assert index.search("gardening")[0]['title'] == "today"
+        assert index.search("python") == []
+
+    def test_search_ranks_title_and_tags(self, vault, index):
+        results = index.search("vector")
+        assert results[0]['title'] == "vector"
+        assert results[0]['path'] == str(vault / "OC-Memory" / "vector.md")
+        assert results[0]['folder'] == "OC-Memory"
+        assert results[0]['score'] >= results[-1]['score']
+        assert {r['title'] for r in results} == {"vector", "today", "stale"}
+
+    def test_search_tags_and_frontmatter(self, index):
+        assert [r['title'] for r in index.search("databases")] == ["vector"]
+        assert [r['title'] for r in index.search("oc-memory source")] == []
+        assert {r['title'] for r in index.search("oc memory")} == {"vector", "python", "stale"}
+
+    def test_search_prefix_and_case(self, index):
+        assert [r['title'] for r in index.search("CHROMA")] == ["vector"]
+
+    def test_search_snippet(self, index):
+        snippet = index.search("chromadb")[0]['snippet']
+        assert "ChromaDB is a vector database" in snippet
+
+    def test_search_folder_filter(self, index):
+        titles = {r['title'] for r in index.search("vector", folder="OC-Memory")}
+        assert titles == {"vector"}
+        titles = {r['title'] for r in index.search("python", folder="OC-Memory")}
+        assert titles == {"python"}
+
+    def test_search_respects_max_results(self, index):
+        assert len(index.search("vector", max_results=1)) == 1
+
+    def test_search_no_match(self, index):
+        assert index.search("nonexistent") == []
+        assert index.search("") == []
+
+    def test_list_notes(self, vault, index):
+        notes = index.list_notes("OC-Memory")
+        assert [n['path'] for n in notes] == [
+            str(Path("OC-Memory/archive/python.md")),
+            str(Path("OC-Memory/vector.md")),
+        ]
+        assert notes[0]['title'] == "python"
+        assert "T" in notes[0]['modified']
+        assert len(index.list_notes()) == 4
+
+    def test_folder_stats(self, vault, index):
+        stats = index.folder_stats("OC-Memory")
+        assert stats['notes'] == 2
+        assert stats['size_bytes'] == sum(
+            f.stat().st_size for f in (vault / "OC-Memory").rglob("*.md")
+        )
+        assert index.folder_stats("Missing") == {'notes': 0, 'size_bytes': 0}
+
+    def test_add_and_remove_document(self, vault, index):
+        note = vault / "Journal" / "new.md"
+        note.write_text("Quantum entanglement notes", encoding="utf-8")
+        assert index.add_document(note)
+        assert index.search("quantum")[0]['title'] == "new"
+
+        assert index.remove_document(note)
+        assert not index.remove_document(note)
+        assert index.search("quantum") == []
+
+    def test_reindex_replaces_content(self, vault, index):
+        note = vault / "Journal" / "today.md"
+        note.write_text("Completely different words", encoding="utf-8")
+        index.add_document(note)
+        assert index.count() == 4
+        assert [r['title'] for r in index.search("roadmap")] == []
+
+    def test_remove_folder(self, vault, index):
+        assert index.remove_folder(vault / "OC-Memory") == 2
+        assert index.count() == 2
+        assert index.list_notes("OC-Memory-old")[0]['title'] == "stale"
+
+    def test_change_listener(self, vault, index):
+        calls = []
+        index.add_change_listener(lambda: calls.append(1))
+        index.add_document(vault / "Journal" / "today.md")
+        index.remove_document(vault / "Journal" / "today.md")
+        index.remove_document(vault / "Journal" / "today.md")
+        assert len(calls) == 2
+
+    def test_index_persists_across_instances(self, vault, index, index_path):
+        index.close()
+        reopened = VaultIndex(str(vault), index_path)
+        assert reopened.count() == 4
+        assert reopened.sync() == {'added': 0, 'updated': 0, 'removed': 0}
+        reopened.close()
+
+    def test_index_files_stay_out_of_the_vault(self, vault, index, index_path):
+        assert Path(index_path).exists()
+        assert [p for p in vault.rglob("*") if p.name.startswith(".oc_")] == []
+
+    def test_rebuild(self, index):
+        assert index.rebuild() == 4
+
+    def test_get_stats(self, index, index_path):
+        stats = index.get_stats()
+        assert stats['notes'] == 4
+        assert stats['index_path'] == index_path
+
+
+class TestVaultWatcher:
+    def test_applies_filesystem_events(self, vault, index):
+        watcher = VaultWatcher(index, quiet_period=0.05)
+        watcher.start()
+        try:
+            assert watcher.is_alive()
+            note = vault / "Journal" / "fresh.md"
+            note.write_text("Photosynthesis basics", encoding="utf-8")
+            assert wait_for(lambda: index.search("photosynthesis"))
+
+            note.rename(vault / "Journal" / "renamed.md")
+            assert wait_for(lambda: [r['title'] for r in index.search("photosynthesis")] == ["renamed"])
+
+            (vault / "Journal" / "renamed.md").unlink()
+            assert wait_for(lambda: index.search("photosynthesis") == [])
+        finally:
+            watcher.stop()
+        assert not watcher.is_alive()
+
+    def test_folder_move(self, vault, index):
+        watcher = VaultWatcher(index, quiet_period=0.05)
+        watcher.start()
+        try:
+            (vault / "Journal").rename(vault / "Diary")
+            assert wait_for(lambda: [n['path'] for n in index.list_notes("Diary")] == [
+                str(Path("Diary/today.md"))
+            ])
+            assert index.list_notes("Journal") == []
+        finally:
+            watcher.stop()
@@ -0,0 +1,139 @@
+"""Tests for lib/warm_index.py"""
+
+import os
+import time
+import pytest
+
+from lib.warm_index import WarmIndex, tokenize
+
+
+@pytest.fixture
+def archive(temp_dir):
+    d = temp_dir / "archive"
+    (d / "2025" / "01").mkdir(parents=True)
+    (d / "2025" / "01" / "vector.md").write_text(
+        "ChromaDB is a vector database. Vector search is fast.", encoding="utf-8"
+    )
+    (d / "2025" / "01" / "python.md").write_text(
+        "User prefers Python with type hints", encoding="utf-8"
+    )
+    (d / "notes.md").write_text("Meeting notes about the vector roadmap", encoding="utf-8")
+    return d
+
+
+class TestTokenize:
+    def test_lowercases_and_splits(self):
+        assert tokenize("Hello, World! hello") == ["hello", "world", "hello"]
+
+    def test_unicode_words(self):
+        assert tokenize("벡터 검색") == ["벡터", "검색"]
+
+    def test_empty(self):
+        assert tokenize("") == []
+
+
+class TestWarmIndex:
+    def test_sync_indexes_all_files(self, archive):
+        index = WarmIndex(str(archive))
+        counts = index.sync()
+        assert counts['added'] == 3
+        assert index.count() == 3
+
+    def test_sync_is_incremental(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        counts = index.sync()
+        assert counts == {'added': 0, 'updated': 0, 'removed': 0}
+
+    def test_sync_detects_changes_and_removals(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+
+        changed = archive / "notes.md"
+        changed.write_text("Completely different content now", encoding="utf-8")
+        future = time.time() + 10
+        os.utime(changed, (future, future))
+        (archive / "2025" / "01" / "python.md").unlink()
+
+        counts = index.sync()
+        assert counts['updated'] == 1
+        assert counts['removed'] == 1
+        assert index.search("roadmap") == []
+
+    def test_search_bm25_ranking(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        results = index.search("vector")
+        assert [r['title'] for r in results] == ["vector", "notes"]
+        assert results[0]['score'] > results[1]['score']
+
+    def test_search_multiple_terms(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        results = index.search("python vector")
+        assert {r['title'] for r in results} == {"vector", "python", "notes"}
+
+    def test_search_respects_n_results(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        assert len(index.search("vector", n_results=1)) == 1
+
+    def test_search_no_match(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        assert index.search("quantum") == []
+
+    def test_search_many_matches_single_searches(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        queries = ["vector", "python hints", "quantum"]
+        assert index.search_many(queries) == [index.search(q) for q in queries]
+
+    def test_search_many_empty(self, archive):
+        index = WarmIndex(str(archive))
+        assert index.search_many([]) == []
+
+    def test_add_and_remove_document(self, archive):
+        index = WarmIndex(str(archive))
+        new_file = archive / "kafka.md"
+        new_file.write_text("Kafka consumer lag alert", encoding="utf-8")
+
+        assert index.add_document(new_file) is True
+        assert index.search("kafka")[0]['path'] == str(new_file.resolve())
+
+        assert index.remove_document(new_file) is True
+        assert index.search("kafka") == []
+        assert index.remove_document(new_file) is False
+
+    def test_reindex_replaces_postings(self, archive):
+        index = WarmIndex(str(archive))
+        target = archive / "notes.md"
+        index.add_document(target)
+        target.write_text("Only about kubernetes", encoding="utf-8")
+        index.add_document(target)
+
+        assert index.count() == 1
+        assert index.search("roadmap") == []
+        assert len(index.search("kubernetes")) == 1
+
+    def test_index_persists_across_instances(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        index.close()
+
+        reopened = WarmIndex(str(archive))
+        assert reopened.count() == 3
+        assert len(reopened.search("python")) == 1
+
+    def test_rebuild(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        assert index.rebuild() == 3
+
+    def test_get_stats(self, archive):
+        index = WarmIndex(str(archive))
+        index.sync()
+        stats = index.get_stats()
+        assert stats['documents'] == 3
+        assert stats['terms'] > 0
+        assert stats['index_path'].endswith(WarmIndex.INDEX_FILENAME)